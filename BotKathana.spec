@@ -3,7 +3,7 @@ from PyInstaller.utils.hooks import collect_all
 
 datas = [('config.json', '.')]
 binaries = []
-hiddenimports = ['PyQt5.QtCore', 'PyQt5.QtGui', 'PyQt5.QtWidgets', 'config_manager', 'bot_controller', 'configuracion', 'game_window', 'estado_objetivo', 'hilo_detector_ocr', 'hilo_habilidades', 'hilo_autocuracion', 'hilo_observador_objetivo', 'hilo_recoger_drop', 'hilo_mob_trabado', 'mss', 'PIL', 'pytesseract', 'win32api', 'win32con', 'win32gui']
+hiddenimports = ['PyQt5.QtCore', 'PyQt5.QtGui', 'PyQt5.QtWidgets', 'config_manager', 'bot_controller', 'configuracion', 'game_window', 'estado_objetivo', 'hilo_detector_ocr', 'hilo_habilidades', 'hilo_autocuracion', 'hilo_observador_objetivo', 'hilo_recoger_drop', 'hilo_mob_trabado', 'clasificador_color', 'lector_vitales', 'captura_sondas', 'backend_plataforma', 'sesion_grabada', 'perfilador', 'metricas', 'carga_diferida', 'almacen_configuracion', 'config_compilada', 'muestreo_rendimiento', 'panel_rendimiento', 'vista_previa_ocr', 'panel_vista_previa', 'localizador_region', 'reconocedor_glifos', 'diccionario_tesseract', 'filtro_clasificacion', 'estadisticas_combate', 'ajuste_escape', 'mss', 'PIL', 'pytesseract', 'win32api', 'win32con', 'win32gui']
 tmp_ret = collect_all('PyQt5')
 datas += tmp_ret[0]; binaries += tmp_ret[1]; hiddenimports += tmp_ret[2]
 tmp_ret = collect_all('mss')
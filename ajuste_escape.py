@@ -0,0 +1,355 @@
+"""
+Ajuste automático del timeout de escape por mob.
+Responsabilidad: Recomendar el timeout de mob trabado a partir del tiempo hasta matar de cada mob (Single Responsibility Principle)
+
+HiloMobTrabado escapa cuando el mob lleva más de ESCAPE_BY_MOB.get(nombre,
+timeout_mob) segundos seleccionado. Con un número fijo se espera de más en
+los mobs trabados o se abandonan mobs que estaban por morir. El ajuste
+mantiene por mob una estimación en línea de un percentil del tiempo hasta
+matar (algoritmo P² de Jain y Chlamtac: cinco marcadores por mob, memoria y
+costo constantes por muerte) y propone como timeout:
+
+    max(timeout fijo, percentil (ajuste_percentil) + margen (ajuste_margen))
+
+Mientras un mob tenga menos de ajuste_muestras muertes (arranque en frío) se
+usa el timeout fijo de la configuración. Con auto_ajuste = False (por
+defecto) el timeout fijo se usa siempre y las recomendaciones solo se
+muestran en la pestaña Escape.
+
+Las muertes llegan de estadisticas_combate (BaseCombates.suscribir). Al
+iniciar, un hilo carga los últimos ajuste_dias días de combates.sqlite sin
+demorar el arranque. Solo cuentan los episodios 'muerto'. Un escape es una
+observación censurada (el mob habría tardado más que el timeout, o nunca
+iba a morir), pero sin él el percentil está sesgado hacia abajo: los mobs
+más lentos que el timeout se escapan, no se registran, y el timeout baja
+de a poco abandonando mobs que iban a morir. Sumar el timeout de cada
+escape como si fuera una muerte tampoco sirve: con muchos mobs trabados el
+percentil cae en el timeout y este sube sin límite. Por eso el ajuste
+nunca baja del timeout fijo: solo lo alarga para los mobs que tardan más
+en morir. Las recomendaciones (el percentil) sirven para bajar a mano el
+timeout fijo de un mob.
+
+Cada percentil en uso (los perfiles de los clientes pueden pedir distintos)
+tiene sus propias estimaciones. Un percentil nuevo (al iniciar o al
+publicarse una configuración) carga el historial una sola vez en segundo
+plano; el hilo de escape solo lee. El margen y las muestras mínimas se
+aplican en la consulta siguiente.
+"""
+import threading
+import time
+from bisect import insort
+from typing import Any, Dict, List, NamedTuple, Optional, Set
+
+from estadisticas_combate import BaseCombates, EpisodioCombate, percentil
+
+
+class CuantilP2:
+    """
+    Estimación en línea de un cuantil con el algoritmo P² (cinco marcadores).
+    agregar() desde un solo hilo a la vez (el llamador toma el lock); valor()
+    se puede leer desde cualquier hilo.
+    """
+
+    __slots__ = ('p', 'cantidad', '_alturas', '_posiciones', '_deseadas', '_incrementos')
+
+    def __init__(self, p: float):
+        """
+        Args:
+            p: Cuantil a estimar (0-1)
+        """
+        self.p = p
+        self.cantidad = 0
+        self._alturas: List[float] = []
+        self._posiciones = [0, 1, 2, 3, 4]
+        self._deseadas = [0.0, 2 * p, 4 * p, 2 + 2 * p, 4.0]
+        self._incrementos = (0.0, p / 2, p, (1 + p) / 2, 1.0)
+
+    def agregar(self, x: float) -> None:
+        """Agrega una observación."""
+        self.cantidad += 1
+        q = self._alturas
+        if self.cantidad <= 5:
+            insort(q, x)
+            return
+
+        n = self._posiciones
+        # Celda de la observación (y extremos)
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = 0
+            while x >= q[k + 1]:
+                k += 1
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self._deseadas[i] += self._incrementos[i]
+
+        # Mover los marcadores centrales hacia su posición deseada
+        for i in (1, 2, 3):
+            d = self._deseadas[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                s = 1 if d > 0 else -1
+                parabola = q[i] + s / (n[i + 1] - n[i - 1]) * (
+                    (n[i] - n[i - 1] + s) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+                    + (n[i + 1] - n[i] - s) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+                )
+                if q[i - 1] < parabola < q[i + 1]:
+                    q[i] = parabola
+                else:
+                    q[i] = q[i] + s * (q[i + s] - q[i]) / (n[i + s] - n[i])
+                n[i] += s
+
+    def valor(self) -> Optional[float]:
+        """Cuantil estimado (exacto con 5 observaciones o menos; None sin observaciones)."""
+        if self.cantidad == 0:
+            return None
+        if self.cantidad <= 5:
+            return percentil(sorted(self._alturas), self.p * 100)
+        return self._alturas[2]
+
+
+class Recomendacion(NamedTuple):
+    """Timeout recomendado para un mob."""
+    mob: str
+    muertes: int                 # Muertes observadas
+    cuantil: float               # Percentil estimado del tiempo hasta matar (segundos)
+    recomendado: float           # cuantil + margen
+    fijo: float                  # Timeout de la configuración (ESCAPE_BY_MOB / timeout_mob)
+    en_uso: bool                 # True si HiloMobTrabado usa el recomendado (mayor que el fijo)
+
+
+class AjusteEscape:
+    """
+    Percentil del tiempo hasta matar por mob y timeout de escape resultante.
+    Compartido por todos los clientes (los nombres de mob son los mismos);
+    cada percentil en uso (los perfiles pueden pedir distintos) tiene sus
+    propias estimaciones.
+    """
+
+    def __init__(self):
+        self.base: Optional[BaseCombates] = None
+        self.activo = False
+        # percentil -> mob -> estimación
+        self._bocetos: Dict[float, Dict[str, CuantilP2]] = {}
+        self._cargando: Set[float] = set()
+        self._almacenes: List[Any] = []
+        self._lock = threading.Lock()
+        # Cada reinicio de las estimaciones invalida las cargas en curso
+        self._generacion = 0
+
+    # ------------------------------
+    # Observaciones
+    # ------------------------------
+    @staticmethod
+    def _agregar(bocetos: Dict[str, CuantilP2], percentil_objetivo: float, mob: str, ttk: float) -> None:
+        boceto = bocetos.get(mob)
+        if boceto is None:
+            boceto = CuantilP2(percentil_objetivo / 100.0)
+            bocetos[mob] = boceto
+        boceto.agregar(ttk)
+
+    def observar(self, episodio: EpisodioCombate) -> None:
+        """Suscriptor de BaseCombates: agrega el tiempo de cada muerte a cada percentil."""
+        if episodio.resultado != 'muerto':
+            return
+        with self._lock:
+            for percentil_objetivo, bocetos in self._bocetos.items():
+                self._agregar(bocetos, percentil_objetivo, episodio.mob, episodio.ttk)
+
+    def _cargar_historial(self, generacion: int, percentil_objetivo: float, base: BaseCombates,
+                          desde: float) -> None:
+        t0 = time.perf_counter()
+        filas = base.tiempos_muerte(desde)
+        with self._lock:
+            if generacion != self._generacion:
+                return
+            bocetos = self._bocetos[percentil_objetivo]
+            for mob, ttk in filas:
+                self._agregar(bocetos, percentil_objetivo, mob, ttk)
+            self._cargando.discard(percentil_objetivo)
+        print(f"[AJUSTE ESCAPE] {len(filas)} muertes de {len(bocetos)} mobs cargadas "
+              f"en {(time.perf_counter() - t0) * 1000:.0f} ms (percentil {percentil_objetivo:g})")
+
+    def preparar(self, escape, esperar: bool = False) -> None:
+        """
+        Crea las estimaciones del percentil de la configuración si todavía no
+        existen y les carga el historial (una sola vez por percentil).
+
+        Args:
+            escape: EscapeCompilado (ajuste_percentil y ajuste_dias)
+            esperar: Cargar en este hilo (la GUI, con el bot detenido) en vez de en segundo plano
+        """
+        percentil_objetivo = escape.ajuste_percentil
+        with self._lock:
+            if percentil_objetivo in self._bocetos:
+                return
+            self._bocetos[percentil_objetivo] = {}
+            generacion = self._generacion
+            if self.base is None or escape.ajuste_dias <= 0:
+                return
+            self._cargando.add(percentil_objetivo)
+        argumentos = (generacion, percentil_objetivo, self.base, time.time() - escape.ajuste_dias * 86400)
+        if esperar:
+            self._cargar_historial(*argumentos)
+        else:
+            threading.Thread(target=self._cargar_historial, args=argumentos,
+                             name='ajuste_escape', daemon=True).start()
+
+    def _reiniciar(self) -> None:
+        """Descarta todas las estimaciones (y las cargas en curso)."""
+        with self._lock:
+            self._generacion += 1
+            self._bocetos = {}
+            self._cargando = set()
+
+    def _al_publicar(self, instantanea) -> None:
+        """Suscriptor de AlmacenConfiguracion: prepara el percentil de la configuración nueva."""
+        self.preparar(instantanea.compilada.escape)
+
+    # ------------------------------
+    # Consultas
+    # ------------------------------
+    def timeout(self, escape, nombre: Optional[str]) -> float:
+        """
+        Segundos con el mismo MOB antes de considerarlo trabado. Solo lee las
+        estimaciones (las prepara preparar(), fuera del hilo de escape).
+
+        Args:
+            escape: EscapeCompilado de la configuración vigente
+            nombre: Mob seleccionado
+
+        Returns:
+            Percentil + margen si el ajuste está activo, el mob tiene muestras
+            suficientes y supera el timeout fijo; si no, el timeout fijo
+        """
+        fijo = escape.timeout(nombre)
+        if not escape.auto_ajuste:
+            return fijo
+        bocetos = self._bocetos.get(escape.ajuste_percentil)
+        boceto = bocetos.get(nombre) if bocetos is not None else None
+        if boceto is None or boceto.cantidad < escape.ajuste_muestras:
+            return fijo
+        return max(fijo, boceto.valor() + escape.ajuste_margen)
+
+    def recomendaciones(self, escape) -> List[Recomendacion]:
+        """
+        Timeout recomendado de cada mob con muertes observadas, por nombre,
+        para el percentil de la configuración (vacío si no está preparado).
+
+        Args:
+            escape: EscapeCompilado (percentil, margen, muestras mínimas y timeouts fijos)
+        """
+        with self._lock:
+            bocetos = sorted(self._bocetos.get(escape.ajuste_percentil, {}).items())
+        resultado = []
+        for mob, boceto in bocetos:
+            cuantil = boceto.valor()
+            recomendado = cuantil + escape.ajuste_margen
+            fijo = escape.timeout(mob)
+            resultado.append(Recomendacion(
+                mob, boceto.cantidad, cuantil, recomendado, fijo,
+                escape.auto_ajuste and boceto.cantidad >= escape.ajuste_muestras and recomendado > fijo,
+            ))
+        return resultado
+
+    def cargando(self, percentil_objetivo: float) -> bool:
+        """True mientras se carga el historial del percentil."""
+        return percentil_objetivo in self._cargando
+
+    # ------------------------------
+    # Ciclo de vida
+    # ------------------------------
+    def cargar(self, base: BaseCombates, escape) -> None:
+        """
+        Calcula las estimaciones del percentil con el historial. Con el bot
+        detenido (GUI o informe) las recalcula en este hilo; en ejecución
+        solo prepara en segundo plano un percentil que aún no tenga.
+        """
+        if self.activo:
+            self.preparar(escape)
+            return
+        self.base = base
+        self._reiniciar()
+        self.preparar(escape, esperar=True)
+
+    def iniciar(self, base: BaseCombates, escape) -> None:
+        """
+        Empieza a observar las muertes y carga el historial en segundo plano.
+
+        Args:
+            base: Base de estadísticas de combate
+            escape: EscapeCompilado de la configuración vigente
+        """
+        if self.activo:
+            return
+        self.base = base
+        self.activo = True
+        self._reiniciar()
+        base.suscribir(self.observar)
+        self.preparar(escape)
+
+    def seguir(self, almacen_config) -> None:
+        """
+        Prepara el percentil de un almacén de configuración (el global o el
+        perfil de un cliente) y el de cada configuración que publique.
+        """
+        if almacen_config in self._almacenes:
+            return
+        self._almacenes.append(almacen_config)
+        almacen_config.suscribir(self._al_publicar)
+        self.preparar(almacen_config.actual.compilada.escape)
+
+    def detener(self) -> None:
+        """Deja de observar las muertes (las estimaciones se conservan para la GUI)."""
+        for almacen_config in self._almacenes:
+            almacen_config.desuscribir(self._al_publicar)
+        self._almacenes = []
+        if not self.activo:
+            return
+        self.activo = False
+        self.base.desuscribir(self.observar)
+
+
+# Instancia global (las muertes de todos los clientes)
+ajuste_escape = AjusteEscape()
+
+
+# ============================================================
+# PRUEBA INDEPENDIENTE
+# ============================================================
+if __name__ == "__main__":
+    import random
+    from estadisticas_combate import base_combates
+    from almacen_configuracion import almacen
+
+    # Precisión de P² contra el percentil exacto
+    aleatorio = random.Random(1)
+    for nombre, generar in (("lognormal", lambda: aleatorio.lognormvariate(2.2, 0.35)),
+                            ("bimodal", lambda: aleatorio.choice((6.0, 14.0)) + aleatorio.gauss(0, 1))):
+        for p in (50, 90, 95):
+            boceto = CuantilP2(p / 100)
+            valores = [generar() for _ in range(2000)]
+            t0 = time.perf_counter()
+            for v in valores:
+                boceto.agregar(v)
+            costo = (time.perf_counter() - t0) / len(valores) * 1e6
+            exacto = percentil(sorted(valores), p)
+            print(f"[P2] {nombre:9s} p{p}: estimado {boceto.valor():6.2f}s | exacto {exacto:6.2f}s | "
+                  f"{costo:.1f} us/muerte")
+
+    # Recomendaciones con la configuración vigente y combates.sqlite
+    escape = almacen.actual.compilada.escape
+    ajuste_escape.cargar(base_combates, escape)
+    print(f"\n[INFO] Percentil {escape.ajuste_percentil:g} + {escape.ajuste_margen:g}s "
+          f"(mínimo {escape.ajuste_muestras} muertes, {escape.ajuste_dias:g} días de {base_combates.ruta})")
+    recomendaciones = ajuste_escape.recomendaciones(escape)
+    if not recomendaciones:
+        print("[INFO] Sin muertes registradas")
+    for r in recomendaciones:
+        print(f"  {r.mob:24s} {r.muertes:6d} muertes | p{escape.ajuste_percentil:g} {r.cuantil:6.1f}s | "
+              f"recomendado {r.recomendado:6.1f}s | fijo {r.fijo:6.1f}s" + (" (en uso)" if r.en_uso else ""))
@@ -0,0 +1,499 @@
+"""
+Almacén de configuración con instantáneas inmutables.
+Responsabilidad: Publicar la configuración vigente como instantáneas validadas e inmutables (Single Responsibility Principle)
+
+Los hilos leen la configuración con una sola carga de atributo:
+
+    cfg = almacen.actual
+    cfg.AUTOCURACION['vida']['tecla']
+
+Cada publicación valida la configuración, construye una Instantanea nueva
+(diccionarios congelados con MappingProxyType y listas convertidas en
+tuplas) y la reemplaza con una asignación de referencia, que es atómica. Un
+hilo que ya tomó la instantánea termina su tick con ella; el siguiente tick
+ve la nueva, sin RUN/STOP.
+
+El módulo configuracion.py se mantiene sincronizado (aplicar_configuracion_a_modulo)
+para las herramientas y la GUI que todavía lo leen directamente.
+
+Cada instantánea expone además su versión compilada (config_compilada):
+teclas con el código VK resuelto, timeouts por mob, habilidades activas e
+índices de nombres, construidos una sola vez por publicación. Los errores que
+impiden compilar (teclas inexistentes en VK_CODES, barras mal definidas)
+rechazan la publicación igual que los errores de estructura.
+
+AlmacenPerfil es el almacén de un cliente con su propio perfil (multicliente):
+la configuración base con las claves del archivo de perfil encima. Cuando la
+base cambia, el perfil se vuelve a publicar con su capa; no sincroniza
+configuracion.py, que sigue reflejando la configuración base.
+
+VigilanteConfiguracion revisa la fecha de modificación de config.json y
+publica los cambios en caliente. Un archivo inválido o a medio escribir se
+ignora y la instantánea anterior sigue vigente.
+"""
+import json
+import os
+import threading
+import time
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config_compilada import ConfigCompilada, errores_compilacion
+
+
+# Claves de configuración que forman una instantánea (mismos nombres que configuracion.py)
+CLAVES = (
+    'GAME_WINDOW_TITLE',
+    'TESSERACT_PATH',
+    'OCR_REGION',
+    'UMBRAL_SIMILITUD',
+    'MOBS_OBJETIVO',
+    'DROP_ITEMS_OBJETIVO',
+    'LOOT_DROP',
+    'HABILIDADES',
+    'AUTOCURACION',
+    'OBSERVADOR_OBJETIVO',
+    'ESCAPE_MOB',
+    'ESCAPE_BY_MOB',
+    'METRICAS',
+    'VK_CODES',
+)
+
+
+def _congelar(valor: Any) -> Any:
+    """Copia inmutable: dict -> MappingProxyType, list -> tuple (recursivo)."""
+    if isinstance(valor, (dict, MappingProxyType)):
+        return MappingProxyType({clave: _congelar(v) for clave, v in valor.items()})
+    if isinstance(valor, (list, tuple)):
+        return tuple(_congelar(v) for v in valor)
+    return valor
+
+
+def _descongelar(valor: Any) -> Any:
+    """Inverso de _congelar: copia mutable con dict y list."""
+    if isinstance(valor, (dict, MappingProxyType)):
+        return {clave: _descongelar(v) for clave, v in valor.items()}
+    if isinstance(valor, tuple):
+        return [_descongelar(v) for v in valor]
+    return valor
+
+
+class Instantanea:
+    """
+    Configuración completa e inmutable en un instante.
+    Los atributos tienen los mismos nombres que las constantes de configuracion.py.
+    """
+
+    __slots__ = CLAVES + ('version', 'timestamp', '_compilada')
+
+    def __init__(self, valores: Dict[str, Any], version: int):
+        for clave in CLAVES:
+            object.__setattr__(self, clave, _congelar(valores[clave]))
+        object.__setattr__(self, 'version', version)
+        object.__setattr__(self, 'timestamp', time.time())
+        object.__setattr__(self, '_compilada', None)
+
+    def __setattr__(self, nombre, valor):
+        raise AttributeError("La instantánea de configuración es inmutable")
+
+    @property
+    def compilada(self) -> ConfigCompilada:
+        """
+        Configuración compilada para los ciclos de los hilos.
+        Se construye en el primer acceso; si dos hilos llegan a la vez, ambos
+        obtienen objetos equivalentes y se conserva el último.
+        """
+        compilada = self._compilada
+        if compilada is None:
+            compilada = ConfigCompilada({clave: getattr(self, clave) for clave in CLAVES})
+            object.__setattr__(self, '_compilada', compilada)
+        return compilada
+
+    def como_dict(self) -> Dict[str, Any]:
+        """Copia mutable de la configuración (para guardar o editar)."""
+        return {clave: _descongelar(getattr(self, clave)) for clave in CLAVES}
+
+
+# ============================================================
+# Validación
+# ============================================================
+
+def _es_numero(valor: Any) -> bool:
+    return isinstance(valor, (int, float)) and not isinstance(valor, bool)
+
+
+def _validar_campos(errores: List[str], seccion: str, datos: Any, campos: Dict[str, Callable[[Any], bool]]) -> None:
+    """Verifica que 'datos' sea un diccionario con los campos y tipos indicados."""
+    if not isinstance(datos, (dict, MappingProxyType)):
+        errores.append(f"{seccion}: debe ser un diccionario")
+        return
+    for campo, valido in campos.items():
+        if campo not in datos:
+            errores.append(f"{seccion}.{campo}: falta")
+        elif not valido(datos[campo]):
+            errores.append(f"{seccion}.{campo}: valor inválido ({datos[campo]!r})")
+
+
+def _validar_opcionales(errores: List[str], seccion: str, datos: Any, campos: Dict[str, Callable[[Any], bool]]) -> None:
+    """Como _validar_campos, pero los campos ausentes se aceptan (config.json anteriores)."""
+    if not isinstance(datos, (dict, MappingProxyType)):
+        return
+    for campo, valido in campos.items():
+        if campo in datos and not valido(datos[campo]):
+            errores.append(f"{seccion}.{campo}: valor inválido ({datos[campo]!r})")
+
+
+def _es_punto(valor: Any) -> bool:
+    return isinstance(valor, (dict, MappingProxyType)) and _es_numero(valor.get('x')) and _es_numero(valor.get('y'))
+
+
+def _es_tecla(valor: Any) -> bool:
+    return isinstance(valor, str) or (isinstance(valor, (list, tuple)) and all(isinstance(t, str) for t in valor))
+
+
+def validar(config: Dict[str, Any]) -> List[str]:
+    """
+    Valida la estructura y los tipos de una configuración completa.
+
+    Returns:
+        Lista de errores (vacía si es válida)
+    """
+    errores: List[str] = []
+    no_negativo = lambda v: _es_numero(v) and v >= 0
+    positivo = lambda v: _es_numero(v) and v > 0
+    texto = lambda v: isinstance(v, str)
+    lista_textos = lambda v: isinstance(v, (list, tuple)) and all(isinstance(x, str) for x in v)
+
+    for clave in ('GAME_WINDOW_TITLE', 'TESSERACT_PATH'):
+        if not texto(config.get(clave)):
+            errores.append(f"{clave}: debe ser texto")
+
+    _validar_campos(errores, 'OCR_REGION', config.get('OCR_REGION'), {
+        'left_offset': _es_numero, 'top_offset': _es_numero, 'width': positivo, 'height': positivo,
+    })
+    _validar_opcionales(errores, 'OCR_REGION', config.get('OCR_REGION'), {
+        'recortar_texto': lambda v: isinstance(v, bool), 'min_pixeles_texto': no_negativo,
+        'diccionario_nombres': lambda v: isinstance(v, bool), 'plantilla': texto,
+        'plantilla_offset_x': _es_numero, 'plantilla_offset_y': _es_numero,
+        'umbral_plantilla': lambda v: _es_numero(v) and 0 < v <= 1,
+        'fallos_relocalizar': lambda v: isinstance(v, int) and not isinstance(v, bool) and v >= 1,
+    })
+
+    umbral = config.get('UMBRAL_SIMILITUD')
+    if not (_es_numero(umbral) and 0 <= umbral <= 1):
+        errores.append(f"UMBRAL_SIMILITUD: debe estar entre 0 y 1 ({umbral!r})")
+
+    for clave in ('MOBS_OBJETIVO', 'DROP_ITEMS_OBJETIVO'):
+        if not lista_textos(config.get(clave)):
+            errores.append(f"{clave}: debe ser una lista de textos")
+
+    _validar_campos(errores, 'LOOT_DROP', config.get('LOOT_DROP'), {
+        'repeticiones_f': no_negativo, 'intervalo_f': no_negativo,
+    })
+
+    habilidades = config.get('HABILIDADES')
+    if not isinstance(habilidades, (dict, MappingProxyType)):
+        errores.append("HABILIDADES: debe ser un diccionario")
+    else:
+        for tecla, habilidad in habilidades.items():
+            _validar_campos(errores, f"HABILIDADES.{tecla}", habilidad, {
+                'active': lambda v: isinstance(v, bool), 'time': no_negativo,
+            })
+
+    autocuracion = config.get('AUTOCURACION')
+    if not isinstance(autocuracion, (dict, MappingProxyType)):
+        errores.append("AUTOCURACION: debe ser un diccionario")
+    else:
+        for recurso in ('vida', 'mana'):
+            _validar_campos(errores, f"AUTOCURACION.{recurso}", autocuracion.get(recurso), {
+                'x': _es_numero, 'y': _es_numero, 'tecla': _es_tecla,
+                'intervalo_con': no_negativo, 'intervalo_sin': no_negativo,
+            })
+
+    _validar_campos(errores, 'OBSERVADOR_OBJETIVO', config.get('OBSERVADOR_OBJETIVO'), {
+        'timeout_drop': no_negativo, 'intervalo_revision': no_negativo,
+    })
+    entero_positivo = lambda v: isinstance(v, int) and not isinstance(v, bool) and v >= 1
+    _validar_opcionales(errores, 'OBSERVADOR_OBJETIVO', config.get('OBSERVADOR_OBJETIVO'), {
+        'ventana_votos': entero_positivo,
+        'entrar_mob_cuadros': entero_positivo, 'entrar_mob_ms': no_negativo,
+        'salir_mob_cuadros': entero_positivo, 'salir_mob_ms': no_negativo,
+    })
+
+    _validar_campos(errores, 'ESCAPE_MOB', config.get('ESCAPE_MOB'), {
+        'timeout_mob': no_negativo,
+        'punto_click_primero': _es_punto,
+        'puntos_clic': lambda v: isinstance(v, (list, tuple)) and all(_es_punto(p) for p in v),
+        'veces': lambda v: isinstance(v, int) and not isinstance(v, bool) and v >= 1,
+        'duracion_total': no_negativo,
+    })
+    _validar_opcionales(errores, 'ESCAPE_MOB', config.get('ESCAPE_MOB'), {
+        'auto_ajuste': lambda v: isinstance(v, bool),
+        'ajuste_percentil': lambda v: _es_numero(v) and 50 <= v < 100,
+        'ajuste_margen': no_negativo,
+        'ajuste_muestras': entero_positivo,
+        'ajuste_dias': no_negativo,
+    })
+
+    escape_by_mob = config.get('ESCAPE_BY_MOB')
+    if not (isinstance(escape_by_mob, (dict, MappingProxyType))
+            and all(texto(k) and no_negativo(v) for k, v in escape_by_mob.items())):
+        errores.append("ESCAPE_BY_MOB: debe asociar nombres de mob con segundos")
+
+    return errores
+
+
+def errores_configuracion(config: Dict[str, Any]) -> List[str]:
+    """
+    Errores de estructura y, si no los hay, errores de compilación.
+
+    Returns:
+        Lista de errores (vacía si la configuración se puede publicar)
+    """
+    return validar(config) or errores_compilacion(config)
+
+
+# ============================================================
+# Almacén
+# ============================================================
+
+class AlmacenConfiguracion:
+    """
+    Dueño de la instantánea vigente.
+    'actual' es un atributo simple: leerlo no toma locks.
+    """
+
+    def __init__(self, valores: Dict[str, Any], sincronizar_modulo: bool = True):
+        self._lock = threading.Lock()
+        self._suscriptores: List[Callable[[Instantanea], None]] = []
+        self._sincronizar_modulo = sincronizar_modulo
+        # La configuración inicial se publica aunque tenga errores para que la
+        # GUI pueda mostrarla y corregirla; verificar() impide arrancar con ella
+        self.errores = errores_configuracion(valores)
+        self.actual = Instantanea(valores, version=1)
+
+    def verificar(self) -> Tuple[bool, str]:
+        """
+        Comprueba que la instantánea vigente se puede usar para arrancar el bot.
+
+        Returns:
+            Tupla (éxito, mensaje)
+        """
+        if self.errores:
+            return False, "Configuración inválida:\n  " + "\n  ".join(self.errores)
+        return True, f"Configuración v{self.actual.version} válida"
+
+    def publicar(self, config: Dict[str, Any], origen: str = "") -> Tuple[bool, str]:
+        """
+        Valida y publica una configuración.
+        Las claves ausentes en 'config' conservan el valor vigente.
+
+        Args:
+            config: Diccionario con la configuración (completa o parcial)
+            origen: Texto para el log ('config.json', 'GUI', ...)
+
+        Returns:
+            Tupla (éxito, mensaje)
+        """
+        with self._lock:
+            valores = self.actual.como_dict()
+            valores.update({clave: config[clave] for clave in CLAVES if clave in config})
+            errores = errores_configuracion(valores)
+            if errores:
+                return False, "Configuración inválida:\n  " + "\n  ".join(errores)
+            nueva = Instantanea(valores, self.actual.version + 1)
+            self.errores = []
+            self.actual = nueva
+
+        if self._sincronizar_modulo:
+            _sincronizar_modulo(nueva)
+        for suscriptor in list(self._suscriptores):
+            try:
+                suscriptor(nueva)
+            except Exception as e:
+                print(f"[CONFIG] Error en suscriptor: {e}")
+        if origen:
+            print(f"[CONFIG] Configuración v{nueva.version} publicada ({origen})")
+        return True, f"Configuración v{nueva.version} publicada"
+
+    def restaurar(self, instantanea: Instantanea) -> None:
+        """Vuelve a publicar una instantánea anterior (ya validada)."""
+        self.publicar(instantanea.como_dict())
+
+    def suscribir(self, funcion: Callable[[Instantanea], None]) -> None:
+        """Registra una función que se llama con cada instantánea nueva."""
+        self._suscriptores.append(funcion)
+
+    def desuscribir(self, funcion: Callable[[Instantanea], None]) -> None:
+        """Quita una función registrada con suscribir()."""
+        if funcion in self._suscriptores:
+            self._suscriptores.remove(funcion)
+
+
+class AlmacenPerfil(AlmacenConfiguracion):
+    """
+    Almacén de un cliente: configuración base + capa del perfil.
+    publicar() actualiza la capa; los cambios de la base se heredan.
+    """
+
+    def __init__(self, base: AlmacenConfiguracion, capa: Dict[str, Any], nombre: str = "",
+                 ruta: Optional[str] = None):
+        self.base = base
+        self.nombre = nombre
+        self.ruta = ruta
+        self.capa = {clave: capa[clave] for clave in CLAVES if clave in capa}
+        super().__init__({**base.actual.como_dict(), **self.capa}, sincronizar_modulo=False)
+        base.suscribir(self._al_cambiar_base)
+
+    def publicar(self, config: Dict[str, Any], origen: str = "") -> Tuple[bool, str]:
+        capa = {**self.capa, **{clave: config[clave] for clave in CLAVES if clave in config}}
+        exito, mensaje = super().publicar({**self.base.actual.como_dict(), **capa}, origen)
+        if exito:
+            self.capa = capa
+        return exito, mensaje
+
+    def _al_cambiar_base(self, instantanea: Instantanea) -> None:
+        valores = {**instantanea.como_dict(), **self.capa}
+        exito, mensaje = super().publicar(valores, origen=f"perfil {self.nombre}")
+        if not exito:
+            print(f"[CONFIG] El perfil {self.nombre} no admite la configuración base nueva. {mensaje}")
+
+    def cerrar(self) -> None:
+        """Deja de seguir los cambios de la base."""
+        self.base.desuscribir(self._al_cambiar_base)
+
+
+def cargar_perfil(base: AlmacenConfiguracion, ruta: str) -> AlmacenPerfil:
+    """
+    Crea el almacén de un perfil a partir de un JSON con las claves que cambian.
+
+    Raises:
+        OSError, ValueError: Si el archivo no se puede leer
+    """
+    with open(ruta, 'r', encoding='utf-8') as f:
+        capa = json.load(f)
+    nombre = os.path.splitext(os.path.basename(ruta))[0]
+    return AlmacenPerfil(base, capa, nombre, ruta)
+
+
+def _sincronizar_modulo(instantanea: Instantanea) -> None:
+    """Copia la instantánea (mutable) a configuracion.py para el código que lo lee directo."""
+    from config_manager import aplicar_configuracion_a_modulo
+    aplicar_configuracion_a_modulo(instantanea.como_dict())
+
+
+def _valores_del_modulo() -> Dict[str, Any]:
+    """Configuración inicial: configuracion.py con config.json ya aplicado."""
+    import configuracion
+    return {clave: getattr(configuracion, clave) for clave in CLAVES}
+
+
+# ============================================================
+# Vigilancia de config.json
+# ============================================================
+
+class VigilanteConfiguracion:
+    """
+    Hilo que publica los cambios de config.json en caliente.
+    Compara (mtime, tamaño) cada 'intervalo' segundos; no necesita dependencias.
+    """
+
+    def __init__(self, almacen_config: 'AlmacenConfiguracion', ruta: Optional[str] = None,
+                 intervalo: float = 1.0):
+        if ruta is None:
+            from config_manager import CONFIG_JSON_PATH
+            ruta = CONFIG_JSON_PATH
+        self.almacen = almacen_config
+        self.ruta = ruta
+        self.intervalo = intervalo
+        self.ejecutando = False
+        self.thread = None
+        self._firma = self._leer_firma()
+
+    def _leer_firma(self) -> Optional[Tuple[int, int]]:
+        try:
+            info = os.stat(self.ruta)
+            return info.st_mtime_ns, info.st_size
+        except OSError:
+            return None
+
+    def revisar(self) -> bool:
+        """
+        Publica config.json si cambió desde la última revisión.
+
+        Returns:
+            True si se publicó una configuración nueva
+        """
+        firma = self._leer_firma()
+        if firma is None or firma == self._firma:
+            return False
+        self._firma = firma
+
+        try:
+            with open(self.ruta, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[CONFIG] {self.ruta} no se pudo leer, se mantiene la configuración actual: {e}")
+            return False
+
+        exito, mensaje = self.almacen.publicar(config, origen=self.ruta)
+        if not exito:
+            print(f"[CONFIG] {self.ruta} rechazado. {mensaje}")
+        return exito
+
+    def _ciclo(self) -> None:
+        while self.ejecutando:
+            self.revisar()
+            time.sleep(self.intervalo)
+
+    def iniciar(self) -> None:
+        """Inicia la vigilancia en un hilo daemon."""
+        if self.ejecutando:
+            return
+        self.ejecutando = True
+        self.thread = threading.Thread(target=self._ciclo, name='config', daemon=True)
+        self.thread.start()
+
+    def detener(self) -> None:
+        """Detiene la vigilancia."""
+        self.ejecutando = False
+        if self.thread:
+            self.thread.join(timeout=2)
+
+
+# Instancia global del almacén (configuracion.py + config.json)
+almacen = AlmacenConfiguracion(_valores_del_modulo())
+
+
+# ============================================================
+# PRUEBA INDEPENDIENTE
+# ============================================================
+if __name__ == "__main__":
+    import tempfile
+
+    print("=" * 60)
+    print("PRUEBA DEL ALMACÉN DE CONFIGURACIÓN")
+    print("=" * 60)
+
+    cfg = almacen.actual
+    print(f"\n[INFO] Versión {cfg.version} | Umbral: {cfg.UMBRAL_SIMILITUD} | Mobs: {len(cfg.MOBS_OBJETIVO)}")
+    try:
+        cfg.AUTOCURACION['vida']['x'] = 0
+    except TypeError:
+        print("[OK] La instantánea no se puede modificar")
+
+    print(almacen.publicar({'UMBRAL_SIMILITUD': 1.5}))
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta = os.path.join(carpeta, "config.json")
+        vigilante = VigilanteConfiguracion(almacen, ruta)
+        with open(ruta, 'w', encoding='utf-8') as f:
+            json.dump({'UMBRAL_SIMILITUD': 0.55}, f)
+        vigilante.revisar()
+        print(f"[INFO] Umbral tras recarga: {almacen.actual.UMBRAL_SIMILITUD} (v{almacen.actual.version})")
+
+    repeticiones = 1_000_000
+    t0 = time.perf_counter()
+    for _ in range(repeticiones):
+        almacen.actual.AUTOCURACION
+    print(f"[INFO] Lectura almacen.actual.AUTOCURACION: {(time.perf_counter() - t0) / repeticiones * 1e9:.0f} ns")
@@ -0,0 +1,413 @@
+"""
+Módulo de abstracción de la plataforma (ventanas, captura y entrada).
+Responsabilidad: Aislar todas las llamadas al sistema operativo (Single Responsibility Principle)
+
+Todo el bot habla con el sistema a través de un BackendPlataforma:
+- BackendWin32: implementación real (user32 + mss)
+- BackendHeadless: implementación en memoria que sirve imágenes y registra la
+  entrada. Permite importar, perfilar y ejecutar el bot completo en Linux.
+
+El backend se inyecta a través de GameWindow; los hilos lo toman de ahí.
+Un mismo backend atiende a todos los clientes del proceso (multicliente): las
+teclas van dirigidas al hwnd de cada ventana y los clics, que mueven el cursor
+compartido, se serializan para que dos clientes no se intercalen.
+"""
+import ctypes
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from captura_sondas import FuentePantalla, FuenteMSS, FuenteMemoria
+
+
+class GeometriaVentana(NamedTuple):
+    """
+    Geometría inmutable de la ventana en coordenadas de pantalla.
+    left/top/right/bottom son el rectángulo de la ventana (origen de las
+    coordenadas relativas de la configuración); cliente_* es el área cliente.
+    """
+    left: int
+    top: int
+    right: int
+    bottom: int
+    cliente_left: int
+    cliente_top: int
+    cliente_ancho: int
+    cliente_alto: int
+
+    @property
+    def ancho(self) -> int:
+        return self.right - self.left
+
+    @property
+    def alto(self) -> int:
+        return self.bottom - self.top
+
+
+class BackendPlataforma(FuentePantalla):
+    """
+    Interfaz de la plataforma: búsqueda y geometría de ventanas, captura de
+    regiones (FuentePantalla), píxeles sonda, teclas y clics.
+    """
+
+    # ------------------------------
+    # Ventanas
+    # ------------------------------
+    def buscar_ventana(self, titulo: str) -> int:
+        """
+        Busca una ventana por título.
+
+        Returns:
+            Handle de la ventana, o 0 si no existe
+        """
+        raise NotImplementedError
+
+    def buscar_ventanas(self, titulo: str) -> List[int]:
+        """
+        Busca todas las ventanas con el título exacto (varios clientes del juego).
+
+        Returns:
+            Handles de las ventanas (lista vacía si no hay ninguna)
+        """
+        hwnd = self.buscar_ventana(titulo)
+        return [hwnd] if hwnd else []
+
+    def ventana_valida(self, hwnd: int) -> bool:
+        """Retorna True si la ventana sigue existiendo."""
+        raise NotImplementedError
+
+    def geometria(self, hwnd: int) -> GeometriaVentana:
+        """Consulta la geometría actual de la ventana."""
+        raise NotImplementedError
+
+    def seguir_geometria(self, hwnd: int, al_cambiar: Callable[[], None],
+                         activo: Callable[[], bool], intervalo: float) -> None:
+        """
+        Bucle bloqueante que llama a `al_cambiar` cuando la ventana se mueve o
+        cambia de tamaño, y como respaldo cada `intervalo` segundos.
+        Termina cuando `activo()` retorna False.
+        """
+        while activo():
+            time.sleep(intervalo)
+            al_cambiar()
+
+    # ------------------------------
+    # Captura
+    # ------------------------------
+    def capturar(self, left: int, top: int, width: int, height: int) -> np.ndarray:
+        raise NotImplementedError
+
+    def color_pixel(self, x: int, y: int) -> Tuple[int, int, int]:
+        """Retorna el color (R, G, B) de un píxel de pantalla."""
+        b, g, r = self.capturar(x, y, 1, 1)[0, 0, :3]
+        return int(r), int(g), int(b)
+
+    # ------------------------------
+    # Entrada
+    # ------------------------------
+    def enviar_tecla(self, hwnd: int, vk_code: int, duracion: float = 0.05) -> None:
+        """Envía pulsación y liberación de una tecla a la ventana."""
+        raise NotImplementedError
+
+    def clic(self, x: int, y: int) -> None:
+        """Hace clic izquierdo en una posición absoluta de pantalla."""
+        raise NotImplementedError
+
+
+# ============================================================
+# Windows
+# ============================================================
+
+class RECT(ctypes.Structure):
+    """Estructura para representar un rectángulo en Windows."""
+    _fields_ = [
+        ('left', ctypes.c_long),
+        ('top', ctypes.c_long),
+        ('right', ctypes.c_long),
+        ('bottom', ctypes.c_long)
+    ]
+
+
+class POINT(ctypes.Structure):
+    """Estructura para representar un punto en Windows."""
+    _fields_ = [
+        ('x', ctypes.c_long),
+        ('y', ctypes.c_long)
+    ]
+
+
+class BackendWin32(BackendPlataforma):
+    """Backend real de Windows: user32 para ventanas y entrada, mss para captura."""
+
+    # Constantes de Windows para mensajes de teclado
+    WM_KEYDOWN = 0x0100
+    WM_KEYUP = 0x0101
+
+    # Constantes para el ratón
+    MOUSEEVENTF_LEFTDOWN = 0x0002
+    MOUSEEVENTF_LEFTUP = 0x0004
+
+    # Constantes para el seguimiento de movimiento
+    EVENT_OBJECT_LOCATIONCHANGE = 0x800B
+    WINEVENT_OUTOFCONTEXT = 0x0000
+    OBJID_WINDOW = 0
+    QS_ALLINPUT = 0x04FF
+    PM_REMOVE = 0x0001
+
+    def __init__(self):
+        self.user32 = ctypes.windll.user32
+        self._fuente = FuenteMSS()
+        # El cursor es uno solo para todos los clientes
+        self._lock_raton = threading.Lock()
+
+    def buscar_ventana(self, titulo: str) -> int:
+        return self.user32.FindWindowW(None, titulo)
+
+    def buscar_ventanas(self, titulo: str) -> List[int]:
+        from ctypes import wintypes
+
+        handles: List[int] = []
+        texto = ctypes.create_unicode_buffer(512)
+
+        def _visitar(hwnd, _):
+            self.user32.GetWindowTextW(hwnd, texto, len(texto))
+            if texto.value == titulo:
+                handles.append(hwnd)
+            return True
+
+        WNDENUMPROC = ctypes.WINFUNCTYPE(wintypes.BOOL, wintypes.HWND, wintypes.LPARAM)
+        self.user32.EnumWindows(WNDENUMPROC(_visitar), 0)
+        return handles
+
+    def ventana_valida(self, hwnd: int) -> bool:
+        return self.user32.IsWindow(hwnd) != 0
+
+    def geometria(self, hwnd: int) -> GeometriaVentana:
+        rect = RECT()
+        self.user32.GetWindowRect(hwnd, ctypes.byref(rect))
+
+        cliente = RECT()
+        self.user32.GetClientRect(hwnd, ctypes.byref(cliente))
+        origen = POINT(0, 0)
+        self.user32.ClientToScreen(hwnd, ctypes.byref(origen))
+
+        return GeometriaVentana(
+            rect.left, rect.top, rect.right, rect.bottom,
+            origen.x, origen.y, cliente.right, cliente.bottom
+        )
+
+    def seguir_geometria(self, hwnd: int, al_cambiar: Callable[[], None],
+                         activo: Callable[[], bool], intervalo: float) -> None:
+        """
+        Escucha EVENT_OBJECT_LOCATIONCHANGE de la ventana (SetWinEventHook) y
+        refresca al moverse; si no llegan eventos, refresca cada `intervalo`.
+        """
+        from ctypes import wintypes
+
+        def _al_mover(hook, evento, hwnd_evento, id_objeto, id_hijo, hilo, tiempo):
+            if hwnd_evento == hwnd and id_objeto == self.OBJID_WINDOW:
+                al_cambiar()
+
+        # Mantener la referencia al callback mientras el hook esté activo
+        WINEVENTPROC = ctypes.WINFUNCTYPE(
+            None, wintypes.HANDLE, wintypes.DWORD, wintypes.HWND,
+            wintypes.LONG, wintypes.LONG, wintypes.DWORD, wintypes.DWORD
+        )
+        callback = WINEVENTPROC(_al_mover)
+        pid = wintypes.DWORD()
+        tid = self.user32.GetWindowThreadProcessId(hwnd, ctypes.byref(pid))
+        self.user32.SetWinEventHook.restype = wintypes.HANDLE
+        hook = self.user32.SetWinEventHook(
+            self.EVENT_OBJECT_LOCATIONCHANGE, self.EVENT_OBJECT_LOCATIONCHANGE,
+            0, callback, pid.value, tid, self.WINEVENT_OUTOFCONTEXT
+        )
+
+        msg = wintypes.MSG()
+        espera_ms = int(intervalo * 1000)
+        try:
+            while activo():
+                # Los eventos out-of-context llegan como mensajes a este hilo
+                self.user32.MsgWaitForMultipleObjects(0, None, False, espera_ms, self.QS_ALLINPUT)
+                while self.user32.PeekMessageW(ctypes.byref(msg), None, 0, 0, self.PM_REMOVE):
+                    self.user32.TranslateMessage(ctypes.byref(msg))
+                    self.user32.DispatchMessageW(ctypes.byref(msg))
+                # Refresco de respaldo (también cubre el caso sin hook)
+                al_cambiar()
+        finally:
+            if hook:
+                self.user32.UnhookWinEvent(hook)
+
+    def capturar(self, left: int, top: int, width: int, height: int) -> np.ndarray:
+        return self._fuente.capturar(left, top, width, height)
+
+    def enviar_tecla(self, hwnd: int, vk_code: int, duracion: float = 0.05) -> None:
+        self.user32.PostMessageW(hwnd, self.WM_KEYDOWN, vk_code, 0)
+        time.sleep(duracion)
+        self.user32.PostMessageW(hwnd, self.WM_KEYUP, vk_code, 0)
+
+    def clic(self, x: int, y: int) -> None:
+        with self._lock_raton:
+            # Mover cursor
+            self.user32.SetCursorPos(x, y)
+            time.sleep(0.05)
+
+            # Clic izquierdo
+            self.user32.mouse_event(self.MOUSEEVENTF_LEFTDOWN, 0, 0, 0, 0)
+            time.sleep(0.05)
+            self.user32.mouse_event(self.MOUSEEVENTF_LEFTUP, 0, 0, 0, 0)
+
+
+# ============================================================
+# Headless (en memoria)
+# ============================================================
+
+class EventoEntrada(NamedTuple):
+    """Entrada registrada por el backend headless."""
+    timestamp: float
+    tipo: str          # 'tecla' o 'clic'
+    hwnd: int
+    vk_code: int
+    x: int
+    y: int
+
+
+class BackendHeadless(BackendPlataforma):
+    """
+    Backend sin sistema de ventanas: la pantalla es un array numpy en memoria
+    y las teclas y clics se registran en `eventos` en lugar de enviarse.
+    """
+
+    def __init__(self, ancho: int = 1920, alto: int = 1080, esperar_entrada: bool = False):
+        """
+        Inicializa el backend.
+
+        Args:
+            ancho, alto: Tamaño de la pantalla en memoria
+            esperar_entrada: True para respetar las pausas de teclas y clics
+                             (por defecto se omiten para correr lo más rápido posible)
+        """
+        self.pantalla = FuenteMemoria(ancho, alto)
+        self.esperar_entrada = esperar_entrada
+        self.eventos: List[EventoEntrada] = []
+        self._ventanas: Dict[str, int] = {}
+        self._titulos: Dict[int, str] = {}
+        self._geometrias: Dict[int, GeometriaVentana] = {}
+        self._lock = threading.Lock()
+
+    # ------------------------------
+    # Preparación del escenario
+    # ------------------------------
+    def agregar_ventana(self, titulo: str, left: int = 0, top: int = 0,
+                        ancho: int = 800, alto: int = 600, hwnd: Optional[int] = None) -> int:
+        """Registra una ventana falsa y retorna su handle."""
+        with self._lock:
+            hwnd = hwnd or 0x1000 + len(self._geometrias)
+            # Con varias ventanas del mismo título, buscar_ventana retorna la primera
+            self._ventanas.setdefault(titulo, hwnd)
+            self._titulos[hwnd] = titulo
+            self._geometrias[hwnd] = GeometriaVentana(
+                left, top, left + ancho, top + alto, left, top, ancho, alto
+            )
+        return hwnd
+
+    def mover_ventana(self, hwnd: int, left: int, top: int) -> None:
+        """Mueve una ventana falsa."""
+        with self._lock:
+            anterior = self._geometrias[hwnd]
+            self._geometrias[hwnd] = GeometriaVentana(
+                left, top, left + anterior.ancho, top + anterior.alto,
+                left, top, anterior.cliente_ancho, anterior.cliente_alto
+            )
+
+    def establecer_pantalla(self, imagen: np.ndarray) -> None:
+        """Reemplaza el contenido de la pantalla (BGRA)."""
+        self.pantalla.establecer_pantalla(imagen)
+
+    def vaciar_eventos(self) -> List[EventoEntrada]:
+        """Retorna y descarta los eventos registrados."""
+        with self._lock:
+            eventos, self.eventos = self.eventos, []
+        return eventos
+
+    # ------------------------------
+    # BackendPlataforma
+    # ------------------------------
+    def buscar_ventana(self, titulo: str) -> int:
+        return self._ventanas.get(titulo, 0)
+
+    def buscar_ventanas(self, titulo: str) -> List[int]:
+        return [hwnd for hwnd, t in self._titulos.items() if t == titulo]
+
+    def ventana_valida(self, hwnd: int) -> bool:
+        return hwnd in self._geometrias
+
+    def geometria(self, hwnd: int) -> GeometriaVentana:
+        return self._geometrias[hwnd]
+
+    def capturar(self, left: int, top: int, width: int, height: int) -> np.ndarray:
+        return self.pantalla.capturar(left, top, width, height)
+
+    def _registrar(self, tipo: str, hwnd: int = 0, vk_code: int = 0, x: int = 0, y: int = 0) -> None:
+        with self._lock:
+            self.eventos.append(EventoEntrada(time.perf_counter(), tipo, hwnd, vk_code, x, y))
+
+    def enviar_tecla(self, hwnd: int, vk_code: int, duracion: float = 0.05) -> None:
+        self._registrar('tecla', hwnd=hwnd, vk_code=vk_code)
+        if self.esperar_entrada:
+            time.sleep(duracion)
+
+    def clic(self, x: int, y: int) -> None:
+        self._registrar('clic', x=x, y=y)
+        if self.esperar_entrada:
+            time.sleep(0.1)
+
+
+# ============================================================
+# Backend por defecto del proceso
+# ============================================================
+
+_backend_defecto: Optional[BackendPlataforma] = None
+
+
+def obtener_backend() -> BackendPlataforma:
+    """
+    Retorna el backend por defecto del proceso: Win32 en Windows y headless en
+    cualquier otra plataforma. Se crea en la primera llamada.
+    """
+    global _backend_defecto
+    if _backend_defecto is None:
+        _backend_defecto = BackendWin32() if sys.platform == 'win32' else BackendHeadless()
+    return _backend_defecto
+
+
+def establecer_backend(backend: BackendPlataforma) -> None:
+    """Reemplaza el backend por defecto (pruebas, simulador, repeticiones)."""
+    global _backend_defecto
+    _backend_defecto = backend
+
+
+# ============================================================
+# PRUEBA INDEPENDIENTE
+# ============================================================
+if __name__ == "__main__":
+    print("=" * 60)
+    print("PRUEBA DEL BACKEND HEADLESS")
+    print("=" * 60)
+
+    backend = BackendHeadless()
+    hwnd = backend.agregar_ventana("Kathana", left=100, top=50)
+    pantalla = np.zeros((1080, 1920, 4), dtype=np.uint8)
+    pantalla[50 + 62, 100 + 110] = (0, 0, 255, 255)   # Píxel de vida: rojo (BGRA)
+    backend.establecer_pantalla(pantalla)
+
+    geometria = backend.geometria(backend.buscar_ventana("Kathana"))
+    print(f"\n[INFO] Ventana: {geometria.ancho}x{geometria.alto} en ({geometria.left}, {geometria.top})")
+    print(f"[INFO] Píxel de vida: RGB{backend.color_pixel(geometria.left + 110, geometria.top + 62)}")
+
+    backend.enviar_tecla(hwnd, 0x31)
+    backend.clic(geometria.left + 400, geometria.top + 300)
+    for evento in backend.vaciar_eventos():
+        print(f"[ENTRADA] {evento.tipo} vk=0x{evento.vk_code:02X} pos=({evento.x}, {evento.y})")
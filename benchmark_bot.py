@@ -0,0 +1,408 @@
+"""
+Microbenchmarks de los caminos calientes del bot.
+Responsabilidad: Medir y comparar el rendimiento entre versiones (Single Responsibility Principle)
+
+Corre sin ventana de juego (BackendHeadless), así que sirve en Linux y en CI.
+
+Uso:
+    python benchmark_bot.py ejecutar --salida base.json
+    python benchmark_bot.py ejecutar --salida nuevo.json --filtro ocr
+    python benchmark_bot.py comparar base.json nuevo.json --umbral 10
+
+`comparar` retorna código 1 si algún caso empeoró más que el umbral.
+"""
+import argparse
+import atexit
+import gc
+import json
+import os
+import platform
+import random
+import statistics
+import string
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+# Tamaños de región OCR (ancho, alto) y de lista de nombres a medir
+TAMANOS_REGION = [(160, 15), (320, 30), (640, 60)]
+TAMANOS_LISTA = [5, 50, 500]
+HILOS_CONTENCION = [1, 4]
+
+# Umbral por defecto (%) para marcar una regresión al comparar
+UMBRAL_REGRESION = 10.0
+
+
+class CasoBenchmark:
+    """
+    Un caso de benchmark.
+    `preparar` se llama una vez y retorna (función, operaciones por llamada).
+    """
+
+    def __init__(self, nombre: str, preparar: Callable[[], Tuple[Callable[[], None], int]], hilos: int = 1):
+        self.nombre = nombre
+        self.preparar = preparar
+        self.hilos = hilos
+
+
+# ============================================================
+# Entorno sin ventana
+# ============================================================
+
+_game_window = None
+
+
+def _ventana_headless():
+    """GameWindow sobre un BackendHeadless (compartida por todos los casos)."""
+    global _game_window
+    if _game_window is None:
+        from backend_plataforma import BackendHeadless
+        from game_window import GameWindow
+        backend = BackendHeadless()
+        backend.agregar_ventana("benchmark", 0, 0, 1024, 768)
+        _game_window = GameWindow("benchmark", backend=backend)
+    return _game_window
+
+
+def _nombres_aleatorios(cantidad: int, semilla: int) -> List[str]:
+    """Nombres de mob reproducibles (1 a 3 palabras)."""
+    azar = random.Random(semilla)
+    nombres = []
+    for _ in range(cantidad):
+        palabras = azar.randint(1, 3)
+        nombres.append(" ".join(
+            azar.choice(string.ascii_uppercase) + "".join(azar.choices(string.ascii_lowercase, k=azar.randint(3, 8)))
+            for _ in range(palabras)
+        ))
+    return nombres
+
+
+# ============================================================
+# Casos
+# ============================================================
+
+def _caso_procesar_imagen(ancho: int, alto: int) -> Callable:
+    def preparar():
+        from hilo_detector_ocr import HiloDetectorOCR
+        detector = HiloDetectorOCR(_ventana_headless())
+        azar = np.random.default_rng(1)
+        imagen = azar.integers(0, 256, size=(alto, ancho, 4), dtype=np.uint8)
+        return (lambda: detector._procesar_imagen_para_ocr(imagen)), 1
+    return preparar
+
+
+def _caso_buscar_en_lista(cantidad: int) -> Callable:
+    def preparar():
+        from hilo_detector_ocr import HiloDetectorOCR
+        from config_compilada import IndiceNombres
+        detector = HiloDetectorOCR(_ventana_headless())
+        lista = _nombres_aleatorios(cantidad, semilla=cantidad)
+        indice = IndiceNombres(lista)
+        # Texto OCR con un error de un carácter sobre un nombre de la lista
+        objetivo = lista[len(lista) // 2]
+        texto = objetivo[:-1] + "x"
+        return (lambda: detector._buscar_en_lista(texto, indice)), 1
+    return preparar
+
+
+def _caso_color(recurso: str) -> Callable:
+    def preparar():
+        from hilo_autocuracion import HiloAutocuracion
+        autocuracion = HiloAutocuracion(_ventana_headless())
+        azar = random.Random(7)
+        colores = [(azar.randrange(256), azar.randrange(256), azar.randrange(256)) for _ in range(1000)]
+        metodo = autocuracion._tiene_vida if recurso == 'vida' else autocuracion._tiene_mana
+
+        def ejecutar():
+            for color in colores:
+                metodo(color)
+        return ejecutar, len(colores)
+    return preparar
+
+
+def _caso_estado(operacion: str) -> Callable:
+    def preparar():
+        from estado_objetivo import estado
+        if operacion == 'obtener_info':
+            return estado.obtener_info, 1
+        if operacion == 'hilo_activo':
+            return (lambda: estado.hilo_activo('detector_ocr')), 1
+        # Mismo mob en cada llamada: el caso estable del detector (sin transición)
+        estado.establecer_mob("Benchmark", "Benchmark", 1.0)
+        return (lambda: estado.establecer_mob("Benchmark", "Benchmark", 1.0)), 1
+    return preparar
+
+
+def _caso_config(operacion: str) -> Callable:
+    def preparar():
+        import config_manager
+        config = config_manager.obtener_configuracion_completa()
+        if operacion == 'aplicar':
+            return (lambda: config_manager.aplicar_configuracion_a_modulo(config)), 1
+
+        # Cargar desde un archivo temporal para no depender del config.json local
+        descriptor, ruta = tempfile.mkstemp(suffix=".json")
+        with os.fdopen(descriptor, 'w', encoding='utf-8') as f:
+            json.dump(config, f, indent=4, ensure_ascii=False)
+        atexit.register(os.remove, ruta)
+
+        def cargar():
+            original = config_manager.CONFIG_JSON_PATH
+            config_manager.CONFIG_JSON_PATH = ruta
+            try:
+                config_manager.cargar_configuracion()
+            finally:
+                config_manager.CONFIG_JSON_PATH = original
+        return cargar, 1
+    return preparar
+
+
+def casos_disponibles() -> List[CasoBenchmark]:
+    """Lista de todos los casos, en orden de ejecución."""
+    casos = []
+    for ancho, alto in TAMANOS_REGION:
+        casos.append(CasoBenchmark(f"ocr.procesar_imagen[{ancho}x{alto}]", _caso_procesar_imagen(ancho, alto)))
+    for cantidad in TAMANOS_LISTA:
+        casos.append(CasoBenchmark(f"ocr.buscar_en_lista[{cantidad}]", _caso_buscar_en_lista(cantidad)))
+    casos.append(CasoBenchmark("autocuracion.tiene_vida", _caso_color('vida')))
+    casos.append(CasoBenchmark("autocuracion.tiene_mana", _caso_color('mana')))
+    for operacion in ('obtener_info', 'hilo_activo', 'establecer_mob'):
+        for hilos in HILOS_CONTENCION:
+            casos.append(CasoBenchmark(f"estado.{operacion}[{hilos} hilo{'s' if hilos > 1 else ''}]", _caso_estado(operacion), hilos))
+    casos.append(CasoBenchmark("config.cargar", _caso_config('cargar')))
+    casos.append(CasoBenchmark("config.aplicar", _caso_config('aplicar')))
+    return casos
+
+
+# ============================================================
+# Medición
+# ============================================================
+
+def _cronometrar(funcion: Callable[[], None], repeticiones: int) -> int:
+    """Ejecuta la función `repeticiones` veces y retorna los nanosegundos totales."""
+    gc_activo = gc.isenabled()
+    gc.disable()
+    try:
+        inicio = time.perf_counter_ns()
+        for _ in range(repeticiones):
+            funcion()
+        return time.perf_counter_ns() - inicio
+    finally:
+        if gc_activo:
+            gc.enable()
+
+
+def _medir_secuencial(funcion: Callable[[], None], ops: int, tiempo_ronda: float, rondas: int) -> List[float]:
+    """Mide ns por operación en cada ronda (un solo hilo)."""
+    # Calibrar repeticiones para que cada ronda dure ~tiempo_ronda
+    repeticiones = 1
+    while True:
+        duracion = _cronometrar(funcion, repeticiones)
+        if duracion >= tiempo_ronda * 1e9 / 4 or repeticiones >= 1 << 24:
+            break
+        repeticiones *= 2
+    repeticiones = max(1, int(repeticiones * tiempo_ronda * 1e9 / max(duracion, 1)))
+
+    return [_cronometrar(funcion, repeticiones) / (repeticiones * ops) for _ in range(rondas)]
+
+
+def _medir_concurrente(funcion: Callable[[], None], ops: int, hilos: int,
+                       tiempo_ronda: float, rondas: int) -> List[float]:
+    """
+    Mide ns por operación con `hilos` hilos llamando a la vez.
+    El valor es la latencia media por llamada vista desde cada hilo.
+    """
+    resultados = []
+    for _ in range(rondas):
+        contadores = [0] * hilos
+        barrera = threading.Barrier(hilos + 1)
+        fin = [0.0]
+
+        def trabajador(indice: int) -> None:
+            barrera.wait()
+            n = 0
+            while time.perf_counter() < fin[0]:
+                funcion()
+                n += 1
+            contadores[indice] = n
+
+        trabajadores = [threading.Thread(target=trabajador, args=(i,), daemon=True) for i in range(hilos)]
+        for t in trabajadores:
+            t.start()
+        fin[0] = time.perf_counter() + tiempo_ronda
+        barrera.wait()
+        for t in trabajadores:
+            t.join()
+        total = sum(contadores) * ops
+        resultados.append(tiempo_ronda * 1e9 * hilos / max(total, 1))
+    return resultados
+
+
+def ejecutar_caso(caso: CasoBenchmark, tiempo_ronda: float, rondas: int) -> Dict[str, float]:
+    """Ejecuta un caso y retorna sus estadísticas."""
+    funcion, ops = caso.preparar()
+    funcion()  # Calentamiento (cachés, importaciones diferidas)
+
+    if caso.hilos == 1:
+        muestras = _medir_secuencial(funcion, ops, tiempo_ronda, rondas)
+    else:
+        muestras = _medir_concurrente(funcion, ops, caso.hilos, tiempo_ronda, rondas)
+
+    mediana = statistics.median(muestras)
+    return {
+        'ns_por_op': mediana,
+        'ns_min': min(muestras),
+        'ns_max': max(muestras),
+        'desviacion': statistics.pstdev(muestras),
+        'rondas': rondas,
+        'hilos': caso.hilos,
+        'ops_por_segundo': 1e9 * caso.hilos / mediana if mediana else 0.0,
+    }
+
+
+def metadatos_maquina() -> Dict[str, object]:
+    """Datos de la máquina y del código para interpretar los resultados."""
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5
+        ).stdout.strip()
+    except Exception:
+        commit = ''
+
+    versiones = {'numpy': np.__version__}
+    try:
+        import cv2
+        versiones['opencv'] = cv2.__version__
+    except ImportError:
+        pass
+
+    return {
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'implementacion': platform.python_implementation(),
+        'sistema': platform.platform(),
+        'procesador': platform.processor() or platform.machine(),
+        'cpus': os.cpu_count(),
+        'versiones': versiones,
+    }
+
+
+def ejecutar(filtro: Optional[str], tiempo_ronda: float, rondas: int) -> Dict[str, object]:
+    """Ejecuta todos los casos (o los que contienen `filtro`) e imprime el progreso."""
+    resultados = {}
+    for caso in casos_disponibles():
+        if filtro and filtro not in caso.nombre:
+            continue
+        try:
+            resultado = ejecutar_caso(caso, tiempo_ronda, rondas)
+        except Exception as e:
+            print(f"  {caso.nombre:40s} ERROR: {e}")
+            continue
+        resultados[caso.nombre] = resultado
+        print(f"  {caso.nombre:40s} {_formatear_ns(resultado['ns_por_op']):>12s}/op "
+              f"(±{100 * resultado['desviacion'] / resultado['ns_por_op']:4.1f}%)")
+    return {'metadatos': metadatos_maquina(), 'resultados': resultados}
+
+
+def _formatear_ns(ns: float) -> str:
+    """Formatea nanosegundos con la unidad adecuada."""
+    if ns >= 1e6:
+        return f"{ns / 1e6:.2f} ms"
+    if ns >= 1e3:
+        return f"{ns / 1e3:.2f} µs"
+    return f"{ns:.1f} ns"
+
+
+# ============================================================
+# Comparación
+# ============================================================
+
+def comparar(base: Dict[str, object], nuevo: Dict[str, object], umbral: float) -> int:
+    """
+    Compara dos ejecuciones e imprime la tabla de cambios.
+
+    Returns:
+        Cantidad de regresiones (casos más lentos que base * (1 + umbral%))
+    """
+    meta_base, meta_nuevo = base['metadatos'], nuevo['metadatos']
+    for clave in ('sistema', 'procesador', 'python'):
+        if meta_base.get(clave) != meta_nuevo.get(clave):
+            print(f"[AVISO] {clave} distinto: '{meta_base.get(clave)}' vs '{meta_nuevo.get(clave)}'")
+
+    print(f"\n  Base:  {meta_base.get('commit') or '?'} ({meta_base.get('fecha')})")
+    print(f"  Nuevo: {meta_nuevo.get('commit') or '?'} ({meta_nuevo.get('fecha')})")
+    print(f"\n  {'Caso':40s} {'base':>12s} {'nuevo':>12s} {'cambio':>9s}")
+    print("  " + "-" * 76)
+
+    regresiones = 0
+    resultados_base = base['resultados']
+    resultados_nuevo = nuevo['resultados']
+    for nombre in sorted(set(resultados_base) | set(resultados_nuevo)):
+        if nombre not in resultados_base or nombre not in resultados_nuevo:
+            origen = "solo nuevo" if nombre in resultados_nuevo else "solo base"
+            print(f"  {nombre:40s} {origen:>35s}")
+            continue
+
+        ns_base = resultados_base[nombre]['ns_por_op']
+        ns_nuevo = resultados_nuevo[nombre]['ns_por_op']
+        cambio = 100.0 * (ns_nuevo - ns_base) / ns_base
+        marca = ""
+        if cambio > umbral:
+            marca = "  << REGRESIÓN"
+            regresiones += 1
+        elif cambio < -umbral:
+            marca = "  mejora"
+        print(f"  {nombre:40s} {_formatear_ns(ns_base):>12s} {_formatear_ns(ns_nuevo):>12s} {cambio:+8.1f}%{marca}")
+
+    print("  " + "-" * 76)
+    print(f"  Regresiones (> {umbral:.0f}%): {regresiones}")
+    return regresiones
+
+
+def main() -> int:
+    """Punto de entrada de los benchmarks."""
+    parser = argparse.ArgumentParser(description="Microbenchmarks de los caminos calientes del bot.")
+    subcomandos = parser.add_subparsers(dest='comando', required=True)
+
+    p_ejecutar = subcomandos.add_parser('ejecutar', help="Ejecuta los benchmarks")
+    p_ejecutar.add_argument('--salida', help="Archivo JSON de resultados")
+    p_ejecutar.add_argument('--filtro', help="Solo casos cuyo nombre contenga este texto")
+    p_ejecutar.add_argument('--rondas', type=int, default=5)
+    p_ejecutar.add_argument('--tiempo-ronda', type=float, default=0.2, help="Segundos por ronda")
+
+    p_comparar = subcomandos.add_parser('comparar', help="Compara dos archivos de resultados")
+    p_comparar.add_argument('base')
+    p_comparar.add_argument('nuevo')
+    p_comparar.add_argument('--umbral', type=float, default=UMBRAL_REGRESION,
+                            help="Porcentaje de empeoramiento que cuenta como regresión")
+    args = parser.parse_args()
+
+    if args.comando == 'comparar':
+        with open(args.base, 'r', encoding='utf-8') as f:
+            base = json.load(f)
+        with open(args.nuevo, 'r', encoding='utf-8') as f:
+            nuevo = json.load(f)
+        return 1 if comparar(base, nuevo, args.umbral) else 0
+
+    print("=" * 70)
+    print("BENCHMARKS DEL BOT")
+    print("=" * 70)
+    informe = ejecutar(args.filtro, args.tiempo_ronda, args.rondas)
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            json.dump(informe, f, indent=4, ensure_ascii=False)
+        print(f"\n[OK] Resultados guardados en {args.salida}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
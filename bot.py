@@ -8,13 +8,18 @@ Inicia y coordina todos los hilos de ejecución:
 
 Uso:
     python bot.py
+    python bot.py --grabar sesion.npz   # Graba la sesión para repetirla offline
+    python bot.py --perfilar detector,vida --perfilar-segundos 60   # Perfil de hilos
+    python bot.py --tiempos-arranque    # Costo de importación por módulo
+    python bot.py --clientes todos --perfil base.json --perfil perfil2.json   # Varios clientes
     
     Presiona Ctrl+C para detener todos los hilos.
 """
+import carga_diferida  # Primero: fija el tiempo de referencia del arranque
+import argparse
 import time
 import sys
 
-from game_window import GameWindow
 from configuracion import (
     GAME_WINDOW_TITLE, 
     MOBS_OBJETIVO, 
@@ -25,14 +30,6 @@ from configuracion import (
     UMBRAL_SIMILITUD,
     ESCAPE_MOB
 )
-from estado_objetivo import estado
-
-from hilo_detector_ocr import HiloDetectorOCR
-from hilo_habilidades import HiloHabilidades
-from hilo_autocuracion import HiloAutocuracion
-from hilo_observador_objetivo import HiloObservadorObjetivo
-from hilo_recoger_drop import HiloRecogerDrop
-from hilo_mob_trabado import HiloMobTrabado
 
 
 def mostrar_banner():
@@ -118,19 +115,139 @@ def mostrar_reglas():
     print("-" * 70)
 
 
+def parsear_argumentos():
+    """Parsea los argumentos de línea de comandos."""
+    parser = argparse.ArgumentParser(description="Bot Kathana - sistema de hilos")
+    parser.add_argument('--grabar', metavar='RUTA',
+                        help="Graba la sesión (región OCR y sondas) en un .npz para sesion_grabada.py")
+    parser.add_argument('--perfilar', metavar='HILOS',
+                        help="Perfila los hilos indicados (lista separada por comas o 'todos') "
+                             "y guarda las pilas colapsadas en perfiles/")
+    parser.add_argument('--perfilar-segundos', metavar='N', type=float, default=30.0,
+                        help="Duración del perfilado en segundos (por defecto 30)")
+    parser.add_argument('--tiempos-arranque', action='store_true',
+                        help="Muestra el costo de importación de cada módulo pesado")
+    parser.add_argument('--clientes', metavar='VENTANAS',
+                        help="Controla varios clientes del juego: 'todos' o handles separados por comas")
+    parser.add_argument('--perfil', metavar='RUTA', action='append', default=[],
+                        help="Perfil JSON para cada cliente, en orden (repetible; sin perfil = config.json)")
+    args = parser.parse_args()
+    if args.clientes:
+        if args.grabar:
+            parser.error("--grabar no se puede combinar con --clientes")
+        if args.clientes == 'todos':
+            args.clientes = None
+        else:
+            try:
+                args.clientes = [int(hwnd, 0) for hwnd in args.clientes.split(',')]
+            except ValueError:
+                parser.error(f"Handles de ventana inválidos: {args.clientes}")
+        args.multicliente = True
+    else:
+        if args.perfil:
+            parser.error("--perfil requiere --clientes")
+        args.multicliente = False
+    if args.perfilar:
+        from perfilador import parsear_hilos
+        try:
+            args.perfilar = parsear_hilos(args.perfilar)
+        except ValueError as e:
+            parser.error(str(e))
+    return args
+
+
+def ejecutar_multicliente(args) -> int:
+    """
+    Ejecuta un bot aislado por cliente del juego (ver BotController).
+    
+    Args:
+        args: Argumentos parseados (clientes y perfiles)
+    
+    Returns:
+        Código de salida
+    """
+    from bot_controller import BotController
+    
+    controlador = BotController()
+    exito, mensaje = controlador.iniciar(ventanas=args.clientes, perfiles=args.perfil)
+    if not exito:
+        print(f"\n❌ {mensaje}")
+        return 1
+    
+    perfilador = None
+    if args.perfilar:
+        from perfilador import perfilador
+        perfilador.iniciar(args.perfilar, duracion=args.perfilar_segundos)
+        print(f"  🔬 Perfilando {', '.join(args.perfilar)} durante {args.perfilar_segundos:.0f}s")
+    
+    print(f"\n🚀 {mensaje} - Presiona Ctrl+C para detener\n")
+    print("=" * 70)
+    
+    try:
+        # Loop principal - una línea de estado por cliente
+        while True:
+            lineas = []
+            for info in controlador.obtener_estados():
+                nombre = info['nombre_coincidente'] or 'N/A'
+                lineas.append(f"{info['cliente']}: [{info['tipo'].value.upper():5s}] "
+                              f"{nombre:16s} {info['tiempo_en_estado']:5.1f}s")
+            print("\r" + " | ".join(lineas), end='', flush=True)
+            time.sleep(0.5)
+    except KeyboardInterrupt:
+        print("\n\n" + "=" * 70)
+        print("⏹️  DETENIENDO BOT...")
+        print("=" * 70)
+        if perfilador:
+            perfilador.detener()
+        controlador.detener()
+        print("\n✅ Todos los clientes detenidos correctamente")
+        print("=" * 70)
+    
+    return 0
+
+
 def main():
     """Función principal del bot."""
+    args = parsear_argumentos()
     hilos = []
     
     try:
         mostrar_banner()
         
+        # Módulos pesados (cv2, numpy, mss, pytesseract, hilos): se cargan
+        # después de parsear los argumentos para que --help responda al instante
+        carga_diferida.precargar()
+        carga_diferida.marcar('módulos cargados')
+        if args.tiempos_arranque:
+            carga_diferida.imprimir_informe()
+        if args.multicliente:
+            return ejecutar_multicliente(args)
+        from game_window import GameWindow
+        from estado_objetivo import estado
+        from hilo_detector_ocr import HiloDetectorOCR
+        from hilo_habilidades import HiloHabilidades
+        from hilo_autocuracion import HiloAutocuracion
+        from hilo_observador_objetivo import HiloObservadorObjetivo
+        from hilo_recoger_drop import HiloRecogerDrop
+        from hilo_mob_trabado import HiloMobTrabado
+        from metricas import iniciar_exportadores
+        from almacen_configuracion import almacen, VigilanteConfiguracion
+        from estadisticas_combate import base_combates, obtener_registro
+        from ajuste_escape import ajuste_escape
+        
+        # No arrancar con una configuración que no compila (teclas inexistentes, barras inválidas)
+        valida, mensaje = almacen.verificar()
+        if not valida:
+            print(f"\n❌ {mensaje}")
+            return 1
+        
         # Buscar ventana del juego
         print("\n[INICIALIZACIÓN]")
         print("-" * 70)
         print("  Buscando ventana del juego...")
         game_window = GameWindow(GAME_WINDOW_TITLE)
         print(f"  ✅ Ventana encontrada (Handle: {game_window.hwnd})")
+        game_window.iniciar_seguimiento()
         
         mostrar_configuracion()
         mostrar_hilos()
@@ -141,41 +258,77 @@ def main():
         print("-" * 70)
         
         # Hilo 1: Detector OCR
-        detector_ocr = HiloDetectorOCR(game_window.hwnd)
+        detector_ocr = HiloDetectorOCR(game_window)
         detector_ocr.iniciar()
         hilos.append(detector_ocr)
         print("  ✅ Hilo 1: Detector OCR iniciado")
         
         # Hilo 2: Habilidades
-        habilidades = HiloHabilidades(game_window.hwnd)
+        habilidades = HiloHabilidades(game_window)
         habilidades.iniciar()
         hilos.append(habilidades)
         print("  ✅ Hilo 2: Habilidades iniciado")
         
         # Hilo 3: Autocuración
-        autocuracion = HiloAutocuracion(game_window.hwnd)
+        autocuracion = HiloAutocuracion(game_window)
         autocuracion.iniciar()
         hilos.append(autocuracion)
         print("  ✅ Hilo 3: Autocuración iniciado")
         
         # Hilo 4: Observador de objetivo
-        observador = HiloObservadorObjetivo(game_window.hwnd)
+        observador = HiloObservadorObjetivo(game_window)
         observador.iniciar()
         hilos.append(observador)
         print("  ✅ Hilo 4: Observador de objetivo iniciado")
 
         # Hilo 5: Recoger drop (loot)
-        hilo_loot = HiloRecogerDrop(game_window.hwnd)
+        hilo_loot = HiloRecogerDrop(game_window)
         hilo_loot.iniciar()
         hilos.append(hilo_loot)
         print("  ✅ Hilo 5: Recoger drop iniciado")
 
         # Hilo 6: Mob trabado (escape)
-        hilo_esc = HiloMobTrabado(game_window.hwnd)
+        hilo_esc = HiloMobTrabado(game_window)
         hilo_esc.iniciar()
         hilos.append(hilo_esc)
         print("  ✅ Hilo 6: Mob trabado iniciado")
         
+        # Estadísticas de combate: el registro se detiene después de los hilos
+        # y la base después del registro (guarda el último combate)
+        registro = obtener_registro(estado.espacio)
+        registro.iniciar(estado, base_combates)
+        hilos.append(registro)
+        base_combates.iniciar()
+        hilos.append(base_combates)
+        print(f"  ✅ Estadísticas de combate en {base_combates.ruta}")
+        ajuste_escape.iniciar(base_combates, almacen.actual.compilada.escape)
+        ajuste_escape.seguir(almacen)
+        hilos.append(ajuste_escape)
+        
+        # Exportadores de métricas (si METRICAS['activo'] en la configuración)
+        hilos.extend(iniciar_exportadores())
+        
+        # Recarga en caliente de config.json: los hilos ven los cambios en el siguiente tick
+        vigilante = VigilanteConfiguracion(almacen)
+        vigilante.iniciar()
+        hilos.append(vigilante)
+        print("  ✅ Recarga en caliente de config.json activa")
+        
+        # Grabación opcional de la sesión
+        if args.grabar:
+            from sesion_grabada import GrabadorSesion
+            grabador = GrabadorSesion(game_window, autocuracion, args.grabar, detector=detector_ocr)
+            grabador.iniciar()
+            hilos.append(grabador)
+            print(f"  ⏺️  Grabando sesión en {args.grabar}")
+        
+        # Perfilado opcional de hilos
+        if args.perfilar:
+            from perfilador import perfilador
+            perfilador.iniciar(args.perfilar, duracion=args.perfilar_segundos)
+            hilos.append(perfilador)
+            print(f"  🔬 Perfilando {', '.join(args.perfilar)} durante {args.perfilar_segundos:.0f}s")
+        
         print("-" * 70)
         print("\n🚀 BOT EN EJECUCIÓN - Presiona Ctrl+C para detener\n")
         print("=" * 70)
@@ -1,21 +1,109 @@
 """
 Controlador del bot para la interfaz gráfica.
 Maneja el inicio y detención de los hilos del bot.
+
+La GUI no consulta el estado periódicamente: el controlador se suscribe a
+los cambios del estado global y a las muestras de rendimiento y los entrega
+a los callbacks (la GUI los pasa a señales Qt, ver panel_rendimiento.py).
+
+Multicliente: el controlador encuentra todas las ventanas con el título del
+juego (o recibe la lista de handles) y ejecuta un ClienteBot aislado por
+ventana, con su propio estado, su perfil de configuración opcional y sus
+hilos. El primer cliente usa el estado global (el que muestra la GUI); los
+demás usan el espacio de estado de su ventana ('hwnd:0x...'). Se comparten
+el backend, el Manager del estado, las tablas de colores, los exportadores
+de métricas, la recarga de config.json, la base de estadísticas de combate
+y, entre clientes con la misma configuración, la configuración compilada
+(índices de nombres incluidos).
+
+Los hilos (y con ellos cv2, numpy, mss, pytesseract y el Manager del
+estado) se importan al pulsar RUN, no al importar este módulo, para que la
+ventana de configuración aparezca sin esperarlos (ver carga_diferida.py).
 """
-import threading
 import time
-from typing import Optional, List, Callable
+from typing import Optional, List, Callable, Sequence, TYPE_CHECKING
 
-from game_window import GameWindow
-from estado_objetivo import estado
-import configuracion
+from almacen_configuracion import almacen, AlmacenConfiguracion, AlmacenPerfil, VigilanteConfiguracion, cargar_perfil
 
-from hilo_detector_ocr import HiloDetectorOCR
-from hilo_habilidades import HiloHabilidades
-from hilo_autocuracion import HiloAutocuracion
-from hilo_observador_objetivo import HiloObservadorObjetivo
-from hilo_recoger_drop import HiloRecogerDrop
-from hilo_mob_trabado import HiloMobTrabado
+if TYPE_CHECKING:
+    from game_window import GameWindow
+    from estado_objetivo import EstadoObjetivo
+
+
+class ClienteBot:
+    """
+    Una instancia aislada del bot para una ventana del juego.
+    Estado, configuración e hilos propios; la entrada va dirigida a su hwnd.
+    """
+    
+    def __init__(self, game_window: 'GameWindow', estado_objetivo: 'EstadoObjetivo',
+                 almacen_config: AlmacenConfiguracion, nombre: str):
+        """
+        Args:
+            game_window: Ventana del cliente
+            estado_objetivo: Estado del cliente
+            almacen_config: Configuración del cliente (global o de su perfil)
+            nombre: Nombre para los logs ('cliente 1', ...)
+        """
+        self.game_window = game_window
+        self.estado = estado_objetivo
+        self.almacen = almacen_config
+        self.nombre = nombre
+        self.hilos: List = []
+    
+    def iniciar(self) -> None:
+        """Crea e inicia los seis hilos del bot para esta ventana."""
+        # Importación diferida (inmediata si la precarga ya terminó)
+        from hilo_detector_ocr import HiloDetectorOCR
+        from hilo_habilidades import HiloHabilidades
+        from hilo_autocuracion import HiloAutocuracion
+        from hilo_observador_objetivo import HiloObservadorObjetivo
+        from hilo_recoger_drop import HiloRecogerDrop
+        from hilo_mob_trabado import HiloMobTrabado
+        from estadisticas_combate import base_combates, obtener_registro
+        from ajuste_escape import ajuste_escape
+        
+        # Geometría en caché, refrescada al mover/redimensionar la ventana
+        self.game_window.iniciar_seguimiento()
+        
+        for clase in (HiloDetectorOCR, HiloHabilidades, HiloAutocuracion,
+                      HiloObservadorObjetivo, HiloRecogerDrop, HiloMobTrabado):
+            hilo = clase(self.game_window, self.estado, self.almacen)
+            hilo.iniciar()
+            self.hilos.append(hilo)
+        
+        # Episodios de combate del cliente (se detiene después de los hilos
+        # para guardar el último combate con su loot)
+        registro = obtener_registro(self.estado.espacio)
+        registro.iniciar(self.estado, base_combates)
+        self.hilos.append(registro)
+        # Percentil de escape del cliente (su perfil puede pedir otro)
+        ajuste_escape.seguir(self.almacen)
+        
+        # Recarga en caliente del archivo de perfil
+        if isinstance(self.almacen, AlmacenPerfil) and self.almacen.ruta:
+            vigilante = VigilanteConfiguracion(self.almacen, self.almacen.ruta)
+            vigilante.iniciar()
+            self.hilos.append(vigilante)
+        
+        print(f"[CONTROLADOR] {self.nombre} iniciado (hwnd {self.game_window.hwnd})")
+    
+    def detener(self) -> None:
+        """Detiene los hilos del cliente y descarta su espacio de estado."""
+        from estado_objetivo import EstadoObjetivo, ESPACIO_GLOBAL
+        
+        for hilo in self.hilos:
+            try:
+                hilo.detener()
+            except Exception as e:
+                print(f"Error al detener hilo ({self.nombre}): {e}")
+        self.hilos.clear()
+        self.game_window.detener_seguimiento()
+        if isinstance(self.almacen, AlmacenPerfil):
+            self.almacen.cerrar()
+        # El próximo RUN empieza con un estado limpio para esta ventana
+        if self.estado.espacio != ESPACIO_GLOBAL:
+            EstadoObjetivo.descartar(self.estado.espacio)
 
 
 class BotController:
@@ -24,23 +112,35 @@ class BotController:
     Gestiona todos los hilos y el estado de ejecución.
     """
     
-    def __init__(self, status_callback: Optional[Callable] = None):
+    def __init__(self, status_callback: Optional[Callable[[dict], None]] = None,
+                 muestra_callback: Optional[Callable[[dict], None]] = None):
         """
         Inicializa el controlador del bot.
         
         Args:
-            status_callback: Función callback para actualizar el estado en la GUI
+            status_callback: Recibe cada cambio de objetivo del cliente 1 (empujado
+                             desde el hilo que lo produce, ver _al_cambiar_estado)
+            muestra_callback: Recibe una muestra de rendimiento por segundo
+                              (ver muestreo_rendimiento.py)
         """
         self.status_callback = status_callback
+        self.muestra_callback = muestra_callback
         self.ejecutando = False
-        self.game_window: Optional[GameWindow] = None
+        self.game_window: Optional['GameWindow'] = None
+        self.clientes: List[ClienteBot] = []
         self.hilos: List = []
-        self.thread_monitor: Optional[threading.Thread] = None
         self.error_message: Optional[str] = None
     
-    def iniciar(self):
+    def iniciar(self, ventanas: Optional[Sequence[int]] = None,
+                perfiles: Optional[Sequence[Optional[str]]] = None):
         """
-        Inicia el bot y todos sus hilos.
+        Inicia el bot y todos sus hilos: un cliente por ventana del juego.
+        
+        Args:
+            ventanas: Handles de las ventanas a controlar (por defecto todas
+                      las que tienen el título GAME_WINDOW_TITLE)
+            perfiles: Archivo JSON de perfil para cada cliente, en el mismo
+                      orden que las ventanas (None o ausente = configuración base)
         
         Returns:
             Tupla (éxito, mensaje)
@@ -49,46 +149,87 @@ class BotController:
             return False, "El bot ya está en ejecución"
         
         try:
-            # Buscar ventana del juego (usar configuración actualizada)
-            self.game_window = GameWindow(configuracion.GAME_WINDOW_TITLE)
+            # Importación diferida (inmediata si la precarga ya terminó)
+            from game_window import GameWindow
+            from estado_objetivo import estado, EstadoObjetivo, espacio_de_ventana
+            from metricas import iniciar_exportadores
+            from estadisticas_combate import base_combates
+            from ajuste_escape import ajuste_escape
             
-            # Crear e iniciar todos los hilos
-            detector_ocr = HiloDetectorOCR(self.game_window.hwnd)
-            detector_ocr.iniciar()
-            self.hilos.append(detector_ocr)
+            # No arrancar con una configuración que no compila (teclas inexistentes, barras inválidas)
+            valida, mensaje = almacen.verificar()
+            if not valida:
+                return False, mensaje
             
-            habilidades = HiloHabilidades(self.game_window.hwnd)
-            habilidades.iniciar()
-            self.hilos.append(habilidades)
+            # Buscar las ventanas del juego (usar configuración actualizada)
+            titulo = almacen.actual.GAME_WINDOW_TITLE
+            if ventanas is None:
+                game_windows = GameWindow.todas(titulo)
+                if not game_windows:
+                    raise Exception(f"No se encontró la ventana con título: {titulo}")
+            else:
+                game_windows = [GameWindow(titulo, hwnd=hwnd) for hwnd in ventanas]
+            perfiles = list(perfiles or [])
             
-            autocuracion = HiloAutocuracion(self.game_window.hwnd)
-            autocuracion.iniciar()
-            self.hilos.append(autocuracion)
+            # Base de estadísticas de combate compartida (se detiene después
+            # de los clientes, que le entregan sus últimos episodios)
+            base_combates.iniciar()
+            self.hilos.append(base_combates)
+            # Timeout de escape por mob a partir de las muertes (historial en segundo plano)
+            ajuste_escape.iniciar(base_combates, almacen.actual.compilada.escape)
+            self.hilos.append(ajuste_escape)
             
-            observador = HiloObservadorObjetivo(self.game_window.hwnd)
-            observador.iniciar()
-            self.hilos.append(observador)
+            for i, game_window in enumerate(game_windows):
+                ruta_perfil = perfiles[i] if i < len(perfiles) else None
+                almacen_cliente = cargar_perfil(almacen, ruta_perfil) if ruta_perfil else almacen
+                valida, mensaje = almacen_cliente.verificar()
+                if not valida:
+                    if isinstance(almacen_cliente, AlmacenPerfil):
+                        almacen_cliente.cerrar()
+                    raise Exception(f"Perfil {ruta_perfil}: {mensaje}")
+                # El primer cliente usa el estado global (el que muestra la GUI);
+                # los demás, el espacio de su ventana
+                estado_cliente = estado if i == 0 else EstadoObjetivo(espacio_de_ventana(game_window.hwnd))
+                cliente = ClienteBot(game_window, estado_cliente, almacen_cliente, f"cliente {i + 1}")
+                self.clientes.append(cliente)
+                cliente.iniciar()
+            self.game_window = self.clientes[0].game_window
             
-            hilo_loot = HiloRecogerDrop(self.game_window.hwnd)
-            hilo_loot.iniciar()
-            self.hilos.append(hilo_loot)
+            # Exportadores de métricas (si METRICAS['activo'])
+            self.hilos.extend(iniciar_exportadores(almacen.actual.METRICAS))
             
-            hilo_esc = HiloMobTrabado(self.game_window.hwnd)
-            hilo_esc.iniciar()
-            self.hilos.append(hilo_esc)
+            # Recarga en caliente de config.json (sin RUN/STOP)
+            vigilante = VigilanteConfiguracion(almacen)
+            vigilante.iniciar()
+            self.hilos.append(vigilante)
+            
+            # Cambios de estado y muestras de rendimiento empujados a la GUI
+            if self.status_callback:
+                estado.suscribir(self._al_cambiar_estado)
+                info = estado.obtener_info()
+                self._al_cambiar_estado({
+                    'tipo': info['tipo'],
+                    'nombre_coincidente': info['nombre_coincidente'],
+                    'similitud': info['similitud'],
+                    'timestamp_cambio': time.time() - info['tiempo_en_estado'],
+                })
+            if self.muestra_callback:
+                from muestreo_rendimiento import MuestreadorRendimiento
+                muestreador = MuestreadorRendimiento()
+                muestreador.suscribir(self.muestra_callback)
+                muestreador.iniciar()
+                self.hilos.append(muestreador)
             
             self.ejecutando = True
             self.error_message = None
             
-            # Iniciar hilo de monitoreo
-            self.thread_monitor = threading.Thread(target=self._monitorear_estado, daemon=True)
-            self.thread_monitor.start()
-            
+            if len(self.clientes) > 1:
+                return True, f"Bot iniciado correctamente ({len(self.clientes)} clientes)"
             return True, "Bot iniciado correctamente"
             
         except Exception as e:
             self.error_message = str(e)
-            self.detener()
+            self._liberar()
             return False, f"Error al iniciar bot: {e}"
     
     def detener(self):
@@ -102,8 +243,18 @@ class BotController:
             return False, "El bot no está en ejecución"
         
         self.ejecutando = False
+        self._liberar()
         
-        # Detener todos los hilos
+        return True, "Bot detenido correctamente"
+    
+    def _liberar(self) -> None:
+        """Detiene los clientes y los hilos compartidos."""
+        if self.status_callback:
+            from estado_objetivo import estado
+            estado.desuscribir(self._al_cambiar_estado)
+        for cliente in self.clientes:
+            cliente.detener()
+        self.clientes.clear()
         for hilo in self.hilos:
             try:
                 hilo.detener()
@@ -112,22 +263,31 @@ class BotController:
         
         self.hilos.clear()
         self.game_window = None
-        
-        return True, "Bot detenido correctamente"
     
-    def _monitorear_estado(self) -> None:
-        """Monitorea el estado del bot y actualiza la GUI."""
-        while self.ejecutando:
-            try:
-                info = estado.obtener_info()
-                
-                if self.status_callback:
-                    self.status_callback(info)
-                
-                time.sleep(0.5)
-            except Exception as e:
-                print(f"Error en monitoreo: {e}")
-                time.sleep(1)
+    def _al_cambiar_estado(self, cambio: dict) -> None:
+        """
+        Suscriptor del estado global: entrega el cambio a la GUI con el mismo
+        formato que obtener_estado() más 'timestamp_cambio' (la GUI calcula el
+        tiempo en estado sin consultar el Manager).
+        """
+        self.status_callback({
+            'tipo': cambio['tipo'].value,
+            'nombre': cambio['nombre_coincidente'] or 'N/A',
+            'similitud': cambio['similitud'] * 100,
+            'timestamp_cambio': cambio['timestamp_cambio'],
+        })
+    
+    def obtener_estados(self) -> List[dict]:
+        """
+        Estado del objetivo de cada cliente.
+        
+        Returns:
+            Lista de diccionarios (cliente, hwnd y la información del estado)
+        """
+        return [
+            {'cliente': cliente.nombre, 'hwnd': cliente.game_window.hwnd, **cliente.estado.obtener_info()}
+            for cliente in list(self.clientes)
+        ]
     
     def esta_ejecutando(self) -> bool:
         """Retorna True si el bot está en ejecución."""
@@ -149,6 +309,7 @@ class BotController:
             }
         
         try:
+            from estado_objetivo import estado
             info = estado.obtener_info()
             return {
                 'tipo': info['tipo'].value,
@@ -22,6 +22,26 @@ a = Analysis(
         'hilo_observador_objetivo',
         'hilo_recoger_drop',
         'hilo_mob_trabado',
+        'clasificador_color',
+        'lector_vitales',
+        'captura_sondas',
+        'backend_plataforma',
+        'sesion_grabada',
+        'perfilador',
+        'metricas',
+        'carga_diferida',
+        'almacen_configuracion',
+        'config_compilada',
+        'muestreo_rendimiento',
+        'panel_rendimiento',
+        'vista_previa_ocr',
+        'panel_vista_previa',
+        'localizador_region',
+        'reconocedor_glifos',
+        'diccionario_tesseract',
+        'filtro_clasificacion',
+        'estadisticas_combate',
+        'ajuste_escape',
     ],
     hookspath=[],
     hooksconfig={},
@@ -0,0 +1,173 @@
+"""
+Herramienta de calibración de colores para las barras de vida y maná.
+
+Aprende de capturas reales qué colores pertenecen a la barra (llena) y cuáles al
+fondo (vacía), y guarda una tabla compacta de 32x32x32 celdas (32 KB por
+recurso) en calibracion_colores.npz. HiloAutocuracion la carga al iniciar y la
+combina con las reglas: las celdas con datos deciden, el resto usa las reglas.
+
+Uso:
+    python calibrar_colores.py mana --llena mana_llena.png --vacia mana_vacia.png
+    python calibrar_colores.py vida --llena v1.png v2.png --vacia v3.png --franja 20 150 62 --alto 3
+
+Las capturas son de la ventana del juego completa (mismas coordenadas que la
+configuración). Por defecto la franja se toma de AUTOCURACION[recurso]['barra'].
+"""
+import argparse
+import os
+import sys
+from typing import List, Tuple
+
+import cv2
+import numpy as np
+
+from clasificador_color import (
+    RUTA_CALIBRACION, BITS_CELDA, CELDA_SIN_DATOS, CELDA_NEGATIVA, CELDA_POSITIVA,
+    obtener_tabla, construir_tabla_calibrada, TablaColores,
+    construir_tabla_vida, construir_tabla_mana,
+)
+
+
+# Muestras mínimas (tras el suavizado) para que una celda tenga decisión propia
+MIN_MUESTRAS_CELDA = 3
+
+
+def _leer_franjas(rutas: List[str], franja: Tuple[int, int, int], alto: int) -> np.ndarray:
+    """
+    Lee la franja de la barra de cada captura.
+
+    Returns:
+        Array (N, 3) con los píxeles en formato BGR
+    """
+    x_inicio, x_fin, y = franja
+    pixeles = []
+    for ruta in rutas:
+        imagen = cv2.imread(ruta, cv2.IMREAD_COLOR)
+        if imagen is None:
+            raise ValueError(f"No se pudo leer la imagen: {ruta}")
+        recorte = imagen[y:y + alto, x_inicio:x_fin, :3]
+        if recorte.size == 0:
+            raise ValueError(f"La franja {franja} está fuera de la imagen {ruta} ({imagen.shape[1]}x{imagen.shape[0]})")
+        pixeles.append(recorte.reshape(-1, 3))
+    return np.concatenate(pixeles)
+
+
+def _histograma_celdas(pixeles_bgr: np.ndarray) -> np.ndarray:
+    """Cuenta los píxeles por celda (32x32x32) indexada por (r, g, b)."""
+    desplazamiento = 8 - BITS_CELDA
+    lado = 1 << BITS_CELDA
+    r = pixeles_bgr[:, 2] >> desplazamiento
+    g = pixeles_bgr[:, 1] >> desplazamiento
+    b = pixeles_bgr[:, 0] >> desplazamiento
+    indices = (r.astype(np.int32) * lado + g) * lado + b
+    return np.bincount(indices, minlength=lado ** 3).reshape(lado, lado, lado).astype(np.float64)
+
+
+def _suavizar(histograma: np.ndarray) -> np.ndarray:
+    """
+    Reparte cada celda con sus vecinas (caja 3x3x3, peso 1/2 a las vecinas) para
+    generalizar a colores cercanos que no aparecieron en las capturas.
+    """
+    relleno = np.pad(histograma, 1)
+    vecinos = np.zeros_like(histograma)
+    lado = histograma.shape[0]
+    for dr in range(3):
+        for dg in range(3):
+            for db in range(3):
+                vecinos += relleno[dr:dr + lado, dg:dg + lado, db:db + lado]
+    return histograma + 0.5 * (vecinos - histograma)
+
+
+def aprender_celdas(positivos_bgr: np.ndarray, negativos_bgr: np.ndarray) -> np.ndarray:
+    """
+    Aprende la decisión de cada celda a partir de píxeles de barra llena y vacía.
+    Cada clase se normaliza por su total, así una barra vacía con muchos más
+    píxeles no domina por volumen.
+
+    Returns:
+        int8[32,32,32] con CELDA_POSITIVA / CELDA_NEGATIVA / CELDA_SIN_DATOS
+    """
+    positivos = _suavizar(_histograma_celdas(positivos_bgr))
+    negativos = _suavizar(_histograma_celdas(negativos_bgr))
+
+    densidad_pos = positivos / max(1.0, positivos.sum())
+    densidad_neg = negativos / max(1.0, negativos.sum())
+
+    celdas = np.full(positivos.shape, CELDA_SIN_DATOS, dtype=np.int8)
+    con_datos = (positivos + negativos) >= MIN_MUESTRAS_CELDA
+    celdas[con_datos & (densidad_pos > densidad_neg)] = CELDA_POSITIVA
+    celdas[con_datos & (densidad_pos <= densidad_neg)] = CELDA_NEGATIVA
+    return celdas
+
+
+def _aciertos(tabla: TablaColores, positivos_bgr: np.ndarray, negativos_bgr: np.ndarray) -> Tuple[float, float]:
+    """Porcentaje de píxeles de barra llena y de barra vacía clasificados correctamente."""
+    pos = tabla.clasificar_bgra(positivos_bgr[None, :, :])
+    neg = tabla.clasificar_bgra(negativos_bgr[None, :, :])
+    return 100.0 * pos.mean(), 100.0 * (1.0 - neg.mean())
+
+
+def guardar_celdas(recurso: str, celdas: np.ndarray, ruta: str = RUTA_CALIBRACION) -> None:
+    """Guarda las celdas de un recurso conservando las de los demás recursos."""
+    existentes = {}
+    if os.path.exists(ruta):
+        with np.load(ruta) as datos:
+            existentes = {clave: datos[clave] for clave in datos.files}
+    existentes[recurso] = celdas
+    np.savez_compressed(ruta, **existentes)
+
+
+def main() -> int:
+    """Punto de entrada de la herramienta de calibración."""
+    parser = argparse.ArgumentParser(description="Calibra los colores de las barras de vida y maná.")
+    parser.add_argument('recurso', choices=['vida', 'mana'])
+    parser.add_argument('--llena', nargs='+', required=True, help="Capturas con la barra llena")
+    parser.add_argument('--vacia', nargs='+', required=True, help="Capturas con la barra vacía")
+    parser.add_argument('--franja', nargs=3, type=int, metavar=('X_INICIO', 'X_FIN', 'Y'),
+                        help="Franja de la barra (por defecto AUTOCURACION[recurso]['barra'])")
+    parser.add_argument('--alto', type=int, default=1, help="Filas de la franja a muestrear")
+    parser.add_argument('--salida', default=RUTA_CALIBRACION)
+    args = parser.parse_args()
+
+    if args.franja:
+        franja = tuple(args.franja)
+    else:
+        import configuracion
+        barra = configuracion.AUTOCURACION[args.recurso].get('barra')
+        if not barra:
+            print("[ERROR] No hay franja configurada; usa --franja X_INICIO X_FIN Y")
+            return 1
+        franja = (barra['x_inicio'], barra['x_fin'], barra['y'])
+
+    try:
+        positivos = _leer_franjas(args.llena, franja, args.alto)
+        negativos = _leer_franjas(args.vacia, franja, args.alto)
+    except ValueError as e:
+        print(f"[ERROR] {e}")
+        return 1
+
+    print(f"[INFO] Píxeles de barra llena: {len(positivos)} | barra vacía: {len(negativos)}")
+
+    celdas = aprender_celdas(positivos, negativos)
+    reglas = construir_tabla_vida() if args.recurso == 'vida' else construir_tabla_mana()
+    calibrada = TablaColores.desde_booleanos(construir_tabla_calibrada(reglas, celdas))
+    original = obtener_tabla(args.recurso, calibrada=False)
+
+    print("\n[RESULTADO] Aciertos sobre las capturas (llena / vacía)")
+    print("-" * 60)
+    for nombre, tabla in (("Reglas originales", original), ("Calibrada", calibrada)):
+        acierto_llena, acierto_vacia = _aciertos(tabla, positivos, negativos)
+        print(f"  {nombre:18s}: {acierto_llena:6.2f}% / {acierto_vacia:6.2f}%")
+    print("-" * 60)
+    print(f"  Celdas positivas: {np.count_nonzero(celdas == CELDA_POSITIVA)} | "
+          f"negativas: {np.count_nonzero(celdas == CELDA_NEGATIVA)} | "
+          f"sin datos (usan reglas): {np.count_nonzero(celdas == CELDA_SIN_DATOS)}")
+
+    guardar_celdas(args.recurso, celdas, args.salida)
+    print(f"\n[OK] Calibración de {args.recurso} guardada en {args.salida}")
+    print("[INFO] Se aplicará la próxima vez que se inicie el bot")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,215 @@
+"""
+Módulo de captura por lotes de los píxeles sonda (vida, maná, barras).
+Responsabilidad: Leer todas las sondas configuradas con una sola captura (Single Responsibility Principle)
+
+En lugar de GetWindowRect + GetDC + GetPixel + ReleaseDC por cada píxel, se
+captura una vez por tick el rectángulo mínimo que contiene todas las sondas y
+se leen los colores del array numpy resultante. La fuente de pantalla es
+intercambiable: mss en el equipo real o una imagen en memoria para pruebas y
+benchmarks en Linux.
+"""
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from metricas import metricas
+
+
+class FuentePantalla:
+    """
+    Interfaz de una fuente de píxeles de pantalla.
+    Las coordenadas son absolutas (pantalla) y la imagen se retorna en BGRA.
+    """
+
+    def capturar(self, left: int, top: int, width: int, height: int) -> np.ndarray:
+        """
+        Captura una región de la pantalla.
+
+        Returns:
+            Array uint8 de forma (height, width, 4) en formato BGRA
+        """
+        raise NotImplementedError
+
+
+class FuenteMSS(FuentePantalla):
+    """Fuente de pantalla real usando mss (una instancia por hilo, mss no es thread-safe)."""
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def capturar(self, left: int, top: int, width: int, height: int) -> np.ndarray:
+        sct = getattr(self._local, 'sct', None)
+        if sct is None:
+            import mss
+            sct = self._local.sct = mss.mss()
+        region = {"left": left, "top": top, "width": width, "height": height}
+        return np.array(sct.grab(region))
+
+
+class FuenteMemoria(FuentePantalla):
+    """
+    Fuente de pantalla falsa que sirve recortes de una imagen en memoria.
+    Permite ejecutar las sondas en Linux (pruebas, benchmarks, repeticiones).
+    """
+
+    def __init__(self, ancho: int = 1920, alto: int = 1080):
+        self.pantalla = np.zeros((alto, ancho, 4), dtype=np.uint8)
+        self.capturas = 0
+
+    def establecer_pantalla(self, imagen: np.ndarray) -> None:
+        """Reemplaza el contenido de la pantalla (BGRA)."""
+        self.pantalla = imagen
+
+    def capturar(self, left: int, top: int, width: int, height: int) -> np.ndarray:
+        self.capturas += 1
+        return self.pantalla[top:top + height, left:left + width]
+
+
+class LecturaSondas:
+    """
+    Resultado de una captura de sondas.
+    Cada sonda es una vista (sin copia) de la región capturada.
+    """
+
+    def __init__(self, imagen: np.ndarray, sondas: Dict[str, Tuple[int, int, int]],
+                 x0: int, y0: int, timestamp: float):
+        self.imagen = imagen
+        self.timestamp = timestamp
+        self._sondas = sondas
+        self._x0 = x0
+        self._y0 = y0
+
+    @property
+    def origen(self) -> Tuple[int, int]:
+        """Posición (x, y) de la región capturada, relativa a la ventana."""
+        return self._x0, self._y0
+
+    @property
+    def sondas(self) -> Dict[str, Tuple[int, int, int]]:
+        """Sondas (x, y, ancho) incluidas en la captura."""
+        return self._sondas
+
+    def __contains__(self, nombre: str) -> bool:
+        return nombre in self._sondas
+
+    def franja(self, nombre: str) -> np.ndarray:
+        """Retorna la franja BGRA (1 x ancho x 4) de una sonda."""
+        x, y, ancho = self._sondas[nombre]
+        fila = y - self._y0
+        columna = x - self._x0
+        return self.imagen[fila:fila + 1, columna:columna + ancho]
+
+    def color(self, nombre: str) -> Tuple[int, int, int]:
+        """Retorna el color (R, G, B) del primer píxel de una sonda."""
+        b, g, r = self.franja(nombre)[0, 0, :3]
+        return int(r), int(g), int(b)
+
+
+class ServicioSondas:
+    """
+    Servicio que agrupa las sondas de píxeles y las lee con una sola captura.
+    Thread-safe: los hilos de vida y maná comparten la misma captura por tick.
+    """
+
+    def __init__(self, fuente: FuentePantalla, obtener_origen: Callable[[], Tuple[int, int]],
+                 max_edad: float = 0.05):
+        """
+        Inicializa el servicio.
+
+        Args:
+            fuente: Fuente de píxeles de pantalla
+            obtener_origen: Función que retorna (left, top) de la ventana del juego
+            max_edad: Segundos durante los que una captura se reutiliza entre hilos
+        """
+        self.fuente = fuente
+        self.obtener_origen = obtener_origen
+        self.max_edad = max_edad
+        self._sondas: Dict[str, Tuple[int, int, int]] = {}
+        self._rect: Optional[Tuple[int, int, int, int]] = None
+        self._ultima: Optional[LecturaSondas] = None
+        self._lock = threading.Lock()
+        # Métricas: tasa de reutilización de la captura entre hilos
+        self._m_reutilizadas = metricas.contador('bot_sondas_lecturas_total', 'Lecturas de sondas por resultado de la caché', resultado='reutilizada')
+        self._m_capturadas = metricas.contador('bot_sondas_lecturas_total', 'Lecturas de sondas por resultado de la caché', resultado='capturada')
+
+    def definir(self, nombre: str, x: int, y: int, ancho: int = 1) -> None:
+        """
+        Define (o actualiza) una sonda relativa a la ventana.
+
+        Args:
+            nombre: Identificador de la sonda ('vida', 'mana', ...)
+            x, y: Primer píxel de la sonda
+            ancho: Píxeles horizontales a leer (1 = un solo punto)
+        """
+        sonda = (int(x), int(y), max(1, int(ancho)))
+        if self._sondas.get(nombre) == sonda:
+            return
+        with self._lock:
+            self._sondas[nombre] = sonda
+            self._rect = None
+            self._ultima = None
+
+    def _rectangulo(self) -> Tuple[int, int, int, int]:
+        """Rectángulo mínimo (x0, y0, ancho, alto) que contiene todas las sondas."""
+        if self._rect is None:
+            x0 = min(x for x, _, _ in self._sondas.values())
+            y0 = min(y for _, y, _ in self._sondas.values())
+            x1 = max(x + ancho for x, _, ancho in self._sondas.values())
+            y1 = max(y for _, y, _ in self._sondas.values()) + 1
+            self._rect = (x0, y0, x1 - x0, y1 - y0)
+        return self._rect
+
+    def leer(self) -> LecturaSondas:
+        """
+        Retorna la lectura de todas las sondas.
+        Si otro hilo capturó hace menos de max_edad segundos, reutiliza esa captura.
+        """
+        with self._lock:
+            ahora = time.perf_counter()
+            if self._ultima is not None and ahora - self._ultima.timestamp < self.max_edad:
+                self._m_reutilizadas.inc()
+                return self._ultima
+
+            self._m_capturadas.inc()
+            x0, y0, ancho, alto = self._rectangulo()
+            left, top = self.obtener_origen()
+            imagen = self.fuente.capturar(left + x0, top + y0, ancho, alto)
+            self._ultima = LecturaSondas(imagen, dict(self._sondas), x0, y0, ahora)
+            return self._ultima
+
+
+# ============================================================
+# PRUEBA INDEPENDIENTE
+# ============================================================
+if __name__ == "__main__":
+    print("=" * 60)
+    print("PRUEBA DEL SERVICIO DE SONDAS (fuente en memoria)")
+    print("=" * 60)
+
+    fuente = FuenteMemoria()
+    pantalla = np.zeros((1080, 1920, 4), dtype=np.uint8)
+    pantalla[100 + 62, 200 + 110] = (0, 0, 255, 255)   # Vida: rojo (BGRA)
+    pantalla[100 + 80, 200 + 45] = (255, 0, 0, 255)    # Maná: azul (BGRA)
+    fuente.establecer_pantalla(pantalla)
+
+    servicio = ServicioSondas(fuente, lambda: (200, 100), max_edad=0)
+    servicio.definir('vida', 110, 62)
+    servicio.definir('mana', 45, 80)
+    servicio.definir('barra_vida', 20, 62, 130)
+
+    lectura = servicio.leer()
+    print(f"\n[INFO] Rectángulo capturado: {lectura.imagen.shape[1]}x{lectura.imagen.shape[0]}")
+    print(f"[INFO] Vida: RGB{lectura.color('vida')} | Maná: RGB{lectura.color('mana')}")
+    print(f"[INFO] Franja barra_vida: {lectura.franja('barra_vida').shape}")
+
+    repeticiones = 20000
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        lectura = servicio.leer()
+        lectura.color('vida')
+        lectura.color('mana')
+        lectura.franja('barra_vida')
+    duracion = (time.perf_counter() - inicio) / repeticiones
+    print(f"[BENCHMARK] {duracion * 1e6:.1f} µs por tick ({fuente.capturas} capturas, 3 sondas)")
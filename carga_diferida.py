@@ -0,0 +1,146 @@
+"""
+Carga diferida de las dependencias pesadas del bot.
+Responsabilidad: Importar en segundo plano los módulos pesados y medir su costo de arranque (Single Responsibility Principle)
+
+La GUI no necesita cv2, numpy, mss, pytesseract ni los hilos para mostrar la
+ventana de configuración. Esos módulos se importan en un hilo de precarga
+después de que la ventana aparece (o al pulsar RUN, lo que ocurra primero);
+si RUN llega durante la precarga, el lock de importación de Python hace que
+espere al módulo en curso en lugar de importarlo dos veces.
+
+El informe de arranque muestra el costo incremental de cada módulo en el
+orden de carga (las dependencias compartidas se atribuyen al primero que
+las importa) y los hitos registrados con marcar().
+"""
+import importlib
+import threading
+import time
+from typing import Callable, List, Optional, Tuple
+
+# Referencia de tiempo: se fija al importar este módulo (primer import de gui_main/bot)
+T0 = time.perf_counter()
+
+# Módulos pesados en orden de dependencia (primero las bibliotecas, luego el bot)
+MODULOS_PESADOS = (
+    'numpy',
+    'cv2',
+    'PIL.Image',
+    'pytesseract',
+    'mss',
+    'estado_objetivo',
+    'backend_plataforma',
+    'game_window',
+    'metricas',
+    'hilo_detector_ocr',
+    'hilo_habilidades',
+    'hilo_autocuracion',
+    'hilo_observador_objetivo',
+    'hilo_recoger_drop',
+    'hilo_mob_trabado',
+)
+
+_hitos: List[Tuple[str, float]] = []
+_tiempos: List[Tuple[str, float, Optional[str]]] = []
+_lock = threading.Lock()
+_thread: Optional[threading.Thread] = None
+_listo = threading.Event()
+
+
+def marcar(hito: str) -> float:
+    """
+    Registra un hito de arranque ('ventana visible', 'primer RUN', ...).
+
+    Returns:
+        Segundos desde T0
+    """
+    transcurrido = time.perf_counter() - T0
+    with _lock:
+        _hitos.append((hito, transcurrido))
+    return transcurrido
+
+
+def precargar(modulos: Tuple[str, ...] = MODULOS_PESADOS) -> List[Tuple[str, float, Optional[str]]]:
+    """
+    Importa los módulos en orden y mide el costo incremental de cada uno.
+    Un módulo que falla no detiene la precarga (el error real aparecerá al usarlo).
+
+    Returns:
+        Lista de (modulo, segundos, error o None)
+    """
+    resultados = []
+    for nombre in modulos:
+        t0 = time.perf_counter()
+        error = None
+        try:
+            importlib.import_module(nombre)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        resultados.append((nombre, time.perf_counter() - t0, error))
+    with _lock:
+        _tiempos.extend(resultados)
+    _listo.set()
+    return resultados
+
+
+def iniciar_precarga(al_terminar: Optional[Callable[[], None]] = None) -> None:
+    """
+    Lanza la precarga en un hilo daemon (una sola vez por proceso).
+
+    Args:
+        al_terminar: Función a llamar cuando termina (desde el hilo de precarga)
+    """
+    global _thread
+    with _lock:
+        if _thread is not None:
+            return
+
+        def _ciclo():
+            precargar()
+            marcar('precarga completa')
+            if al_terminar:
+                al_terminar()
+
+        _thread = threading.Thread(target=_ciclo, name='precarga', daemon=True)
+        _thread.start()
+
+
+def esperar_precarga(timeout: Optional[float] = None) -> bool:
+    """Espera a que termine la precarga. Retorna False si no terminó a tiempo."""
+    return _listo.wait(timeout)
+
+
+def informe() -> str:
+    """Informe de tiempos de arranque (hitos y costo de importación por módulo)."""
+    with _lock:
+        hitos = list(_hitos)
+        tiempos = list(_tiempos)
+
+    lineas = ["[ARRANQUE] Tiempos de arranque (desde el inicio del proceso de la app)"]
+    for hito, transcurrido in hitos:
+        lineas.append(f"[ARRANQUE]   {hito:30s} {transcurrido * 1000:8.0f} ms")
+    if tiempos:
+        total = sum(segundos for _, segundos, _ in tiempos)
+        lineas.append(f"[ARRANQUE]   Importación diferida: {total * 1000:.0f} ms")
+        for nombre, segundos, error in sorted(tiempos, key=lambda t: t[1], reverse=True):
+            detalle = f"  ({error})" if error else ""
+            lineas.append(f"[ARRANQUE]     {nombre:28s} {segundos * 1000:8.1f} ms{detalle}")
+    return "\n".join(lineas)
+
+
+def imprimir_informe() -> None:
+    """Imprime el informe de arranque."""
+    print(informe())
+
+
+# ============================================================
+# PRUEBA INDEPENDIENTE
+# ============================================================
+if __name__ == "__main__":
+    print("=" * 60)
+    print("PRUEBA DE CARGA DIFERIDA")
+    print("=" * 60)
+
+    marcar('inicio de la prueba')
+    iniciar_precarga()
+    esperar_precarga()
+    imprimir_informe()
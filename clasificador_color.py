@@ -0,0 +1,413 @@
+"""
+Módulo de clasificación de colores para las barras de vida y maná.
+Responsabilidad: Compilar las reglas de color en una tabla de búsqueda (Single Responsibility Principle)
+
+Las reglas (listas de colores conocidos con tolerancia + reglas de dominancia)
+se evalúan una sola vez para los 16.7M colores RGB posibles y se guardan en una
+tabla de 1 bit por color (2 MB por recurso). Clasificar un color, o un array
+completo de píxeles, es entonces una sola lectura indexada.
+"""
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+# Tolerancia por componente usada al comparar contra los colores conocidos
+TOLERANCIA_COLOR = 15
+
+# Colores válidos para vida (rojos)
+COLORES_VIDA = [
+    (255, 0, 0), (254, 0, 0), (253, 0, 0), (252, 0, 0), (251, 0, 0), (250, 0, 0),
+    (255, 1, 0), (255, 2, 0), (254, 1, 0), (253, 1, 0), (252, 1, 0),
+    (200, 0, 0), (180, 0, 0), (160, 0, 0), (140, 0, 0), (120, 0, 0), (100, 0, 0),
+    (255, 50, 0), (255, 40, 0), (255, 30, 0), (255, 20, 0), (255, 10, 0),
+    (80, 0, 0), (60, 0, 0),
+]
+
+# Colores válidos para maná (azules celestes de la barra del juego)
+# Solo colores claros y medios brillantes, sin oscuros que se acerquen al marrón
+COLORES_MANA = [
+    # Azules brillantes puros (parte clara de la barra - celestes)
+    (0, 0, 255), (0, 0, 254), (0, 0, 253), (0, 0, 252), (0, 0, 251), (0, 0, 250),
+    (10, 10, 255), (20, 20, 255), (30, 30, 255), (40, 40, 255), (50, 50, 255),
+    (60, 60, 255), (70, 70, 255), (80, 80, 255), (90, 90, 255), (100, 100, 255),
+
+    # Azules medios brillantes (gradiente de la barra - celestes medios)
+    (0, 0, 240), (0, 0, 230), (0, 0, 220), (0, 0, 210), (0, 0, 200),
+    (10, 10, 240), (20, 20, 230), (30, 30, 220), (40, 40, 210), (50, 50, 200),
+    (0, 0, 190), (0, 0, 180), (0, 0, 170), (0, 0, 160), (0, 0, 150),
+
+    # Azules con algo de verde (variaciones celestes)
+    (0, 20, 255), (0, 40, 255), (0, 60, 255), (0, 80, 255), (0, 100, 255),
+    (0, 20, 200), (0, 40, 200), (0, 60, 200), (0, 80, 200),
+    (0, 20, 150), (0, 40, 150), (0, 60, 150),
+
+    # Azules con algo de rojo (posibles reflejos celestes)
+    (20, 0, 255), (40, 0, 255), (60, 0, 255), (80, 0, 255),
+    (20, 0, 200), (40, 0, 200), (60, 0, 200),
+    (20, 0, 150), (40, 0, 150),
+
+    # Azules mixtos claros (R, G bajos, B alto - solo los más claros)
+    (30, 40, 255), (40, 50, 240), (50, 60, 220), (60, 70, 200),
+]
+
+
+# ============================================================
+# Reglas de referencia (evaluación escalar, color por color)
+# ============================================================
+
+def _colores_similares(color1: Tuple[int, int, int],
+                       color2: Tuple[int, int, int],
+                       tolerancia: int = TOLERANCIA_COLOR) -> bool:
+    """Verifica si dos colores son similares."""
+    r1, g1, b1 = color1
+    r2, g2, b2 = color2
+    return (abs(r1 - r2) <= tolerancia and
+            abs(g1 - g2) <= tolerancia and
+            abs(b1 - b2) <= tolerancia)
+
+
+def regla_vida(color: Tuple[int, int, int]) -> bool:
+    """
+    Regla original de detección de vida, evaluada color por color.
+    Se conserva como referencia para construir y verificar la tabla.
+    """
+    r, g, b = color
+
+    # Verificar contra colores conocidos
+    for color_vida in COLORES_VIDA:
+        if _colores_similares(color, color_vida):
+            return True
+
+    # Verificar si el rojo es dominante
+    if r > 50 and r > (g + 30) and r > (b + 30):
+        return True
+
+    return False
+
+
+def regla_mana(color: Tuple[int, int, int]) -> bool:
+    """
+    Regla original de detección de maná, evaluada color por color.
+    Se conserva como referencia para construir y verificar la tabla.
+    """
+    r, g, b = color
+
+    # Verificar contra colores conocidos
+    for color_mana in COLORES_MANA:
+        if _colores_similares(color, color_mana):
+            return True
+
+    # REGLA PRINCIPAL: El azul es el componente dominante (solo colores claros/celestes)
+    # La barra de maná tiene B mucho mayor que R y G, y debe ser suficientemente brillante
+    if b >= 150:
+        if b > r and b > g:
+            max_rg = max(r, g)
+            if b > (max_rg + 20):
+                return True
+
+    # REGLA SECUNDARIA: Azul alto aunque R y G también tengan algo (solo celestes claros)
+    # El azul debe ser al menos 1.5 veces el promedio de R y G
+    if b >= 150 and b >= r and b >= g:
+        promedio_rg = (r + g) / 2
+        if promedio_rg == 0 or b >= (promedio_rg * 1.5):
+            return True
+
+    return False
+
+
+# ============================================================
+# Construcción de tablas
+# ============================================================
+
+def _marcar_colores_conocidos(tabla: np.ndarray, colores: list, tolerancia: int) -> None:
+    """Marca en la tabla 256x256x256 el cubo de tolerancia de cada color conocido."""
+    for r, g, b in colores:
+        tabla[max(0, r - tolerancia):r + tolerancia + 1,
+              max(0, g - tolerancia):g + tolerancia + 1,
+              max(0, b - tolerancia):b + tolerancia + 1] = True
+
+
+def _canales() -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Retorna los ejes R, G, B listos para broadcasting sobre el cubo RGB."""
+    eje = np.arange(256, dtype=np.int16)
+    return eje[:, None, None], eje[None, :, None], eje[None, None, :]
+
+
+def construir_tabla_vida() -> np.ndarray:
+    """Evalúa la regla de vida para todos los colores. Retorna un bool[256,256,256]."""
+    tabla = np.zeros((256, 256, 256), dtype=bool)
+    _marcar_colores_conocidos(tabla, COLORES_VIDA, TOLERANCIA_COLOR)
+
+    r, g, b = _canales()
+    tabla |= (r > 50) & (r > g + 30) & (r > b + 30)
+    return tabla
+
+
+def construir_tabla_mana() -> np.ndarray:
+    """Evalúa la regla de maná para todos los colores. Retorna un bool[256,256,256]."""
+    tabla = np.zeros((256, 256, 256), dtype=bool)
+    _marcar_colores_conocidos(tabla, COLORES_MANA, TOLERANCIA_COLOR)
+
+    r, g, b = _canales()
+    brillante = b >= 150
+    # Regla principal: b > max(r, g) + 20 (implica b > r y b > g)
+    tabla |= brillante & (b > np.maximum(r, g) + 20)
+    # Regla secundaria: b >= 1.5 * (r + g) / 2  <=>  4b >= 3(r + g), en enteros exactos
+    tabla |= brillante & (b >= r) & (b >= g) & (4 * b >= 3 * (r + g))
+    return tabla
+
+
+class TablaColores:
+    """
+    Tabla de búsqueda de 1 bit por color RGB (24 bits, 2 MB).
+    Índice de un color: (r << 16) | (g << 8) | b.
+    """
+
+    def __init__(self, bits: np.ndarray):
+        """
+        Inicializa la tabla.
+
+        Args:
+            bits: Array uint8 de 2^21 bytes (salida de np.packbits, orden big-endian)
+        """
+        if bits.dtype != np.uint8 or bits.size != (1 << 21):
+            raise ValueError("La tabla de colores debe tener 2^21 bytes uint8")
+        self.bits = bits
+
+    @classmethod
+    def desde_booleanos(cls, tabla: np.ndarray) -> "TablaColores":
+        """Empaqueta una tabla bool[256,256,256] en 1 bit por color."""
+        return cls(np.packbits(tabla.reshape(-1)))
+
+    def contiene(self, color: Tuple[int, int, int]) -> bool:
+        """Clasifica un solo color (R, G, B)."""
+        r, g, b = color
+        indice = (r << 16) | (g << 8) | b
+        return bool((self.bits[indice >> 3] >> (7 - (indice & 7))) & 1)
+
+    def clasificar_rgb(self, r: np.ndarray, g: np.ndarray, b: np.ndarray) -> np.ndarray:
+        """Clasifica arrays de canales R, G, B. Retorna un array bool con la misma forma."""
+        indice = (r.astype(np.uint32) << 16) | (g.astype(np.uint32) << 8) | b.astype(np.uint32)
+        return ((self.bits[indice >> 3] >> (7 - (indice & 7)).astype(np.uint8)) & 1).astype(bool)
+
+    def clasificar_bgra(self, imagen: np.ndarray) -> np.ndarray:
+        """
+        Clasifica todos los píxeles de una imagen BGRA/BGR (formato de mss y OpenCV).
+
+        Returns:
+            Array bool de forma (alto, ancho)
+        """
+        return self.clasificar_rgb(imagen[..., 2], imagen[..., 1], imagen[..., 0])
+
+    def guardar(self, ruta: str) -> None:
+        """Guarda la tabla empaquetada en un archivo .npy."""
+        np.save(ruta, self.bits)
+
+    @classmethod
+    def cargar(cls, ruta: str) -> "TablaColores":
+        """Carga una tabla empaquetada desde un archivo .npy."""
+        return cls(np.load(ruta))
+
+
+# ============================================================
+# Calibración (generada por calibrar_colores.py)
+# ============================================================
+
+# Archivo con las celdas calibradas de cada recurso
+RUTA_CALIBRACION = "calibracion_colores.npz"
+
+# Bits por canal de las celdas calibradas (32x32x32 celdas de 8x8x8 colores)
+BITS_CELDA = 5
+
+# Valores de cada celda calibrada
+CELDA_SIN_DATOS = -1
+CELDA_NEGATIVA = 0
+CELDA_POSITIVA = 1
+
+
+def construir_tabla_calibrada(tabla_reglas: np.ndarray, celdas: np.ndarray) -> np.ndarray:
+    """
+    Combina las reglas con las celdas aprendidas en la calibración.
+    Las celdas con datos deciden; las celdas sin datos conservan las reglas.
+
+    Args:
+        tabla_reglas: bool[256,256,256] con las reglas originales
+        celdas: int8[32,32,32] con CELDA_POSITIVA / CELDA_NEGATIVA / CELDA_SIN_DATOS
+
+    Returns:
+        bool[256,256,256]
+    """
+    escala = 1 << (8 - BITS_CELDA)
+    expandidas = celdas.repeat(escala, axis=0).repeat(escala, axis=1).repeat(escala, axis=2)
+    return np.where(expandidas == CELDA_SIN_DATOS, tabla_reglas, expandidas == CELDA_POSITIVA)
+
+
+def cargar_celdas_calibradas(recurso: str, ruta: str = RUTA_CALIBRACION):
+    """
+    Retorna las celdas calibradas de un recurso, o None si no hay calibración.
+    """
+    if not os.path.exists(ruta):
+        return None
+    try:
+        with np.load(ruta) as datos:
+            if recurso in datos.files:
+                return datos[recurso]
+    except Exception as e:
+        print(f"[CLASIFICADOR] No se pudo cargar la calibración {ruta}: {e}")
+    return None
+
+
+# ============================================================
+# Tablas compartidas (se construyen una vez por proceso)
+# ============================================================
+
+_tablas = {}
+_tablas_lock = threading.Lock()
+
+_CONSTRUCTORES = {
+    'vida': construir_tabla_vida,
+    'mana': construir_tabla_mana,
+}
+
+
+def obtener_tabla(recurso: str, calibrada: bool = True) -> TablaColores:
+    """
+    Retorna la tabla compilada de un recurso ('vida' o 'mana').
+    Si existe una calibración para el recurso se combina con las reglas.
+    La primera llamada la construye (~100 ms); las siguientes la reutilizan.
+
+    Args:
+        recurso: 'vida' o 'mana'
+        calibrada: False para obtener solo las reglas originales
+    """
+    clave = (recurso, calibrada)
+    tabla = _tablas.get(clave)
+    if tabla is not None:
+        return tabla
+
+    with _tablas_lock:
+        if clave not in _tablas:
+            booleanos = _CONSTRUCTORES[recurso]()
+            celdas = cargar_celdas_calibradas(recurso) if calibrada else None
+            if celdas is not None:
+                booleanos = construir_tabla_calibrada(booleanos, celdas)
+                print(f"[CLASIFICADOR] Usando calibración de {recurso} ({RUTA_CALIBRACION})")
+            _tablas[clave] = TablaColores.desde_booleanos(booleanos)
+        return _tablas[clave]
+
+
+# ============================================================
+# Verificación y benchmark
+# ============================================================
+
+def _diferencias_plano(argumentos: Tuple[str, int]) -> int:
+    """
+    Cuenta los colores del plano R = r en los que la tabla compilada difiere
+    de la regla escalar original (65536 llamadas a regla_vida/regla_mana).
+
+    Args:
+        argumentos: Tupla (recurso, r); una sola tupla para usarla con Pool.imap
+    """
+    recurso, r = argumentos
+    regla = regla_vida if recurso == 'vida' else regla_mana
+    tabla = obtener_tabla(recurso, calibrada=False)
+    g, b = np.meshgrid(np.arange(256), np.arange(256), indexing='ij')
+    obtenido = tabla.clasificar_rgb(np.full_like(g, r), g, b).tolist()
+    diferencias = 0
+    for valor_g, fila in enumerate(obtenido):
+        for valor_b, valor in enumerate(fila):
+            if valor != regla((r, valor_g, valor_b)):
+                diferencias += 1
+    return diferencias
+
+
+def verificar_equivalencia(recurso: str, procesos: Optional[int] = None) -> int:
+    """
+    Compara la tabla compilada contra la regla escalar original en los 16.7M
+    colores, plano R a plano R, repartiendo los planos entre varios procesos
+    (la regla escalar tarda varios minutos en un solo núcleo).
+
+    Args:
+        recurso: 'vida' o 'mana'
+        procesos: Procesos de trabajo (None = uno por núcleo; 1 = en este proceso)
+
+    Returns:
+        Número de colores en los que difieren (0 = equivalentes)
+    """
+    planos = [(recurso, r) for r in range(256)]
+    if procesos == 1 or (procesos is None and (os.cpu_count() or 1) == 1):
+        return sum(map(_diferencias_plano, planos))
+    with multiprocessing.Pool(procesos) as pool:
+        return sum(pool.imap_unordered(_diferencias_plano, planos, chunksize=4))
+
+
+def benchmark(repeticiones: int = 100000) -> dict:
+    """
+    Mide el throughput de la regla original frente a la tabla compilada.
+
+    Returns:
+        Diccionario con colores/segundo de cada variante
+    """
+    rng = np.random.default_rng(1)
+    colores = [tuple(int(c) for c in fila) for fila in rng.integers(0, 256, size=(repeticiones, 3))]
+    imagen = rng.integers(0, 256, size=(1080, 1920, 4), dtype=np.uint8)
+    resultados = {}
+
+    for recurso, regla in (('vida', regla_vida), ('mana', regla_mana)):
+        tabla = obtener_tabla(recurso, calibrada=False)
+
+        inicio = time.perf_counter()
+        for color in colores:
+            regla(color)
+        resultados[f'{recurso}_regla_escalar'] = repeticiones / (time.perf_counter() - inicio)
+
+        inicio = time.perf_counter()
+        for color in colores:
+            tabla.contiene(color)
+        resultados[f'{recurso}_tabla_escalar'] = repeticiones / (time.perf_counter() - inicio)
+
+        inicio = time.perf_counter()
+        tabla.clasificar_bgra(imagen)
+        resultados[f'{recurso}_tabla_imagen'] = imagen.shape[0] * imagen.shape[1] / (time.perf_counter() - inicio)
+
+    return resultados
+
+
+# ============================================================
+# PRUEBA INDEPENDIENTE
+# ============================================================
+if __name__ == "__main__":
+    print("=" * 60)
+    print("PRUEBA DEL CLASIFICADOR DE COLORES")
+    print("=" * 60)
+
+    total_diferencias = 0
+    for recurso in ('vida', 'mana'):
+        inicio = time.perf_counter()
+        obtener_tabla(recurso, calibrada=False)
+        print(f"\n[INFO] Tabla de {recurso} construida en {(time.perf_counter() - inicio) * 1000:.0f} ms")
+
+        inicio = time.perf_counter()
+        diferencias = verificar_equivalencia(recurso)
+        total_diferencias += diferencias
+        if diferencias == 0:
+            print(f"[OK] Tabla de {recurso} equivalente a la regla original (16.7M colores, "
+                  f"{time.perf_counter() - inicio:.0f} s)")
+        else:
+            print(f"[ERROR] Tabla de {recurso} difiere en {diferencias} colores")
+
+    print("\n[BENCHMARK] Colores clasificados por segundo")
+    print("-" * 60)
+    for nombre, valor in benchmark().items():
+        print(f"  {nombre:24s}: {valor:>16,.0f}")
+    print("-" * 60)
+
+    # Código de salida distinto de 0 si alguna tabla no es equivalente
+    if total_diferencias:
+        sys.exit(1)
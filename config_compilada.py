@@ -0,0 +1,375 @@
+"""
+Configuración compilada para los ciclos de los hilos.
+Responsabilidad: Convertir la configuración cruda en objetos listos para usar en cada tick (Single Responsibility Principle)
+
+La configuración cruda (JSON) obliga a los hilos a repetir en cada tick el
+mismo trabajo: buscar cada tecla en VK_CODES, resolver el timeout de escape
+con ESCAPE_BY_MOB.get(nombre, defecto), filtrar las habilidades activas,
+separar la tecla '0' de la vida fuera de combate y comparar el texto OCR con
+cada nombre desde cero.
+
+compilar() hace ese trabajo una vez por cada configuración publicada y
+produce objetos con __slots__:
+
+    cc = almacen.actual.compilada
+    for habilidad in cc.habilidades:        # solo activas, con su código VK
+        ...
+    cc.escape.timeout(nombre)               # tabla por mob ya resuelta
+    cc.mobs.buscar(texto, cc.umbral)        # índice de nombres precalculado
+
+Las teclas inexistentes en VK_CODES y las barras mal definidas se reportan
+como errores (errores_compilacion): el almacén rechaza la configuración
+antes de que llegue a los hilos y el bot no arranca con ella. Los objetos se
+construyen la primera vez que un hilo pide la instantánea compilada.
+"""
+import os
+import threading
+from difflib import SequenceMatcher
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+
+# Teclas fijas que usan los hilos además de las configuradas
+TECLA_ATACAR = 'R'
+TECLA_LOOT = 'F'
+TECLA_SELECCIONAR_DEFECTO = 'E'
+# Única tecla de vida que se usa fuera de combate
+TECLA_VIDA_FUERA_COMBATE = '0'
+
+
+def _teclas(valor: Any) -> Tuple[str, ...]:
+    """Normaliza 'tecla' (texto o lista de textos) a una tupla."""
+    if isinstance(valor, str):
+        return (valor,)
+    return tuple(valor)
+
+
+class HabilidadCompilada:
+    """Habilidad activa con su código VK resuelto."""
+
+    __slots__ = ('tecla', 'vk', 'cooldown')
+
+    def __init__(self, tecla: str, vk: int, cooldown: float):
+        self.tecla = tecla
+        self.vk = vk
+        self.cooldown = float(cooldown)
+
+
+class RecursoCompilado:
+    """Vida o maná: sonda, teclas resueltas, intervalos y umbrales."""
+
+    __slots__ = ('nombre', 'x', 'y', 'sonda', 'usa_barra', 'tecla_texto',
+                 'vk_combate', 'vk_fuera_combate', 'intervalo_con', 'intervalo_sin',
+                 'umbral_combate', 'umbral_fuera_combate')
+
+    def __init__(self, nombre: str, config: Mapping, vk_codes: Mapping[str, int]):
+        # Importación diferida: lector_vitales arrastra numpy y el almacén se
+        # importa al abrir la GUI (la compilación ocurre al arrancar los hilos)
+        from lector_vitales import LectorVitales
+
+        self.nombre = nombre
+        self.x = config['x']
+        self.y = config['y']
+        self.usa_barra = LectorVitales.usa_barra(config)
+        if self.usa_barra:
+            barra = config['barra']
+            # (x, y, ancho) tal como lo recibe ServicioSondas.definir
+            self.sonda = (barra['x_inicio'], barra['y'], barra['x_fin'] - barra['x_inicio'])
+        else:
+            self.sonda = (config['x'], config['y'], 1)
+        teclas = _teclas(config['tecla'])
+        self.tecla_texto = config['tecla'] if isinstance(config['tecla'], str) else list(teclas)
+        self.vk_combate = tuple(vk_codes[t] for t in teclas)
+        if nombre == 'vida':
+            self.vk_fuera_combate = tuple(vk_codes[t] for t in teclas if t == TECLA_VIDA_FUERA_COMBATE)
+        else:
+            self.vk_fuera_combate = self.vk_combate
+        self.intervalo_con = float(config['intervalo_con'])
+        self.intervalo_sin = float(config['intervalo_sin'])
+        self.umbral_combate = LectorVitales.umbral(config, True)
+        self.umbral_fuera_combate = LectorVitales.umbral(config, False)
+
+    def teclas(self, en_combate: bool) -> Tuple[int, ...]:
+        """Códigos VK a presionar según haya o no un MOB seleccionado."""
+        return self.vk_combate if en_combate else self.vk_fuera_combate
+
+    def umbral(self, en_combate: bool) -> float:
+        """Umbral de curación (porcentaje) según haya o no un MOB seleccionado."""
+        return self.umbral_combate if en_combate else self.umbral_fuera_combate
+
+
+class EscapeCompilado:
+    """Escape de mob trabado con la tabla de timeouts por mob resuelta."""
+
+    __slots__ = ('timeout_defecto', 'timeouts', 'puntos', 'punto_personaje',
+                 'veces', 'duracion_total', 'intervalo', 'auto_ajuste', 'ajuste_percentil',
+                 'ajuste_margen', 'ajuste_muestras', 'ajuste_dias')
+
+    def __init__(self, escape_mob: Mapping, escape_by_mob: Mapping[str, float]):
+        self.timeout_defecto = float(escape_mob['timeout_mob'])
+        self.timeouts = {nombre: float(t) for nombre, t in escape_by_mob.items()}
+        self.puntos = tuple((p['x'], p['y']) for p in escape_mob['puntos_clic'])
+        primero = escape_mob['punto_click_primero']
+        self.punto_personaje = (primero['x'], primero['y'])
+        self.veces = int(escape_mob['veces'])
+        self.duracion_total = float(escape_mob['duracion_total'])
+        self.intervalo = self.duracion_total / self.veces
+        # Ajuste por historial (ajuste_escape.py)
+        self.auto_ajuste = bool(escape_mob.get('auto_ajuste', False))
+        self.ajuste_percentil = float(escape_mob.get('ajuste_percentil', 95.0))
+        self.ajuste_margen = float(escape_mob.get('ajuste_margen', 3.0))
+        self.ajuste_muestras = int(escape_mob.get('ajuste_muestras', 10))
+        self.ajuste_dias = float(escape_mob.get('ajuste_dias', 14))
+
+    def timeout(self, nombre: Optional[str]) -> float:
+        """Segundos con el mismo MOB antes de considerarlo trabado (sin ajuste por historial)."""
+        return self.timeouts.get(nombre, self.timeout_defecto)
+
+
+class LocalizacionCompilada:
+    """Plantilla del marco del objetivo y desplazamiento de la región OCR respecto de ella."""
+
+    __slots__ = ('ruta', 'offset_x', 'offset_y', 'umbral', 'fallos')
+
+    def __init__(self, region: Mapping):
+        self.ruta = region['plantilla']
+        self.offset_x = int(region.get('plantilla_offset_x', 0))
+        self.offset_y = int(region.get('plantilla_offset_y', 0))
+        self.umbral = float(region.get('umbral_plantilla', 0.8))
+        self.fallos = int(region.get('fallos_relocalizar', 20))
+
+
+class FiltroCompilado:
+    """Votación e histéresis del filtro de clasificación (filtro_clasificacion.py)."""
+
+    __slots__ = ('ventana', 'entrar_mob_cuadros', 'entrar_mob_ms', 'salir_mob_cuadros', 'salir_mob_ms')
+
+    def __init__(self, observador: Mapping):
+        self.ventana = int(observador.get('ventana_votos', 3))
+        self.entrar_mob_cuadros = int(observador.get('entrar_mob_cuadros', 1))
+        self.entrar_mob_ms = float(observador.get('entrar_mob_ms', 0))
+        self.salir_mob_cuadros = int(observador.get('salir_mob_cuadros', 3))
+        self.salir_mob_ms = float(observador.get('salir_mob_ms', 150))
+
+
+class IndiceNombres:
+    """
+    Nombres de mobs o drops preparados para comparar con el texto OCR.
+
+    SequenceMatcher analiza la segunda secuencia (b2j) al asignarla; aquí se
+    asigna una sola vez por nombre y por hilo, y cada comparación solo cambia
+    el texto detectado. Los nombres cuya cota superior (real_quick_ratio,
+    quick_ratio) no supera a la mejor similitud hallada no llegan a ratio().
+    El resultado es el mismo que comparar con
+    SequenceMatcher(None, detectado.lower(), nombre.lower()).ratio().
+    """
+
+    __slots__ = ('nombres', '_claves', '_local')
+
+    def __init__(self, nombres):
+        self.nombres = tuple(nombres)
+        # Nombres vacíos nunca coinciden (similitud 0), no hace falta compararlos
+        self._claves = tuple((nombre, nombre.lower()) for nombre in self.nombres if nombre)
+        # SequenceMatcher es mutable: cada hilo usa sus propias instancias
+        self._local = threading.local()
+
+    def _comparadores(self) -> List[Tuple[str, SequenceMatcher]]:
+        comparadores = getattr(self._local, 'comparadores', None)
+        if comparadores is None:
+            comparadores = []
+            for nombre, clave in self._claves:
+                comparador = SequenceMatcher(None)
+                comparador.set_seq2(clave)
+                comparadores.append((nombre, comparador))
+            self._local.comparadores = comparadores
+        return comparadores
+
+    def buscar(self, texto: str, umbral: float) -> Tuple[Optional[str], float]:
+        """
+        Busca el nombre más parecido al texto detectado.
+
+        Args:
+            texto: Texto capturado por OCR
+            umbral: Similitud mínima para aceptar la coincidencia
+
+        Returns:
+            tuple: (nombre_encontrado, similitud) o (None, mejor_similitud)
+        """
+        if not texto:
+            return None, 0
+        limpio = texto.strip().lower()
+        if not limpio:
+            return None, 0
+
+        mejor_match = None
+        mejor_similitud = 0
+        for nombre, comparador in self._comparadores():
+            comparador.set_seq1(limpio)
+            # Cotas superiores baratas de ratio(): si no pueden superar al mejor, se descarta
+            if comparador.real_quick_ratio() <= mejor_similitud or comparador.quick_ratio() <= mejor_similitud:
+                continue
+            similitud = comparador.ratio()
+            if similitud > mejor_similitud:
+                mejor_similitud = similitud
+                mejor_match = nombre
+
+        if mejor_similitud >= umbral:
+            return mejor_match, mejor_similitud
+        return None, mejor_similitud
+
+
+# Índices por lista de nombres: los clientes (y las versiones de la
+# configuración) con las mismas listas comparten los comparadores
+_indices: Dict[Tuple[str, ...], IndiceNombres] = {}
+_indices_lock = threading.Lock()
+MAX_INDICES = 32
+
+
+def indice_compartido(nombres) -> IndiceNombres:
+    """Retorna el IndiceNombres de la lista, reutilizando uno existente si lo hay."""
+    clave = tuple(nombres)
+    indice = _indices.get(clave)
+    if indice is None:
+        with _indices_lock:
+            indice = _indices.get(clave)
+            if indice is None:
+                if len(_indices) >= MAX_INDICES:
+                    _indices.clear()
+                indice = _indices[clave] = IndiceNombres(clave)
+    return indice
+
+
+class ConfigCompilada:
+    """Vista compilada de una instantánea de configuración."""
+
+    __slots__ = ('vk', 'vk_atacar', 'vk_loot', 'vk_seleccionar', 'tecla_seleccionar', 'filtro',
+                 'habilidades', 'vida', 'mana', 'escape', 'mobs', 'drops', 'umbral',
+                 'region_ocr', 'recortar_texto', 'min_pixeles_texto', 'diccionario_nombres', 'localizacion',
+                 'loot_repeticiones', 'loot_intervalo')
+
+    def __init__(self, config: Mapping[str, Any]):
+        vk = config['VK_CODES']
+        self.vk = vk
+        self.vk_atacar = vk[TECLA_ATACAR]
+        self.vk_loot = vk[TECLA_LOOT]
+        self.tecla_seleccionar = config['OBSERVADOR_OBJETIVO'].get('tecla_seleccionar', TECLA_SELECCIONAR_DEFECTO)
+        self.vk_seleccionar = vk[self.tecla_seleccionar]
+        self.filtro = FiltroCompilado(config['OBSERVADOR_OBJETIVO'])
+
+        # Solo las activas, en el orden configurado (el orden en que se presionan)
+        self.habilidades = tuple(
+            HabilidadCompilada(tecla, vk[tecla], habilidad['time'])
+            for tecla, habilidad in config['HABILIDADES'].items() if habilidad['active']
+        )
+
+        autocuracion = config['AUTOCURACION']
+        self.vida = RecursoCompilado('vida', autocuracion['vida'], vk)
+        self.mana = RecursoCompilado('mana', autocuracion['mana'], vk)
+        self.escape = EscapeCompilado(config['ESCAPE_MOB'], config['ESCAPE_BY_MOB'])
+
+        self.mobs = indice_compartido(config['MOBS_OBJETIVO'])
+        self.drops = indice_compartido(config['DROP_ITEMS_OBJETIVO'])
+        self.umbral = float(config['UMBRAL_SIMILITUD'])
+
+        region = config['OCR_REGION']
+        self.region_ocr = (region['left_offset'], region['top_offset'], region['width'], region['height'])
+        self.recortar_texto = bool(region.get('recortar_texto', False))
+        self.min_pixeles_texto = int(region.get('min_pixeles_texto', 20))
+        self.diccionario_nombres = bool(region.get('diccionario_nombres', False))
+        self.localizacion = LocalizacionCompilada(region) if region.get('plantilla') else None
+
+        loot = config['LOOT_DROP']
+        self.loot_repeticiones = max(0, int(loot.get('repeticiones_f', 3)))
+        self.loot_intervalo = float(loot.get('intervalo_f', 0.5))
+
+
+def errores_compilacion(config: Mapping[str, Any]) -> List[str]:
+    """
+    Verificaciones que dependen de cruzar secciones (teclas contra VK_CODES,
+    barras) o del disco (plantilla del marco del objetivo). Supone que la estructura ya pasó almacen_configuracion.validar().
+
+    Returns:
+        Lista de errores (vacía si la configuración compila)
+    """
+    errores: List[str] = []
+    vk = config['VK_CODES']
+
+    def _verificar_tecla(seccion: str, tecla: str) -> None:
+        if tecla not in vk:
+            errores.append(f"{seccion}: la tecla '{tecla}' no está en VK_CODES")
+
+    for tecla in (TECLA_ATACAR, TECLA_LOOT):
+        _verificar_tecla("Teclas fijas", tecla)
+    _verificar_tecla("OBSERVADOR_OBJETIVO.tecla_seleccionar",
+                     config['OBSERVADOR_OBJETIVO'].get('tecla_seleccionar', TECLA_SELECCIONAR_DEFECTO))
+
+    for tecla, habilidad in config['HABILIDADES'].items():
+        if habilidad['active']:
+            _verificar_tecla(f"HABILIDADES.{tecla}", tecla)
+
+    for recurso in ('vida', 'mana'):
+        datos = config['AUTOCURACION'][recurso]
+        for tecla in _teclas(datos['tecla']):
+            _verificar_tecla(f"AUTOCURACION.{recurso}.tecla", tecla)
+        barra = datos.get('barra')
+        if barra and barra.get('activa'):
+            if not all(isinstance(barra.get(c), (int, float)) for c in ('x_inicio', 'x_fin', 'y')):
+                errores.append(f"AUTOCURACION.{recurso}.barra: faltan x_inicio, x_fin o y")
+            elif barra['x_fin'] <= barra['x_inicio']:
+                errores.append(f"AUTOCURACION.{recurso}.barra: x_fin debe ser mayor que x_inicio")
+
+    plantilla = config['OCR_REGION'].get('plantilla')
+    if plantilla and not os.path.isfile(plantilla):
+        errores.append(f"OCR_REGION.plantilla: no existe el archivo '{plantilla}'")
+
+    return errores
+
+
+def compilar(config: Mapping[str, Any]) -> Tuple[Optional[ConfigCompilada], List[str]]:
+    """
+    Compila una configuración ya validada estructuralmente.
+
+    Returns:
+        Tupla (ConfigCompilada o None, errores)
+    """
+    errores = errores_compilacion(config)
+    if errores:
+        return None, errores
+    return ConfigCompilada(config), []
+
+
+# ============================================================
+# PRUEBA INDEPENDIENTE
+# ============================================================
+if __name__ == "__main__":
+    import time
+    from almacen_configuracion import almacen
+
+    print("=" * 60)
+    print("PRUEBA DE LA CONFIGURACIÓN COMPILADA")
+    print("=" * 60)
+
+    cfg = almacen.actual
+    cc = cfg.compilada
+    print(f"\n[INFO] Habilidades activas: {[h.tecla for h in cc.habilidades]}")
+    print(f"[INFO] Vida: combate {cc.vida.vk_combate} | fuera de combate {cc.vida.vk_fuera_combate}")
+    print(f"[INFO] Timeout por defecto: {cc.escape.timeout(None)}s | mobs con timeout propio: {len(cc.escape.timeouts)}")
+
+    nombres = list(cfg.MOBS_OBJETIVO) or ["Goblin Guerrero"]
+    texto = nombres[len(nombres) // 2][:-1] + "x"
+    indice = IndiceNombres(nombres)
+    print(f"[INFO] '{texto}' -> {indice.buscar(texto, cc.umbral)}")
+
+    repeticiones = 2000
+    t0 = time.perf_counter()
+    for _ in range(repeticiones):
+        max(SequenceMatcher(None, texto.lower(), n.lower()).ratio() for n in nombres)
+    crudo = (time.perf_counter() - t0) / repeticiones
+    t0 = time.perf_counter()
+    for _ in range(repeticiones):
+        indice.buscar(texto, cc.umbral)
+    compilado = (time.perf_counter() - t0) / repeticiones
+    print(f"[INFO] Búsqueda en {len(nombres)} nombres: cruda {crudo * 1e6:.1f} µs | índice {compilado * 1e6:.1f} µs")
+
+    malo = cfg.como_dict()
+    malo['HABILIDADES']['Ñ'] = {'active': True, 'time': 1.0}
+    print(f"[INFO] Tecla inexistente: {almacen.publicar(malo)}")
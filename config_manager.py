@@ -40,8 +40,12 @@ def guardar_configuracion(config: Dict[str, Any]) -> bool:
         True si se guardó correctamente, False en caso contrario
     """
     try:
-        with open(CONFIG_JSON_PATH, 'w', encoding='utf-8') as f:
+        # Escribir a un temporal y reemplazar: quien vigila config.json nunca
+        # ve el archivo a medio escribir
+        temporal = CONFIG_JSON_PATH + ".tmp"
+        with open(temporal, 'w', encoding='utf-8') as f:
             json.dump(config, f, indent=4, ensure_ascii=False)
+        os.replace(temporal, CONFIG_JSON_PATH)
         return True
     except Exception as e:
         print(f"Error al guardar configuración: {e}")
@@ -78,6 +82,7 @@ def obtener_configuracion_completa() -> Dict[str, Any]:
             'OBSERVADOR_OBJETIVO': cfg.OBSERVADOR_OBJETIVO,
             'ESCAPE_MOB': cfg.ESCAPE_MOB,
             'ESCAPE_BY_MOB': cfg.ESCAPE_BY_MOB,
+            'METRICAS': cfg.METRICAS,
         }
     except Exception as e:
         print(f"Error al cargar configuración por defecto: {e}")
@@ -118,4 +123,6 @@ def aplicar_configuracion_a_modulo(config: Dict[str, Any]) -> None:
         cfg.ESCAPE_MOB = config['ESCAPE_MOB']
     if 'ESCAPE_BY_MOB' in config:
         cfg.ESCAPE_BY_MOB = config['ESCAPE_BY_MOB']
+    if 'METRICAS' in config:
+        cfg.METRICAS = config['METRICAS']
 
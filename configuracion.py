@@ -18,7 +18,18 @@ OCR_REGION = {
     "left_offset": 10,     # Margen izquierdo desde la ventana
     "top_offset": 90,     # Margen superior desde la ventana
     "width": 160,       # Ancho de la región a capturar
-    "height": 15          # Alto de la región a capturar
+    "height": 15,         # Alto de la región a capturar
+    "recortar_texto": False,  # Recortar cada cuadro al texto (con borde de fondo) antes del OCR
+    "min_pixeles_texto": 20,  # Menos píxeles blancos en la binarizada = placa vacía, NULO sin OCR (0 = siempre OCR)
+    "diccionario_nombres": False,  # Limitar Tesseract a las palabras y caracteres de MOBS/DROP_ITEMS_OBJETIVO
+    # Localización automática: recorte del marco del objetivo (PNG) que se busca
+    # en la ventana; la región queda a (offset_x, offset_y) del marco encontrado.
+    # Vacío = región fija. Crear con: python localizador_region.py capturar ...
+    "plantilla": "",
+    "plantilla_offset_x": 0,
+    "plantilla_offset_y": 0,
+    "umbral_plantilla": 0.8,     # Puntaje mínimo de cv2.matchTemplate (0-1)
+    "fallos_relocalizar": 20     # Cuadros seguidos sin clasificar antes de volver a localizar
 }
 
 # Umbral de similitud mínimo para considerar una coincidencia
@@ -127,6 +138,11 @@ AUTOCURACION = {
         'tecla': ['0','7', '4'],            # Tecla para curar vida
         'intervalo_con': 1.0,    # Intervalo cuando hay vida (segundos)
         'intervalo_sin': 0.5,    # Intervalo cuando no hay vida (segundos)
+        # Medición por porcentaje: franja horizontal de la barra completa
+        # Si 'activa' es False se usa solo el píxel (x, y)
+        'barra': {'activa': False, 'x_inicio': 20, 'x_fin': 150, 'y': 62},
+        'umbral_combate': 60.0,        # Curar por debajo de este % con un MOB
+        'umbral_fuera_combate': 30.0,  # Curar por debajo de este % sin MOB
     },
     'mana': {
         'x': 45,                 # Posición X de la barra de maná
@@ -134,6 +150,9 @@ AUTOCURACION = {
         'tecla': '9',            # Tecla para restaurar maná
         'intervalo_con': 1.0,    # Intervalo cuando hay maná (segundos)
         'intervalo_sin': 0.5,    # Intervalo cuando no hay maná (segundos)
+        'barra': {'activa': False, 'x_inicio': 20, 'x_fin': 150, 'y': 80},
+        'umbral_combate': 30.0,
+        'umbral_fuera_combate': 30.0,
     }
 }
 
@@ -144,6 +163,14 @@ OBSERVADOR_OBJETIVO = {
     'timeout_drop': 3.0,         # Segundos antes de presionar E en estado DROP
     'intervalo_revision': 0.1,   # Intervalo de revisión del estado (segundos)
     'tecla_seleccionar': 'E',    # Tecla para seleccionar objetivo (E, TAB, Q, etc.)
+    # Filtro de la clasificación (ver filtro_clasificacion.py): un cambio de
+    # objetivo se confirma cuando gana la votación de los últimos cuadros
+    # durante N cuadros o T ms. 1 / 1 / 1 = sin filtro.
+    'ventana_votos': 3,          # Cuadros que votan (ponderados por la confianza del OCR)
+    'entrar_mob_cuadros': 1,     # Cambios que no salen de MOB: cuadros ganando...
+    'entrar_mob_ms': 0,          # ...o milisegundos ganando (0 = solo cuadros)
+    'salir_mob_cuadros': 3,      # Salir de MOB (muerte, otro mob): cuadros ganando...
+    'salir_mob_ms': 150,         # ...o milisegundos ganando
 }
 
 # ============================================================
@@ -163,6 +190,14 @@ ESCAPE_MOB = {
     ],
     'veces': 1,                  # Veces que se hace clic en el punto
     'duracion_total': 1.0,       # Duración total de la secuencia de escape (segundos)
+    # Ajuste automático del timeout por mob con el historial de muertes (ajuste_escape.py):
+    # timeout = percentil del tiempo hasta matar + margen, nunca menor que el fijo;
+    # sin muestras suficientes se usa ESCAPE_BY_MOB / timeout_mob
+    'auto_ajuste': False,
+    'ajuste_percentil': 95.0,    # Percentil del tiempo hasta matar (50-99.9)
+    'ajuste_margen': 3.0,        # Segundos que se suman al percentil
+    'ajuste_muestras': 10,       # Muertes de un mob antes de usar su timeout ajustado
+    'ajuste_dias': 14,           # Días del historial (combates.sqlite) que se cargan al iniciar
 }
 
 ESCAPE_BY_MOB = {
@@ -180,6 +215,19 @@ ESCAPE_BY_MOB = {
 }
 
 
+# ============================================================
+# MÉTRICAS (contadores e histogramas de los subsistemas)
+# - puerto: Endpoint HTTP en localhost (formato Prometheus), 0 = sin endpoint
+# - archivo: Volcado periódico en JSON lines, "" = sin archivo
+# ============================================================
+METRICAS = {
+    'activo': False,
+    'puerto': 9464,
+    'archivo': "metricas.jsonl",
+    'intervalo_archivo': 10.0,
+}
+
+
 # ============================================================
 # CÓDIGOS DE TECLAS VIRTUALES (Windows)
 # ============================================================
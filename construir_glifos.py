@@ -0,0 +1,243 @@
+"""
+Herramienta de construcción de la tabla de glifos de la fuente del juego.
+
+Aprende el mapa de bits de cada carácter a partir de placas de nombre
+etiquetadas y guarda la tabla en glifos_fuente.npz. HiloDetectorOCR la carga
+al iniciar: las placas con todos los glifos conocidos se leen sin Tesseract.
+
+Muestras:
+- Sesiones grabadas (python bot.py --grabar sesion.npz): cada cuadro en que
+  el bot clasificó un MOB o DROP se etiqueta con el nombre de la lista.
+- Imágenes sueltas de la región OCR con su texto (--muestra imagen.png "texto").
+
+Cada muestra se segmenta igual que en el reconocedor. Si la cantidad de
+glifos coincide con la de caracteres de la etiqueta, cada glifo recibe su
+carácter; si no (letras pegadas), los glifos ya conocidos se alinean desde
+ambos extremos y un único glifo desconocido en el medio recibe los
+caracteres restantes. Cada mapa de bits se queda con el carácter más votado.
+
+Uso:
+    python construir_glifos.py --sesion sesion1.npz sesion2.npz
+    python construir_glifos.py --muestra placa1.png "Zinkiu Gosu (58)" --muestra placa2.png "Kyoin (48)"
+"""
+import argparse
+import sys
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from reconocedor_glifos import RUTA_GLIFOS, ReconocedorGlifos, lineas, segmentar, tramos
+
+
+# Espacio "infinito": segmentar sin separar palabras
+SIN_ESPACIOS = 10 ** 6
+
+# Muestra: (placa en escala de grises, texto)
+Muestra = Tuple[np.ndarray, str]
+
+
+def muestras_de_sesion(ruta: str) -> List[Muestra]:
+    """Cuadros de una sesión grabada en que el bot reconoció un MOB o DROP."""
+    from sesion_grabada import SesionGrabada
+    sesion = SesionGrabada.cargar(ruta)
+    return [
+        (cv2.cvtColor(sesion.ocr[i], cv2.COLOR_BGRA2GRAY), str(sesion.nombre[i]))
+        for i in range(len(sesion))
+        if sesion.tipo[i] in ('mob', 'drop') and sesion.nombre[i]
+    ]
+
+
+def muestra_de_imagen(ruta: str, texto: str) -> Muestra:
+    """Imagen de la región OCR con su texto."""
+    gris = cv2.imread(ruta, cv2.IMREAD_GRAYSCALE)
+    if gris is None:
+        raise ValueError(f"No se pudo leer la imagen: {ruta}")
+    return gris, texto
+
+
+def _glifos(gris: np.ndarray, umbral: int) -> List[np.ndarray]:
+    """Glifos de la primera línea, sin espacios."""
+    segmentada = segmentar(gris > umbral, SIN_ESPACIOS)
+    return segmentada[0] if segmentada else []
+
+
+def _huecos(gris: np.ndarray, umbral: int, texto: str) -> Tuple[List[int], List[int]]:
+    """
+    Huecos (columnas vacías) entre glifos de la primera línea, separados en
+    dentro de palabras y entre palabras. Solo si cada glifo es un carácter.
+    """
+    mascara = gris > umbral
+    bandas = lineas(mascara)
+    if not bandas:
+        return [], []
+    inicio, fin = bandas[0]
+    columnas = tramos(mascara[inicio:fin].any(axis=0))
+    palabras = texto.split()
+    if len(columnas) != sum(len(p) for p in palabras):
+        return [], []
+    dentro, entre = [], []
+    indice = 0
+    for n, palabra in enumerate(palabras):
+        for k in range(len(palabra) - 1):
+            dentro.append(columnas[indice + k + 1][0] - columnas[indice + k][1])
+        indice += len(palabra)
+        if n < len(palabras) - 1:
+            entre.append(columnas[indice][0] - columnas[indice - 1][1])
+    return dentro, entre
+
+
+def estimar_espacio(muestras: List[Muestra], umbral: int) -> int:
+    """
+    Columnas vacías a partir de las cuales hay un espacio: entre el mayor hueco
+    dentro de palabras y el menor entre palabras de las muestras.
+    """
+    dentro, entre = [], []
+    for gris, texto in muestras:
+        d, e = _huecos(gris, umbral, texto)
+        dentro.extend(d)
+        entre.extend(e)
+    mayor_dentro = max(dentro, default=1)
+    if not entre:
+        return mayor_dentro + 1
+    return max(mayor_dentro + 1, (mayor_dentro + min(entre) + 1) // 2)
+
+
+def aprender(muestras: List[Muestra], umbral: int,
+             espacio: Optional[int] = None) -> Tuple[ReconocedorGlifos, Dict[str, int]]:
+    """
+    Aprende la tabla de glifos.
+
+    Returns:
+        Tupla (reconocedor, resumen con muestras usadas, descartadas y conflictos)
+    """
+    votos: Dict[Tuple[Tuple[int, int], bytes], Counter] = {}
+    bits_por_clave: Dict[Tuple[Tuple[int, int], bytes], np.ndarray] = {}
+
+    def votar(glifo: np.ndarray, texto: str) -> None:
+        clave = (glifo.shape, glifo.tobytes())
+        votos.setdefault(clave, Counter())[texto] += 1
+        bits_por_clave[clave] = glifo
+
+    resumen = {'usadas': 0, 'pegadas': 0, 'descartadas': 0, 'conflictos': 0}
+    pendientes = []
+    for gris, texto in muestras:
+        glifos = _glifos(gris, umbral)
+        caracteres = texto.replace(' ', '')
+        if len(glifos) == len(caracteres):
+            for glifo, caracter in zip(glifos, caracteres):
+                votar(glifo, caracter)
+            resumen['usadas'] += 1
+        else:
+            pendientes.append((glifos, caracteres))
+
+    # Letras pegadas: alinear los glifos conocidos desde ambos extremos
+    conocidos = {clave: contador.most_common(1)[0][0] for clave, contador in votos.items()}
+    for glifos, caracteres in pendientes:
+        izquierda, usados_izq = 0, 0
+        while izquierda < len(glifos):
+            caracter = conocidos.get((glifos[izquierda].shape, glifos[izquierda].tobytes()))
+            if caracter is None or not caracteres[usados_izq:].startswith(caracter):
+                break
+            usados_izq += len(caracter)
+            izquierda += 1
+        derecha, usados_der = len(glifos) - 1, len(caracteres)
+        while derecha > izquierda:
+            caracter = conocidos.get((glifos[derecha].shape, glifos[derecha].tobytes()))
+            if caracter is None or not caracteres[usados_izq:usados_der].endswith(caracter):
+                break
+            usados_der -= len(caracter)
+            derecha -= 1
+        if derecha == izquierda and usados_der > usados_izq:
+            votar(glifos[izquierda], caracteres[usados_izq:usados_der])
+            resumen['pegadas'] += 1
+        else:
+            resumen['descartadas'] += 1
+
+    glifos_tabla = []
+    for clave, contador in votos.items():
+        if len(contador) > 1:
+            resumen['conflictos'] += 1
+        glifos_tabla.append((contador.most_common(1)[0][0], bits_por_clave[clave]))
+
+    if espacio is None:
+        espacio = estimar_espacio(muestras, umbral)
+    return ReconocedorGlifos(glifos_tabla, espacio, umbral), resumen
+
+
+def evaluar(reconocedor: ReconocedorGlifos, muestras: List[Muestra]) -> Dict[str, float]:
+    """Aciertos, cuadros que irían a Tesseract y tiempo por cuadro sobre las muestras."""
+    aciertos = 0
+    desconocidos = 0
+    inicio = time.perf_counter()
+    for gris, texto in muestras:
+        leido, _ = reconocedor.reconocer(gris)
+        if leido is None:
+            desconocidos += 1
+        elif leido.split('\n')[0] == texto:
+            aciertos += 1
+    duracion = time.perf_counter() - inicio
+    total = max(1, len(muestras))
+    return {
+        'aciertos': 100.0 * aciertos / total,
+        'tesseract': 100.0 * desconocidos / total,
+        'us_por_cuadro': 1e6 * duracion / total,
+    }
+
+
+def main() -> int:
+    """Punto de entrada de la construcción de la tabla de glifos."""
+    parser = argparse.ArgumentParser(description="Construye la tabla de glifos de la fuente de las placas.")
+    parser.add_argument('--sesion', nargs='+', default=[], help="Sesiones grabadas con bot.py --grabar")
+    parser.add_argument('--muestra', nargs=2, action='append', default=[], metavar=('IMAGEN', 'TEXTO'),
+                        help="Imagen de la región OCR y su texto (repetible)")
+    parser.add_argument('--umbral', type=int, help="Umbral de binarización (por defecto el del detector)")
+    parser.add_argument('--espacio', type=int, help="Columnas vacías que forman un espacio (por defecto se estima)")
+    parser.add_argument('--salida', default=RUTA_GLIFOS)
+    args = parser.parse_args()
+
+    umbral = args.umbral
+    if umbral is None:
+        from hilo_detector_ocr import UMBRAL_BINARIZACION
+        umbral = UMBRAL_BINARIZACION
+
+    try:
+        muestras = []
+        for ruta in args.sesion:
+            muestras.extend(muestras_de_sesion(ruta))
+        for ruta, texto in args.muestra:
+            muestras.append(muestra_de_imagen(ruta, texto))
+    except (OSError, ValueError) as e:
+        print(f"[ERROR] {e}")
+        return 1
+    if not muestras:
+        print("[ERROR] No hay muestras etiquetadas (usa --sesion o --muestra)")
+        return 1
+
+    reconocedor, resumen = aprender(muestras, umbral, args.espacio)
+    textos = Counter(texto for _, texto in muestras)
+    print(f"[INFO] Muestras: {len(muestras)} ({len(textos)} textos distintos)")
+    print(f"[INFO] Usadas: {resumen['usadas']} | con letras pegadas: {resumen['pegadas']} | "
+          f"descartadas: {resumen['descartadas']} | glifos con etiquetas en conflicto: {resumen['conflictos']}")
+    caracteres = sorted({texto for texto, _ in reconocedor.glifos})
+    print(f"[INFO] Glifos: {len(reconocedor)} | caracteres: {''.join(c for c in caracteres if len(c) == 1)}")
+    print(f"[INFO] Espacio: {reconocedor.espacio} columnas | umbral: {reconocedor.umbral}")
+
+    resultado = evaluar(reconocedor, muestras)
+    print("\n[RESULTADO] Sobre las muestras")
+    print("-" * 60)
+    print(f"  Texto correcto:        {resultado['aciertos']:6.2f}%")
+    print(f"  Irían a Tesseract:     {resultado['tesseract']:6.2f}%")
+    print(f"  Tiempo por cuadro:     {resultado['us_por_cuadro']:6.1f} µs")
+    print("-" * 60)
+
+    reconocedor.guardar(args.salida)
+    print(f"\n[OK] Tabla de glifos guardada en {args.salida}")
+    print("[INFO] Se aplicará la próxima vez que se inicie el bot")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
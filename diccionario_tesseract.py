@@ -0,0 +1,133 @@
+"""
+Diccionario y lista de caracteres de Tesseract a partir de los nombres configurados.
+Responsabilidad: Generar la configuración de Tesseract que limita el OCR a los nombres buscados (Single Responsibility Principle)
+
+Con '--psm 7 --oem 3 -l eng' Tesseract lee la placa con el vocabulario y
+los caracteres de todo el inglés, y la similitud difusa tiene que corregir
+después lecturas como 'Kyoln (4B)'. Los nombres de MOBS_OBJETIVO y
+DROP_ITEMS_OBJETIVO definen lo que puede aparecer en la placa:
+- -c tessedit_char_whitelist: solo los caracteres de esos nombres (más los
+  dígitos y paréntesis del nivel)
+- --user-words: un archivo con cada palabra de esos nombres
+
+Se activa con OCR_REGION.diccionario_nombres (desactivado por defecto): la
+lista blanca también obliga a leer las placas que no están en las listas
+(jugadores, otros mobs) con esos caracteres. Antes de activarlo hay que
+comparar con sesion_grabada.py --comparar-diccionario en sesiones reales.
+
+El archivo de palabras se escribe una vez por cada combinación de listas
+(carpeta CARPETA, con el hash de las palabras en el nombre del archivo):
+cuando las listas cambian en la configuración, la próxima lectura genera el
+nuevo. Los clientes con las mismas listas comparten archivo.
+
+pytesseract separa la configuración con shlex (sin modo POSIX en Windows,
+donde las comillas no se quitan): la ruta es relativa, sin espacios, y la
+lista de caracteres no incluye comillas ni barras invertidas.
+"""
+import hashlib
+import os
+import threading
+from typing import Dict, Iterable, List, Tuple
+
+
+# Configuración base: una sola línea de texto, motor LSTM, inglés
+CONFIG_BASE = '--psm 7 --oem 3 -l eng'
+
+# Carpeta de los archivos de palabras (relativa a la carpeta del bot)
+CARPETA = "tesseract_nombres"
+
+# Caracteres del nivel del objetivo, siempre permitidos: 'Kyoin (48)'
+CARACTERES_NIVEL = "0123456789()"
+
+# Caracteres que shlex no deja pasar tal cual
+_EXCLUIDOS = set('"\'\\')
+
+# Configuración por par de índices de nombres (se vacía al llegar al máximo)
+_configuraciones: Dict[Tuple[object, object], str] = {}
+_lock = threading.Lock()
+MAX_CONFIGURACIONES = 32
+
+
+def palabras(nombres: Iterable[str]) -> List[str]:
+    """Palabras distintas de los nombres, en orden de aparición."""
+    vistas: Dict[str, None] = {}
+    for nombre in nombres:
+        for palabra in nombre.split():
+            vistas.setdefault(palabra, None)
+    return list(vistas)
+
+
+def caracteres(nombres: Iterable[str]) -> str:
+    """Caracteres permitidos: los de los nombres y los del nivel, ordenados."""
+    permitidos = set(CARACTERES_NIVEL)
+    for nombre in nombres:
+        permitidos.update(c for c in nombre if not c.isspace())
+    return ''.join(sorted(permitidos - _EXCLUIDOS))
+
+
+def generar_config(nombres: Iterable[str], carpeta: str = CARPETA) -> str:
+    """
+    Escribe el archivo de palabras y retorna la configuración de Tesseract.
+
+    Args:
+        nombres: Nombres de mobs y drops
+        carpeta: Carpeta donde se escribe el archivo de palabras
+
+    Returns:
+        Configuración para pytesseract (CONFIG_BASE si no hay nombres)
+    """
+    nombres = [nombre for nombre in nombres if nombre and nombre.strip()]
+    if not nombres:
+        return CONFIG_BASE
+    contenido = '\n'.join(palabras(nombres)) + '\n'
+    resumen = hashlib.sha1(contenido.encode('utf-8')).hexdigest()[:12]
+    ruta = os.path.join(carpeta, f"nombres_{resumen}.user-words")
+    if not os.path.exists(ruta):
+        os.makedirs(carpeta, exist_ok=True)
+        # Escritura atómica: otro cliente puede estar leyendo el mismo archivo
+        temporal = f"{ruta}.{os.getpid()}.{threading.get_ident()}"
+        with open(temporal, 'w', encoding='utf-8') as f:
+            f.write(contenido)
+        os.replace(temporal, ruta)
+    return f"{CONFIG_BASE} --user-words {ruta} -c tessedit_char_whitelist={caracteres(nombres)}"
+
+
+def config_para(mobs, drops) -> str:
+    """
+    Configuración de Tesseract para los índices de nombres de la
+    configuración compilada (compilada.mobs, compilada.drops).
+
+    Los índices se comparten entre versiones de la configuración con las
+    mismas listas (indice_compartido), así que sirven de clave: en cada
+    cuadro la consulta es una búsqueda en un diccionario y el archivo solo
+    se escribe cuando cambian las listas.
+    """
+    clave = (mobs, drops)
+    config = _configuraciones.get(clave)
+    if config is None:
+        with _lock:
+            config = _configuraciones.get(clave)
+            if config is None:
+                try:
+                    config = generar_config(mobs.nombres + drops.nombres)
+                except OSError as e:
+                    print(f"[TESSERACT] No se pudo escribir el diccionario de nombres: {e}")
+                    config = CONFIG_BASE
+                if len(_configuraciones) >= MAX_CONFIGURACIONES:
+                    _configuraciones.clear()
+                _configuraciones[clave] = config
+                print(f"[TESSERACT] Configuración: {config}")
+    return config
+
+
+# ============================================================
+# PRUEBA INDEPENDIENTE
+# ============================================================
+if __name__ == "__main__":
+    from almacen_configuracion import almacen
+
+    compilada = almacen.actual.compilada
+    nombres = compilada.mobs.nombres + compilada.drops.nombres
+    print(f"[INFO] Nombres: {len(nombres)} | palabras: {len(palabras(nombres))}")
+    print(f"[INFO] Caracteres permitidos: {caracteres(nombres)}")
+    print(f"[INFO] Configuración: {config_para(compilada.mobs, compilada.drops)}")
@@ -0,0 +1,462 @@
+"""
+Estadísticas persistentes de combate.
+Responsabilidad: Registrar cada combate en una base local y consultarla (Single Responsibility Principle)
+
+Un episodio de combate empieza cuando el objetivo confirmado pasa a un MOB
+(desde NULO/DROP o desde otro mob) y termina cuando deja de ser ese mob:
+- 'muerto': el objetivo pasó a NULO o DROP
+- 'escape': HiloMobTrabado ejecutó el escape durante el episodio
+- 'cambio': se seleccionó otro mob sin que el anterior muriera
+
+Cada episodio guarda el mob, el tiempo de selección (segundos sin mob antes
+de seleccionarlo; 0 después de un cambio), el tiempo hasta matarlo, las
+pulsaciones de loot y las pociones de vida y maná. El loot y las pociones
+que llegan después de la muerte son de ese combate, así que el episodio se
+escribe recién al seleccionar el siguiente mob (o al detener el bot).
+
+Costo en los hilos del bot: el registro se suscribe al estado (una
+comparación por cambio de objetivo) y los hilos anotan sus eventos con un
+incremento en un diccionario. Los episodios terminados pasan por una cola a
+un hilo escritor que los guarda en SQLite (WAL, synchronous=NORMAL) por
+lotes, en una sola transacción cada INTERVALO_ESCRITURA segundos o
+LOTE_ESCRITURA episodios.
+
+La base no se lee al iniciar el bot (solo se crea la tabla si no existe);
+las consultas de TTK y muertes por hora leen solo el índice
+(resultado, inicio, mob, ttk). Semanas de episodios no hacen más lento el
+arranque; el informe de cuatro semanas (~240.000 combates) tarda menos de
+un segundo.
+
+Uso:
+    python estadisticas_combate.py                 # informe de los últimos 7 días
+    python estadisticas_combate.py --dias 30 --ruta combates.sqlite
+"""
+import queue
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+# Espacio de estado por defecto: estado_objetivo.ESPACIO_GLOBAL (no se importa
+# para que la GUI no arranque el Manager del estado al consultar la base)
+ESPACIO_GLOBAL = 'global'
+
+# Base de datos (relativa a la carpeta del bot)
+RUTA_COMBATES = "combates.sqlite"
+
+# Escritura por lotes: cada cuántos segundos y a partir de cuántos episodios
+INTERVALO_ESCRITURA = 5.0
+LOTE_ESCRITURA = 50
+
+# Versión del esquema (PRAGMA user_version)
+VERSION_ESQUEMA = 1
+
+# Eventos que anotan los hilos del bot
+EVENTOS = ('loot', 'vida', 'mana', 'escape')
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS episodios (
+    id INTEGER PRIMARY KEY,
+    espacio TEXT NOT NULL,
+    mob TEXT NOT NULL,
+    inicio REAL NOT NULL,
+    seleccion REAL,
+    ttk REAL NOT NULL,
+    resultado TEXT NOT NULL,
+    loot INTEGER NOT NULL,
+    pociones_vida INTEGER NOT NULL,
+    pociones_mana INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS episodios_inicio ON episodios(inicio);
+CREATE INDEX IF NOT EXISTS episodios_resultado ON episodios(resultado, inicio, mob, ttk);
+"""
+
+
+class EpisodioCombate(NamedTuple):
+    """Un combate terminado."""
+    espacio: str                 # Espacio de estado del cliente
+    mob: str                     # Nombre de la lista que coincidió
+    inicio: float                # Selección del mob (epoch, segundos)
+    seleccion: Optional[float]   # Segundos sin mob antes de seleccionarlo (None en el primero)
+    ttk: float                   # Segundos desde la selección hasta el fin del episodio
+    resultado: str               # 'muerto', 'escape' o 'cambio'
+    loot: int                    # Pulsaciones de la tecla de loot
+    pociones_vida: int           # Pulsaciones de curación de vida
+    pociones_mana: int           # Pulsaciones de curación de maná
+
+
+def percentil(ordenados: Sequence[float], p: float) -> float:
+    """
+    Percentil con interpolación lineal entre rangos (el de numpy por defecto).
+
+    Args:
+        ordenados: Valores ordenados de menor a mayor (al menos uno)
+        p: Percentil (0-100)
+    """
+    posicion = (len(ordenados) - 1) * p / 100.0
+    abajo = int(posicion)
+    arriba = min(abajo + 1, len(ordenados) - 1)
+    return ordenados[abajo] + (ordenados[arriba] - ordenados[abajo]) * (posicion - abajo)
+
+
+class BaseCombates:
+    """
+    Base SQLite de episodios de combate.
+    agregar() solo encola; el hilo escritor guarda los episodios por lotes.
+    Las consultas abren su propia conexión (se pueden usar sin el hilo).
+    """
+
+    def __init__(self, ruta: str = RUTA_COMBATES):
+        self.ruta = ruta
+        self.ejecutando = False
+        self.thread = None
+        self._cola: 'queue.Queue[Optional[EpisodioCombate]]' = queue.Queue()
+        self.escritos = 0
+        self._suscriptores: Tuple[Callable[[EpisodioCombate], None], ...] = ()
+
+    # ------------------------------
+    # Escritura
+    # ------------------------------
+    def suscribir(self, funcion: Callable[[EpisodioCombate], None]) -> None:
+        """
+        Registra una función que recibe cada episodio terminado.
+        Se ejecuta en el hilo que entrega el episodio (normalmente el detector):
+        debe retornar enseguida.
+        """
+        self._suscriptores = self._suscriptores + (funcion,)
+
+    def desuscribir(self, funcion: Callable[[EpisodioCombate], None]) -> None:
+        """Quita una función registrada con suscribir()."""
+        self._suscriptores = tuple(f for f in self._suscriptores if f != funcion)
+
+    def agregar(self, episodio: EpisodioCombate) -> None:
+        """Encola un episodio (cualquier hilo; no toca el disco). Sin el hilo escritor se descarta."""
+        for funcion in self._suscriptores:
+            try:
+                funcion(episodio)
+            except Exception as e:
+                print(f"[COMBATES] Error en suscriptor: {e}")
+        if self.ejecutando:
+            self._cola.put(episodio)
+
+    def _conectar(self) -> sqlite3.Connection:
+        conexion = sqlite3.connect(self.ruta)
+        conexion.execute("PRAGMA journal_mode=WAL")
+        conexion.execute("PRAGMA synchronous=NORMAL")
+        if conexion.execute("PRAGMA user_version").fetchone()[0] < VERSION_ESQUEMA:
+            conexion.executescript(_ESQUEMA)
+            conexion.execute(f"PRAGMA user_version={VERSION_ESQUEMA}")
+        return conexion
+
+    def _escribir(self, conexion: sqlite3.Connection, lote: List[EpisodioCombate]) -> None:
+        try:
+            with conexion:
+                conexion.executemany(
+                    "INSERT INTO episodios (espacio, mob, inicio, seleccion, ttk, resultado,"
+                    " loot, pociones_vida, pociones_mana) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    lote)
+            self.escritos += len(lote)
+        except sqlite3.Error as e:
+            print(f"[COMBATES] No se pudieron guardar {len(lote)} episodios: {e}")
+        lote.clear()
+
+    def _ciclo(self) -> None:
+        try:
+            conexion = self._conectar()
+        except sqlite3.Error as e:
+            print(f"[COMBATES] No se pudo abrir {self.ruta}, no se guardan estadísticas: {e}")
+            self.ejecutando = False
+            return
+        lote: List[EpisodioCombate] = []
+        limite = time.monotonic() + INTERVALO_ESCRITURA
+        fin = False
+        while not fin:
+            try:
+                episodio = self._cola.get(timeout=max(0.0, limite - time.monotonic()))
+                if episodio is None:
+                    fin = True
+                else:
+                    lote.append(episodio)
+            except queue.Empty:
+                pass
+            if lote and (fin or len(lote) >= LOTE_ESCRITURA or time.monotonic() >= limite):
+                self._escribir(conexion, lote)
+            if time.monotonic() >= limite:
+                limite = time.monotonic() + INTERVALO_ESCRITURA
+        conexion.close()
+
+    def iniciar(self) -> None:
+        """Inicia el hilo escritor."""
+        if self.ejecutando:
+            return
+        self.ejecutando = True
+        self.thread = threading.Thread(target=self._ciclo, name='combates', daemon=True)
+        self.thread.start()
+
+    def detener(self) -> None:
+        """Guarda los episodios encolados y detiene el hilo escritor."""
+        if not self.ejecutando:
+            return
+        self.ejecutando = False
+        self._cola.put(None)
+        if self.thread:
+            self.thread.join(timeout=5)
+
+    # ------------------------------
+    # Consultas
+    # ------------------------------
+    @staticmethod
+    def _desde(desde: Optional[float], condicion: str = "WHERE") -> Tuple[str, Tuple]:
+        """Condición de fecha (sin ella, recorrer la tabla es más rápido que el índice)."""
+        if desde is None:
+            return "", ()
+        return f" {condicion} inicio >= ?", (desde,)
+
+    def _consultar(self, sql: str, parametros: Tuple = ()) -> List[Tuple]:
+        try:
+            conexion = sqlite3.connect(f"file:{self.ruta}?mode=ro", uri=True)
+        except sqlite3.Error:
+            # Todavía no se guardó ningún episodio
+            return []
+        try:
+            return conexion.execute(sql, parametros).fetchall()
+        except sqlite3.OperationalError:
+            return []
+        finally:
+            conexion.close()
+
+    def tiempos_muerte(self, desde: Optional[float] = None) -> List[Tuple[str, float]]:
+        """
+        (mob, ttk) de los episodios 'muerto', sin orden (se lee solo el índice).
+
+        Args:
+            desde: Solo episodios que empezaron después de este epoch (None = todos)
+        """
+        condicion, parametros = self._desde(desde, "AND")
+        return self._consultar(
+            f"SELECT mob, ttk FROM episodios WHERE resultado = 'muerto'{condicion}", parametros)
+
+    def percentiles_ttk(self, desde: Optional[float] = None,
+                        percentiles: Sequence[float] = (50, 90, 95)) -> Dict[str, Dict[str, float]]:
+        """
+        Percentiles del tiempo hasta matar por mob (solo episodios 'muerto').
+
+        Args:
+            desde: Solo episodios que empezaron después de este epoch (None = todos)
+            percentiles: Percentiles a calcular (0-100)
+
+        Returns:
+            {mob: {'muertes': n, 'p50': segundos, ...}}
+        """
+        # Sin ORDER BY en la consulta: cada mob se ordena en Python
+        tiempos: Dict[str, List[float]] = {}
+        for mob, ttk in self.tiempos_muerte(desde):
+            tiempos.setdefault(mob, []).append(ttk)
+        resultado: Dict[str, Dict[str, float]] = {}
+        for mob, valores in tiempos.items():
+            valores.sort()
+            datos = {'muertes': len(valores)}
+            for p in percentiles:
+                datos[f"p{p:g}"] = percentil(valores, p)
+            resultado[mob] = datos
+        return resultado
+
+    def resultados_por_mob(self, desde: Optional[float] = None) -> Dict[str, Dict[str, int]]:
+        """
+        Episodios por mob y resultado.
+
+        Returns:
+            {mob: {'muerto': n, 'escape': n, 'cambio': n}}
+        """
+        condicion, parametros = self._desde(desde)
+        filas = self._consultar(
+            f"SELECT mob, resultado, COUNT(*) FROM episodios{condicion} GROUP BY mob, resultado", parametros)
+        resultado: Dict[str, Dict[str, int]] = {}
+        for mob, tipo, cantidad in filas:
+            resultado.setdefault(mob, {'muerto': 0, 'escape': 0, 'cambio': 0})[tipo] = cantidad
+        return resultado
+
+    def kills_por_hora(self, desde: Optional[float] = None) -> List[Tuple[float, int]]:
+        """
+        Mobs muertos por hora de reloj.
+
+        Args:
+            desde: Solo episodios que empezaron después de este epoch (None = todos)
+
+        Returns:
+            Lista de (inicio de la hora en epoch, muertes), ordenada; las horas sin combates no aparecen
+        """
+        condicion, parametros = self._desde(desde, "AND")
+        filas = self._consultar(
+            "SELECT CAST(inicio / 3600 AS INTEGER) AS hora, COUNT(*) FROM episodios"
+            f" WHERE resultado = 'muerto'{condicion} GROUP BY hora ORDER BY hora", parametros)
+        return [(hora * 3600.0, cantidad) for hora, cantidad in filas]
+
+    def consumo_por_mob(self, desde: Optional[float] = None) -> Dict[str, Tuple[float, float, float]]:
+        """
+        Promedio de loot, pociones de vida y pociones de maná por episodio de cada mob.
+
+        Returns:
+            {mob: (loot, pociones_vida, pociones_mana)}
+        """
+        condicion, parametros = self._desde(desde)
+        filas = self._consultar(
+            f"SELECT mob, AVG(loot), AVG(pociones_vida), AVG(pociones_mana) FROM episodios{condicion}"
+            " GROUP BY mob", parametros)
+        return {mob: (loot, vida, mana) for mob, loot, vida, mana in filas}
+
+
+class RegistroCombate:
+    """
+    Arma los episodios de combate de un espacio de estado.
+    Suscrito al estado del cliente; los hilos del bot anotan sus eventos con anotar().
+    """
+
+    def __init__(self, espacio: str):
+        self.espacio = espacio
+        self.base: Optional[BaseCombates] = None
+        self._estado = None
+        # Un hilo escribe cada clave (loot, vida, maná, escape): sin lock
+        self._cuentas: Dict[str, int] = dict.fromkeys(EVENTOS, 0)
+        self._lock = threading.Lock()
+        self._ultimo: Optional[Tuple[str, Optional[str]]] = None
+        # Episodio en curso: (mob, inicio, selección, cuentas al empezar)
+        self._actual: Optional[Tuple[str, float, Optional[float], Dict[str, int]]] = None
+        # Episodio terminado que espera el loot y las pociones posteriores: (..., ttk, resultado)
+        self._pendiente: Optional[Tuple[str, float, Optional[float], Dict[str, int], float, str]] = None
+        self._fin: Optional[float] = None
+
+    def anotar(self, evento: str) -> None:
+        """Cuenta un evento ('loot', 'vida', 'mana' o 'escape') del episodio actual."""
+        self._cuentas[evento] += 1
+
+    def _guardar_pendiente(self) -> None:
+        if self._pendiente is None:
+            return
+        mob, inicio, seleccion, marca, ttk, resultado = self._pendiente
+        self._pendiente = None
+        if self.base is not None:
+            self.base.agregar(EpisodioCombate(
+                self.espacio, mob, inicio, seleccion, ttk, resultado,
+                self._cuentas['loot'] - marca['loot'],
+                self._cuentas['vida'] - marca['vida'],
+                self._cuentas['mana'] - marca['mana'],
+            ))
+
+    def al_cambiar(self, cambio: dict) -> None:
+        """Suscriptor del estado: abre y cierra episodios (hilo del detector)."""
+        tipo = cambio['tipo'].value
+        nombre = cambio['nombre_coincidente']
+        clave = (tipo, nombre)
+        # resetear_timestamp notifica el mismo objetivo: no corta el episodio
+        if clave == self._ultimo:
+            return
+        self._ultimo = clave
+        ahora = cambio['timestamp_cambio']
+        es_mob = tipo == 'mob' and bool(nombre)
+
+        with self._lock:
+            if self._actual is not None:
+                mob, inicio, seleccion, marca = self._actual
+                if self._cuentas['escape'] > marca['escape']:
+                    resultado = 'escape'
+                else:
+                    resultado = 'cambio' if es_mob else 'muerto'
+                self._guardar_pendiente()
+                self._pendiente = (mob, inicio, seleccion, marca, ahora - inicio, resultado)
+                self._actual = None
+                self._fin = ahora
+            if es_mob:
+                self._guardar_pendiente()
+                seleccion = None if self._fin is None else ahora - self._fin
+                self._actual = (nombre, ahora, seleccion, dict(self._cuentas))
+
+    def iniciar(self, estado_objetivo, base: BaseCombates) -> None:
+        """
+        Empieza a registrar los combates de un estado.
+
+        Args:
+            estado_objetivo: EstadoObjetivo del cliente
+            base: Base donde se guardan los episodios
+        """
+        self.detener()
+        with self._lock:
+            self.base = base
+            self._ultimo = None
+            self._actual = None
+            self._pendiente = None
+            self._fin = None
+        self._estado = estado_objetivo
+        estado_objetivo.suscribir(self.al_cambiar)
+
+    def detener(self) -> None:
+        """Deja de registrar; guarda el episodio terminado y descarta el que está en curso."""
+        if self._estado is None:
+            return
+        self._estado.desuscribir(self.al_cambiar)
+        self._estado = None
+        with self._lock:
+            self._guardar_pendiente()
+            self._actual = None
+
+
+# Base compartida por todos los clientes y un registro por espacio de estado
+base_combates = BaseCombates()
+_registros: Dict[str, RegistroCombate] = {}
+_lock = threading.Lock()
+
+
+def obtener_registro(espacio: str = ESPACIO_GLOBAL) -> RegistroCombate:
+    """Registro de combates de un espacio de estado (se crea la primera vez)."""
+    registro = _registros.get(espacio)
+    if registro is None:
+        with _lock:
+            registro = _registros.setdefault(espacio, RegistroCombate(espacio))
+    return registro
+
+
+# ============================================================
+# INFORME
+# ============================================================
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Informe de las estadísticas de combate")
+    parser.add_argument('--ruta', default=RUTA_COMBATES, help=f"Base de datos (por defecto {RUTA_COMBATES})")
+    parser.add_argument('--dias', type=float, default=7.0, help="Días hacia atrás (0 = todo)")
+    args = parser.parse_args()
+
+    consulta = BaseCombates(args.ruta)
+    desde = time.time() - args.dias * 86400 if args.dias > 0 else None
+
+    t0 = time.perf_counter()
+    ttk = consulta.percentiles_ttk(desde)
+    resultados = consulta.resultados_por_mob(desde)
+    consumo = consulta.consumo_por_mob(desde)
+    horas = consulta.kills_por_hora(desde)
+    duracion = (time.perf_counter() - t0) * 1000
+
+    print("=" * 96)
+    print(f"ESTADÍSTICAS DE COMBATE - {args.ruta}" + (f" (últimos {args.dias:g} días)" if desde else ""))
+    print("=" * 96)
+    if not resultados:
+        print("Sin episodios registrados")
+    else:
+        print(f"{'Mob':24s} {'Muertes':>8s} {'Escapes':>8s} {'Cambios':>8s} "
+              f"{'TTK p50':>8s} {'TTK p90':>8s} {'TTK p95':>8s} {'Loot':>6s} {'Vida':>6s} {'Maná':>6s}")
+        for mob in sorted(resultados):
+            r = resultados[mob]
+            t = ttk.get(mob)
+            tiempos = (f"{t['p50']:7.1f}s {t['p90']:7.1f}s {t['p95']:7.1f}s" if t
+                       else f"{'-':>8s} {'-':>8s} {'-':>8s}")
+            loot, vida, mana = consumo.get(mob, (0.0, 0.0, 0.0))
+            print(f"{mob[:24]:24s} {r['muerto']:8d} {r['escape']:8d} {r['cambio']:8d} "
+                  f"{tiempos} {loot:6.1f} {vida:6.1f} {mana:6.1f}")
+
+        print("\nMuertes por hora:")
+        for hora, cantidad in horas[-24:]:
+            print(f"  {time.strftime('%Y-%m-%d %H:00', time.localtime(hora))}  {cantidad:4d}  {'#' * min(cantidad, 60)}")
+        if horas:
+            total = sum(cantidad for _, cantidad in horas)
+            print(f"\nPromedio: {total / len(horas):.1f} muertes por hora con combates ({len(horas)} horas)")
+    print(f"\nConsultas: {duracion:.1f} ms")
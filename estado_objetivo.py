@@ -6,11 +6,26 @@ Tipos de objetivo:
 - NULO: No hay objetivo (texto OCR vacío)
 - MOB: Objetivo es un mob de la lista
 - DROP: Objetivo es un item dropeado
+
+Espacios de nombres: EstadoObjetivo('hwnd:0x1a2b') es el estado de un
+cliente concreto (ver bot_controller.ClienteBot); estado = EstadoObjetivo()
+es el espacio 'global' que usan por defecto los hilos y la GUI.
+
+Cambios empujados: suscribir() registra una función que recibe cada cambio
+de objetivo (tipo, nombre, similitud y momento del cambio) en el hilo que lo
+produjo, sin que la GUI tenga que consultar el Manager periódicamente.
 """
 import multiprocessing
 import threading
 import time
 from enum import Enum
+from typing import Callable, List
+
+from metricas import metricas
+
+
+# Espacio por defecto (la instancia global `estado`)
+ESPACIO_GLOBAL = 'global'
 
 
 class TipoObjetivo(Enum):
@@ -24,26 +39,64 @@ class EstadoObjetivo:
     """
     Clase para manejar el estado del objetivo.
     Process-safe para uso en paralelo entre múltiples procesos usando multiprocessing.Manager.
+    
+    Cada espacio de nombres ('global', 'hwnd:0x1a2b', ...) es un estado
+    independiente; todos viven en el mismo Manager. EstadoObjetivo(espacio)
+    devuelve siempre la misma instancia para un espacio (búsqueda O(1) en un
+    dict) y EstadoObjetivo() es el estado global de siempre.
     """
-    _instance = None
-    _init_lock = None
+    _init_lock = threading.Lock()
     _manager = None
+    _espacios = {}
+    
+    def __new__(cls, espacio: str = ESPACIO_GLOBAL):
+        # Camino rápido sin lock: el espacio ya existe
+        instancia = cls._espacios.get(espacio)
+        if instancia is not None:
+            return instancia
+        
+        with cls._init_lock:
+            instancia = cls._espacios.get(espacio)
+            if instancia is None:
+                instancia = super().__new__(cls)
+                instancia._inicializar(espacio)
+                cls._espacios[espacio] = instancia
+        return instancia
+    
+    @classmethod
+    def espacios(cls) -> List[str]:
+        """Retorna los nombres de los espacios creados en este proceso."""
+        with cls._init_lock:
+            return list(cls._espacios)
     
-    def __new__(cls):
-        # Usar threading.Lock para el singleton (solo se crea una vez en el proceso principal)
-        import threading as thread_module
-        if not hasattr(cls, '_init_lock') or cls._init_lock is None:
-            cls._init_lock = thread_module.Lock()
+    @classmethod
+    def descartar(cls, espacio: str) -> bool:
+        """
+        Elimina un espacio: el siguiente EstadoObjetivo(espacio) empieza de cero.
+        El espacio global no se puede descartar (los hilos lo usan por defecto).
+        
+        Args:
+            espacio: Nombre del espacio
         
-        if cls._instance is None:
-            with cls._init_lock:
-                if cls._instance is None:
-                    cls._instance = super().__new__(cls)
-                    cls._instance._inicializar()
-        return cls._instance
-    
-    def _inicializar(self):
+        Returns:
+            True si el espacio existía y se eliminó
+        """
+        if espacio == ESPACIO_GLOBAL:
+            raise ValueError("El espacio global no se puede descartar")
+        with cls._init_lock:
+            return cls._espacios.pop(espacio, None) is not None
+    
+    @property
+    def espacio(self) -> str:
+        """Nombre del espacio de este estado."""
+        return self._espacio
+    
+    def _inicializar(self, espacio: str):
         """Inicializa el estado usando multiprocessing.Manager."""
+        self._espacio = espacio
+        # Tupla inmutable: notificar no necesita lock (suscribir la reemplaza)
+        self._suscriptores = ()
+        
         # Crear manager si no existe (solo en el proceso principal)
         if multiprocessing.current_process().name == 'MainProcess':
             if EstadoObjetivo._manager is None:
@@ -77,6 +130,42 @@ class EstadoObjetivo:
         # Lock para sincronización (ahora es multiprocessing.Lock)
         self._lock = multiprocessing.Lock()
     
+    # ============================================================
+    # Notificación de cambios
+    # ============================================================
+    
+    def suscribir(self, funcion: Callable[[dict], None]) -> None:
+        """
+        Registra una función que se llama con cada cambio de objetivo.
+        Se ejecuta en el hilo que cambió el estado (normalmente el detector):
+        debe retornar enseguida.
+        
+        Args:
+            funcion: Recibe {'tipo', 'nombre_coincidente', 'similitud', 'timestamp_cambio'}
+        """
+        self._suscriptores = self._suscriptores + (funcion,)
+    
+    def desuscribir(self, funcion: Callable[[dict], None]) -> None:
+        """Quita una función registrada con suscribir()."""
+        self._suscriptores = tuple(f for f in self._suscriptores if f != funcion)
+    
+    def _notificar(self, tipo: TipoObjetivo, nombre_coincidente: str, similitud: float,
+                   timestamp_cambio: float) -> None:
+        """Entrega el cambio a los suscriptores (valores locales, sin leer el Manager)."""
+        if not self._suscriptores:
+            return
+        cambio = {
+            'tipo': tipo,
+            'nombre_coincidente': nombre_coincidente or None,
+            'similitud': similitud,
+            'timestamp_cambio': timestamp_cambio,
+        }
+        for funcion in self._suscriptores:
+            try:
+                funcion(cambio)
+            except Exception as e:
+                print(f"[ESTADO] Error en suscriptor: {e}")
+    
     # ============================================================
     # Control de procesos
     # ============================================================
@@ -133,9 +222,17 @@ class EstadoObjetivo:
     
     def resetear_timestamp(self):
         """Resetea el timestamp del estado actual (reinicia el contador de tiempo)."""
+        notificar = bool(self._suscriptores)
         with self._lock:
-            self._estado['timestamp_cambio'] = time.time()
+            timestamp = time.time()
+            self._estado['timestamp_cambio'] = timestamp
             print("[ESTADO] ⏱️ Timestamp reseteado - Contador vuelve a 0")
+            if notificar:
+                tipo = TipoObjetivo(self._estado['tipo'])
+                nombre_coincidente = self._estado['nombre_coincidente']
+                similitud = self._estado['similitud']
+        if notificar:
+            self._notificar(tipo, nombre_coincidente, similitud, timestamp)
     
     # ============================================================
     # Propiedades del estado
@@ -202,12 +299,15 @@ class EstadoObjetivo:
         Returns:
             True si hubo transición MOB→NULO (mob murió)
         """
+        _M_MUTACIONES[TipoObjetivo.NULO].inc()
         with self._lock:
             transicion_mob_a_nulo = (self._estado['tipo'] == TipoObjetivo.MOB.value)
             
-            if self._estado['tipo'] != TipoObjetivo.NULO.value:
+            cambio = self._estado['tipo'] != TipoObjetivo.NULO.value
+            if cambio:
+                timestamp = time.time()
                 self._estado['tipo_anterior'] = self._estado['tipo']
-                self._estado['timestamp_cambio'] = time.time()
+                self._estado['timestamp_cambio'] = timestamp
             
             self._estado['tipo'] = TipoObjetivo.NULO.value
             self._estado['nombre'] = ''
@@ -219,6 +319,8 @@ class EstadoObjetivo:
             print("[ESTADO] Objetivo: NULO (MOB MURIÓ - Ejecutar loot)")
         else:
             print("[ESTADO] Objetivo: NULO (sin objetivo)")
+        if cambio:
+            self._notificar(TipoObjetivo.NULO, '', 0.0, timestamp)
         
         return transicion_mob_a_nulo
     
@@ -231,11 +333,13 @@ class EstadoObjetivo:
             nombre_coincidente: Nombre del mob de la lista
             similitud: Porcentaje de similitud (0-1)
         """
+        _M_MUTACIONES[TipoObjetivo.MOB].inc()
         with self._lock:
             cambio = self._estado['tipo'] != TipoObjetivo.MOB.value or self._estado['nombre_coincidente'] != nombre_coincidente
             if cambio:
+                timestamp = time.time()
                 self._estado['tipo_anterior'] = self._estado['tipo']
-                self._estado['timestamp_cambio'] = time.time()
+                self._estado['timestamp_cambio'] = timestamp
             self._estado['tipo'] = TipoObjetivo.MOB.value
             self._estado['nombre'] = nombre_detectado or ''
             self._estado['nombre_coincidente'] = nombre_coincidente or ''
@@ -244,6 +348,7 @@ class EstadoObjetivo:
         # Mover print fuera del lock para reducir tiempo de retención
         if cambio:
             print(f"[ESTADO] Objetivo: MOB - {nombre_coincidente} ({similitud*100:.1f}%)")
+            self._notificar(TipoObjetivo.MOB, nombre_coincidente, similitud, timestamp)
     
     def establecer_drop(self, nombre_detectado: str, nombre_coincidente: str, similitud: float):
         """
@@ -254,11 +359,13 @@ class EstadoObjetivo:
             nombre_coincidente: Nombre del item de la lista
             similitud: Porcentaje de similitud (0-1)
         """
+        _M_MUTACIONES[TipoObjetivo.DROP].inc()
         with self._lock:
             cambio = self._estado['tipo'] != TipoObjetivo.DROP.value or self._estado['nombre_coincidente'] != nombre_coincidente
             if cambio:
+                timestamp = time.time()
                 self._estado['tipo_anterior'] = self._estado['tipo']
-                self._estado['timestamp_cambio'] = time.time()
+                self._estado['timestamp_cambio'] = timestamp
             self._estado['tipo'] = TipoObjetivo.DROP.value
             self._estado['nombre'] = nombre_detectado or ''
             self._estado['nombre_coincidente'] = nombre_coincidente or ''
@@ -267,6 +374,7 @@ class EstadoObjetivo:
         # Mover print fuera del lock para reducir tiempo de retención
         if cambio:
             print(f"[ESTADO] Objetivo: DROP - {nombre_coincidente} ({similitud*100:.1f}%)")
+            self._notificar(TipoObjetivo.DROP, nombre_coincidente, similitud, timestamp)
     
     def obtener_info(self) -> dict:
         """
@@ -289,5 +397,17 @@ class EstadoObjetivo:
             }
 
 
+# Mutaciones del estado por tipo (camino caliente del detector: contador por hilo)
+_M_MUTACIONES = {
+    tipo: metricas.contador('bot_estado_mutaciones_total', 'Escrituras del estado del objetivo por tipo', tipo=tipo.value)
+    for tipo in TipoObjetivo
+}
+
+
+def espacio_de_ventana(hwnd: int) -> str:
+    """Nombre del espacio de estado de un cliente del juego."""
+    return f"hwnd:{hwnd:#x}"
+
+
 # Instancia global del estado
 estado = EstadoObjetivo()
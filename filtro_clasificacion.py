@@ -0,0 +1,130 @@
+"""
+Filtro temporal de la clasificación del objetivo.
+Responsabilidad: Confirmar en EstadoObjetivo solo los cambios de objetivo estables (Single Responsibility Principle)
+
+El detector clasifica cada cuadro por separado. Una lectura mala en medio de
+un combate (MOB -> NULO -> MOB) reinicia timestamp_cambio, dispara la
+secuencia de loot de HiloRecogerDrop (MOB -> NULO = mob muerto) y pausa los
+demás hilos cerca de un segundo. El filtro se interpone entre la
+clasificación y el estado:
+
+1. Votación ponderada: cada cuadro vota por su clasificación (tipo y
+   nombre) con un peso igual a la confianza del OCR (glifos o Tesseract con
+   image_to_data; una placa vacía vota con confianza 1). Gana la
+   clasificación con más de la mitad del peso de los últimos
+   `ventana_votos` cuadros; sin mayoría no cambia nada.
+2. Histéresis: la ganadora reemplaza a la confirmada cuando sigue ganando
+   durante N cuadros o T milisegundos (lo que ocurra primero). Salir de MOB
+   (muerte o cambio de mob) usa salir_mob_cuadros / salir_mob_ms; los demás
+   cambios (entrar a MOB, NULO <-> DROP) usan entrar_mob_cuadros / entrar_mob_ms.
+
+Con ventana_votos = 1 y entrar/salir_mob_cuadros = 1 cada cuadro se
+confirma en el acto (el comportamiento sin filtro).
+"""
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+
+from estado_objetivo import TipoObjetivo
+from metricas import metricas
+
+
+# Peso mínimo de un voto: lecturas con confianza ~0 persistentes también terminan ganando
+PESO_MINIMO = 0.05
+
+# Clasificación de un cuadro: (texto, tipo, nombre coincidente, similitud)
+Clasificacion = Tuple[str, TipoObjetivo, Optional[str], float]
+
+
+class FiltroClasificacion:
+    """
+    Votación y histéresis de la clasificación de un detector.
+    Se usa desde un solo hilo (el del detector o la repetición de una sesión).
+    """
+
+    def __init__(self):
+        # (clasificación, peso) de los últimos cuadros
+        self._votos: Deque[Tuple[Clasificacion, float]] = deque()
+        # Clasificación confirmada (None hasta el primer cuadro)
+        self.confirmada: Optional[Clasificacion] = None
+        self._candidata: Optional[Tuple[TipoObjetivo, Optional[str]]] = None
+        self._racha = 0
+        self._desde = 0.0
+        self._ultima_cruda: Optional[Tuple[TipoObjetivo, Optional[str]]] = None
+        self._m_transiciones = {
+            etapa: metricas.contador('bot_clasificacion_transiciones_total',
+                                     'Cambios de clasificación del objetivo, por cuadro y confirmados', etapa=etapa)
+            for etapa in ('cruda', 'confirmada')
+        }
+
+    def reiniciar(self) -> None:
+        """Descarta los votos y la clasificación confirmada."""
+        self._votos.clear()
+        self.confirmada = None
+        self._candidata = None
+        self._racha = 0
+        self._ultima_cruda = None
+
+    def _mayoria(self) -> Optional[Clasificacion]:
+        """Última lectura de la clasificación con más de la mitad del peso de la ventana, o None."""
+        pesos: Dict[Tuple[TipoObjetivo, Optional[str]], float] = {}
+        lecturas: Dict[Tuple[TipoObjetivo, Optional[str]], Clasificacion] = {}
+        total = 0.0
+        for cuadro, peso in self._votos:
+            clave = (cuadro[1], cuadro[2])
+            pesos[clave] = pesos.get(clave, 0.0) + peso
+            lecturas[clave] = cuadro
+            total += peso
+        clave, peso = max(pesos.items(), key=lambda item: item[1])
+        return lecturas[clave] if peso * 2 > total else None
+
+    def observar(self, cuadro: Clasificacion, confianza: float, ahora: float, config) -> Clasificacion:
+        """
+        Agrega la clasificación de un cuadro y retorna la confirmada.
+
+        Args:
+            cuadro: (texto, tipo, nombre, similitud) del cuadro
+            confianza: Confianza del OCR del cuadro (0-1)
+            ahora: Instante del cuadro en segundos (time.perf_counter o el grabado)
+            config: FiltroCompilado de la configuración vigente
+
+        Returns:
+            Clasificación a publicar en el estado
+        """
+        clave = (cuadro[1], cuadro[2])
+        if clave != self._ultima_cruda:
+            if self._ultima_cruda is not None:
+                self._m_transiciones['cruda'].inc()
+            self._ultima_cruda = clave
+
+        self._votos.append((cuadro, max(PESO_MINIMO, min(1.0, confianza))))
+        while len(self._votos) > config.ventana:
+            self._votos.popleft()
+
+        if self.confirmada is None:
+            self.confirmada = cuadro
+            return cuadro
+        actual = (self.confirmada[1], self.confirmada[2])
+        if clave == actual:
+            # Mismo objetivo: se publica la lectura más reciente (texto y similitud)
+            self.confirmada = cuadro
+
+        mayoria = self._mayoria()
+        if mayoria is None or (mayoria[1], mayoria[2]) == actual:
+            self._candidata = None
+            return self.confirmada
+        candidata = (mayoria[1], mayoria[2])
+        if candidata != self._candidata:
+            self._candidata = candidata
+            self._racha = 0
+            self._desde = ahora
+        self._racha += 1
+
+        if actual[0] == TipoObjetivo.MOB:
+            cuadros, ms = config.salir_mob_cuadros, config.salir_mob_ms
+        else:
+            cuadros, ms = config.entrar_mob_cuadros, config.entrar_mob_ms
+        if self._racha >= cuadros or (ms > 0 and (ahora - self._desde) * 1000 >= ms):
+            self.confirmada = mayoria
+            self._candidata = None
+            self._m_transiciones['confirmada'].inc()
+        return self.confirmada
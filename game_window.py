@@ -1,19 +1,18 @@
 """
 Módulo para gestionar la ventana del juego.
 Responsabilidad: Encontrar y gestionar la ventana del juego (Single Responsibility Principle)
-"""
-import ctypes
-from ctypes import wintypes
 
+La geometría de la ventana se guarda en caché: leerla es un acceso a atributo.
+Un hilo de seguimiento la refresca cuando Windows avisa que la ventana se movió
+o cambió de tamaño (SetWinEventHook) y, como respaldo, cada pocos cientos de ms.
+
+Todas las llamadas al sistema pasan por el BackendPlataforma de la ventana; los
+hilos lo toman de aquí (game_window.backend).
+"""
+import threading
+from typing import List, Optional
 
-class RECT(ctypes.Structure):
-    """Estructura para representar un rectángulo en Windows."""
-    _fields_ = [
-        ('left', ctypes.c_long),
-        ('top', ctypes.c_long),
-        ('right', ctypes.c_long),
-        ('bottom', ctypes.c_long)
-    ]
+from backend_plataforma import BackendPlataforma, GeometriaVentana, obtener_backend
 
 
 class GameWindow:
@@ -22,16 +21,22 @@ class GameWindow:
     Encapsula toda la lógica relacionada con la ventana.
     """
     
-    def __init__(self, window_title: str):
+    def __init__(self, window_title: str, backend: Optional[BackendPlataforma] = None,
+                 hwnd: Optional[int] = None):
         """
         Inicializa el gestor de ventana.
         
         Args:
             window_title: Título de la ventana del juego
+            backend: Backend de plataforma (por defecto el del proceso)
+            hwnd: Handle de una ventana concreta (varios clientes con el mismo título)
         """
         self.window_title = window_title
-        self.user32 = ctypes.windll.user32
-        self._hwnd = None
+        self.backend = backend or obtener_backend()
+        self._hwnd = hwnd
+        self._geometria: Optional[GeometriaVentana] = None
+        self._seguimiento: Optional[threading.Thread] = None
+        self._siguiendo = False
     
     @property
     def hwnd(self) -> int:
@@ -46,25 +51,110 @@ class GameWindow:
         
         Returns:
             Handle de la ventana
-            
+        
         Raises:
             Exception: Si no se encuentra la ventana
         """
-        hwnd = self.user32.FindWindowW(None, self.window_title)
+        hwnd = self.backend.buscar_ventana(self.window_title)
         if hwnd == 0:
             raise Exception(f"No se encontró la ventana con título: {self.window_title}")
         return hwnd
     
-    def get_window_rect(self) -> RECT:
+    @classmethod
+    def todas(cls, window_title: str, backend: Optional[BackendPlataforma] = None) -> List['GameWindow']:
+        """
+        Retorna una GameWindow por cada ventana abierta con el título indicado.
+        
+        Args:
+            window_title: Título de la ventana del juego
+            backend: Backend de plataforma (por defecto el del proceso)
+        """
+        backend = backend or obtener_backend()
+        return [cls(window_title, backend, hwnd) for hwnd in backend.buscar_ventanas(window_title)]
+    
+    # ============================================================
+    # Geometría en caché
+    # ============================================================
+    
+    def _consultar_geometria(self) -> GeometriaVentana:
+        """Consulta al backend la geometría actual de la ventana (syscalls)."""
+        return self.backend.geometria(self.hwnd)
+    
+    def actualizar_geometria(self) -> bool:
+        """
+        Refresca la geometría en caché.
+        El reemplazo es una sola asignación de una tupla inmutable, así que los
+        lectores ven siempre la geometría anterior completa o la nueva completa.
+        
+        Returns:
+            True si la geometría cambió
+        """
+        nueva = self._consultar_geometria()
+        cambio = nueva != self._geometria
+        self._geometria = nueva
+        return cambio
+    
+    def invalidar_geometria(self) -> None:
+        """Descarta la geometría en caché; la próxima lectura la vuelve a consultar."""
+        self._geometria = None
+    
+    @property
+    def geometria(self) -> GeometriaVentana:
+        """Geometría de la ventana en caché (acceso a atributo, sin syscalls)."""
+        geometria = self._geometria
+        if geometria is None:
+            self.actualizar_geometria()
+            geometria = self._geometria
+        return geometria
+    
+    def get_window_rect(self) -> GeometriaVentana:
         """
         Obtiene las coordenadas de la ventana.
         
         Returns:
-            Estructura RECT con las coordenadas
+            Geometría en caché (expone left, top, right y bottom como RECT)
         """
-        rect = RECT()
-        self.user32.GetWindowRect(self.hwnd, ctypes.byref(rect))
-        return rect
+        return self.geometria
+    
+    # ============================================================
+    # Seguimiento de movimiento/redimensionado
+    # ============================================================
+    
+    def iniciar_seguimiento(self, intervalo: float = 0.5) -> None:
+        """
+        Inicia el hilo que mantiene la geometría actualizada.
+        
+        Args:
+            intervalo: Segundos entre refrescos de respaldo (si no llega ningún evento)
+        """
+        if self._siguiendo:
+            return
+        self.actualizar_geometria()
+        self._siguiendo = True
+        self._seguimiento = threading.Thread(
+            target=self._ciclo_seguimiento, args=(intervalo,), name='ventana', daemon=True
+        )
+        self._seguimiento.start()
+    
+    def detener_seguimiento(self) -> None:
+        """Detiene el hilo de seguimiento de la geometría."""
+        self._siguiendo = False
+        if self._seguimiento:
+            self._seguimiento.join(timeout=2)
+            self._seguimiento = None
+    
+    def _ciclo_seguimiento(self, intervalo: float) -> None:
+        """
+        Delega en el backend la escucha de movimientos de la ventana del juego y
+        refresca la geometría en cada aviso (o cada `intervalo` como respaldo).
+        """
+        def _refrescar():
+            try:
+                self.actualizar_geometria()
+            except Exception as e:
+                print(f"[VENTANA] Error al refrescar geometría: {e}")
+        
+        self.backend.seguir_geometria(self.hwnd, _refrescar, lambda: self._siguiendo, intervalo)
     
     def is_valid(self) -> bool:
         """
@@ -73,4 +163,4 @@ class GameWindow:
         Returns:
             True si la ventana existe, False en caso contrario
         """
-        return self.user32.IsWindow(self.hwnd) != 0
+        return self.backend.ventana_valida(self.hwnd)
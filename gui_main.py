@@ -1,9 +1,17 @@
 """
 Interfaz gráfica principal del bot Kathana.
 Interfaz de escritorio con PyQt5 para configurar y controlar el bot.
+
+Los módulos pesados (hilos, cv2, numpy, mss, pytesseract) no se importan
+aquí: se precargan en segundo plano cuando la ventana ya está visible.
+
+El estado del objetivo y las muestras de rendimiento llegan empujados por
+señales Qt (PuenteBot): la GUI no consulta el Manager del estado.
 """
+import carga_diferida  # Primero: fija el tiempo de referencia del arranque
 import sys
 import os
+import time
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QTabWidget, QPushButton, QLabel, QLineEdit, QSpinBox, QDoubleSpinBox,
@@ -17,6 +25,10 @@ from config_manager import (
     obtener_configuracion_completa, guardar_configuracion, aplicar_configuracion_a_modulo
 )
 from bot_controller import BotController
+from almacen_configuracion import almacen
+from perfilador import perfilador, HILOS_PERFILABLES
+from panel_rendimiento import PanelRendimiento, PuenteBot
+from panel_vista_previa import PanelVistaPreviaOCR
 
 
 class GeneralTab(QWidget):
@@ -86,6 +98,61 @@ class GeneralTab(QWidget):
         self.ocr_height.setValue(ocr_region.get('height', 15))
         grid.addWidget(self.ocr_height, 3, 1)
         
+        self.ocr_recortar = QCheckBox("Recortar al texto antes del OCR")
+        self.ocr_recortar.setChecked(ocr_region.get('recortar_texto', False))
+        grid.addWidget(self.ocr_recortar, 4, 0, 1, 2)
+        
+        # Localización automática por plantilla del marco del objetivo
+        grid.addWidget(QLabel("Plantilla del marco:"), 5, 0)
+        hbox = QHBoxLayout()
+        self.ocr_plantilla = QLineEdit(ocr_region.get('plantilla', ''))
+        self.ocr_plantilla.setPlaceholderText("Vacío = región fija")
+        btn_plantilla = QPushButton("Buscar...")
+        btn_plantilla.clicked.connect(self.buscar_plantilla)
+        hbox.addWidget(self.ocr_plantilla)
+        hbox.addWidget(btn_plantilla)
+        grid.addLayout(hbox, 5, 1)
+        
+        grid.addWidget(QLabel("Offset desde la plantilla (X, Y):"), 6, 0)
+        hbox = QHBoxLayout()
+        self.ocr_plantilla_x = QSpinBox()
+        self.ocr_plantilla_x.setRange(-2000, 2000)
+        self.ocr_plantilla_x.setValue(ocr_region.get('plantilla_offset_x', 0))
+        self.ocr_plantilla_y = QSpinBox()
+        self.ocr_plantilla_y.setRange(-2000, 2000)
+        self.ocr_plantilla_y.setValue(ocr_region.get('plantilla_offset_y', 0))
+        hbox.addWidget(self.ocr_plantilla_x)
+        hbox.addWidget(self.ocr_plantilla_y)
+        grid.addLayout(hbox, 6, 1)
+        
+        grid.addWidget(QLabel("Umbral de la plantilla:"), 7, 0)
+        self.ocr_umbral_plantilla = QDoubleSpinBox()
+        self.ocr_umbral_plantilla.setRange(0.1, 1.0)
+        self.ocr_umbral_plantilla.setSingleStep(0.05)
+        self.ocr_umbral_plantilla.setDecimals(2)
+        self.ocr_umbral_plantilla.setValue(ocr_region.get('umbral_plantilla', 0.8))
+        grid.addWidget(self.ocr_umbral_plantilla, 7, 1)
+        
+        grid.addWidget(QLabel("Fallos antes de relocalizar:"), 8, 0)
+        self.ocr_fallos = QSpinBox()
+        self.ocr_fallos.setRange(1, 1000)
+        self.ocr_fallos.setValue(ocr_region.get('fallos_relocalizar', 20))
+        grid.addWidget(self.ocr_fallos, 8, 1)
+        
+        grid.addWidget(QLabel("Mínimo de píxeles de texto (0 = siempre OCR):"), 9, 0)
+        self.ocr_min_pixeles = QSpinBox()
+        self.ocr_min_pixeles.setRange(0, 10000)
+        self.ocr_min_pixeles.setValue(ocr_region.get('min_pixeles_texto', 20))
+        self.ocr_min_pixeles.setToolTip("Con menos píxeles blancos la placa se considera vacía (NULO sin OCR)")
+        grid.addWidget(self.ocr_min_pixeles, 9, 1)
+        
+        self.ocr_diccionario = QCheckBox("Limitar Tesseract a las palabras y caracteres de los nombres")
+        self.ocr_diccionario.setChecked(ocr_region.get('diccionario_nombres', False))
+        self.ocr_diccionario.setToolTip("Genera --user-words y tessedit_char_whitelist con Mobs y Drop Items. "
+                                        "Las placas de otros nombres (jugadores, mobs fuera de la lista) se leen "
+                                        "con esos caracteres: comparar antes con sesion_grabada.py --comparar-diccionario")
+        grid.addWidget(self.ocr_diccionario, 10, 0, 1, 2)
+        
         group.setLayout(grid)
         layout.addWidget(group)
         
@@ -114,6 +181,13 @@ class GeneralTab(QWidget):
         if file_path:
             self.tesseract_path.setText(file_path)
     
+    def buscar_plantilla(self):
+        file_path, _ = QFileDialog.getOpenFileName(
+            self, "Seleccionar plantilla del marco del objetivo", "", "Imágenes (*.png)"
+        )
+        if file_path:
+            self.ocr_plantilla.setText(file_path)
+    
     def obtener_valores(self) -> dict:
         """Retorna los valores actuales de la pestaña."""
         return {
@@ -124,6 +198,14 @@ class GeneralTab(QWidget):
                 'top_offset': self.ocr_top.value(),
                 'width': self.ocr_width.value(),
                 'height': self.ocr_height.value(),
+                'recortar_texto': self.ocr_recortar.isChecked(),
+                'min_pixeles_texto': self.ocr_min_pixeles.value(),
+                'diccionario_nombres': self.ocr_diccionario.isChecked(),
+                'plantilla': self.ocr_plantilla.text().strip(),
+                'plantilla_offset_x': self.ocr_plantilla_x.value(),
+                'plantilla_offset_y': self.ocr_plantilla_y.value(),
+                'umbral_plantilla': self.ocr_umbral_plantilla.value(),
+                'fallos_relocalizar': self.ocr_fallos.value(),
             },
             'UMBRAL_SIMILITUD': self.umbral.value(),
         }
@@ -281,6 +363,12 @@ class HabilidadesTab(QWidget):
 class AutocuracionTab(QWidget):
     """Pestaña de configuración de Autocuración."""
     
+    # Valores por defecto de la medición por barra si la configuración no los trae
+    DEFECTOS_BARRA = {
+        'vida': {'y': 62, 'umbral_combate': 60.0, 'umbral_fuera_combate': 30.0},
+        'mana': {'y': 80, 'umbral_combate': 30.0, 'umbral_fuera_combate': 30.0},
+    }
+    
     def __init__(self, config: dict):
         super().__init__()
         self.config = config
@@ -333,6 +421,8 @@ class AutocuracionTab(QWidget):
         self.vida_intervalo_sin.setValue(vida_config.get('intervalo_sin', 0.5))
         grid_vida.addWidget(self.vida_intervalo_sin, 4, 1)
         
+        self.vida_barra = self._agregar_campos_barra(grid_vida, 5, vida_config, 'vida')
+        
         group_vida.setLayout(grid_vida)
         layout.addWidget(group_vida)
         
@@ -373,12 +463,73 @@ class AutocuracionTab(QWidget):
         self.mana_intervalo_sin.setValue(mana_config.get('intervalo_sin', 0.5))
         grid_mana.addWidget(self.mana_intervalo_sin, 4, 1)
         
+        self.mana_barra = self._agregar_campos_barra(grid_mana, 5, mana_config, 'mana')
+        
         group_mana.setLayout(grid_mana)
         layout.addWidget(group_mana)
         
         layout.addStretch()
         self.setLayout(layout)
     
+    def _agregar_campos_barra(self, grid: QGridLayout, fila: int, config: dict, recurso: str) -> dict:
+        """Agrega los campos de medición por porcentaje de la barra y los retorna."""
+        campos = {
+            'activa': QCheckBox("Medir porcentaje de la barra completa"),
+            'x_inicio': QSpinBox(),
+            'x_fin': QSpinBox(),
+            'y': QSpinBox(),
+            'umbral_combate': QDoubleSpinBox(),
+            'umbral_fuera_combate': QDoubleSpinBox(),
+        }
+        
+        grid.addWidget(campos['activa'], fila, 0, 1, 2)
+        etiquetas = [
+            ('x_inicio', "Barra X inicio:"),
+            ('x_fin', "Barra X fin:"),
+            ('y', "Barra Y:"),
+            ('umbral_combate', "Umbral en combate (%):"),
+            ('umbral_fuera_combate', "Umbral fuera de combate (%):"),
+        ]
+        for i, (clave, texto) in enumerate(etiquetas, start=1):
+            grid.addWidget(QLabel(texto), fila + i, 0)
+            if clave.startswith('umbral'):
+                campos[clave].setRange(0.0, 100.0)
+                campos[clave].setSingleStep(5.0)
+                campos[clave].setDecimals(1)
+            else:
+                campos[clave].setRange(0, 2000)
+            grid.addWidget(campos[clave], fila + i, 1)
+        
+        self.cargar_campos_barra(campos, config, recurso)
+        return campos
+    
+    @classmethod
+    def cargar_campos_barra(cls, campos: dict, config: dict, recurso: str):
+        """Carga en los campos de barra los valores de la configuración de un recurso."""
+        defecto = cls.DEFECTOS_BARRA[recurso]
+        barra = config.get('barra') or {}
+        campos['activa'].setChecked(barra.get('activa', False))
+        campos['x_inicio'].setValue(barra.get('x_inicio', 20))
+        campos['x_fin'].setValue(barra.get('x_fin', 150))
+        campos['y'].setValue(barra.get('y', defecto['y']))
+        campos['umbral_combate'].setValue(config.get('umbral_combate', defecto['umbral_combate']))
+        campos['umbral_fuera_combate'].setValue(
+            config.get('umbral_fuera_combate', defecto['umbral_fuera_combate']))
+    
+    @staticmethod
+    def _valores_barra(campos: dict) -> dict:
+        """Retorna los valores de los campos de barra con el formato de AUTOCURACION."""
+        return {
+            'barra': {
+                'activa': campos['activa'].isChecked(),
+                'x_inicio': campos['x_inicio'].value(),
+                'x_fin': campos['x_fin'].value(),
+                'y': campos['y'].value(),
+            },
+            'umbral_combate': campos['umbral_combate'].value(),
+            'umbral_fuera_combate': campos['umbral_fuera_combate'].value(),
+        }
+    
     def obtener_valores(self) -> dict:
         teclas_vida = [t.strip() for t in self.vida_teclas.text().split(',') if t.strip()]
         return {
@@ -389,6 +540,7 @@ class AutocuracionTab(QWidget):
                     'tecla': teclas_vida,
                     'intervalo_con': self.vida_intervalo_con.value(),
                     'intervalo_sin': self.vida_intervalo_sin.value(),
+                    **self._valores_barra(self.vida_barra),
                 },
                 'mana': {
                     'x': self.mana_x.value(),
@@ -396,6 +548,7 @@ class AutocuracionTab(QWidget):
                     'tecla': self.mana_tecla.text(),
                     'intervalo_con': self.mana_intervalo_con.value(),
                     'intervalo_sin': self.mana_intervalo_sin.value(),
+                    **self._valores_barra(self.mana_barra),
                 }
             }
         }
@@ -446,6 +599,40 @@ class ObservadorTab(QWidget):
         group.setLayout(grid)
         layout.addWidget(group)
         
+        # Filtro de la clasificación (votación e histéresis)
+        group = QGroupBox("Filtro de Clasificación (1 / 1 / 1 = sin filtro)")
+        grid = QGridLayout()
+        
+        grid.addWidget(QLabel("Cuadros que votan:"), 0, 0)
+        self.ventana_votos = QSpinBox()
+        self.ventana_votos.setRange(1, 30)
+        self.ventana_votos.setValue(obs_config.get('ventana_votos', 3))
+        self.ventana_votos.setToolTip("Gana la clasificación con más de la mitad de la confianza OCR de estos cuadros")
+        grid.addWidget(self.ventana_votos, 0, 1)
+        
+        self.filtro_campos = {}
+        for fila, (clave, titulo, cuadros, ms) in enumerate((
+            ('entrar_mob', "Cambios que no salen de MOB (cuadros / ms):", 1, 0),
+            ('salir_mob', "Salir de MOB (cuadros / ms):", 3, 150),
+        ), start=1):
+            grid.addWidget(QLabel(titulo), fila, 0)
+            hbox = QHBoxLayout()
+            spin_cuadros = QSpinBox()
+            spin_cuadros.setRange(1, 100)
+            spin_cuadros.setValue(obs_config.get(f'{clave}_cuadros', cuadros))
+            spin_ms = QSpinBox()
+            spin_ms.setRange(0, 10000)
+            spin_ms.setSingleStep(50)
+            spin_ms.setValue(int(obs_config.get(f'{clave}_ms', ms)))
+            spin_ms.setToolTip("0 = solo cuadros")
+            hbox.addWidget(spin_cuadros)
+            hbox.addWidget(spin_ms)
+            grid.addLayout(hbox, fila, 1)
+            self.filtro_campos[clave] = (spin_cuadros, spin_ms)
+        
+        group.setLayout(grid)
+        layout.addWidget(group)
+        
         layout.addStretch()
         self.setLayout(layout)
     
@@ -455,6 +642,11 @@ class ObservadorTab(QWidget):
                 'tecla_seleccionar': self.tecla_seleccionar.text().upper().strip(),
                 'timeout_drop': self.timeout_drop.value(),
                 'intervalo_revision': self.intervalo_revision.value(),
+                'ventana_votos': self.ventana_votos.value(),
+                'entrar_mob_cuadros': self.filtro_campos['entrar_mob'][0].value(),
+                'entrar_mob_ms': self.filtro_campos['entrar_mob'][1].value(),
+                'salir_mob_cuadros': self.filtro_campos['salir_mob'][0].value(),
+                'salir_mob_ms': self.filtro_campos['salir_mob'][1].value(),
             }
         }
 
@@ -574,9 +766,121 @@ class EscapeTab(QWidget):
         group_timeouts.setLayout(vbox_timeouts)
         layout.addWidget(group_timeouts)
         
+        # Ajuste automático por historial (ajuste_escape.py)
+        group_ajuste = QGroupBox("Ajuste Automático del Timeout (tiempo hasta matar)")
+        vbox_ajuste = QVBoxLayout()
+        grid_ajuste = QGridLayout()
+        
+        self.auto_ajuste = QCheckBox("Usar el timeout recomendado si supera el fijo (percentil + margen)")
+        self.auto_ajuste.setChecked(escape_mob.get('auto_ajuste', False))
+        self.auto_ajuste.setToolTip("Nunca baja del timeout fijo (los escapes no cuentan como muertes); "
+                                    "sin muertes suficientes de un mob se usa su timeout fijo")
+        grid_ajuste.addWidget(self.auto_ajuste, 0, 0, 1, 4)
+        
+        grid_ajuste.addWidget(QLabel("Percentil:"), 1, 0)
+        self.ajuste_percentil = QDoubleSpinBox()
+        self.ajuste_percentil.setRange(50.0, 99.9)
+        self.ajuste_percentil.setSingleStep(1.0)
+        self.ajuste_percentil.setDecimals(1)
+        self.ajuste_percentil.setValue(escape_mob.get('ajuste_percentil', 95.0))
+        grid_ajuste.addWidget(self.ajuste_percentil, 1, 1)
+        
+        grid_ajuste.addWidget(QLabel("Margen (segundos):"), 1, 2)
+        self.ajuste_margen = QDoubleSpinBox()
+        self.ajuste_margen.setRange(0.0, 120.0)
+        self.ajuste_margen.setSingleStep(0.5)
+        self.ajuste_margen.setDecimals(1)
+        self.ajuste_margen.setValue(escape_mob.get('ajuste_margen', 3.0))
+        grid_ajuste.addWidget(self.ajuste_margen, 1, 3)
+        
+        grid_ajuste.addWidget(QLabel("Muertes mínimas:"), 2, 0)
+        self.ajuste_muestras = QSpinBox()
+        self.ajuste_muestras.setRange(1, 1000)
+        self.ajuste_muestras.setValue(escape_mob.get('ajuste_muestras', 10))
+        grid_ajuste.addWidget(self.ajuste_muestras, 2, 1)
+        
+        grid_ajuste.addWidget(QLabel("Historial (días):"), 2, 2)
+        self.ajuste_dias = QSpinBox()
+        self.ajuste_dias.setRange(0, 365)
+        self.ajuste_dias.setValue(int(escape_mob.get('ajuste_dias', 14)))
+        grid_ajuste.addWidget(self.ajuste_dias, 2, 3)
+        vbox_ajuste.addLayout(grid_ajuste)
+        
+        self.tabla_recomendaciones = QTableWidget()
+        self.tabla_recomendaciones.setColumnCount(6)
+        self.tabla_recomendaciones.setHorizontalHeaderLabels(
+            ["Mob", "Muertes", "Percentil (s)", "Recomendado (s)", "Fijo (s)", "En uso"])
+        self.tabla_recomendaciones.horizontalHeader().setStretchLastSection(True)
+        self.tabla_recomendaciones.setEditTriggers(QTableWidget.NoEditTriggers)
+        vbox_ajuste.addWidget(self.tabla_recomendaciones)
+        
+        hbox_ajuste = QHBoxLayout()
+        btn_actualizar = QPushButton("Actualizar Recomendaciones")
+        btn_actualizar.clicked.connect(self.actualizar_recomendaciones)
+        btn_copiar = QPushButton("Copiar a Timeouts por Mob")
+        btn_copiar.setToolTip("Escribe los recomendados en la tabla de timeouts fijos (guardar para aplicar)")
+        btn_copiar.clicked.connect(self.copiar_recomendaciones)
+        hbox_ajuste.addWidget(btn_actualizar)
+        hbox_ajuste.addWidget(btn_copiar)
+        hbox_ajuste.addStretch()
+        vbox_ajuste.addLayout(hbox_ajuste)
+        
+        self.estado_ajuste = QLabel("Sin recomendaciones (pulsa Actualizar)")
+        self.estado_ajuste.setWordWrap(True)
+        vbox_ajuste.addWidget(self.estado_ajuste)
+        
+        group_ajuste.setLayout(vbox_ajuste)
+        layout.addWidget(group_ajuste)
+        
         layout.addStretch()
         self.setLayout(layout)
     
+    def actualizar_recomendaciones(self):
+        """
+        Muestra el timeout recomendado de cada mob. Con el bot en ejecución usa
+        las estimaciones en vivo; detenido, las calcula con combates.sqlite.
+        """
+        # Importación diferida: sqlite3 solo al consultar
+        from config_compilada import EscapeCompilado
+        from estadisticas_combate import base_combates
+        from ajuste_escape import ajuste_escape
+        
+        valores = self.obtener_valores()
+        escape = EscapeCompilado(valores['ESCAPE_MOB'], valores['ESCAPE_BY_MOB'])
+        ajuste_escape.cargar(base_combates, escape)
+        recomendaciones = ajuste_escape.recomendaciones(escape)
+        
+        self.tabla_recomendaciones.setRowCount(len(recomendaciones))
+        for row, r in enumerate(recomendaciones):
+            celdas = (r.mob, str(r.muertes), f"{r.cuantil:.1f}", f"{r.recomendado:.1f}",
+                      f"{r.fijo:.1f}", "Sí" if r.en_uso else "No")
+            for columna, texto in enumerate(celdas):
+                self.tabla_recomendaciones.setItem(row, columna, QTableWidgetItem(texto))
+        
+        origen = "en vivo" if ajuste_escape.activo else base_combates.ruta
+        if ajuste_escape.cargando(escape.ajuste_percentil):
+            origen += ", cargando historial"
+        self.estado_ajuste.setText(
+            f"Percentil {escape.ajuste_percentil:g} + {escape.ajuste_margen:g}s de margen ({origen}); "
+            f"{len(recomendaciones)} mobs con muertes registradas")
+    
+    def copiar_recomendaciones(self):
+        """Copia el timeout recomendado de cada mob a la tabla de timeouts fijos."""
+        filas = {}
+        for row in range(self.tabla_timeouts.rowCount()):
+            item = self.tabla_timeouts.item(row, 0)
+            if item:
+                filas[item.text()] = row
+        for row in range(self.tabla_recomendaciones.rowCount()):
+            mob = self.tabla_recomendaciones.item(row, 0).text()
+            recomendado = self.tabla_recomendaciones.item(row, 3).text()
+            fila = filas.get(mob)
+            if fila is None:
+                fila = self.tabla_timeouts.rowCount()
+                self.tabla_timeouts.insertRow(fila)
+                self.tabla_timeouts.setItem(fila, 0, QTableWidgetItem(mob))
+            self.tabla_timeouts.setItem(fila, 1, QTableWidgetItem(recomendado))
+    
     def agregar_punto(self):
         from PyQt5.QtWidgets import QInputDialog
         x, ok1 = QInputDialog.getInt(self, "Agregar Punto", "Coordenada X:", 0, 0, 2000)
@@ -640,17 +944,99 @@ class EscapeTab(QWidget):
                 'puntos_clic': puntos,
                 'veces': self.veces.value(),
                 'duracion_total': self.duracion_total.value(),
+                'auto_ajuste': self.auto_ajuste.isChecked(),
+                'ajuste_percentil': self.ajuste_percentil.value(),
+                'ajuste_margen': self.ajuste_margen.value(),
+                'ajuste_muestras': self.ajuste_muestras.value(),
+                'ajuste_dias': self.ajuste_dias.value(),
             },
             'ESCAPE_BY_MOB': escape_by_mob,
         }
 
 
+class PerfiladoTab(QWidget):
+    """Pestaña para perfilar hilos del bot en caliente."""
+    
+    def __init__(self):
+        super().__init__()
+        self.init_ui()
+    
+    def init_ui(self):
+        layout = QVBoxLayout()
+        
+        group = QGroupBox("Hilos a perfilar")
+        grid = QGridLayout()
+        self.checks_hilos = {}
+        for i, nombre in enumerate(HILOS_PERFILABLES):
+            check = QCheckBox(nombre)
+            check.setChecked(True)
+            self.checks_hilos[nombre] = check
+            grid.addWidget(check, i // 4, i % 4)
+        group.setLayout(grid)
+        layout.addWidget(group)
+        
+        hbox = QHBoxLayout()
+        hbox.addWidget(QLabel("Duración (segundos):"))
+        self.duracion = QSpinBox()
+        self.duracion.setRange(1, 3600)
+        self.duracion.setValue(30)
+        hbox.addWidget(self.duracion)
+        hbox.addStretch()
+        
+        self.btn_perfilar = QPushButton("Iniciar perfilado")
+        self.btn_perfilar.clicked.connect(self.toggle_perfilado)
+        hbox.addWidget(self.btn_perfilar)
+        layout.addLayout(hbox)
+        
+        self.estado_perfilado = QLabel("Sin perfilar")
+        self.estado_perfilado.setWordWrap(True)
+        layout.addWidget(self.estado_perfilado)
+        
+        layout.addWidget(QLabel(
+            "El resultado se guarda en perfiles/*.folded (pilas colapsadas).\n"
+            "Se puede abrir en speedscope.app o con flamegraph.pl."
+        ))
+        
+        layout.addStretch()
+        self.setLayout(layout)
+    
+    def toggle_perfilado(self):
+        """Inicia o detiene una sesión de perfilado."""
+        if perfilador.activo:
+            perfilador.detener()
+        else:
+            hilos = [nombre for nombre, check in self.checks_hilos.items() if check.isChecked()]
+            if not hilos:
+                QMessageBox.warning(self, "Perfilado", "Selecciona al menos un hilo.")
+                return
+            perfilador.iniciar(hilos, duracion=self.duracion.value())
+        self.actualizar()
+    
+    def actualizar(self):
+        """Refresca el botón y la etiqueta de estado (llamado por el timer)."""
+        if perfilador.activo:
+            self.btn_perfilar.setText("Detener perfilado")
+            self.estado_perfilado.setText(f"Perfilando... {perfilador.progreso():.0f}s restantes")
+        else:
+            self.btn_perfilar.setText("Iniciar perfilado")
+            if perfilador.ultimo_archivo:
+                muestras = ", ".join(f"{h}: {n}" for h, n in perfilador.ultimo_resumen.items())
+                self.estado_perfilado.setText(f"Último perfil: {perfilador.ultimo_archivo}\nMuestras: {muestras}")
+
+
 class MainWindow(QMainWindow):
     """Ventana principal de la aplicación."""
     
     def __init__(self):
         super().__init__()
-        self.bot_controller = BotController(status_callback=self.actualizar_estado)
+        # Eventos de los hilos del bot → señales Qt, como máximo uno por cuadro de pantalla
+        refresco = QApplication.primaryScreen().refreshRate() or 60
+        self.puente = PuenteBot(intervalo_ms=int(1000 / refresco), parent=self)
+        self.bot_controller = BotController(
+            status_callback=self.puente.publicar_estado,
+            muestra_callback=self.puente.publicar_muestra,
+        )
+        self.info_estado = None
         
         # Cargar configuración desde JSON y aplicarla al módulo
         self.config = obtener_configuracion_completa()
@@ -658,7 +1044,10 @@ class MainWindow(QMainWindow):
         
         self.init_ui()
         
-        # Timer para actualizar estado
+        self.puente.estado_cambiado.connect(self.actualizar_estado)
+        self.puente.muestra_nueva.connect(self.tab_rendimiento.agregar_muestra)
+        
+        # Timer para el contador de tiempo y la pestaña de perfilado (sin consultar el bot)
         self.timer = QTimer()
         self.timer.timeout.connect(self.actualizar_estado_periodico)
         self.timer.start(500)  # Actualizar cada 500ms
@@ -711,6 +1100,15 @@ class MainWindow(QMainWindow):
         self.tab_escape = EscapeTab(self.config)
         self.tabs.addTab(self.tab_escape, "Escape")
         
+        self.tab_perfilado = PerfiladoTab()
+        self.tabs.addTab(self.tab_perfilado, "Perfilado")
+        
+        self.tab_rendimiento = PanelRendimiento()
+        self.tabs.addTab(self.tab_rendimiento, "Rendimiento")
+        
+        self.tab_vista_ocr = PanelVistaPreviaOCR()
+        self.tabs.addTab(self.tab_vista_ocr, "Vista OCR")
+        
         layout.addWidget(self.tabs)
         
         # Botones inferiores
@@ -738,11 +1136,14 @@ class MainWindow(QMainWindow):
             # Obtener configuración actual desde la interfaz
             config = self.obtener_configuracion_desde_interfaz()
             
+            # Validar y publicar antes de escribir: un config.json inválido no se guarda
+            exito, mensaje = almacen.publicar(config, origen='GUI')
+            if not exito:
+                QMessageBox.critical(self, "Error", mensaje)
+                return
+            
             # Guardar en JSON
             if guardar_configuracion(config):
-                # Aplicar al módulo de configuración
-                aplicar_configuracion_a_modulo(config)
-                
                 # Actualizar la configuración local y recargar la interfaz
                 self.config = config
                 self.actualizar_interfaz_desde_config(config)
@@ -764,6 +1165,14 @@ class MainWindow(QMainWindow):
         self.tab_general.ocr_top.setValue(ocr_region.get('top_offset', 90))
         self.tab_general.ocr_width.setValue(ocr_region.get('width', 150))
         self.tab_general.ocr_height.setValue(ocr_region.get('height', 15))
+        self.tab_general.ocr_recortar.setChecked(ocr_region.get('recortar_texto', False))
+        self.tab_general.ocr_min_pixeles.setValue(ocr_region.get('min_pixeles_texto', 20))
+        self.tab_general.ocr_diccionario.setChecked(ocr_region.get('diccionario_nombres', False))
+        self.tab_general.ocr_plantilla.setText(ocr_region.get('plantilla', ''))
+        self.tab_general.ocr_plantilla_x.setValue(ocr_region.get('plantilla_offset_x', 0))
+        self.tab_general.ocr_plantilla_y.setValue(ocr_region.get('plantilla_offset_y', 0))
+        self.tab_general.ocr_umbral_plantilla.setValue(ocr_region.get('umbral_plantilla', 0.8))
+        self.tab_general.ocr_fallos.setValue(ocr_region.get('fallos_relocalizar', 20))
         self.tab_general.umbral.setValue(config.get('UMBRAL_SIMILITUD', 0.70))
         
         # Actualizar pestaña Mobs
@@ -809,6 +1218,7 @@ class MainWindow(QMainWindow):
         self.tab_autocuracion.vida_teclas.setText(teclas_str)
         self.tab_autocuracion.vida_intervalo_con.setValue(vida_config.get('intervalo_con', 1.0))
         self.tab_autocuracion.vida_intervalo_sin.setValue(vida_config.get('intervalo_sin', 0.5))
+        self.tab_autocuracion.cargar_campos_barra(self.tab_autocuracion.vida_barra, vida_config, 'vida')
         
         mana_config = autocuracion.get('mana', {})
         self.tab_autocuracion.mana_x.setValue(mana_config.get('x', 45))
@@ -816,12 +1226,18 @@ class MainWindow(QMainWindow):
         self.tab_autocuracion.mana_tecla.setText(mana_config.get('tecla', '9'))
         self.tab_autocuracion.mana_intervalo_con.setValue(mana_config.get('intervalo_con', 1.0))
         self.tab_autocuracion.mana_intervalo_sin.setValue(mana_config.get('intervalo_sin', 0.5))
+        self.tab_autocuracion.cargar_campos_barra(self.tab_autocuracion.mana_barra, mana_config, 'mana')
         
         # Actualizar pestaña Observador
         obs_config = config.get('OBSERVADOR_OBJETIVO', {})
         self.tab_observador.tecla_seleccionar.setText(obs_config.get('tecla_seleccionar', 'E'))
         self.tab_observador.timeout_drop.setValue(obs_config.get('timeout_drop', 3.0))
         self.tab_observador.intervalo_revision.setValue(obs_config.get('intervalo_revision', 0.1))
+        self.tab_observador.ventana_votos.setValue(obs_config.get('ventana_votos', 3))
+        for clave, cuadros, ms in (('entrar_mob', 1, 0), ('salir_mob', 3, 150)):
+            spin_cuadros, spin_ms = self.tab_observador.filtro_campos[clave]
+            spin_cuadros.setValue(obs_config.get(f'{clave}_cuadros', cuadros))
+            spin_ms.setValue(int(obs_config.get(f'{clave}_ms', ms)))
         
         # Actualizar pestaña Escape
         escape_mob = config.get('ESCAPE_MOB', {})
@@ -832,6 +1248,11 @@ class MainWindow(QMainWindow):
         self.tab_escape.punto_primero_y.setValue(punto_primero.get('y', 360))
         self.tab_escape.veces.setValue(escape_mob.get('veces', 1))
         self.tab_escape.duracion_total.setValue(escape_mob.get('duracion_total', 1.0))
+        self.tab_escape.auto_ajuste.setChecked(escape_mob.get('auto_ajuste', True))
+        self.tab_escape.ajuste_percentil.setValue(escape_mob.get('ajuste_percentil', 95.0))
+        self.tab_escape.ajuste_margen.setValue(escape_mob.get('ajuste_margen', 3.0))
+        self.tab_escape.ajuste_muestras.setValue(escape_mob.get('ajuste_muestras', 10))
+        self.tab_escape.ajuste_dias.setValue(int(escape_mob.get('ajuste_dias', 14)))
         
         self.tab_escape.lista_puntos.clear()
         puntos = escape_mob.get('puntos_clic', [])
@@ -872,6 +1293,7 @@ class MainWindow(QMainWindow):
                 self.btn_run_stop.setText("RUN")
                 self.btn_run_stop.setStyleSheet("background-color: #4CAF50; color: white; padding: 10px;")
                 self.status_label.setText("Estado: Detenido")
+                self.info_estado = None
             else:
                 QMessageBox.warning(self, "Error", mensaje)
         else:
@@ -879,13 +1301,17 @@ class MainWindow(QMainWindow):
             try:
                 config = self.obtener_configuracion_desde_interfaz()
                 
-                # Aplicar directamente al módulo de configuración (sin guardar en JSON)
-                aplicar_configuracion_a_modulo(config)
+                # Publicar como instantánea validada (sin guardar en JSON)
+                exito, mensaje = almacen.publicar(config, origen='GUI')
+                if not exito:
+                    QMessageBox.critical(self, "Error", mensaje)
+                    return
                 
                 # Actualizar configuración local
                 self.config = config
                 
                 # Iniciar el bot con los valores de la interfaz
+                self.tab_rendimiento.limpiar()
                 exito, mensaje = self.bot_controller.iniciar()
                 if exito:
                     self.btn_run_stop.setText("STOP")
@@ -897,30 +1323,42 @@ class MainWindow(QMainWindow):
                 QMessageBox.critical(self, "Error", f"Error al obtener configuración: {e}")
     
     def actualizar_estado(self, info: dict):
-        """Callback para actualizar el estado desde el bot."""
-        # Este método se llama desde el bot_controller
-        pass
+        """Recibe un cambio de objetivo (slot de PuenteBot.estado_cambiado)."""
+        self.info_estado = info
+        self._mostrar_estado()
     
     def actualizar_estado_periodico(self):
-        """Actualiza el estado periódicamente."""
-        if self.bot_controller.esta_ejecutando():
-            estado_info = self.bot_controller.obtener_estado()
-            tipo = estado_info['tipo'].upper()
-            nombre = estado_info['nombre']
-            tiempo = estado_info['tiempo']
-            similitud = estado_info['similitud']
-            
-            if tipo == 'mob':
-                emoji = "⚔️"
-                info_text = f"{emoji} {tipo}: {nombre} ({similitud:.0f}%) | Tiempo: {tiempo:.1f}s"
-            elif tipo == 'drop':
-                emoji = "🎁"
-                info_text = f"{emoji} {tipo}: {nombre} ({similitud:.0f}%) | Tiempo: {tiempo:.1f}s"
-            else:
-                emoji = "❓"
-                info_text = f"{emoji} {tipo}: {nombre} | Tiempo: {tiempo:.1f}s"
-            
-            self.info_label.setText(info_text)
+        """Refresca el contador de tiempo en estado y la pestaña de perfilado."""
+        self.tab_perfilado.actualizar()
+        self._mostrar_estado()
+    
+    def _mostrar_estado(self):
+        """Muestra el último estado recibido; el tiempo se calcula localmente."""
+        if not self.bot_controller.esta_ejecutando() or self.info_estado is None:
+            return
+        info = self.info_estado
+        tipo = info['tipo']
+        nombre = info['nombre']
+        tiempo = time.time() - info['timestamp_cambio']
+        similitud = info['similitud']
+        
+        if tipo == 'mob':
+            emoji = "⚔️"
+            info_text = f"{emoji} {tipo.upper()}: {nombre} ({similitud:.0f}%) | Tiempo: {tiempo:.1f}s"
+        elif tipo == 'drop':
+            emoji = "🎁"
+            info_text = f"{emoji} {tipo.upper()}: {nombre} ({similitud:.0f}%) | Tiempo: {tiempo:.1f}s"
+        else:
+            emoji = "❓"
+            info_text = f"{emoji} {tipo.upper()}: {nombre} | Tiempo: {tiempo:.1f}s"
+        
+        self.info_label.setText(info_text)
+
+
+def _ventana_visible():
+    """Marca el primer cuadro pintado y lanza la precarga de módulos pesados."""
+    carga_diferida.marcar('ventana visible')
+    carga_diferida.iniciar_precarga(al_terminar=carga_diferida.imprimir_informe)
 
 
 def main():
@@ -930,6 +1368,9 @@ def main():
     window = MainWindow()
     window.show()
     
+    # Se ejecuta cuando el loop de eventos ya pintó la ventana
+    QTimer.singleShot(0, _ventana_visible)
+    
     sys.exit(app.exec_())
 
 
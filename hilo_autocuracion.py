@@ -4,68 +4,19 @@ Monitorea la vida y el maná del personaje.
 Presiona las teclas de curación cuando están bajos.
 Se pausa cuando el estado indica que los hilos deben detenerse.
 """
-import ctypes
 import time
 import threading
-from typing import Tuple, List
+from typing import Tuple, List, Optional
 
-from estado_objetivo import estado, TipoObjetivo
-from configuracion import AUTOCURACION, VK_CODES
-
-# Cargar DLL de Windows
-user32 = ctypes.windll.user32
-
-
-class RECT(ctypes.Structure):
-    """Estructura para representar un rectángulo en Windows."""
-    _fields_ = [
-        ('left', ctypes.c_long),
-        ('top', ctypes.c_long),
-        ('right', ctypes.c_long),
-        ('bottom', ctypes.c_long)
-    ]
-
-
-# Constantes para mensajes de teclado
-WM_KEYDOWN = 0x0100
-WM_KEYUP = 0x0101
-
-
-# Colores válidos para vida (rojos)
-COLORES_VIDA = [
-    (255, 0, 0), (254, 0, 0), (253, 0, 0), (252, 0, 0), (251, 0, 0), (250, 0, 0),
-    (255, 1, 0), (255, 2, 0), (254, 1, 0), (253, 1, 0), (252, 1, 0),
-    (200, 0, 0), (180, 0, 0), (160, 0, 0), (140, 0, 0), (120, 0, 0), (100, 0, 0),
-    (255, 50, 0), (255, 40, 0), (255, 30, 0), (255, 20, 0), (255, 10, 0),
-    (80, 0, 0), (60, 0, 0),
-]
-
-# Colores válidos para maná (azules celestes de la barra del juego)
-# Solo colores claros y medios brillantes, sin oscuros que se acerquen al marrón
-COLORES_MANA = [
-    # Azules brillantes puros (parte clara de la barra - celestes)
-    (0, 0, 255), (0, 0, 254), (0, 0, 253), (0, 0, 252), (0, 0, 251), (0, 0, 250),
-    (10, 10, 255), (20, 20, 255), (30, 30, 255), (40, 40, 255), (50, 50, 255),
-    (60, 60, 255), (70, 70, 255), (80, 80, 255), (90, 90, 255), (100, 100, 255),
-    
-    # Azules medios brillantes (gradiente de la barra - celestes medios)
-    (0, 0, 240), (0, 0, 230), (0, 0, 220), (0, 0, 210), (0, 0, 200),
-    (10, 10, 240), (20, 20, 230), (30, 30, 220), (40, 40, 210), (50, 50, 200),
-    (0, 0, 190), (0, 0, 180), (0, 0, 170), (0, 0, 160), (0, 0, 150),
-    
-    # Azules con algo de verde (variaciones celestes)
-    (0, 20, 255), (0, 40, 255), (0, 60, 255), (0, 80, 255), (0, 100, 255),
-    (0, 20, 200), (0, 40, 200), (0, 60, 200), (0, 80, 200),
-    (0, 20, 150), (0, 40, 150), (0, 60, 150),
-    
-    # Azules con algo de rojo (posibles reflejos celestes)
-    (20, 0, 255), (40, 0, 255), (60, 0, 255), (80, 0, 255),
-    (20, 0, 200), (40, 0, 200), (60, 0, 200),
-    (20, 0, 150), (40, 0, 150),
-    
-    # Azules mixtos claros (R, G bajos, B alto - solo los más claros)
-    (30, 40, 255), (40, 50, 240), (50, 60, 220), (60, 70, 200),
-]
+from estado_objetivo import estado, EstadoObjetivo, TipoObjetivo
+from game_window import GameWindow
+from clasificador_color import obtener_tabla
+from lector_vitales import LectorVitales
+from captura_sondas import ServicioSondas, LecturaSondas
+from metricas import metricas
+from almacen_configuracion import almacen, AlmacenConfiguracion
+from config_compilada import RecursoCompilado
+from estadisticas_combate import obtener_registro
 
 
 class HiloAutocuracion:
@@ -74,126 +25,100 @@ class HiloAutocuracion:
     Presiona teclas de curación cuando están bajos.
     """
     
-    def __init__(self, hwnd: int):
+    def __init__(self, game_window: GameWindow, estado_objetivo: Optional[EstadoObjetivo] = None,
+                 almacen_config: Optional[AlmacenConfiguracion] = None):
         """
         Inicializa el monitor de autocuración.
         
         Args:
-            hwnd: Handle de la ventana del juego
+            game_window: Ventana del juego (handle y geometría en caché)
+            estado_objetivo: Estado del cliente (por defecto el estado global)
+            almacen_config: Configuración del cliente (por defecto el almacén global)
         """
-        self.hwnd = hwnd
+        self.game_window = game_window
+        self.hwnd = game_window.hwnd
+        self.backend = game_window.backend
+        # Estado y configuración del cliente (multicliente: uno por ventana)
+        self.estado = estado_objetivo or estado
+        self.almacen = almacen_config or almacen
         self.ejecutando = False
         self.thread_vida = None
         self.thread_mana = None
-        self.gdi32 = ctypes.windll.gdi32
+        # Tablas de colores compiladas (una lectura indexada por muestra)
+        self.tabla_vida = obtener_tabla('vida')
+        self.tabla_mana = obtener_tabla('mana')
+        self.lector = LectorVitales({'vida': self.tabla_vida, 'mana': self.tabla_mana})
+        # Una sola captura por tick para todas las sondas (vida, maná, barras)
+        self.sondas = ServicioSondas(self.backend, self._obtener_origen_ventana)
+        # Métricas
+        self._m_teclas = metricas.contador('bot_teclas_total', 'Teclas enviadas al juego por origen', origen='autocuracion',
+                                           espacio=self.estado.espacio)
+        self._m_iteraciones = {
+            recurso: metricas.contador('bot_hilo_iteraciones_total', 'Iteraciones del ciclo de cada hilo', hilo=recurso,
+                                       espacio=self.estado.espacio)
+            for recurso in ('vida', 'mana')
+        }
+        self._m_curaciones = {
+            recurso: metricas.contador('bot_curaciones_total', 'Veces que se disparó la curación por recurso', recurso=recurso)
+            for recurso in ('vida', 'mana')
+        }
+        # Nivel de cada recurso (tendencia en la GUI): % de la barra, o 100/0 con el píxel
+        self._m_nivel = {
+            recurso: metricas.medidor('bot_recurso_porcentaje', 'Nivel de vida y maná (%) por espacio de estado',
+                                      recurso=recurso, espacio=self.estado.espacio)
+            for recurso in ('vida', 'mana')
+        }
+        # Estadísticas de combate del cliente (pociones por episodio)
+        self.registro = obtener_registro(self.estado.espacio)
     
-    def _obtener_rect_ventana(self) -> RECT:
-        """Obtiene las coordenadas de la ventana."""
-        rect = RECT()
-        user32.GetWindowRect(self.hwnd, ctypes.byref(rect))
-        return rect
+    def _obtener_origen_ventana(self) -> Tuple[int, int]:
+        """Retorna (left, top) de la ventana, origen de las coordenadas relativas."""
+        geometria = self.game_window.geometria
+        return geometria.left, geometria.top
     
-    def _obtener_color_pixel(self, x_relativo: int, y_relativo: int) -> Tuple[int, int, int]:
+    def _leer_sonda(self, recurso: RecursoCompilado) -> LecturaSondas:
         """
-        Obtiene el color RGB de un píxel en coordenadas relativas a la ventana.
-        
-        Args:
-            x_relativo: Coordenada X relativa a la ventana
-            y_relativo: Coordenada Y relativa a la ventana
-            
-        Returns:
-            Tupla (R, G, B)
+        Define la sonda del recurso según la configuración y retorna la lectura
+        compartida de todas las sondas.
         """
-        rect = self._obtener_rect_ventana()
-        x_absoluto = rect.left + x_relativo
-        y_absoluto = rect.top + y_relativo
-        
-        hdc = user32.GetDC(0)
-        color = self.gdi32.GetPixel(hdc, x_absoluto, y_absoluto)
-        user32.ReleaseDC(0, hdc)
-        
-        r = color & 0xFF
-        g = (color >> 8) & 0xFF
-        b = (color >> 16) & 0xFF
-        
-        return r, g, b
+        self.sondas.definir(recurso.nombre, *recurso.sonda)
+        return self.sondas.leer()
     
-    def _colores_similares(self, color1: Tuple[int, int, int], 
-                          color2: Tuple[int, int, int], 
-                          tolerancia: int = 15) -> bool:
-        """Verifica si dos colores son similares."""
-        r1, g1, b1 = color1
-        r2, g2, b2 = color2
-        return (abs(r1 - r2) <= tolerancia and 
-                abs(g1 - g2) <= tolerancia and 
-                abs(b1 - b2) <= tolerancia)
+    def _presionar_vk(self, vk: int) -> None:
+        """Presiona una tecla (código VK ya resuelto) en la ventana del juego."""
+        self.backend.enviar_tecla(self.hwnd, vk)
+        self._m_teclas.inc()
     
-    def _presionar_tecla(self, tecla: str) -> None:
-        """Presiona una tecla en la ventana del juego."""
-        if tecla not in VK_CODES:
-            return
-        
-        vk_code = VK_CODES[tecla]
-        user32.PostMessageW(self.hwnd, WM_KEYDOWN, vk_code, 0)
-        time.sleep(0.05)
-        user32.PostMessageW(self.hwnd, WM_KEYUP, vk_code, 0)
+    def _tiene_vida(self, color: Tuple[int, int, int]) -> bool:
+        """Verifica si el color corresponde a la barra de vida."""
+        return self.tabla_vida.contiene(color)
     
-    def _tiene_vida(self, x: int, y: int) -> Tuple[bool, Tuple[int, int, int]]:
-        """
-        Verifica si hay vida en la posición indicada.
-        
-        Returns:
-            Tupla (tiene_vida, color_detectado)
-        """
-        color = self._obtener_color_pixel(x, y)
-        r, g, b = color
-        
-        # Verificar contra colores conocidos
-        for color_vida in COLORES_VIDA:
-            if self._colores_similares(color, color_vida):
-                return True, color
-        
-        # Verificar si el rojo es dominante
-        if r > 50 and r > (g + 30) and r > (b + 30):
-            return True, color
-        
-        return False, color
+    def _tiene_mana(self, color: Tuple[int, int, int]) -> bool:
+        """Verifica si el color corresponde a la barra de maná (azules celestes)."""
+        return self.tabla_mana.contiene(color)
     
-    def _tiene_mana(self, x: int, y: int) -> Tuple[bool, Tuple[int, int, int]]:
+    def _evaluar_recurso(self, recurso: RecursoCompilado) -> Tuple[bool, str]:
         """
-        Verifica si hay maná en la posición indicada.
-        Detecta azules de la barra de maná del juego.
+        Decide si el recurso está por encima del nivel de curación.
+        Con barra configurada mide el porcentaje y lo compara con el umbral
+        (distinto en combate y fuera de combate); si no, usa el píxel (x, y).
         
         Returns:
-            Tupla (tiene_mana, color_detectado)
+            Tupla (hay_suficiente, detalle para el log)
         """
-        color = self._obtener_color_pixel(x, y)
-        r, g, b = color
-        
-        # Verificar contra colores conocidos
-        for color_mana in COLORES_MANA:
-            if self._colores_similares(color, color_mana):
-                return True, color
-        
-        # REGLA PRINCIPAL: El azul es el componente dominante (solo colores claros/celestes)
-        # La barra de maná tiene B mucho mayor que R y G, y debe ser suficientemente brillante
-        if b >= 150:  # Solo azules claros/celestes, no oscuros
-            # Si el azul es significativamente mayor que rojo y verde
-            if b > r and b > g:
-                # Y la diferencia es notable (al menos 20 puntos más que el mayor de R,G)
-                max_rg = max(r, g)
-                if b > (max_rg + 20):
-                    return True, color
+        lectura = self._leer_sonda(recurso)
+        nombre = recurso.nombre
         
-        # REGLA SECUNDARIA: Azul alto aunque R y G también tengan algo (solo celestes claros)
-        # Para azules como (50, 50, 200) o (80, 80, 255) - solo si son suficientemente brillantes
-        if b >= 150 and b >= r and b >= g:
-            # El azul debe ser al menos 1.5 veces el promedio de R y G
-            promedio_rg = (r + g) / 2
-            if promedio_rg == 0 or b >= (promedio_rg * 1.5):
-                return True, color
+        if recurso.usa_barra:
+            porcentaje = self.lector.porcentaje(nombre, lectura.franja(nombre))
+            umbral = recurso.umbral(self.estado.tipo == TipoObjetivo.MOB)
+            self._m_nivel[nombre].fijar(porcentaje)
+            return porcentaje >= umbral, f"{porcentaje:.0f}% < {umbral:.0f}%"
         
-        return False, color
+        color = lectura.color(nombre)
+        tiene = self._tiene_vida(color) if nombre == 'vida' else self._tiene_mana(color)
+        self._m_nivel[nombre].fijar(100.0 if tiene else 0.0)
+        return tiene, f"Color: RGB{color}"
     
     def _ciclo_vida(self) -> None:
         """Ciclo de monitoreo de vida."""
@@ -201,28 +126,28 @@ class HiloAutocuracion:
         contador = 0
         
         while self.ejecutando:
-            # Leer configuración dinámicamente desde el módulo
-            config = AUTOCURACION['vida']
+            # Configuración compilada vigente (cambia en caliente)
+            config = self.almacen.actual.compilada.vida
             
             # Verificar si este hilo está activo
-            if not estado.hilo_activo('autocuracion'):
+            if not self.estado.hilo_activo('autocuracion'):
                 time.sleep(0.1)
                 continue
             
-            tiene_vida, color = self._tiene_vida(config['x'], config['y'])
+            tiene_vida, detalle = self._evaluar_recurso(config)
             contador += 1
+            self._m_iteraciones['vida'].inc()
             
             if tiene_vida:
-                time.sleep(config['intervalo_con'])
+                time.sleep(config.intervalo_con)
             else:
-                # Obtener tipo una vez antes del loop
-                tipo_actual = estado.tipo
-                print(f"[VIDA] Sin vida | Color: RGB{color} | Presionando '{config['tecla']}'")
-                for tecla in config['tecla']:
-                    if tipo_actual != TipoObjetivo.MOB and tecla != '0':
-                        continue
-                    self._presionar_tecla(tecla)
-                time.sleep(config['intervalo_sin'])
+                self._m_curaciones['vida'].inc()
+                self.registro.anotar('vida')
+                print(f"[VIDA] Sin vida | {detalle} | Presionando '{config.tecla_texto}'")
+                # Fuera de combate solo la tecla '0' (resuelto al compilar)
+                for vk in config.teclas(self.estado.tipo == TipoObjetivo.MOB):
+                    self._presionar_vk(vk)
+                time.sleep(config.intervalo_sin)
         
         print("[AUTOCURACIÓN] Hilo de vida detenido")
     
@@ -232,23 +157,27 @@ class HiloAutocuracion:
         contador = 0
         
         while self.ejecutando:
-            # Leer configuración dinámicamente desde el módulo
-            config = AUTOCURACION['mana']
+            # Configuración compilada vigente (cambia en caliente)
+            config = self.almacen.actual.compilada.mana
             
             # Verificar si este hilo está activo
-            if not estado.hilo_activo('autocuracion'):
+            if not self.estado.hilo_activo('autocuracion'):
                 time.sleep(0.1)
                 continue
             
-            tiene_mana, color = self._tiene_mana(config['x'], config['y'])
+            tiene_mana, detalle = self._evaluar_recurso(config)
             contador += 1
+            self._m_iteraciones['mana'].inc()
             
             if tiene_mana:
-                time.sleep(config['intervalo_con'])
+                time.sleep(config.intervalo_con)
             else:
-                print(f"[MANÁ] Sin maná | Color: RGB{color} | Presionando '{config['tecla']}'")
-                self._presionar_tecla(config['tecla'])
-                time.sleep(config['intervalo_sin'])
+                self._m_curaciones['mana'].inc()
+                self.registro.anotar('mana')
+                print(f"[MANÁ] Sin maná | {detalle} | Presionando '{config.tecla_texto}'")
+                for vk in config.vk_combate:
+                    self._presionar_vk(vk)
+                time.sleep(config.intervalo_sin)
         
         print("[AUTOCURACIÓN] Hilo de maná detenido")
     
@@ -260,11 +189,11 @@ class HiloAutocuracion:
         self.ejecutando = True
         
         # Hilo para vida
-        self.thread_vida = threading.Thread(target=self._ciclo_vida, daemon=True)
+        self.thread_vida = threading.Thread(target=self._ciclo_vida, name=f'vida:{self.estado.espacio}', daemon=True)
         self.thread_vida.start()
         
         # Hilo para maná
-        self.thread_mana = threading.Thread(target=self._ciclo_mana, daemon=True)
+        self.thread_mana = threading.Thread(target=self._ciclo_mana, name=f'mana:{self.estado.espacio}', daemon=True)
         self.thread_mana.start()
     
     def detener(self) -> None:
@@ -279,9 +208,14 @@ class HiloAutocuracion:
         """Muestra la configuración actual de autocuración."""
         print("\n[CONFIGURACIÓN DE AUTOCURACIÓN]")
         print("-" * 50)
-        for recurso, config in AUTOCURACION.items():
+        for recurso, config in self.almacen.actual.AUTOCURACION.items():
             print(f"  {recurso.upper()}:")
             print(f"    Posición: ({config['x']}, {config['y']})")
+            if LectorVitales.usa_barra(config):
+                barra = config['barra']
+                print(f"    Barra: x {barra['x_inicio']}-{barra['x_fin']}, y {barra['y']}")
+                print(f"    Umbral: {LectorVitales.umbral(config, True):.0f}% en combate, "
+                      f"{LectorVitales.umbral(config, False):.0f}% fuera de combate")
             print(f"    Tecla: '{config['tecla']}'")
             print(f"    Intervalo con recurso: {config['intervalo_con']}s")
             print(f"    Intervalo sin recurso: {config['intervalo_sin']}s")
@@ -306,7 +240,7 @@ if __name__ == "__main__":
         print(f"[OK] Ventana encontrada (Handle: {game_window.hwnd})")
         
         # Crear e iniciar hilo
-        hilo = HiloAutocuracion(game_window.hwnd)
+        hilo = HiloAutocuracion(game_window)
         hilo.mostrar_configuracion()
         
         print("\n[INFO] Iniciando hilos de autocuración...")
@@ -6,42 +6,34 @@ También ejecuta:
 - Secuencia de loot cuando un mob muere
 - Secuencia de escape cuando un mob está trabado (> 15 segundos)
 """
-import ctypes
 import time
 import threading
-import mss
 import pytesseract
 import cv2
 import numpy as np
-from difflib import SequenceMatcher
+from typing import Optional, Tuple
 
-from estado_objetivo import estado, TipoObjetivo
-from configuracion import (
-    TESSERACT_PATH, OCR_REGION, UMBRAL_SIMILITUD,
-    MOBS_OBJETIVO, DROP_ITEMS_OBJETIVO, VK_CODES
-)
+from estado_objetivo import estado, EstadoObjetivo, TipoObjetivo
+from game_window import GameWindow
+from metricas import metricas
+from almacen_configuracion import almacen, AlmacenConfiguracion
+from config_compilada import IndiceNombres
+from vista_previa_ocr import CuadroOCR, obtener_buffer
+from localizador_region import LocalizadorRegion, recortar_al_texto
+from reconocedor_glifos import cargar_reconocedor
+from diccionario_tesseract import CONFIG_BASE, config_para
+from filtro_clasificacion import FiltroClasificacion
 
-# Configurar Tesseract (se actualizará dinámicamente)
-def _configurar_tesseract():
-    """Configura Tesseract con la ruta actual del módulo."""
-    import configuracion
-    pytesseract.pytesseract.tesseract_cmd = configuracion.TESSERACT_PATH
-
-_configurar_tesseract()
+# Brillo a partir del cual un píxel es texto (binarización y recorte al texto)
+UMBRAL_BINARIZACION = 150
 
-# Constantes para mensajes de teclado
-WM_KEYDOWN = 0x0100
-WM_KEYUP = 0x0101
+# Límites del histograma de píxeles que recibe el OCR (región 160x15 escalada 2x = 9600)
+LIMITES_PIXELES = (500, 1000, 2000, 3000, 4000, 6000, 8000, 10000, 20000, 40000)
 
-
-class RECT(ctypes.Structure):
-    """Estructura para representar un rectángulo en Windows."""
-    _fields_ = [
-        ('left', ctypes.c_long),
-        ('top', ctypes.c_long),
-        ('right', ctypes.c_long),
-        ('bottom', ctypes.c_long)
-    ]
+# Configurar Tesseract (se actualizará dinámicamente)
+def _configurar_tesseract():
+    """Configura Tesseract con la ruta de la configuración vigente."""
+    pytesseract.pytesseract.tesseract_cmd = almacen.actual.TESSERACT_PATH
 
 
 class HiloDetectorOCR:
@@ -50,160 +42,242 @@ class HiloDetectorOCR:
     Actualiza el estado global constantemente.
     """
     
-    def __init__(self, hwnd: int):
+    def __init__(self, game_window: GameWindow, estado_objetivo: Optional[EstadoObjetivo] = None,
+                 almacen_config: Optional[AlmacenConfiguracion] = None):
         """
         Inicializa el detector OCR.
         
         Args:
-            hwnd: Handle de la ventana del juego
+            game_window: Ventana del juego (handle y geometría en caché)
+            estado_objetivo: Estado del cliente (por defecto el estado global)
+            almacen_config: Configuración del cliente (por defecto el almacén global)
         """
-        self.hwnd = hwnd
+        self.game_window = game_window
+        self.hwnd = game_window.hwnd
+        self.backend = game_window.backend
+        # Estado y configuración del cliente (multicliente: uno por ventana)
+        self.estado = estado_objetivo or estado
+        self.almacen = almacen_config or almacen
         self.ejecutando = False
         self.thread = None
-        self.user32 = ctypes.windll.user32
         self.intervalo = 0.01  # 1000ms entre capturas
+        # Ruta de Tesseract al crear el detector (no al importar el módulo)
+        _configurar_tesseract()
         
-    def _obtener_rect_ventana(self) -> RECT:
-        """Obtiene las coordenadas de la ventana."""
-        rect = RECT()
-        self.user32.GetWindowRect(self.hwnd, ctypes.byref(rect))
-        return rect
+        # Métricas (series obtenidas una vez; inc/observar en el ciclo)
+        self._m_iteraciones = metricas.contador('bot_hilo_iteraciones_total', 'Iteraciones del ciclo de cada hilo', hilo='detector',
+                                                espacio=self.estado.espacio)
+        self._m_cuadros = metricas.contador('bot_ocr_cuadros_total', 'Cuadros procesados por el detector OCR',
+                                            espacio=self.estado.espacio)
+        self._m_latencia = {
+            etapa: metricas.histograma('bot_ocr_latencia_segundos', 'Latencia por etapa del detector OCR', etapa=etapa)
+            for etapa in ('captura', 'ocr', 'clasificacion')
+        }
+        self._m_evitados = metricas.contador('bot_ocr_evitados_total', 'Llamadas al OCR evitadas por placa vacía')
+        self._m_pixeles = metricas.histograma('bot_ocr_pixeles', 'Píxeles de la imagen que recibe el OCR',
+                                              limites=LIMITES_PIXELES)
+        # Vista previa de depuración (la GUI la activa; cerrada no cuesta nada)
+        self.vista_previa = obtener_buffer(self.estado.espacio)
+        # Región OCR fija o ubicada por la plantilla del marco del objetivo
+        self.localizador = LocalizadorRegion(game_window)
+        # Tabla de glifos de la fuente del juego (None = solo Tesseract)
+        self.glifos = cargar_reconocedor()
+        self._m_motor = {
+            motor: metricas.contador('bot_ocr_motor_total', 'Placas leídas por cada motor de OCR', motor=motor)
+            for motor in ('glifos', 'tesseract')
+        }
+        # Votación e histéresis antes de publicar la clasificación en el estado
+        self.filtro = FiltroClasificacion()
     
     def _capturar_region_objetivo(self) -> np.ndarray:
         """
         Captura la región de la ventana donde aparece la información del objetivo.
         Devuelve una imagen en formato numpy (OpenCV).
         """
-        # Leer configuración dinámicamente desde el módulo
-        import configuracion
-        ocr_region = configuracion.OCR_REGION
-        
-        rect = self._obtener_rect_ventana()
+        # Región de la configuración compilada vigente (o la ubicada por la plantilla)
+        izquierda, arriba, ancho, alto = self.localizador.region(self.almacen.actual.compilada)
         
-        region = {
-            "left": rect.left + ocr_region["left_offset"],
-            "top": rect.top + ocr_region["top_offset"],
-            "width": ocr_region["width"],
-            "height": ocr_region["height"]
-        }
+        # Geometría en caché (sin GetWindowRect por captura)
+        rect = self.game_window.geometria
         
-        with mss.mss() as sct:
-            screenshot = sct.grab(region)
-            # Convertir directamente a array numpy (BGRA)
-            img = np.array(screenshot)
-            
-            # [DEBUG] Guardar la imagen capturada cruda
-            # cv2.imwrite("debug_captura_raw.png", img)
+        # Captura BGRA a través del backend (mss reutilizado por hilo en Windows)
+        img = self.backend.capturar(
+            rect.left + izquierda,
+            rect.top + arriba,
+            ancho,
+            alto
+        )
         
         return img
     
     def _procesar_imagen_para_ocr(self, imagen: np.ndarray) -> np.ndarray:
         """
         Preprocesa la imagen con OpenCV para mejorar la detección OCR.
-        Pipeline: Escala de grises -> Resize 2x -> Binarización.
+        Pipeline: Escala de grises -> Recorte al texto -> Resize 2x -> Binarización.
         """
+        return self._binarizar(self._escala_grises(imagen))
+    
+    def _escala_grises(self, imagen: np.ndarray) -> np.ndarray:
+        """Captura BGRA a escala de grises, recortada al texto si está configurado."""
         # 1. Convertir BGRA a Escala de Grises
         gris = cv2.cvtColor(imagen, cv2.COLOR_BGRA2GRAY)
         
+        # 1b. Recortar al rectángulo del texto (Tesseract procesa menos píxeles)
+        if self.almacen.actual.compilada.recortar_texto:
+            gris = recortar_al_texto(gris, UMBRAL_BINARIZACION)
+        return gris
+    
+    def _binarizar(self, gris: np.ndarray) -> np.ndarray:
+        """Escala 2x y binariza la imagen en grises (lo que recibe Tesseract)."""
         # 2. Escalar 2x (Tesseract funciona mejor con texto más grande)
         # Usamos interpolación CUBIC para mantener bordes suaves pero definidos
         escalada = cv2.resize(gris, None, fx=2, fy=2, interpolation=cv2.INTER_CUBIC)
         
         # 3. Binarización (Texto blanco sobre fondo negro)
-        # Aplicamos un umbral fijo. Ajustar '150' si el texto no se detecta bien.
-        # Todo lo que sea más brillante que 150 se vuelve blanco (255), lo demás negro (0).
-        _, binaria = cv2.threshold(escalada, 150, 255, cv2.THRESH_BINARY)
+        # Aplicamos un umbral fijo. Ajustar UMBRAL_BINARIZACION si el texto no se detecta bien.
+        # Todo lo que sea más brillante que el umbral se vuelve blanco (255), lo demás negro (0).
+        _, binaria = cv2.threshold(escalada, UMBRAL_BINARIZACION, 255, cv2.THRESH_BINARY)
         
         return binaria
     
-    def _extraer_texto(self, imagen: np.ndarray) -> str:
-        """Usa OCR para extraer el texto de la imagen procesada."""
-        imagen_procesada = self._procesar_imagen_para_ocr(imagen)
+    def _leer_texto(self, gris: np.ndarray, binaria: np.ndarray) -> Tuple[str, float]:
+        """
+        Lee la placa con la tabla de glifos; si hay glifos desconocidos (o no
+        hay tabla), con Tesseract sobre la imagen binarizada.
         
-        # [DEBUG] Guardar imagen procesada (lo que ve el OCR)
-        # cv2.imwrite("debug_captura_proc.png", imagen_procesada)
+        Returns:
+            tuple: (texto, confianza 0-1)
+        """
+        if self.glifos is not None:
+            texto, confianza = self.glifos.reconocer(gris)
+            if texto is not None:
+                self._m_motor['glifos'].inc()
+                return texto, confianza
+        self._m_motor['tesseract'].inc()
+        return self._reconocer_texto(binaria)
+    
+    def _placa_vacia(self, binaria: np.ndarray) -> bool:
+        """
+        True si la imagen binarizada no tiene suficientes píxeles de texto.
+        Sin objetivo la placa queda en negro: el OCR solo devolvería "".
+        """
+        return np.count_nonzero(binaria) < self.almacen.actual.compilada.min_pixeles_texto
+    
+    def _reconocer_texto(self, imagen_procesada: np.ndarray) -> Tuple[str, float]:
+        """
+        Ejecuta Tesseract sobre una imagen ya preprocesada.
         
+        Returns:
+            tuple: (texto, confianza media de las palabras 0-1)
+        """
         # Configuración optimizada:
         # --psm 7: Tratar imagen como una sola línea de texto.
-        # -c tessedit_char_whitelist: Solo permitir letras, números, espacios y paréntesis.
-        config_tesseract = '--psm 7 --oem 3 -l eng'
-        texto = pytesseract.image_to_string(imagen_procesada, config=config_tesseract)
-        return texto.strip()
+        # --user-words / -c tessedit_char_whitelist: palabras y caracteres de los
+        # nombres configurados (se regeneran cuando cambian las listas).
+        compilada = self.almacen.actual.compilada
+        if compilada.diccionario_nombres:
+            config_tesseract = config_para(compilada.mobs, compilada.drops)
+        else:
+            config_tesseract = CONFIG_BASE
+        # image_to_data: la misma lectura que image_to_string, con confianza por palabra
+        datos = pytesseract.image_to_data(imagen_procesada, config=config_tesseract,
+                                          output_type=pytesseract.Output.DICT)
+        lineas = {}
+        confianzas = []
+        for palabra, confianza, bloque, parrafo, linea in zip(
+                datos['text'], datos['conf'], datos['block_num'], datos['par_num'], datos['line_num']):
+            confianza = float(confianza)
+            # Confianza -1: filas de estructura (página, bloque, línea), no palabras
+            if confianza < 0 or not palabra.strip():
+                continue
+            lineas.setdefault((bloque, parrafo, linea), []).append(palabra.strip())
+            confianzas.append(confianza)
+        texto = '\n'.join(' '.join(palabras) for palabras in lineas.values())
+        return texto, (sum(confianzas) / len(confianzas) / 100.0 if confianzas else 0.0)
     
-    def _calcular_similitud(self, texto1: str, texto2: str) -> float:
-        """Calcula la similitud entre dos cadenas de texto."""
-        if not texto1 or not texto2:
-            return 0
-        return SequenceMatcher(None, texto1.lower(), texto2.lower()).ratio()
+    @staticmethod
+    def _primera_linea(texto: str) -> str:
+        """Retorna la primera línea del texto OCR (nombre del objetivo)."""
+        lineas = texto.split('\n')
+        return lineas[0].strip() if lineas else ""
     
-    def _buscar_en_lista(self, nombre_detectado: str, lista: list) -> tuple:
+    def _buscar_en_lista(self, nombre_detectado: str, indice: IndiceNombres) -> tuple:
         """
-        Busca el mejor match en una lista.
+        Busca el mejor match en un índice de nombres de la configuración compilada.
         
         Args:
             nombre_detectado: Nombre capturado por OCR
-            lista: Lista de nombres a comparar
+            indice: Índice de nombres a comparar (compilada.mobs o compilada.drops)
             
         Returns:
             tuple: (nombre_encontrado, similitud) o (None, 0)
         """
-        # Leer umbral dinámicamente desde el módulo
-        import configuracion
-        umbral = configuracion.UMBRAL_SIMILITUD
-        
-        if not nombre_detectado:
-            return None, 0
-        
-        mejor_match = None
-        mejor_similitud = 0
-        nombre_limpio = nombre_detectado.strip()
-        
-        for item in lista:
-            similitud = self._calcular_similitud(nombre_limpio, item)
-            if similitud > mejor_similitud:
-                mejor_similitud = similitud
-                mejor_match = item
-        
-        if mejor_similitud >= umbral:
-            return mejor_match, mejor_similitud
-        
-        return None, mejor_similitud
+        # Umbral de la instantánea vigente
+        return indice.buscar(nombre_detectado, self.almacen.actual.compilada.umbral)
     
     # ============================================================
     # Clasificación de objetivo
     # ============================================================
     
-    def _clasificar_objetivo(self, texto_detectado: str) -> None:
+    def _clasificar_texto(self, texto_detectado: str) -> Tuple[TipoObjetivo, Optional[str], float]:
         """
-        Clasifica el objetivo y actualiza el estado global.
+        Clasifica el texto detectado sin tocar el estado global.
         
         Args:
             texto_detectado: Texto extraído por OCR
+            
+        Returns:
+            tuple: (tipo, nombre_coincidente, similitud)
         """
-        # Leer listas dinámicamente desde el módulo
-        import configuracion
-        mobs_objetivo = configuracion.MOBS_OBJETIVO
-        drop_items_objetivo = configuracion.DROP_ITEMS_OBJETIVO
+        # Índices de la configuración compilada vigente (una sola lectura para ambos)
+        compilada = self.almacen.actual.compilada
         
         # Si el texto está vacío -> NULO
         if not texto_detectado or texto_detectado.strip() == "":
-            estado.establecer_nulo()
-            return
+            return TipoObjetivo.NULO, None, 0
         
         # Buscar en la lista de mobs
-        mob_encontrado, similitud_mob = self._buscar_en_lista(texto_detectado, mobs_objetivo)
+        mob_encontrado, similitud_mob = compilada.mobs.buscar(texto_detectado, compilada.umbral)
         if mob_encontrado:
-            estado.establecer_mob(texto_detectado, mob_encontrado, similitud_mob)
-            return
+            return TipoObjetivo.MOB, mob_encontrado, similitud_mob
         
         # Buscar en la lista de drops
-        drop_encontrado, similitud_drop = self._buscar_en_lista(texto_detectado, drop_items_objetivo)
+        drop_encontrado, similitud_drop = compilada.drops.buscar(texto_detectado, compilada.umbral)
         if drop_encontrado:
-            estado.establecer_drop(texto_detectado, drop_encontrado, similitud_drop)
-            return
+            return TipoObjetivo.DROP, drop_encontrado, similitud_drop
         
         # No coincide con nada -> NULO (objetivo desconocido)
-        estado.establecer_nulo()
+        return TipoObjetivo.NULO, None, 0
+    
+    def _confirmar_clasificacion(self, texto_detectado: str, tipo: TipoObjetivo, nombre: Optional[str],
+                                 similitud: float, confianza: float,
+                                 ahora: Optional[float] = None) -> Tuple[str, TipoObjetivo, Optional[str], float]:
+        """
+        Pasa la clasificación de un cuadro por el filtro de votación e histéresis.
+        
+        Args:
+            confianza: Confianza del OCR del cuadro (0-1)
+            ahora: Instante del cuadro (por defecto time.perf_counter())
+            
+        Returns:
+            tuple: (texto, tipo, nombre_coincidente, similitud) a publicar
+        """
+        if self.filtro is None:
+            return texto_detectado, tipo, nombre, similitud
+        if ahora is None:
+            ahora = time.perf_counter()
+        return self.filtro.observar((texto_detectado, tipo, nombre, similitud), confianza, ahora,
+                                    self.almacen.actual.compilada.filtro)
+    
+    def _aplicar_clasificacion(self, texto_detectado: str, tipo: TipoObjetivo,
+                               nombre: Optional[str], similitud: float) -> None:
+        """Publica en el estado global el resultado de _clasificar_texto."""
+        if tipo == TipoObjetivo.MOB:
+            self.estado.establecer_mob(texto_detectado, nombre, similitud)
+        elif tipo == TipoObjetivo.DROP:
+            self.estado.establecer_drop(texto_detectado, nombre, similitud)
+        else:
+            self.estado.establecer_nulo()
     
     def _ciclo_deteccion(self) -> None:
         """Ciclo principal del hilo detector."""
@@ -211,28 +285,58 @@ class HiloDetectorOCR:
         
         while self.ejecutando:
             # Verificar si este hilo está activo
-            if not estado.hilo_activo('detector_ocr'):
+            if not self.estado.hilo_activo('detector_ocr'):
                 time.sleep(0.1)
                 continue
             
+            self._m_iteraciones.inc()
             try:
                 # Actualizar configuración de Tesseract por si cambió
-                import configuracion
-                pytesseract.pytesseract.tesseract_cmd = configuracion.TESSERACT_PATH
+                _configurar_tesseract()
                 
                 # 2. Capturar la región del objetivo
+                t0 = time.perf_counter()
                 captura = self._capturar_region_objetivo()
+                t1 = time.perf_counter()
                 
-                # 3. Extraer texto con OCR
-                texto = self._extraer_texto(captura)
+                # 3. Extraer texto con OCR (placa vacía: NULO sin llamar a Tesseract)
+                gris = self._escala_grises(captura)
+                binaria = self._binarizar(gris)
+                vacia = self._placa_vacia(binaria)
+                if vacia:
+                    texto, confianza = "", 1.0
+                    self._m_evitados.inc()
+                else:
+                    texto, confianza = self._leer_texto(gris, binaria)
+                    self._m_pixeles.observar(binaria.size)
+                t2 = time.perf_counter()
                 print("texto escaneado: ", texto)
                 
                 # 4. Obtener primera línea (nombre del objetivo)
-                lineas = texto.split('\n')
-                nombre = lineas[0].strip() if lineas else ""
+                nombre = self._primera_linea(texto)
+                
+                # 5. Clasificar, filtrar (votación e histéresis) y actualizar estado
+                tipo, coincidente, similitud = self._clasificar_texto(nombre)
+                self._aplicar_clasificacion(*self._confirmar_clasificacion(
+                    nombre, tipo, coincidente, similitud, confianza, t2
+                ))
+                t3 = time.perf_counter()
+                
+                # Cuadros seguidos con texto sin clasificar: la región pudo moverse
+                # (placa vacía: no hay objetivo, no cuenta para el localizador)
+                if not vacia:
+                    self.localizador.registrar(tipo == TipoObjetivo.NULO, self.almacen.actual.compilada)
+                
+                # Vista previa: solo referencias, la GUI copia al mostrar
+                if self.vista_previa.activo:
+                    self.vista_previa.publicar(CuadroOCR(
+                        captura, binaria, texto, nombre, tipo.value, coincidente, similitud, t3 - t0
+                    ))
                 
-                # 5. Clasificar y actualizar estado
-                self._clasificar_objetivo(nombre)
+                self._m_cuadros.inc()
+                self._m_latencia['captura'].observar(t1 - t0)
+                self._m_latencia['ocr'].observar(t2 - t1)
+                self._m_latencia['clasificacion'].observar(t3 - t2)
 
             except Exception as e:
                 print(f"[DETECTOR OCR] Error: {e}")
@@ -247,7 +351,7 @@ class HiloDetectorOCR:
             return
         
         self.ejecutando = True
-        self.thread = threading.Thread(target=self._ciclo_deteccion, daemon=True)
+        self.thread = threading.Thread(target=self._ciclo_deteccion, name=f'detector:{self.estado.espacio}', daemon=True)
         self.thread.start()
     
     def detener(self) -> None:
@@ -262,7 +366,7 @@ class HiloDetectorOCR:
 # ============================================================
 if __name__ == "__main__":
     from game_window import GameWindow
-    from configuracion import GAME_WINDOW_TITLE
+    from configuracion import GAME_WINDOW_TITLE, MOBS_OBJETIVO, DROP_ITEMS_OBJETIVO, UMBRAL_SIMILITUD
     
     try:
         print("=" * 60)
@@ -288,7 +392,7 @@ if __name__ == "__main__":
         print("[INFO] Presiona Ctrl+C para detener")
         print("-" * 60)
         
-        detector = HiloDetectorOCR(game_window.hwnd)
+        detector = HiloDetectorOCR(game_window)
         detector.iniciar()
         
         # Mantener corriendo
@@ -4,19 +4,15 @@ Presiona las teclas de habilidades cuando el objetivo es MOB o DROP.
 Trabaja en paralelo observando el estado global.
 Se pausa cuando el estado indica que los hilos deben detenerse.
 """
-import ctypes
 import time
 import threading
+from typing import Optional
 
-from estado_objetivo import estado, TipoObjetivo
-from configuracion import HABILIDADES, VK_CODES
-
-# Cargar DLL de Windows
-user32 = ctypes.windll.user32
-
-# Constantes para mensajes de teclado
-WM_KEYDOWN = 0x0100
-WM_KEYUP = 0x0101
+from estado_objetivo import estado, EstadoObjetivo, TipoObjetivo
+from game_window import GameWindow
+from metricas import metricas
+from almacen_configuracion import almacen, AlmacenConfiguracion
+from config_compilada import ConfigCompilada, HabilidadCompilada
 
 
 class HiloHabilidades:
@@ -25,65 +21,59 @@ class HiloHabilidades:
     Solo actúa cuando el objetivo es MOB o DROP.
     """
     
-    def __init__(self, hwnd: int):
+    def __init__(self, game_window: GameWindow, estado_objetivo: Optional[EstadoObjetivo] = None,
+                 almacen_config: Optional[AlmacenConfiguracion] = None):
         """
         Inicializa el disparador de habilidades.
         
         Args:
-            hwnd: Handle de la ventana del juego
+            game_window: Ventana del juego (handle y geometría en caché)
+            estado_objetivo: Estado del cliente (por defecto el estado global)
+            almacen_config: Configuración del cliente (por defecto el almacén global)
         """
-        self.hwnd = hwnd
+        self.game_window = game_window
+        self.hwnd = game_window.hwnd
+        self.backend = game_window.backend
+        # Estado y configuración del cliente (multicliente: uno por ventana)
+        self.estado = estado_objetivo or estado
+        self.almacen = almacen_config or almacen
         self.ejecutando = False
         self.thread = None
         # Tiempo del último uso de cada habilidad
-        self.ultimo_uso = {tecla: 0 for tecla in HABILIDADES.keys()}
+        self.ultimo_uso = {tecla: 0 for tecla in self.almacen.actual.HABILIDADES.keys()}
+        # Métricas
+        self._m_teclas = metricas.contador('bot_teclas_total', 'Teclas enviadas al juego por origen', origen='habilidades',
+                                           espacio=self.estado.espacio)
+        self._m_iteraciones = metricas.contador('bot_hilo_iteraciones_total', 'Iteraciones del ciclo de cada hilo', hilo='habilidades',
+                                                espacio=self.estado.espacio)
     
-    def _presionar_tecla(self, tecla: str) -> None:
-        """Presiona una tecla en la ventana del juego."""
-        if tecla not in VK_CODES:
-            return
-        
-        vk_code = VK_CODES[tecla]
-        user32.PostMessageW(self.hwnd, WM_KEYDOWN, vk_code, 0)
-        time.sleep(0.05)
-        user32.PostMessageW(self.hwnd, WM_KEYUP, vk_code, 0)
+    def _presionar_vk(self, vk: int) -> None:
+        """Presiona una tecla (código VK ya resuelto) en la ventana del juego."""
+        self.backend.enviar_tecla(self.hwnd, vk)
+        self._m_teclas.inc()
     
-    def _habilidad_lista(self, tecla: str) -> bool:
+    def _habilidad_lista(self, habilidad: HabilidadCompilada) -> bool:
         """
         Verifica si una habilidad está lista para usar.
         
         Args:
-            tecla: Tecla de la habilidad
+            habilidad: Habilidad activa de la configuración compilada
             
         Returns:
             True si pasó suficiente tiempo desde el último uso
         """
-        # Leer configuración dinámicamente desde el módulo
-        import configuracion
-        habilidades = configuracion.HABILIDADES
-        
-        config = habilidades.get(tecla)
-        if not config or not config['active']:
-            return False
-        
-        # Asegurar que la tecla existe en el diccionario de último uso
-        if tecla not in self.ultimo_uso:
-            self.ultimo_uso[tecla] = 0
-        
-        tiempo_actual = time.time()
-        tiempo_desde_uso = tiempo_actual - self.ultimo_uso[tecla]
-        
-        return tiempo_desde_uso >= config['time']
+        tiempo_desde_uso = time.time() - self.ultimo_uso.get(habilidad.tecla, 0)
+        return tiempo_desde_uso >= habilidad.cooldown
     
-    def _usar_habilidad(self, tecla: str) -> None:
+    def _usar_habilidad(self, habilidad: HabilidadCompilada) -> None:
         """Usa una habilidad y registra el tiempo."""
-        self._presionar_tecla(tecla)
-        self.ultimo_uso[tecla] = time.time()
-        print(f"[HABILIDAD] Tecla {tecla} presionada")
+        self._presionar_vk(habilidad.vk)
+        self.ultimo_uso[habilidad.tecla] = time.time()
+        print(f"[HABILIDAD] Tecla {habilidad.tecla} presionada")
     
-    def _presionar_r_atacar(self) -> None:
+    def _presionar_r_atacar(self, compilada: ConfigCompilada) -> None:
         """Presiona R para atacar al mob."""
-        self._presionar_tecla('R')
+        self._presionar_vk(compilada.vk_atacar)
     
     def _ciclo_habilidades(self) -> None:
         """Ciclo principal del hilo de habilidades."""
@@ -91,30 +81,31 @@ class HiloHabilidades:
         
         while self.ejecutando:
             # Verificar si este hilo está activo
-            if not estado.hilo_activo('habilidades'):
+            if not self.estado.hilo_activo('habilidades'):
                 time.sleep(0.1)
                 continue
             
+            self._m_iteraciones.inc()
+            
             # Obtener toda la información una vez por ciclo
-            info = estado.obtener_info()
+            info = self.estado.obtener_info()
             tipo_actual = info['tipo']
             nombre_coincidente = info['nombre_coincidente']
             
             # Solo actuar si el objetivo es MOB o DROP Y tiene nombre coincidente válido
             # Esto evita atacar mobs que no están en la lista
             if tipo_actual in (TipoObjetivo.MOB, TipoObjetivo.DROP) and nombre_coincidente:
+                # Configuración compilada vigente (solo habilidades activas, VK resuelto)
+                compilada = self.almacen.actual.compilada
+                
                 # Si es MOB, también atacar con R
                 if tipo_actual == TipoObjetivo.MOB:
-                    self._presionar_r_atacar()
-                
-                # Leer configuración dinámicamente desde el módulo
-                import configuracion
-                habilidades = configuracion.HABILIDADES
+                    self._presionar_r_atacar(compilada)
                 
                 # Revisar cada habilidad activa
-                for tecla, config in habilidades.items():
-                    if config['active'] and self._habilidad_lista(tecla):
-                        self._usar_habilidad(tecla)
+                for habilidad in compilada.habilidades:
+                    if self._habilidad_lista(habilidad):
+                        self._usar_habilidad(habilidad)
                         time.sleep(0.1)  # Pausa entre habilidades
                 
                 time.sleep(0.5)  # Revisar cada 0.5 segundos en combate
@@ -130,7 +121,7 @@ class HiloHabilidades:
             return
         
         self.ejecutando = True
-        self.thread = threading.Thread(target=self._ciclo_habilidades, daemon=True)
+        self.thread = threading.Thread(target=self._ciclo_habilidades, name=f'habilidades:{self.estado.espacio}', daemon=True)
         self.thread.start()
     
     def detener(self) -> None:
@@ -143,7 +134,7 @@ class HiloHabilidades:
         """Muestra la configuración actual de habilidades."""
         print("\n[CONFIGURACIÓN DE HABILIDADES]")
         print("-" * 40)
-        for tecla, config in HABILIDADES.items():
+        for tecla, config in self.almacen.actual.HABILIDADES.items():
             estado_txt = "✅ ACTIVA" if config['active'] else "❌ INACTIVA"
             print(f"  Tecla {tecla}: {estado_txt} | Cooldown: {config['time']}s")
         print("-" * 40)
@@ -167,7 +158,7 @@ if __name__ == "__main__":
         print(f"[OK] Ventana encontrada (Handle: {game_window.hwnd})")
         
         # Crear e iniciar hilo
-        hilo = HiloHabilidades(game_window.hwnd)
+        hilo = HiloHabilidades(game_window)
         hilo.mostrar_configuracion()
         
         print("\n[INFO] Iniciando hilo de habilidades...")
@@ -4,20 +4,14 @@ Detecta cuando un mob lleva mucho tiempo y ejecuta la secuencia de escape (clics
 """
 import time
 import threading
+from typing import Optional
 
-from estado_objetivo import estado, TipoObjetivo
-from configuracion import ESCAPE_MOB, ESCAPE_BY_MOB
-import ctypes
-
-
-class RECT(ctypes.Structure):
-    """Estructura para representar un rectángulo en Windows."""
-    _fields_ = [
-        ("left", ctypes.c_long),
-        ("top", ctypes.c_long),
-        ("right", ctypes.c_long),
-        ("bottom", ctypes.c_long),
-    ]
+from estado_objetivo import estado, EstadoObjetivo, TipoObjetivo
+from game_window import GameWindow
+from metricas import metricas
+from almacen_configuracion import almacen, AlmacenConfiguracion
+from estadisticas_combate import obtener_registro
+from ajuste_escape import ajuste_escape
 
 
 class HiloMobTrabado:
@@ -25,48 +19,49 @@ class HiloMobTrabado:
     Hilo que detecta mobs trabados y ejecuta escape mediante clics alternados.
     """
 
-    def __init__(self, hwnd: int):
-        self.hwnd = hwnd
-        self.user32 = ctypes.windll.user32
+    def __init__(self, game_window: GameWindow, estado_objetivo: Optional[EstadoObjetivo] = None,
+                 almacen_config: Optional[AlmacenConfiguracion] = None):
+        self.game_window = game_window
+        self.hwnd = game_window.hwnd
+        self.backend = game_window.backend
+        # Estado y configuración del cliente (multicliente: uno por ventana)
+        self.estado = estado_objetivo or estado
+        self.almacen = almacen_config or almacen
         self.ejecutando = False
         self.thread = None
         self._escape_ejecutado_para_mob = None
         self._escape_punto_actual = 0
+        # Métricas
+        self._m_clics = metricas.contador('bot_clics_total', 'Clics enviados al juego por origen', origen='escape')
+        self._m_iteraciones = metricas.contador('bot_hilo_iteraciones_total', 'Iteraciones del ciclo de cada hilo', hilo='escape',
+                                                espacio=self.estado.espacio)
+        self._m_escapes = metricas.contador('bot_escapes_total', 'Secuencias de escape (mob trabado) ejecutadas')
+        # Estadísticas de combate del cliente (el episodio termina como 'escape')
+        self.registro = obtener_registro(self.estado.espacio)
 
     # ------------------------------
     # Helpers de ventana y clic
     # ------------------------------
-    def _obtener_rect_ventana(self) -> RECT:
-        rect = RECT()
-        self.user32.GetWindowRect(self.hwnd, ctypes.byref(rect))
-        return rect
-
     def _hacer_clic(self, x_relativo: int, y_relativo: int) -> None:
-        rect = self._obtener_rect_ventana()
+        # Geometría en caché (sin GetWindowRect por clic)
+        rect = self.game_window.geometria
         x_abs = rect.left + x_relativo
         y_abs = rect.top + y_relativo
 
-        # Mover cursor
-        self.user32.SetCursorPos(x_abs, y_abs)
-        time.sleep(0.05)
-
-        # Clic izquierdo
-        self.user32.mouse_event(0x0002, 0, 0, 0, 0)  # Down
-        time.sleep(0.05)
-        self.user32.mouse_event(0x0004, 0, 0, 0, 0)  # Up
+        self.backend.clic(x_abs, y_abs)
+        self._m_clics.inc()
 
     # ------------------------------
     # Lógica de escape
     # ------------------------------
     def _ejecutar_escape(self) -> None:
-        # Leer configuración dinámicamente desde el módulo
-        import configuracion
-        escape_mob = configuracion.ESCAPE_MOB
+        # Configuración compilada vigente
+        escape = self.almacen.actual.compilada.escape
         
         # Obtener nombre una vez al inicio
-        info = estado.obtener_info()
+        info = self.estado.obtener_info()
         nombre_mob = info['nombre_coincidente']
-        puntos = escape_mob["puntos_clic"]
+        puntos = escape.puntos
         
         # Asegurar que el índice esté dentro del rango válido
         if len(puntos) == 0:
@@ -74,31 +69,31 @@ class HiloMobTrabado:
             return
             
         self._escape_punto_actual = self._escape_punto_actual % len(puntos)
-        punto = puntos[self._escape_punto_actual]
-        click_x = punto["x"]
-        click_y = punto["y"]
+        click_x, click_y = puntos[self._escape_punto_actual]
 
         print(
             f"[ESCAPE] 🏃 Mob trabado ({nombre_mob}) - Punto {self._escape_punto_actual + 1}/{len(puntos)}"
         )
         print(f"[ESCAPE] Haciendo clic en ({click_x}, {click_y})")
 
+        self._m_escapes.inc()
+        self.registro.anotar('escape')
+
         # Marcar acción en progreso
-        estado.iniciar_accion_loot()
+        self.estado.iniciar_accion_loot()
 
         # Pausar hilos
-        estado.pausar_todos_los_hilos()
+        self.estado.pausar_todos_los_hilos()
 
         # Clics
-        veces = escape_mob["veces"]
-        duracion = escape_mob["duracion_total"]
-        intervalo = duracion / veces
+        veces = escape.veces
+        intervalo = escape.intervalo
 
-        punto_click_primero = escape_mob["punto_click_primero"]
+        cabeza_x, cabeza_y = escape.punto_personaje
 
         
 
-        print(f"[ESCAPE] Clic en ({punto_click_primero["x"]}, {punto_click_primero["y"]})")
+        print(f"[ESCAPE] Clic en ({cabeza_x}, {cabeza_y})")
         for i in range(veces):
             self._hacer_clic(click_x, click_y)
             print(f"[ESCAPE] Clic en ({click_x}, {click_y}) - ({i+1}/{veces})")
@@ -107,21 +102,21 @@ class HiloMobTrabado:
 
         time.sleep(0.2)
 
-        self._hacer_clic(punto_click_primero["x"], punto_click_primero["y"])
+        self._hacer_clic(cabeza_x, cabeza_y)
         print("click en la cabeza del personaje")
         time.sleep(0.3)
-        self._hacer_clic(punto_click_primero["x"], punto_click_primero["y"])
+        self._hacer_clic(cabeza_x, cabeza_y)
         print("click en la cabeza del personaje")
         time.sleep(0.3)
-        self._hacer_clic(punto_click_primero["x"], punto_click_primero["y"])
+        self._hacer_clic(cabeza_x, cabeza_y)
         print("click en la cabeza del personaje")
 
         # Reactivar hilos
-        estado.reactivar_todos_los_hilos()
-        estado.finalizar_accion_loot()
+        self.estado.reactivar_todos_los_hilos()
+        self.estado.finalizar_accion_loot()
 
         # Resetear contador y alternar punto
-        estado.resetear_timestamp()
+        self.estado.resetear_timestamp()
         self._escape_punto_actual = (self._escape_punto_actual + 1) % len(puntos)
         self._escape_ejecutado_para_mob = None
 
@@ -129,14 +124,7 @@ class HiloMobTrabado:
             f"[ESCAPE] ✅ Completado - Próxima vez usará Punto {self._escape_punto_actual + 1}"
         )
 
-    def _verificar_mob_trabado(self) -> bool:
-        # Leer configuración dinámicamente desde el módulo
-        import configuracion
-        escape_mob = configuracion.ESCAPE_MOB
-        escape_by_mob = configuracion.ESCAPE_BY_MOB
-        
-        # Obtener información una vez
-        info = estado.obtener_info()
+    def _verificar_mob_trabado(self, info: dict, tiempo_escape: float) -> bool:
         if info['tipo'] != TipoObjetivo.MOB:
             return False
 
@@ -146,10 +134,6 @@ class HiloMobTrabado:
         if self._escape_ejecutado_para_mob == nombre_actual:
             return False
 
-        #El escape depende de con qué mob estes peleando
-        #si es fuerte demora más, si es debil demora menos
-        tiempo_escape = escape_by_mob.get(nombre_actual, escape_mob["timeout_mob"])
-        
         if tiempo_en_estado >= tiempo_escape:
             self._escape_ejecutado_para_mob = nombre_actual
             return True
@@ -166,28 +150,30 @@ class HiloMobTrabado:
     def _ciclo(self) -> None:
         print("[ESCAPE] Hilo de mob trabado iniciado")
         while self.ejecutando:
-            if not estado.hilo_activo("mob_trabado"):
+            if not self.estado.hilo_activo("mob_trabado"):
                 time.sleep(0.1)
                 continue
 
+            self._m_iteraciones.inc()
             try:
-                # Leer configuración dinámicamente desde el módulo
-                import configuracion
-                escape_mob = configuracion.ESCAPE_MOB
-                escape_by_mob = configuracion.ESCAPE_BY_MOB
+                # Configuración compilada vigente (cambia en caliente)
+                escape = self.almacen.actual.compilada.escape
                 
                 # Obtener información una vez por ciclo
-                info = estado.obtener_info()
+                info = self.estado.obtener_info()
+                
+                #El escape depende de con qué mob estes peleando
+                #si es fuerte demora más, si es debil demora menos
+                #(con auto_ajuste, percentil del tiempo hasta matar + margen)
+                tiempo_escape = ajuste_escape.timeout(escape, info['nombre_coincidente'])
                 
-                if self._verificar_mob_trabado() and not info['ejecutando_loot']:
-                    estado.pausar_todos_los_hilos_excepto('mob_trabado')
+                if self._verificar_mob_trabado(info, tiempo_escape) and not info['ejecutando_loot']:
+                    self.estado.pausar_todos_los_hilos_excepto('mob_trabado')
                     self._ejecutar_escape()
-                    estado.pausar_todos_los_hilos_excepto('observador_objetivo')
+                    self.estado.pausar_todos_los_hilos_excepto('observador_objetivo')
                 
-                nombre_actual = info['nombre_coincidente']
-                tiempo_escape = escape_by_mob.get(nombre_actual, escape_mob["timeout_mob"])
-                if info['tiempo_en_estado'] >= tiempo_escape + escape_mob["duracion_total"] + 1:
-                    estado.resetear_timestamp()
+                if info['tiempo_en_estado'] >= tiempo_escape + escape.duracion_total + 1:
+                    self.estado.resetear_timestamp()
                     print(f"hilo de mob trabado activo por {info['tiempo_en_estado']:.1f} segundos    ")
                 
             except Exception as e:
@@ -201,7 +187,7 @@ class HiloMobTrabado:
         if self.ejecutando:
             return
         self.ejecutando = True
-        self.thread = threading.Thread(target=self._ciclo, daemon=True)
+        self.thread = threading.Thread(target=self._ciclo, name=f'escape:{self.estado.espacio}', daemon=True)
         self.thread.start()
 
     def detener(self) -> None:
@@ -211,17 +197,19 @@ class HiloMobTrabado:
     
     def mostrar_configuracion(self) -> None:
         """Muestra la configuración actual de escape."""
+        cfg = self.almacen.actual
+        escape_mob, escape_by_mob = cfg.ESCAPE_MOB, cfg.ESCAPE_BY_MOB
         print("\n[CONFIGURACIÓN DE ESCAPE (MOB TRABADO)]")
         print("-" * 50)
-        print(f"  Timeout por defecto: {ESCAPE_MOB['timeout_mob']}s")
-        print(f"  Veces de clic: {ESCAPE_MOB['veces']}")
-        print(f"  Duración total: {ESCAPE_MOB['duracion_total']}s")
-        print(f"  Puntos de clic: {len(ESCAPE_MOB['puntos_clic'])}")
-        for i, punto in enumerate(ESCAPE_MOB['puntos_clic'], 1):
+        print(f"  Timeout por defecto: {escape_mob['timeout_mob']}s")
+        print(f"  Veces de clic: {escape_mob['veces']}")
+        print(f"  Duración total: {escape_mob['duracion_total']}s")
+        print(f"  Puntos de clic: {len(escape_mob['puntos_clic'])}")
+        for i, punto in enumerate(escape_mob['puntos_clic'], 1):
             print(f"    Punto {i}: ({punto['x']}, {punto['y']})")
-        if ESCAPE_BY_MOB:
+        if escape_by_mob:
             print(f"\n  Timeouts personalizados por mob:")
-            for mob, timeout in ESCAPE_BY_MOB.items():
+            for mob, timeout in escape_by_mob.items():
                 print(f"    {mob}: {timeout}s")
         print("-" * 50)
 
@@ -231,7 +219,7 @@ class HiloMobTrabado:
 # ============================================================
 if __name__ == "__main__":
     from game_window import GameWindow
-    from configuracion import GAME_WINDOW_TITLE
+    from configuracion import GAME_WINDOW_TITLE, ESCAPE_MOB, ESCAPE_BY_MOB
     
     try:
         print("=" * 60)
@@ -244,7 +232,7 @@ if __name__ == "__main__":
         print(f"[OK] Ventana encontrada (Handle: {game_window.hwnd})")
         
         # Crear e iniciar hilo
-        hilo = HiloMobTrabado(game_window.hwnd)
+        hilo = HiloMobTrabado(game_window)
         hilo.mostrar_configuracion()
         
         print("\n[INFO] Iniciando hilo de mob trabado...")
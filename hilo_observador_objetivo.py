@@ -6,19 +6,14 @@ Observa constantemente el estado del objetivo y presiona E según las reglas:
 - DROP: Si lleva más de 3 segundos, presiona E
 Se pausa cuando el estado indica que los hilos deben detenerse.
 """
-import ctypes
 import time
 import threading
+from typing import Optional
 
-from estado_objetivo import estado, TipoObjetivo
-from configuracion import VK_CODES, OBSERVADOR_OBJETIVO
-
-# Cargar DLL de Windows
-user32 = ctypes.windll.user32
-
-# Constantes para mensajes de teclado
-WM_KEYDOWN = 0x0100
-WM_KEYUP = 0x0101
+from estado_objetivo import estado, EstadoObjetivo, TipoObjetivo
+from game_window import GameWindow
+from metricas import metricas
+from almacen_configuracion import almacen, AlmacenConfiguracion
 
 
 class HiloObservadorObjetivo:
@@ -26,51 +21,59 @@ class HiloObservadorObjetivo:
     Hilo que observa el estado del objetivo y presiona E según las reglas.
     """
     
-    def __init__(self, hwnd: int):
+    def __init__(self, game_window: GameWindow, estado_objetivo: Optional[EstadoObjetivo] = None,
+                 almacen_config: Optional[AlmacenConfiguracion] = None):
         """
         Inicializa el observador de objetivo.
         
         Args:
-            hwnd: Handle de la ventana del juego
+            game_window: Ventana del juego (handle y geometría en caché)
+            estado_objetivo: Estado del cliente (por defecto el estado global)
+            almacen_config: Configuración del cliente (por defecto el almacén global)
         """
-        self.hwnd = hwnd
+        self.game_window = game_window
+        self.hwnd = game_window.hwnd
+        self.backend = game_window.backend
+        # Estado y configuración del cliente (multicliente: uno por ventana)
+        self.estado = estado_objetivo or estado
+        self.almacen = almacen_config or almacen
         self.ejecutando = False
         self.thread = None
         # No copiar valores, leer dinámicamente desde el módulo
+        # Métricas
+        self._m_teclas = metricas.contador('bot_teclas_total', 'Teclas enviadas al juego por origen', origen='observador',
+                                           espacio=self.estado.espacio)
+        self._m_iteraciones = metricas.contador('bot_hilo_iteraciones_total', 'Iteraciones del ciclo de cada hilo', hilo='observador',
+                                                espacio=self.estado.espacio)
     
     def _presionar_tecla_para_seleccionar(self) -> None:
         """Presiona la tecla configurada para seleccionar objetivo."""
-        # Leer configuración dinámicamente desde el módulo
-        import configuracion
-        tecla = configuracion.OBSERVADOR_OBJETIVO.get('tecla_seleccionar', 'E')
-        vk_codes = configuracion.VK_CODES
-        
-        if tecla not in vk_codes:
-            print(f"[OBSERVADOR] Error: Tecla '{tecla}' no encontrada en VK_CODES")
-            return
+        # Configuración compilada vigente (la tecla se validó contra VK_CODES al publicar)
+        compilada = self.almacen.actual.compilada
         
-        vk_code = vk_codes[tecla]
-        user32.PostMessageW(self.hwnd, WM_KEYDOWN, vk_code, 0)
-        time.sleep(0.05)
-        user32.PostMessageW(self.hwnd, WM_KEYUP, vk_code, 0)
-        print(f"[OBSERVADOR] Tecla {tecla} presionada - Seleccionando objetivo...")
+        self.backend.enviar_tecla(self.hwnd, compilada.vk_seleccionar)
+        self._m_teclas.inc()
+        print(f"[OBSERVADOR] Tecla {compilada.tecla_seleccionar} presionada - Seleccionando objetivo...")
     
     def _ciclo_observador(self) -> None:
         """Ciclo principal del observador."""
         print("[OBSERVADOR] Hilo iniciado")
         
         while self.ejecutando:
-            # Leer configuración dinámicamente desde el módulo
-            timeout_drop = OBSERVADOR_OBJETIVO['timeout_drop']
-            intervalo = OBSERVADOR_OBJETIVO['intervalo_revision']
+            # Instantánea vigente de la configuración (cambia en caliente)
+            config_observador = self.almacen.actual.OBSERVADOR_OBJETIVO
+            timeout_drop = config_observador['timeout_drop']
+            intervalo = config_observador['intervalo_revision']
             
             # Verificar si este hilo está activo
-            if not estado.hilo_activo('observador_objetivo'):
+            if not self.estado.hilo_activo('observador_objetivo'):
                 time.sleep(0.1)
                 continue
             
+            self._m_iteraciones.inc()
+            
             # Obtener toda la información una vez por ciclo
-            info = estado.obtener_info()
+            info = self.estado.obtener_info()
             tipo_actual = info['tipo']
             tiempo_en_estado = info['tiempo_en_estado']
             
@@ -80,9 +83,9 @@ class HiloObservadorObjetivo:
                 time.sleep(1.5)  # Esperar un poco antes de volver a intentar
                 
             elif tipo_actual in [TipoObjetivo.MOB, TipoObjetivo.DROP]:
-                estado.pausar_todos_los_hilos_excepto('habilidades')
-                estado.activar_hilo('recoger_drop')
-                estado.activar_hilo('mob_trabado')
+                self.estado.pausar_todos_los_hilos_excepto('habilidades')
+                self.estado.activar_hilo('recoger_drop')
+                self.estado.activar_hilo('mob_trabado')
                 # Tenemos un mob -> no hacer nada
                 pass
                 
@@ -103,7 +106,7 @@ class HiloObservadorObjetivo:
             return
         
         self.ejecutando = True
-        self.thread = threading.Thread(target=self._ciclo_observador, daemon=True)
+        self.thread = threading.Thread(target=self._ciclo_observador, name=f'observador:{self.estado.espacio}', daemon=True)
         self.thread.start()
     
     def detener(self) -> None:
@@ -118,7 +121,7 @@ class HiloObservadorObjetivo:
 # ============================================================
 if __name__ == "__main__":
     from game_window import GameWindow
-    from configuracion import GAME_WINDOW_TITLE
+    from configuracion import GAME_WINDOW_TITLE, OBSERVADOR_OBJETIVO
     
     try:
         print("=" * 60)
@@ -144,7 +147,7 @@ if __name__ == "__main__":
         print("[INFO] Presiona Ctrl+C para detener")
         print("-" * 60)
         
-        observador = HiloObservadorObjetivo(game_window.hwnd)
+        observador = HiloObservadorObjetivo(game_window)
         observador.iniciar()
         
         # Mantener corriendo
@@ -4,13 +4,14 @@ Escucha transiciones MOB -> NULO y ejecuta la secuencia de loot.
 """
 import time
 import threading
+from typing import Optional
 
-from estado_objetivo import estado, TipoObjetivo
-from configuracion import VK_CODES, LOOT_DROP
-
-# Constantes de Windows para teclado
-WM_KEYDOWN = 0x0100
-WM_KEYUP = 0x0101
+from estado_objetivo import estado, EstadoObjetivo, TipoObjetivo
+from game_window import GameWindow
+from metricas import metricas
+from almacen_configuracion import almacen, AlmacenConfiguracion
+from config_compilada import ConfigCompilada
+from estadisticas_combate import obtener_registro
 
 
 class HiloRecogerDrop:
@@ -18,35 +19,45 @@ class HiloRecogerDrop:
     Hilo que ejecuta el loot cuando el mob muere (MOB -> NULO).
     """
 
-    def __init__(self, hwnd: int):
+    def __init__(self, game_window: GameWindow, estado_objetivo: Optional[EstadoObjetivo] = None,
+                 almacen_config: Optional[AlmacenConfiguracion] = None):
         """
         Inicializa el hilo de loot.
 
         Args:
-            hwnd: Handle de la ventana del juego
+            game_window: Ventana del juego (handle y geometría en caché)
+            estado_objetivo: Estado del cliente (por defecto el estado global)
+            almacen_config: Configuración del cliente (por defecto el almacén global)
         """
-        self.hwnd = hwnd
-        self.user32 = None
+        self.game_window = game_window
+        self.hwnd = game_window.hwnd
+        self.backend = game_window.backend
+        # Estado y configuración del cliente (multicliente: uno por ventana)
+        self.estado = estado_objetivo or estado
+        self.almacen = almacen_config or almacen
         self.ejecutando = False
         self.thread = None
         # No copiar valores, leer dinámicamente desde el módulo
+        # Métricas
+        self._m_teclas = metricas.contador('bot_teclas_total', 'Teclas enviadas al juego por origen', origen='loot',
+                                           espacio=self.estado.espacio)
+        self._m_iteraciones = metricas.contador('bot_hilo_iteraciones_total', 'Iteraciones del ciclo de cada hilo', hilo='loot',
+                                                espacio=self.estado.espacio)
+        self._m_loots = metricas.contador('bot_loot_total', 'Secuencias de loot ejecutadas')
+        # Estadísticas de combate del cliente (pulsaciones de loot por episodio)
+        self.registro = obtener_registro(self.estado.espacio)
 
     # ---------------------------------------------
     # Helpers de teclado
     # ---------------------------------------------
-    def _presionar_tecla(self, tecla: str) -> None:
-        if not self.user32:
-            self.user32 = __import__("ctypes").windll.user32
-        if tecla not in VK_CODES:
-            return
-        vk_code = VK_CODES[tecla]
-        self.user32.PostMessageW(self.hwnd, WM_KEYDOWN, vk_code, 0)
-        time.sleep(0.05)
-        self.user32.PostMessageW(self.hwnd, WM_KEYUP, vk_code, 0)
+    def _presionar_vk(self, vk: int) -> None:
+        self.backend.enviar_tecla(self.hwnd, vk)
+        self._m_teclas.inc()
 
-    def _presionar_tecla_f(self) -> None:
+    def _presionar_tecla_f(self, compilada: ConfigCompilada) -> None:
         """Presiona la tecla F para lootear."""
-        self._presionar_tecla("F")
+        self._presionar_vk(compilada.vk_loot)
+        self.registro.anotar('loot')
 
     # ---------------------------------------------
     # Lógica principal de loot
@@ -59,21 +70,22 @@ class HiloRecogerDrop:
         - Reactiva hilos al finalizar
         """
         print("[LOOT] 🎁 Mob murió - Ejecutando secuencia de loot (hilo_recoger_drop)...")
+        self._m_loots.inc()
 
         # Marcar que estamos en acción de loot
-        estado.iniciar_accion_loot()
+        self.estado.iniciar_accion_loot()
 
         # Pausar todos los hilos
-        estado.pausar_todos_los_hilos()
+        self.estado.pausar_todos_los_hilos()
 
-        # Leer configuración dinámicamente desde el módulo
-        config_loot = LOOT_DROP
-        repeticiones = max(0, int(config_loot.get('repeticiones_f', 3)))
-        intervalo = float(config_loot.get('intervalo_f', 0.5))
+        # Configuración compilada vigente
+        compilada = self.almacen.actual.compilada
+        repeticiones = compilada.loot_repeticiones
+        intervalo = compilada.loot_intervalo
 
         # Presionar F repeticiones configuradas
         for i in range(repeticiones):
-            self._presionar_tecla_f()
+            self._presionar_tecla_f(compilada)
             print(f"[LOOT] Tecla F presionada ({i+1}/{repeticiones})")
             if i < repeticiones - 1:
                 time.sleep(intervalo)
@@ -81,13 +93,13 @@ class HiloRecogerDrop:
         # Esperar hasta ~1.s totales (0.5 + 0.5 + 0.5)
         # time.sleep(0.5)
 
-        self._presionar_tecla("R")
+        self._presionar_vk(compilada.vk_atacar)
 
         # Reactivar todos los hilos
-        estado.reactivar_todos_los_hilos()
+        self.estado.reactivar_todos_los_hilos()
 
         # Marcar que terminamos
-        estado.finalizar_accion_loot()
+        self.estado.finalizar_accion_loot()
 
         print("[LOOT] ✅ Secuencia de loot completada")
 
@@ -98,23 +110,24 @@ class HiloRecogerDrop:
         print("[LOOT] Hilo de recoger drop iniciado")
         while self.ejecutando:
             # Verificar si este hilo está activo
-            if not estado.hilo_activo("recoger_drop"):
+            if not self.estado.hilo_activo("recoger_drop"):
                 time.sleep(0.1)
                 continue
 
-            info = estado.obtener_info()
+            self._m_iteraciones.inc()
+            info = self.estado.obtener_info()
 
             # Detectar transición MOB -> NULO
             if (
                 info["tipo"] in [TipoObjetivo.NULO, TipoObjetivo.DROP]
                 and info["tipo_anterior"] == TipoObjetivo.MOB
-                and not estado.ejecutando_loot
+                and not self.estado.ejecutando_loot
             ):
-                estado.pausar_todos_los_hilos_excepto('recoger_drop')
+                self.estado.pausar_todos_los_hilos_excepto('recoger_drop')
                 self._ejecutar_loot()
                 # Resetear timestamp para que el contador arranque en 0
-                estado.resetear_timestamp()
-                estado.pausar_todos_los_hilos_excepto('observador_objetivo')
+                self.estado.resetear_timestamp()
+                self.estado.pausar_todos_los_hilos_excepto('observador_objetivo')
 
             time.sleep(0.1)
 
@@ -124,7 +137,7 @@ class HiloRecogerDrop:
         if self.ejecutando:
             return
         self.ejecutando = True
-        self.thread = threading.Thread(target=self._ciclo_loot, daemon=True)
+        self.thread = threading.Thread(target=self._ciclo_loot, name=f'loot:{self.estado.espacio}', daemon=True)
         self.thread.start()
 
     def detener(self) -> None:
@@ -2,21 +2,15 @@
 Módulo para enviar comandos de teclado a la ventana del juego.
 Responsabilidad: Simulación de entrada de teclado (Single Responsibility Principle)
 """
-import ctypes
-import time
 from game_window import GameWindow
 
 
 class KeyboardController:
     """
     Clase para enviar comandos de teclado a la ventana del juego.
-    Usa PostMessage para enviar teclas a una ventana específica.
+    Envía las teclas a través del backend de la ventana (PostMessage en Windows).
     """
     
-    # Constantes de Windows para mensajes de teclado
-    WM_KEYDOWN = 0x0100
-    WM_KEYUP = 0x0101
-    
     # Códigos virtuales de teclas
     VK_CODES = {
         '0': 0x30,
@@ -39,7 +33,7 @@ class KeyboardController:
             game_window: Instancia de GameWindow
         """
         self.game_window = game_window
-        self.user32 = ctypes.windll.user32
+        self.backend = game_window.backend
     
     def press_key(self, key: str, delay: float = 0.05) -> None:
         """
@@ -56,10 +50,4 @@ class KeyboardController:
             raise ValueError(f"Tecla '{key}' no soportada. Teclas válidas: {list(self.VK_CODES.keys())}")
         
         vk_code = self.VK_CODES[key]
-        hwnd = self.game_window.hwnd
-        
-        # Enviar tecla presionada
-        self.user32.PostMessageW(hwnd, self.WM_KEYDOWN, vk_code, 0)
-        time.sleep(delay)
-        # Enviar tecla liberada
-        self.user32.PostMessageW(hwnd, self.WM_KEYUP, vk_code, 0)
+        self.backend.enviar_tecla(self.game_window.hwnd, vk_code, delay)
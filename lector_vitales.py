@@ -0,0 +1,107 @@
+"""
+Módulo para medir el porcentaje de llenado de las barras de vida y maná.
+Responsabilidad: Convertir una franja de píxeles de la barra en un porcentaje (Single Responsibility Principle)
+
+En lugar de preguntar "¿el píxel (x, y) es rojo?", se clasifica de una vez
+toda una franja horizontal de la barra con la tabla de colores compilada y se
+calcula hasta dónde llega el relleno. Con el porcentaje se puede curar con un
+umbral distinto dentro y fuera de combate.
+"""
+from typing import Dict, Optional
+
+import numpy as np
+
+from clasificador_color import TablaColores, obtener_tabla
+
+
+# Umbrales por defecto (porcentaje de la barra) si la configuración no los define
+UMBRAL_COMBATE_DEFECTO = 60.0
+UMBRAL_FUERA_COMBATE_DEFECTO = 30.0
+
+
+class LectorVitales:
+    """
+    Lector del porcentaje de vida y maná a partir de franjas de la barra.
+    """
+
+    def __init__(self, tablas: Optional[Dict[str, TablaColores]] = None):
+        """
+        Inicializa el lector.
+
+        Args:
+            tablas: Tabla de colores por recurso ('vida', 'mana').
+                    Por defecto usa las tablas compiladas de clasificador_color.
+        """
+        self.tablas = tablas or {
+            'vida': obtener_tabla('vida'),
+            'mana': obtener_tabla('mana'),
+        }
+
+    def porcentaje(self, recurso: str, franja: np.ndarray) -> float:
+        """
+        Calcula el porcentaje de llenado de una barra.
+
+        La barra se llena de izquierda a derecha, así que el porcentaje es la
+        posición de la última columna con color de recurso. Esto tolera el
+        texto (números de vida/maná) que el juego dibuja encima de la barra.
+
+        Args:
+            recurso: 'vida' o 'mana'
+            franja: Imagen BGRA/BGR de la franja (alto x ancho), con la barra completa
+
+        Returns:
+            Porcentaje de llenado (0.0 - 100.0)
+        """
+        llenos = self.tablas[recurso].clasificar_bgra(franja)
+        columnas = np.flatnonzero(llenos.any(axis=0))
+        if columnas.size == 0:
+            return 0.0
+        return (columnas[-1] + 1) * 100.0 / llenos.shape[1]
+
+    @staticmethod
+    def umbral(config: dict, en_combate: bool) -> float:
+        """
+        Retorna el umbral de curación (porcentaje) configurado para un recurso.
+
+        Args:
+            config: Configuración del recurso (AUTOCURACION['vida'] o ['mana'])
+            en_combate: True si el objetivo actual es un MOB
+        """
+        if en_combate:
+            return float(config.get('umbral_combate', UMBRAL_COMBATE_DEFECTO))
+        return float(config.get('umbral_fuera_combate', UMBRAL_FUERA_COMBATE_DEFECTO))
+
+    @staticmethod
+    def usa_barra(config: dict) -> bool:
+        """Retorna True si el recurso está configurado para medir la barra completa."""
+        barra = config.get('barra')
+        return bool(barra and barra.get('activa') and barra['x_fin'] > barra['x_inicio'])
+
+
+# ============================================================
+# PRUEBA INDEPENDIENTE
+# ============================================================
+if __name__ == "__main__":
+    import time
+
+    print("=" * 60)
+    print("PRUEBA DEL LECTOR DE VITALES")
+    print("=" * 60)
+
+    lector = LectorVitales()
+
+    # Barra sintética de 120 px: 45% roja, resto gris oscuro, con texto blanco encima
+    franja = np.full((3, 120, 4), 40, dtype=np.uint8)
+    franja[:, :54, 2] = 220
+    franja[:, :54, :2] = 0
+    franja[:, 30:38, :3] = 255
+
+    porcentaje = lector.porcentaje('vida', franja)
+    print(f"\n[INFO] Porcentaje medido: {porcentaje:.1f}% (esperado 45.0%)")
+
+    repeticiones = 20000
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        lector.porcentaje('vida', franja)
+    duracion = (time.perf_counter() - inicio) / repeticiones
+    print(f"[BENCHMARK] {duracion * 1e6:.1f} µs por lectura")
@@ -0,0 +1,282 @@
+"""
+Localización automática de la región OCR y recorte al texto.
+Responsabilidad: Ubicar el marco del objetivo en la ventana y reducir la imagen que recibe el OCR (Single Responsibility Principle)
+
+OCR_REGION es un rectángulo a mano en posiciones fijas: se rompe si la
+interfaz del juego se mueve, y Tesseract procesa el rectángulo completo
+(escalado 2x) aunque el nombre ocupe una fracción. Dos etapas lo reducen:
+
+1. Localización (opcional, con OCR_REGION.plantilla): la plantilla es un
+   recorte del marco del objetivo (un elemento fijo de la interfaz, no el
+   texto). Se busca una vez en la ventana completa con
+   cv2.matchTemplate; la región OCR queda a un desplazamiento fijo del
+   marco encontrado. Solo se vuelve a buscar ante un fallo: tras varios
+   cuadros seguidos con texto en la placa que no coincide con ningún nombre
+   se verifica la plantilla en su posición (una comparación del tamaño de
+   la plantilla) y, si ya no está ahí, se busca de nuevo en toda la
+   ventana. Los cuadros sin objetivo (placa vacía) no cuentan: el marco
+   puede no dibujarse sin objetivo. Si la búsqueda no encuentra la
+   plantilla se conserva la última posición conocida hasta que otra racha
+   de fallos vuelva a contradecirla.
+2. Recorte al texto (OCR_REGION.recortar_texto): cada cuadro se recorta al
+   rectángulo que contiene los píxeles de texto (más un margen) antes de
+   escalar y llamar a Tesseract. Alrededor del texto quedan siempre
+   BORDE_TEXTO píxeles de fondo (completados con negro): Tesseract necesita
+   ese borde para leer bien una sola línea.
+
+Crear la plantilla (con el juego abierto y un objetivo seleccionado):
+    python localizador_region.py capturar marco.png --x 4 --y 80 --ancho 40 --alto 8
+    python localizador_region.py probar
+"""
+import os
+import time
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+from metricas import metricas
+
+
+# Margen (píxeles) de la captura que se conserva alrededor del texto al recortar
+MARGEN_TEXTO = 4
+
+# Fondo mínimo (píxeles, antes de escalar 2x) alrededor del texto recortado:
+# Tesseract lee mal una línea pegada al borde de la imagen, así que lo que
+# falte hasta BORDE_TEXTO se completa con negro (20 píxeles tras escalar)
+BORDE_TEXTO = 10
+
+# Segundos entre búsquedas mientras la plantilla no se encuentra
+REINTENTO_LOCALIZAR = 2.0
+
+
+def recortar_al_texto(gris: np.ndarray, umbral: int, margen: int = MARGEN_TEXTO,
+                      borde: int = BORDE_TEXTO) -> np.ndarray:
+    """
+    Recorta una imagen en escala de grises al rectángulo de sus píxeles de texto
+    y la completa con fondo negro hasta 'borde' píxeles alrededor del texto.
+
+    Args:
+        gris: Imagen en escala de grises (texto claro sobre fondo oscuro)
+        umbral: Brillo a partir del cual un píxel es texto (el de la binarización)
+        margen: Píxeles de la imagen que se conservan alrededor del texto
+        borde: Fondo mínimo alrededor del texto (margen conservado + negro)
+
+    Returns:
+        Imagen recortada (vista sin copiar si el margen ya cubre el borde), o
+        la imagen completa si no hay texto
+    """
+    texto = gris > umbral
+    filas = np.flatnonzero(texto.any(axis=1))
+    if not filas.size:
+        return gris
+    columnas = np.flatnonzero(texto.any(axis=0))
+    alto, ancho = gris.shape
+    y0, y1 = max(0, filas[0] - margen), min(alto, filas[-1] + margen + 1)
+    x0, x1 = max(0, columnas[0] - margen), min(ancho, columnas[-1] + margen + 1)
+    recorte = gris[y0:y1, x0:x1]
+
+    # Fondo que falta a cada lado hasta 'borde'
+    arriba = max(0, borde - (filas[0] - y0))
+    abajo = max(0, borde - (y1 - 1 - filas[-1]))
+    izquierda = max(0, borde - (columnas[0] - x0))
+    derecha = max(0, borde - (x1 - 1 - columnas[-1]))
+    if not (arriba or abajo or izquierda or derecha):
+        return recorte
+    return cv2.copyMakeBorder(recorte, arriba, abajo, izquierda, derecha, cv2.BORDER_CONSTANT, value=0)
+
+
+def _gris(imagen: np.ndarray) -> np.ndarray:
+    """BGRA (captura del backend) a escala de grises."""
+    return cv2.cvtColor(imagen, cv2.COLOR_BGRA2GRAY)
+
+
+class LocalizadorRegion:
+    """
+    Región OCR de un detector: la fija de la configuración o la ubicada por
+    la plantilla del marco del objetivo. Se usa desde el hilo del detector.
+    """
+
+    def __init__(self, game_window):
+        """
+        Args:
+            game_window: Ventana del juego (backend y geometría en caché)
+        """
+        self.game_window = game_window
+        self.backend = game_window.backend
+        # Esquina superior izquierda de la plantilla en la ventana (None = no encontrada)
+        self.posicion: Optional[Tuple[int, int]] = None
+        self.puntaje = 0.0
+        self.pendiente = True
+        self.fallos = 0
+        self._ultimo_intento = 0.0
+        self._ruta: Optional[str] = None
+        self._plantilla: Optional[np.ndarray] = None
+        self._m_localizaciones = {
+            resultado: metricas.contador('bot_ocr_localizaciones_total',
+                                         'Búsquedas de la plantilla del marco del objetivo', resultado=resultado)
+            for resultado in ('encontrada', 'no_encontrada', 'verificada')
+        }
+
+    def _cargar_plantilla(self, ruta: str) -> Optional[np.ndarray]:
+        """Plantilla en escala de grises (se lee de disco solo si cambió la ruta)."""
+        if ruta != self._ruta:
+            self._ruta = ruta
+            self._plantilla = cv2.imread(ruta, cv2.IMREAD_GRAYSCALE)
+            self.posicion = None
+            self.pendiente = True
+            if self._plantilla is None:
+                print(f"[LOCALIZADOR] No se pudo leer la plantilla: {ruta}")
+        return self._plantilla
+
+    def region(self, compilada) -> Tuple[int, int, int, int]:
+        """
+        Región OCR (izquierda, arriba, ancho, alto) relativa a la ventana.
+        Busca la plantilla si hace falta; mientras no se encuentre usa la región fija.
+
+        Args:
+            compilada: ConfigCompilada vigente
+        """
+        localizacion = compilada.localizacion
+        if localizacion is None:
+            return compilada.region_ocr
+        if self.pendiente and self._cargar_plantilla(localizacion.ruta) is not None:
+            if self.posicion is not None or time.perf_counter() - self._ultimo_intento >= REINTENTO_LOCALIZAR:
+                self.localizar(localizacion)
+        return self.region_actual(compilada)
+
+    def region_actual(self, compilada) -> Tuple[int, int, int, int]:
+        """Región OCR con la última posición conocida, sin buscar (para otros hilos)."""
+        localizacion = compilada.localizacion
+        posicion = self.posicion
+        if localizacion is None or posicion is None or self._ruta != localizacion.ruta:
+            return compilada.region_ocr
+        _, _, ancho, alto = compilada.region_ocr
+        return (posicion[0] + localizacion.offset_x, posicion[1] + localizacion.offset_y, ancho, alto)
+
+    def _verificar(self, localizacion) -> bool:
+        """True si la plantilla sigue en la última posición encontrada."""
+        plantilla = self._plantilla
+        alto, ancho = plantilla.shape
+        rect = self.game_window.geometria
+        x, y = self.posicion
+        recorte = _gris(self.backend.capturar(rect.left + x, rect.top + y, ancho, alto))
+        if recorte.shape != plantilla.shape:
+            return False
+        puntaje = float(cv2.matchTemplate(recorte, plantilla, cv2.TM_CCOEFF_NORMED)[0, 0])
+        return puntaje >= localizacion.umbral
+
+    def localizar(self, localizacion) -> Optional[Tuple[int, int]]:
+        """
+        Busca la plantilla: primero en la última posición conocida y, si no
+        está, en la ventana completa.
+
+        Args:
+            localizacion: LocalizacionCompilada de la configuración vigente
+
+        Returns:
+            Posición (x, y) de la plantilla en la ventana (la última conocida
+            si esta vez no se encontró), o None si nunca se encontró
+        """
+        self.pendiente = False
+        self.fallos = 0
+        self._ultimo_intento = time.perf_counter()
+        plantilla = self._cargar_plantilla(localizacion.ruta)
+        if plantilla is None:
+            return None
+
+        if self.posicion is not None and self._verificar(localizacion):
+            self._m_localizaciones['verificada'].inc()
+            return self.posicion
+
+        rect = self.game_window.geometria
+        ventana = _gris(self.backend.capturar(rect.left, rect.top, rect.right - rect.left, rect.bottom - rect.top))
+        if ventana.shape[0] < plantilla.shape[0] or ventana.shape[1] < plantilla.shape[1]:
+            self.pendiente = self.posicion is None
+            self._m_localizaciones['no_encontrada'].inc()
+            return self.posicion
+        resultado = cv2.matchTemplate(ventana, plantilla, cv2.TM_CCOEFF_NORMED)
+        _, puntaje, _, posicion = cv2.minMaxLoc(resultado)
+        self.puntaje = float(puntaje)
+
+        anterior = self.posicion
+        if puntaje >= localizacion.umbral:
+            self.posicion = (int(posicion[0]), int(posicion[1]))
+            self._m_localizaciones['encontrada'].inc()
+            if self.posicion != anterior:
+                print(f"[LOCALIZADOR] Marco del objetivo en {self.posicion} (puntaje {puntaje:.2f})")
+        else:
+            self._m_localizaciones['no_encontrada'].inc()
+            if anterior is not None:
+                # El marco puede no estar dibujado en este cuadro (objetivo
+                # deseleccionado): se conserva la última posición conocida
+                print(f"[LOCALIZADOR] Marco del objetivo no encontrado (mejor puntaje {puntaje:.2f}); "
+                      f"se conserva {anterior}")
+        # Nunca encontrada: se reintenta cada REINTENTO_LOCALIZAR segundos
+        self.pendiente = self.posicion is None
+        return self.posicion
+
+    def registrar(self, fallo: bool, compilada) -> None:
+        """
+        Registra el resultado de un cuadro. Tras 'fallos_relocalizar' fallos
+        seguidos se vuelve a localizar en el próximo cuadro.
+
+        Args:
+            fallo: True si la placa tenía texto y no coincidió con ningún
+                   nombre; un cuadro sin objetivo no es un fallo
+            compilada: ConfigCompilada vigente
+        """
+        localizacion = compilada.localizacion
+        if localizacion is None:
+            return
+        if not fallo:
+            self.fallos = 0
+            return
+        self.fallos += 1
+        if self.fallos >= localizacion.fallos:
+            self.pendiente = True
+
+
+# ============================================================
+# PRUEBA INDEPENDIENTE
+# ============================================================
+if __name__ == "__main__":
+    import argparse
+
+    from almacen_configuracion import almacen
+    from game_window import GameWindow
+
+    parser = argparse.ArgumentParser(description="Crea y prueba la plantilla del marco del objetivo.")
+    sub = parser.add_subparsers(dest='comando', required=True)
+    capturar = sub.add_parser('capturar', help="Guarda un rectángulo de la ventana como plantilla")
+    capturar.add_argument('ruta', help="Archivo PNG de salida")
+    for opcion in ('--x', '--y', '--ancho', '--alto'):
+        capturar.add_argument(opcion, type=int, required=True, help="Rectángulo relativo a la ventana")
+    sub.add_parser('probar', help="Busca la plantilla configurada y muestra la región resultante")
+    args = parser.parse_args()
+
+    cfg = almacen.actual
+    game_window = GameWindow(cfg.GAME_WINDOW_TITLE)
+    rect = game_window.geometria
+
+    if args.comando == 'capturar':
+        imagen = game_window.backend.capturar(rect.left + args.x, rect.top + args.y, args.ancho, args.alto)
+        cv2.imwrite(args.ruta, _gris(imagen))
+        region = cfg.OCR_REGION
+        print(f"[OK] Plantilla guardada en {os.path.abspath(args.ruta)}")
+        print("Claves para OCR_REGION en config.json:")
+        print(f'  "plantilla": "{args.ruta}",')
+        print(f'  "plantilla_offset_x": {region["left_offset"] - args.x},')
+        print(f'  "plantilla_offset_y": {region["top_offset"] - args.y}')
+    else:
+        compilada = cfg.compilada
+        if compilada.localizacion is None:
+            print("[ERROR] OCR_REGION no tiene 'plantilla'")
+        else:
+            localizador = LocalizadorRegion(game_window)
+            t0 = time.perf_counter()
+            posicion = localizador.localizar(compilada.localizacion)
+            duracion = time.perf_counter() - t0
+            print(f"Posición: {posicion} | puntaje {localizador.puntaje:.3f} "
+                  f"(umbral {compilada.localizacion.umbral}) | {duracion * 1000:.1f} ms")
+            print(f"Región OCR: {localizador.region_actual(compilada)} (fija: {compilada.region_ocr})")
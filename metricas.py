@@ -0,0 +1,468 @@
+"""
+Registro de métricas del bot (contadores, histogramas y medidores).
+Responsabilidad: Contar eventos y latencias de los subsistemas y exportarlos (Single Responsibility Principle)
+
+Cada subsistema obtiene sus series una sola vez (en __init__) y en el camino
+caliente solo llama a inc() u observar(). Los valores se acumulan en un
+fragmento por hilo (threading.local), sin locks: sumar es un acceso a
+atributo y una suma sobre una lista propia del hilo. Los fragmentos se
+agregan únicamente al exportar. Un medidor guarda solo el último valor
+(vida/maná en %): fijar() es una asignación.
+
+Exportación (opcional, ver METRICAS en configuracion.py):
+- Endpoint HTTP en localhost con formato de texto de Prometheus (/metrics)
+- Volcado periódico a un archivo JSON lines con valores y tasas por segundo
+"""
+import json
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+# Límites (segundos) de los histogramas de latencia por defecto
+LIMITES_LATENCIA = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+def _formatear_etiquetas(etiquetas: Tuple[Tuple[str, str], ...], extra: str = "") -> str:
+    """Etiquetas en formato Prometheus: {a="1",b="2"}."""
+    partes = [f'{clave}="{valor}"' for clave, valor in etiquetas]
+    if extra:
+        partes.append(extra)
+    return "{" + ",".join(partes) + "}" if partes else ""
+
+
+def _formatear_numero(valor: float) -> str:
+    """Número en formato Prometheus (+Inf, enteros sin decimales)."""
+    if valor == float('inf'):
+        return "+Inf"
+    if float(valor).is_integer():
+        return str(int(valor))
+    return repr(float(valor))
+
+
+class _Serie:
+    """Base de una serie con fragmentos por hilo."""
+
+    tipo = ""
+
+    def __init__(self, nombre: str, ayuda: str, etiquetas: Tuple[Tuple[str, str], ...]):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = etiquetas
+        self._local = threading.local()
+        self._fragmentos: List[list] = []
+        self._lock = threading.Lock()
+
+    def _nuevo_fragmento(self) -> list:
+        """Crea el fragmento del hilo actual (solo la primera vez que escribe)."""
+        fragmento = self._fragmento_vacio()
+        self._local.fragmento = fragmento
+        with self._lock:
+            self._fragmentos.append(fragmento)
+        return fragmento
+
+    def _fragmento_vacio(self) -> list:
+        raise NotImplementedError
+
+    @property
+    def clave(self) -> str:
+        """Nombre completo de la serie: nombre{etiquetas}."""
+        return self.nombre + _formatear_etiquetas(self.etiquetas)
+
+
+class Contador(_Serie):
+    """Contador monótono. inc() no toma locks."""
+
+    tipo = "counter"
+
+    def _fragmento_vacio(self) -> list:
+        return [0]
+
+    def inc(self, cantidad: float = 1) -> None:
+        """Suma 'cantidad' al contador (camino caliente)."""
+        try:
+            self._local.fragmento[0] += cantidad
+        except AttributeError:
+            self._nuevo_fragmento()[0] += cantidad
+
+    @property
+    def valor(self) -> float:
+        """Suma de todos los hilos."""
+        with self._lock:
+            return sum(fragmento[0] for fragmento in self._fragmentos)
+
+    def lineas_prometheus(self) -> List[str]:
+        return [f"{self.clave} {_formatear_numero(self.valor)}"]
+
+    def instantanea(self) -> Dict[str, float]:
+        return {self.clave: self.valor}
+
+
+class Histograma(_Serie):
+    """Histograma con límites fijos. observar() no toma locks."""
+
+    tipo = "histogram"
+
+    def __init__(self, nombre: str, ayuda: str, etiquetas: Tuple[Tuple[str, str], ...],
+                 limites: Sequence[float] = LIMITES_LATENCIA):
+        super().__init__(nombre, ayuda, etiquetas)
+        self.limites = tuple(sorted(limites))
+
+    def _fragmento_vacio(self) -> list:
+        # [cubetas (una por límite + infinito), suma, cantidad]
+        return [[0] * (len(self.limites) + 1), 0.0, 0]
+
+    def observar(self, valor: float) -> None:
+        """Registra una observación (camino caliente)."""
+        try:
+            fragmento = self._local.fragmento
+        except AttributeError:
+            fragmento = self._nuevo_fragmento()
+        fragmento[0][bisect_left(self.limites, valor)] += 1
+        fragmento[1] += valor
+        fragmento[2] += 1
+
+    def _agregar(self) -> Tuple[List[int], float, int]:
+        """Suma los fragmentos: (cubetas, suma, cantidad)."""
+        cubetas = [0] * (len(self.limites) + 1)
+        suma = 0.0
+        cantidad = 0
+        with self._lock:
+            for fragmento in self._fragmentos:
+                for i, n in enumerate(fragmento[0]):
+                    cubetas[i] += n
+                suma += fragmento[1]
+                cantidad += fragmento[2]
+        return cubetas, suma, cantidad
+
+    def percentil(self, q: float, cubetas: Optional[List[int]] = None) -> float:
+        """Percentil aproximado (límite superior de la cubeta que lo contiene)."""
+        if cubetas is None:
+            cubetas = self._agregar()[0]
+        total = sum(cubetas)
+        if total == 0:
+            return 0.0
+        acumulado = 0
+        for i, n in enumerate(cubetas):
+            acumulado += n
+            if acumulado >= q * total:
+                return self.limites[i] if i < len(self.limites) else float('inf')
+        return float('inf')
+
+    def lineas_prometheus(self) -> List[str]:
+        cubetas, suma, cantidad = self._agregar()
+        lineas = []
+        acumulado = 0
+        for limite, n in zip(self.limites + (float('inf'),), cubetas):
+            acumulado += n
+            le = f'le="{_formatear_numero(limite)}"'
+            lineas.append(f"{self.nombre}_bucket{_formatear_etiquetas(self.etiquetas, le)} {acumulado}")
+        etiquetas = _formatear_etiquetas(self.etiquetas)
+        lineas.append(f"{self.nombre}_sum{etiquetas} {_formatear_numero(suma)}")
+        lineas.append(f"{self.nombre}_count{etiquetas} {cantidad}")
+        return lineas
+
+    def instantanea(self) -> Dict[str, float]:
+        cubetas, suma, cantidad = self._agregar()
+        clave = self.clave
+        return {
+            f"{clave}.cantidad": cantidad,
+            f"{clave}.suma": suma,
+            f"{clave}.p50": self.percentil(0.50, cubetas),
+            f"{clave}.p95": self.percentil(0.95, cubetas),
+        }
+
+
+class Medidor(_Serie):
+    """Valor instantáneo (el último escrito). fijar() no toma locks."""
+
+    tipo = "gauge"
+
+    def __init__(self, nombre: str, ayuda: str, etiquetas: Tuple[Tuple[str, str], ...]):
+        super().__init__(nombre, ayuda, etiquetas)
+        self._valor = 0.0
+
+    def _fragmento_vacio(self) -> list:
+        return [0.0]
+
+    def fijar(self, valor: float) -> None:
+        """Reemplaza el valor (camino caliente)."""
+        self._valor = valor
+
+    @property
+    def valor(self) -> float:
+        """Último valor fijado."""
+        return self._valor
+
+    def lineas_prometheus(self) -> List[str]:
+        return [f"{self.clave} {_formatear_numero(self._valor)}"]
+
+    def instantanea(self) -> Dict[str, float]:
+        return {self.clave: self._valor}
+
+
+class RegistroMetricas:
+    """
+    Registro de todas las series del proceso.
+    contador()/histograma() retornan siempre la misma instancia para el
+    mismo nombre y etiquetas, así varios hilos pueden compartir una serie.
+    """
+
+    def __init__(self):
+        self._series: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], _Serie] = {}
+        self._lock = threading.Lock()
+
+    def _obtener(self, clase, nombre: str, ayuda: str, etiquetas: dict, **kwargs) -> _Serie:
+        clave = (nombre, tuple(sorted((k, str(v)) for k, v in etiquetas.items())))
+        with self._lock:
+            serie = self._series.get(clave)
+            if serie is None:
+                serie = self._series[clave] = clase(nombre, ayuda, clave[1], **kwargs)
+            return serie
+
+    def contador(self, nombre: str, ayuda: str = "", **etiquetas) -> Contador:
+        """Obtiene (o crea) un contador."""
+        return self._obtener(Contador, nombre, ayuda, etiquetas)
+
+    def histograma(self, nombre: str, ayuda: str = "", limites: Sequence[float] = LIMITES_LATENCIA,
+                   **etiquetas) -> Histograma:
+        """Obtiene (o crea) un histograma."""
+        return self._obtener(Histograma, nombre, ayuda, etiquetas, limites=limites)
+
+    def medidor(self, nombre: str, ayuda: str = "", **etiquetas) -> Medidor:
+        """Obtiene (o crea) un medidor."""
+        return self._obtener(Medidor, nombre, ayuda, etiquetas)
+
+    def buscar(self, nombre: str) -> List[_Serie]:
+        """Todas las series con ese nombre (una por combinación de etiquetas)."""
+        with self._lock:
+            return [serie for (nombre_serie, _), serie in self._series.items() if nombre_serie == nombre]
+
+    def _series_ordenadas(self) -> List[_Serie]:
+        with self._lock:
+            return [self._series[clave] for clave in sorted(self._series)]
+
+    def texto_prometheus(self) -> str:
+        """Todas las series en formato de texto de Prometheus."""
+        lineas = []
+        anterior = None
+        for serie in self._series_ordenadas():
+            if serie.nombre != anterior:
+                lineas.append(f"# HELP {serie.nombre} {serie.ayuda}")
+                lineas.append(f"# TYPE {serie.nombre} {serie.tipo}")
+                anterior = serie.nombre
+            lineas.extend(serie.lineas_prometheus())
+        return "\n".join(lineas) + "\n"
+
+    def instantanea(self) -> Dict[str, float]:
+        """Valores actuales de todas las series (contadores y resumen de histogramas)."""
+        valores = {}
+        for serie in self._series_ordenadas():
+            valores.update(serie.instantanea())
+        return valores
+
+    def contadores(self) -> Dict[str, float]:
+        """Valores actuales solo de los contadores."""
+        return {serie.clave: serie.valor for serie in self._series_ordenadas() if isinstance(serie, Contador)}
+
+
+# Instancia global del registro
+metricas = RegistroMetricas()
+
+
+# ============================================================
+# Exportadores
+# ============================================================
+
+class ServidorMetricas:
+    """Endpoint HTTP (solo localhost) con las métricas en formato Prometheus."""
+
+    def __init__(self, registro: RegistroMetricas = metricas, puerto: int = 9464, host: str = "127.0.0.1"):
+        self.registro = registro
+        self.puerto = puerto
+        self.host = host
+        self.servidor = None
+        self.thread = None
+
+    def iniciar(self) -> None:
+        """Inicia el servidor HTTP en un hilo daemon."""
+        # http.server solo se importa si el endpoint está activo
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        registro = self.registro
+
+        class _Manejador(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                cuerpo = registro.texto_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(cuerpo)))
+                self.end_headers()
+                self.wfile.write(cuerpo)
+
+            def log_message(self, formato, *args):
+                pass
+
+        self.servidor = ThreadingHTTPServer((self.host, self.puerto), _Manejador)
+        self.servidor.daemon_threads = True
+        self.thread = threading.Thread(target=self.servidor.serve_forever, name='metricas_http', daemon=True)
+        self.thread.start()
+        print(f"[METRICAS] Endpoint en http://{self.host}:{self.servidor.server_address[1]}/metrics")
+
+    def detener(self) -> None:
+        """Detiene el servidor HTTP."""
+        if self.servidor:
+            self.servidor.shutdown()
+            self.servidor.server_close()
+            self.servidor = None
+
+
+class VolcadoMetricas:
+    """
+    Escribe las métricas periódicamente en un archivo JSON lines.
+    Cada línea trae los valores acumulados y la tasa por segundo de cada
+    contador desde el volcado anterior (cuadros OCR/s, mutaciones/s, ...).
+    """
+
+    def __init__(self, registro: RegistroMetricas = metricas, ruta: str = "metricas.jsonl",
+                 intervalo: float = 10.0):
+        self.registro = registro
+        self.ruta = ruta
+        self.intervalo = intervalo
+        self.ejecutando = False
+        self.thread = None
+        self._detener = threading.Event()
+        self._anterior: Dict[str, float] = {}
+        self._t_anterior = 0.0
+
+    def volcar(self) -> dict:
+        """Agrega una línea al archivo y la retorna."""
+        ahora = time.perf_counter()
+        contadores = self.registro.contadores()
+        transcurrido = ahora - self._t_anterior if self._t_anterior else 0.0
+        por_segundo = {}
+        if transcurrido > 0:
+            for clave, valor in contadores.items():
+                por_segundo[clave] = round((valor - self._anterior.get(clave, 0)) / transcurrido, 3)
+        self._anterior = contadores
+        self._t_anterior = ahora
+
+        linea = {
+            'timestamp': time.time(),
+            'valores': self.registro.instantanea(),
+            'por_segundo': por_segundo,
+        }
+        with open(self.ruta, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(linea, ensure_ascii=False) + "\n")
+        return linea
+
+    def _ciclo(self) -> None:
+        self._anterior = self.registro.contadores()
+        self._t_anterior = time.perf_counter()
+        while not self._detener.wait(self.intervalo):
+            try:
+                self.volcar()
+            except Exception as e:
+                print(f"[METRICAS] Error al volcar métricas: {e}")
+        try:
+            self.volcar()
+        except Exception as e:
+            print(f"[METRICAS] Error al volcar métricas: {e}")
+
+    def iniciar(self) -> None:
+        """Inicia el volcado periódico en un hilo daemon."""
+        if self.ejecutando:
+            return
+        self.ejecutando = True
+        self._detener.clear()
+        self.thread = threading.Thread(target=self._ciclo, name='metricas', daemon=True)
+        self.thread.start()
+        print(f"[METRICAS] Volcado cada {self.intervalo:.0f}s en {self.ruta}")
+
+    def detener(self) -> None:
+        """Detiene el volcado (escribe una última línea)."""
+        self.ejecutando = False
+        self._detener.set()
+        if self.thread:
+            self.thread.join(timeout=2)
+
+
+def iniciar_exportadores(config: Optional[dict] = None) -> list:
+    """
+    Inicia los exportadores según la configuración METRICAS.
+
+    Args:
+        config: Diccionario METRICAS (por defecto el de la configuración vigente)
+
+    Returns:
+        Lista de exportadores iniciados (cada uno con detener())
+    """
+    if config is None:
+        from almacen_configuracion import almacen
+        config = almacen.actual.METRICAS
+    exportadores = []
+    if not config.get('activo', False):
+        return exportadores
+
+    if config.get('puerto'):
+        servidor = ServidorMetricas(metricas, int(config['puerto']))
+        try:
+            servidor.iniciar()
+            exportadores.append(servidor)
+        except OSError as e:
+            print(f"[METRICAS] No se pudo abrir el puerto {config['puerto']}: {e}")
+
+    if config.get('archivo'):
+        volcado = VolcadoMetricas(metricas, config['archivo'], float(config.get('intervalo_archivo', 10.0)))
+        volcado.iniciar()
+        exportadores.append(volcado)
+
+    return exportadores
+
+
+# ============================================================
+# PRUEBA INDEPENDIENTE
+# ============================================================
+if __name__ == "__main__":
+    import urllib.request
+
+    print("=" * 60)
+    print("PRUEBA DEL REGISTRO DE MÉTRICAS")
+    print("=" * 60)
+
+    cuadros = metricas.contador('bot_ocr_cuadros_total', 'Cuadros procesados por el detector OCR')
+    latencia = metricas.histograma('bot_ocr_latencia_segundos', 'Latencia por etapa del detector', etapa='ocr')
+
+    repeticiones = 1_000_000
+    t0 = time.perf_counter()
+    for _ in range(repeticiones):
+        cuadros.inc()
+    t_inc = (time.perf_counter() - t0) / repeticiones
+
+    t0 = time.perf_counter()
+    for i in range(repeticiones):
+        latencia.observar((i % 100) / 1000)
+    t_obs = (time.perf_counter() - t0) / repeticiones
+
+    def _trabajo():
+        for _ in range(100000):
+            cuadros.inc()
+
+    hilos = [threading.Thread(target=_trabajo) for _ in range(4)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    print(f"\n[INFO] inc(): {t_inc * 1e9:.0f} ns | observar(): {t_obs * 1e9:.0f} ns")
+    print(f"[INFO] Contador (1M + 4 hilos x 100k): {cuadros.valor:.0f}")
+
+    servidor = ServidorMetricas(metricas, puerto=0)
+    servidor.iniciar()
+    puerto = servidor.servidor.server_address[1]
+    with urllib.request.urlopen(f"http://127.0.0.1:{puerto}/metrics") as respuesta:
+        print("\n" + respuesta.read().decode("utf-8"))
+    servidor.detener()
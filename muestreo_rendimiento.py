@@ -0,0 +1,225 @@
+"""
+Muestreo del rendimiento del bot para el panel de la GUI.
+Responsabilidad: Convertir las métricas acumuladas en muestras periódicas con historial acotado (Single Responsibility Principle)
+
+Cada `intervalo` segundos el muestreador lee el registro de métricas (en
+memoria, sin pasar por el Manager del estado) y calcula:
+- ocr_fps: cuadros/s del detector OCR
+- latencia_ms: latencia media de detección (captura + OCR + clasificación)
+- teclas_s: teclas/s enviadas al juego por todos los hilos
+- vida / mana: último nivel leído por la autocuración (%)
+
+Cada muestra se entrega a los suscriptores (la GUI la convierte en una señal
+Qt). HistorialRendimiento guarda las últimas N muestras en deques con
+maxlen: la memoria es fija aunque la sesión dure horas.
+"""
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+from metricas import metricas, RegistroMetricas
+
+
+# Espacio de estado por defecto: estado_objetivo.ESPACIO_GLOBAL (no se importa
+# aquí para que la GUI no arranque el Manager del estado al cargar el panel)
+ESPACIO_GLOBAL = 'global'
+
+
+# Series de cada muestra (orden de los gráficos)
+SERIES = ('ocr_fps', 'latencia_ms', 'teclas_s', 'vida', 'mana')
+
+# Etapas del detector que suman la latencia de detección
+ETAPAS_DETECCION = ('captura', 'ocr', 'clasificacion')
+
+# Historial por defecto: 10 minutos a una muestra por segundo
+MAX_MUESTRAS = 600
+
+
+class HistorialRendimiento:
+    """
+    Últimas muestras de cada serie en buffers circulares (deque con maxlen).
+    Se usa desde un solo hilo (el de la GUI), sin locks.
+    """
+
+    def __init__(self, max_muestras: int = MAX_MUESTRAS):
+        """
+        Args:
+            max_muestras: Muestras que se conservan por serie
+        """
+        self.max_muestras = max_muestras
+        self.tiempos = deque(maxlen=max_muestras)
+        self.series: Dict[str, deque] = {nombre: deque(maxlen=max_muestras) for nombre in SERIES}
+
+    def agregar(self, muestra: dict) -> None:
+        """Agrega una muestra (descarta la más antigua si el historial está lleno)."""
+        self.tiempos.append(muestra['timestamp'])
+        for nombre, valores in self.series.items():
+            valores.append(muestra.get(nombre, 0.0))
+
+    def valores(self, nombre: str) -> deque:
+        """Valores de una serie, del más antiguo al más reciente."""
+        return self.series[nombre]
+
+    def limpiar(self) -> None:
+        """Vacía el historial (nuevo RUN)."""
+        self.tiempos.clear()
+        for valores in self.series.values():
+            valores.clear()
+
+    def __len__(self) -> int:
+        return len(self.tiempos)
+
+
+class MuestreadorRendimiento:
+    """
+    Hilo que toma una muestra de rendimiento cada `intervalo` segundos y la
+    entrega a los suscriptores.
+    """
+
+    def __init__(self, registro: RegistroMetricas = metricas, intervalo: float = 1.0,
+                 espacio: str = ESPACIO_GLOBAL):
+        """
+        Args:
+            registro: Registro de métricas a leer
+            intervalo: Segundos entre muestras
+            espacio: Espacio de estado cuyo nivel de vida/maná se muestra
+        """
+        self.registro = registro
+        self.intervalo = intervalo
+        self.ejecutando = False
+        self.thread = None
+        self.ultima: Optional[dict] = None
+        self._detener = threading.Event()
+        self._suscriptores: List[Callable[[dict], None]] = []
+        # Series que se leen en cada muestra (los contadores de cuadros y teclas
+        # se buscan por nombre en cada muestra: un cliente o un hilo nuevo agrega
+        # su espacio u origen)
+        self._latencias = [
+            registro.histograma('bot_ocr_latencia_segundos', 'Latencia por etapa del detector OCR', etapa=etapa)
+            for etapa in ETAPAS_DETECCION
+        ]
+        self._niveles = {
+            recurso: registro.medidor('bot_recurso_porcentaje', 'Nivel de vida y maná (%) por espacio de estado',
+                                      recurso=recurso, espacio=espacio)
+            for recurso in ('vida', 'mana')
+        }
+        self._anterior: Optional[dict] = None
+
+    def suscribir(self, funcion: Callable[[dict], None]) -> None:
+        """Registra una función que se llama (desde el hilo de muestreo) con cada muestra."""
+        self._suscriptores.append(funcion)
+
+    def desuscribir(self, funcion: Callable[[dict], None]) -> None:
+        """Quita una función registrada con suscribir()."""
+        if funcion in self._suscriptores:
+            self._suscriptores.remove(funcion)
+
+    def _acumulados(self) -> dict:
+        """Valores acumulados de las series (para calcular tasas entre muestras)."""
+        suma = 0.0
+        cantidad = 0
+        for histograma in self._latencias:
+            valores = histograma.instantanea()
+            suma += valores[f"{histograma.clave}.suma"]
+            cantidad += valores[f"{histograma.clave}.cantidad"]
+        return {
+            't': time.perf_counter(),
+            'cuadros': sum(serie.valor for serie in self.registro.buscar('bot_ocr_cuadros_total')),
+            'teclas': sum(serie.valor for serie in self.registro.buscar('bot_teclas_total')),
+            'latencia_suma': suma,
+            # Cada cuadro pasa por las tres etapas: latencia por cuadro = suma / cuadros
+            'latencia_cuadros': cantidad / len(self._latencias),
+        }
+
+    def muestrear(self) -> dict:
+        """
+        Toma una muestra: tasas desde la muestra anterior y niveles actuales.
+
+        Returns:
+            Diccionario con 'timestamp' y una clave por serie de SERIES
+        """
+        actual = self._acumulados()
+        anterior = self._anterior or actual
+        self._anterior = actual
+        transcurrido = actual['t'] - anterior['t']
+        cuadros = actual['latencia_cuadros'] - anterior['latencia_cuadros']
+
+        muestra = {
+            'timestamp': time.time(),
+            'ocr_fps': (actual['cuadros'] - anterior['cuadros']) / transcurrido if transcurrido > 0 else 0.0,
+            'latencia_ms': (actual['latencia_suma'] - anterior['latencia_suma']) / cuadros * 1000 if cuadros > 0 else 0.0,
+            'teclas_s': (actual['teclas'] - anterior['teclas']) / transcurrido if transcurrido > 0 else 0.0,
+            'vida': self._niveles['vida'].valor,
+            'mana': self._niveles['mana'].valor,
+        }
+        self.ultima = muestra
+        return muestra
+
+    def _ciclo(self) -> None:
+        self.muestrear()
+        while not self._detener.wait(self.intervalo):
+            muestra = self.muestrear()
+            for funcion in list(self._suscriptores):
+                try:
+                    funcion(muestra)
+                except Exception as e:
+                    print(f"[RENDIMIENTO] Error en suscriptor: {e}")
+
+    def iniciar(self) -> None:
+        """Inicia el muestreo en un hilo daemon."""
+        if self.ejecutando:
+            return
+        self.ejecutando = True
+        self._detener.clear()
+        self._anterior = None
+        self.thread = threading.Thread(target=self._ciclo, name='muestreo', daemon=True)
+        self.thread.start()
+
+    def detener(self) -> None:
+        """Detiene el muestreo."""
+        self.ejecutando = False
+        self._detener.set()
+        if self.thread:
+            self.thread.join(timeout=2)
+
+
+# ============================================================
+# PRUEBA INDEPENDIENTE
+# ============================================================
+if __name__ == "__main__":
+    import random
+
+    print("=" * 60)
+    print("PRUEBA DEL MUESTREO DE RENDIMIENTO")
+    print("=" * 60)
+
+    cuadros = metricas.contador('bot_ocr_cuadros_total', 'Cuadros procesados por el detector OCR',
+                                espacio=ESPACIO_GLOBAL)
+    latencias = [metricas.histograma('bot_ocr_latencia_segundos', 'Latencia por etapa del detector OCR', etapa=etapa)
+                 for etapa in ETAPAS_DETECCION]
+    teclas = metricas.contador('bot_teclas_total', 'Teclas enviadas al juego por origen', origen='habilidades',
+                               espacio=ESPACIO_GLOBAL)
+    vida = metricas.medidor('bot_recurso_porcentaje', 'Nivel de vida y maná (%) por espacio de estado',
+                            recurso='vida', espacio=ESPACIO_GLOBAL)
+
+    historial = HistorialRendimiento(max_muestras=5)
+    muestreador = MuestreadorRendimiento(intervalo=0.5)
+    muestreador.suscribir(historial.agregar)
+    muestreador.suscribir(lambda m: print(
+        f"  ocr {m['ocr_fps']:5.1f}/s | latencia {m['latencia_ms']:5.1f} ms | "
+        f"teclas {m['teclas_s']:4.1f}/s | vida {m['vida']:3.0f}%"))
+    muestreador.iniciar()
+
+    fin = time.time() + 4
+    while time.time() < fin:
+        cuadros.inc()
+        for latencia in latencias:
+            latencia.observar(random.uniform(0.002, 0.01))
+        if random.random() < 0.2:
+            teclas.inc()
+        vida.fijar(random.uniform(40, 100))
+        time.sleep(0.03)
+
+    muestreador.detener()
+    print(f"\nHistorial acotado: {len(historial)} muestras (máximo {historial.max_muestras})")
@@ -0,0 +1,229 @@
+"""
+Panel de rendimiento de la GUI y puente de señales con los hilos del bot.
+Responsabilidad: Llevar los eventos de los hilos del bot al hilo de la GUI y dibujar su historial (Single Responsibility Principle)
+
+Los hilos del bot no tocan widgets: publican en PuenteBot, que los convierte
+en señales Qt (entregadas en el hilo de la GUI). Los cambios de estado se
+agrupan: el hilo que publica solo reemplaza el último valor y, si no hay una
+entrega pendiente, emite una señal; la GUI aplica como máximo un cambio por
+cuadro de pantalla y descarta los intermedios.
+
+PanelRendimiento dibuja con QPainter el historial de cada serie (OCR/s,
+latencia de detección, teclas/s y vida/maná), guardado en buffers
+circulares de tamaño fijo.
+"""
+import threading
+import time
+from typing import Dict, Optional, Sequence, Tuple
+
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QGridLayout, QLabel, QSizePolicy
+from PyQt5.QtCore import Qt, QObject, QTimer, QPointF, pyqtSignal
+from PyQt5.QtGui import QPainter, QPen, QColor, QPolygonF
+
+from muestreo_rendimiento import HistorialRendimiento, MAX_MUESTRAS
+
+
+class PuenteBot(QObject):
+    """
+    Puente entre los hilos del bot y la GUI.
+    publicar_*() se llaman desde cualquier hilo; las señales llegan al hilo de la GUI.
+    """
+
+    estado_cambiado = pyqtSignal(dict)
+    muestra_nueva = pyqtSignal(dict)
+    _hay_estado = pyqtSignal()
+
+    def __init__(self, intervalo_ms: int = 16, parent: Optional[QObject] = None):
+        """
+        Args:
+            intervalo_ms: Mínimo entre dos entregas de estado (un cuadro de pantalla)
+            parent: QObject padre
+        """
+        super().__init__(parent)
+        self.intervalo = intervalo_ms / 1000
+        self.entregados = 0
+        self.descartados = 0
+        self._lock = threading.Lock()
+        self._estado: Optional[dict] = None
+        self._programado = False
+        self._ultima_entrega = 0.0
+        self._hay_estado.connect(self._entregar_estado, Qt.QueuedConnection)
+
+    def publicar_estado(self, info: dict) -> None:
+        """Publica un cambio de estado (desde los hilos del bot)."""
+        with self._lock:
+            if self._estado is not None:
+                self.descartados += 1
+            self._estado = info
+            if self._programado:
+                return
+            self._programado = True
+        self._hay_estado.emit()
+
+    def publicar_muestra(self, muestra: dict) -> None:
+        """Publica una muestra de rendimiento (una por segundo, sin agrupar)."""
+        self.muestra_nueva.emit(muestra)
+
+    def _entregar_estado(self) -> None:
+        """Emite el último estado publicado (hilo de la GUI)."""
+        espera = self._ultima_entrega + self.intervalo - time.perf_counter()
+        if espera > 0:
+            QTimer.singleShot(max(1, int(espera * 1000)), self._entregar_estado)
+            return
+        with self._lock:
+            info = self._estado
+            self._estado = None
+            self._programado = False
+        self._ultima_entrega = time.perf_counter()
+        if info is not None:
+            self.entregados += 1
+            self.estado_cambiado.emit(info)
+
+
+class GraficoSerie(QWidget):
+    """Gráfico de líneas de una o más series de un HistorialRendimiento."""
+
+    def __init__(self, titulo: str, historial: HistorialRendimiento,
+                 series: Sequence[Tuple[str, str]], unidad: str = "",
+                 maximo: Optional[float] = None):
+        """
+        Args:
+            titulo: Título del gráfico
+            historial: Historial compartido por todos los gráficos del panel
+            series: (nombre de la serie, color) por línea
+            unidad: Texto después del valor actual ('/s', ' ms', '%')
+            maximo: Escala vertical fija (None = se ajusta al historial)
+        """
+        super().__init__()
+        self.titulo = titulo
+        self.historial = historial
+        self.series = list(series)
+        self.unidad = unidad
+        self.maximo = maximo
+        self.setMinimumSize(200, 110)
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+
+    def _escala(self) -> float:
+        """Valor que corresponde al borde superior del gráfico."""
+        if self.maximo is not None:
+            return self.maximo
+        mayor = max((max(self.historial.valores(nombre), default=0.0) for nombre, _ in self.series), default=0.0)
+        return mayor * 1.2 if mayor > 0 else 1.0
+
+    def paintEvent(self, event):
+        pintor = QPainter(self)
+        pintor.setRenderHint(QPainter.Antialiasing)
+        ancho, alto = self.width(), self.height()
+        pintor.fillRect(0, 0, ancho, alto, QColor('#1e1e1e'))
+
+        # Área del trazo (debajo del título)
+        margen, arriba = 4, 18
+        area_alto = alto - arriba - margen
+        pintor.setPen(QPen(QColor('#3a3a3a'), 1))
+        for fraccion in (0.0, 0.5, 1.0):
+            y = arriba + area_alto * fraccion
+            pintor.drawLine(QPointF(margen, y), QPointF(ancho - margen, y))
+
+        escala = self._escala()
+        paso = (ancho - 2 * margen) / max(1, self.historial.max_muestras - 1)
+        textos = []
+        for nombre, color in self.series:
+            valores = self.historial.valores(nombre)
+            if valores:
+                # Las muestras más recientes quedan pegadas al borde derecho
+                x0 = ancho - margen - paso * (len(valores) - 1)
+                linea = QPolygonF([
+                    QPointF(x0 + i * paso, arriba + area_alto * (1 - min(valor, escala) / escala))
+                    for i, valor in enumerate(valores)
+                ])
+                pintor.setPen(QPen(QColor(color), 1.5))
+                pintor.drawPolyline(linea)
+                textos.append((f"{valores[-1]:.1f}{self.unidad}", color))
+
+        # Título y valor actual de cada serie
+        pintor.setPen(QColor('#dddddd'))
+        pintor.drawText(margen, 13, self.titulo)
+        x = ancho - margen
+        for texto, color in reversed(textos):
+            x -= pintor.fontMetrics().width(texto) + 8
+            pintor.setPen(QColor(color))
+            pintor.drawText(x, 13, texto)
+        pintor.end()
+
+
+class PanelRendimiento(QWidget):
+    """Pestaña con los gráficos de rendimiento en vivo."""
+
+    def __init__(self, max_muestras: int = MAX_MUESTRAS):
+        """
+        Args:
+            max_muestras: Muestras visibles por gráfico (una por segundo)
+        """
+        super().__init__()
+        self.historial = HistorialRendimiento(max_muestras)
+        self.graficos = [
+            GraficoSerie("OCR (cuadros/s)", self.historial, [('ocr_fps', '#4fc3f7')], "/s"),
+            GraficoSerie("Latencia de detección", self.historial, [('latencia_ms', '#ffb74d')], " ms"),
+            GraficoSerie("Teclas enviadas", self.historial, [('teclas_s', '#ba68c8')], "/s"),
+            GraficoSerie("Vida / Maná", self.historial, [('vida', '#e57373'), ('mana', '#64b5f6')], "%", maximo=100.0),
+        ]
+        self.init_ui(max_muestras)
+
+    def init_ui(self, max_muestras: int):
+        layout = QVBoxLayout()
+
+        grid = QGridLayout()
+        for i, grafico in enumerate(self.graficos):
+            grid.addWidget(grafico, i // 2, i % 2)
+        layout.addLayout(grid)
+
+        layout.addWidget(QLabel(
+            f"Una muestra por segundo; se muestran los últimos {max_muestras // 60} minutos."
+        ))
+        self.setLayout(layout)
+
+    def agregar_muestra(self, muestra: Dict[str, float]) -> None:
+        """Agrega una muestra y repinta los gráficos (slot de PuenteBot.muestra_nueva)."""
+        self.historial.agregar(muestra)
+        for grafico in self.graficos:
+            grafico.update()
+
+    def limpiar(self) -> None:
+        """Vacía el historial (nuevo RUN)."""
+        self.historial.limpiar()
+        for grafico in self.graficos:
+            grafico.update()
+
+
+# ============================================================
+# PRUEBA INDEPENDIENTE
+# ============================================================
+if __name__ == "__main__":
+    import random
+    import sys
+    from PyQt5.QtWidgets import QApplication
+
+    app = QApplication(sys.argv)
+    panel = PanelRendimiento(max_muestras=120)
+    puente = PuenteBot()
+    puente.muestra_nueva.connect(panel.agregar_muestra)
+    panel.setWindowTitle("Prueba del panel de rendimiento")
+    panel.resize(800, 400)
+    panel.show()
+
+    def _publicar():
+        # Simula el hilo de muestreo (en la GUI real llega desde otro hilo)
+        vida = panel.historial.valores('vida')
+        puente.publicar_muestra({
+            'timestamp': time.time(),
+            'ocr_fps': random.uniform(25, 35),
+            'latencia_ms': random.uniform(8, 20),
+            'teclas_s': random.uniform(0, 6),
+            'vida': max(0.0, min(100.0, (vida[-1] if vida else 100.0) + random.uniform(-15, 10))),
+            'mana': random.uniform(50, 100),
+        })
+
+    temporizador = QTimer()
+    temporizador.timeout.connect(_publicar)
+    temporizador.start(200)
+    sys.exit(app.exec_())
@@ -0,0 +1,172 @@
+"""
+Panel de vista previa del detector OCR en la GUI.
+Responsabilidad: Mostrar la región capturada, la imagen binarizada y el resultado del OCR en vivo (Single Responsibility Principle)
+
+Reemplaza a los cv2.imwrite("debug_captura_*.png") comentados del detector.
+El panel lee el buffer de una posición de vista_previa_ocr con un QTimer al
+máximo de cuadros/s elegido: los cuadros que el detector publica entre dos
+lecturas se descartan sin acumularse. El buffer solo está activo mientras
+la pestaña está visible; la conversión y el escalado de las imágenes se
+hacen aquí, en el hilo de la GUI.
+"""
+from typing import Optional
+
+from PyQt5.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QGridLayout, QGroupBox, QLabel, QSpinBox
+)
+from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtGui import QImage, QPixmap, QFont
+
+from vista_previa_ocr import CuadroOCR, obtener_buffer
+
+
+# Ancho en pantalla de las dos imágenes (píxeles)
+ANCHO_IMAGEN = 600
+
+
+def _a_pixmap(imagen, formato: QImage.Format) -> QPixmap:
+    """
+    Convierte un array (alto, ancho[, canales]) en un QPixmap escalado a
+    ANCHO_IMAGEN con vecino más cercano (se ven los píxeles reales).
+    """
+    if not imagen.flags['C_CONTIGUOUS']:
+        imagen = imagen.copy()
+    alto, ancho = imagen.shape[:2]
+    # copy(): la QImage deja de apuntar a la memoria del array
+    qimagen = QImage(imagen.data, ancho, alto, imagen.strides[0], formato).copy()
+    escala = max(1, ANCHO_IMAGEN // max(1, ancho))
+    return QPixmap.fromImage(qimagen).scaled(
+        ancho * escala, alto * escala, Qt.KeepAspectRatio, Qt.FastTransformation
+    )
+
+
+class PanelVistaPreviaOCR(QWidget):
+    """Pestaña con la vista previa en vivo del detector OCR."""
+
+    def __init__(self, espacio: Optional[str] = None):
+        """
+        Args:
+            espacio: Espacio de estado del detector a mostrar (por defecto el global)
+        """
+        super().__init__()
+        self.buffer = obtener_buffer(espacio) if espacio else obtener_buffer()
+        self._visto = 0
+        self._mostrados = 0
+        self._publicados_inicio = 0
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.actualizar)
+        self.init_ui()
+
+    def init_ui(self):
+        layout = QVBoxLayout()
+
+        hbox = QHBoxLayout()
+        hbox.addWidget(QLabel("Máximo de cuadros/s:"))
+        self.fps = QSpinBox()
+        self.fps.setRange(1, 30)
+        self.fps.setValue(10)
+        self.fps.valueChanged.connect(self._ajustar_intervalo)
+        hbox.addWidget(self.fps)
+        hbox.addStretch()
+        self.contadores = QLabel("Sin cuadros")
+        hbox.addWidget(self.contadores)
+        layout.addLayout(hbox)
+
+        group_imagenes = QGroupBox("Región OCR")
+        vbox = QVBoxLayout()
+        vbox.addWidget(QLabel("Captura:"))
+        self.imagen_captura = QLabel()
+        self.imagen_captura.setMinimumHeight(60)
+        vbox.addWidget(self.imagen_captura)
+        vbox.addWidget(QLabel("Binarizada (lo que recibe el OCR):"))
+        self.imagen_binaria = QLabel()
+        self.imagen_binaria.setMinimumHeight(60)
+        vbox.addWidget(self.imagen_binaria)
+        group_imagenes.setLayout(vbox)
+        layout.addWidget(group_imagenes)
+
+        group_resultado = QGroupBox("Resultado")
+        grid = QGridLayout()
+        fuente = QFont("Consolas", 10)
+        self.campos = {}
+        for fila, (clave, titulo) in enumerate((
+            ('texto', "Texto OCR:"),
+            ('clasificacion', "Clasificación:"),
+            ('candidato', "Mejor candidato:"),
+            ('latencia', "Latencia:"),
+        )):
+            grid.addWidget(QLabel(titulo), fila, 0)
+            campo = QLabel("-")
+            campo.setFont(fuente)
+            campo.setTextInteractionFlags(Qt.TextSelectableByMouse)
+            grid.addWidget(campo, fila, 1)
+            self.campos[clave] = campo
+        group_resultado.setLayout(grid)
+        layout.addWidget(group_resultado)
+
+        layout.addWidget(QLabel(
+            "La vista previa solo está activa mientras esta pestaña está visible."
+        ))
+        layout.addStretch()
+        self.setLayout(layout)
+
+    def _ajustar_intervalo(self):
+        """Intervalo del timer según el máximo de cuadros/s."""
+        self.timer.setInterval(int(1000 / self.fps.value()))
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self._publicados_inicio = self.buffer.publicados
+        self._mostrados = 0
+        self.buffer.activo = True
+        self._ajustar_intervalo()
+        self.timer.start()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.buffer.activo = False
+        self.timer.stop()
+        self.buffer.limpiar()
+
+    def actualizar(self):
+        """Muestra el último cuadro publicado, si hay uno nuevo (llamado por el timer)."""
+        self._visto, cuadro = self.buffer.tomar(self._visto)
+        if cuadro is None:
+            return
+        self._mostrados += 1
+        self.mostrar(cuadro)
+        publicados = self.buffer.publicados - self._publicados_inicio
+        self.contadores.setText(f"Mostrados {self._mostrados} de {publicados} cuadros del detector")
+
+    def mostrar(self, cuadro: CuadroOCR):
+        """Dibuja un cuadro del detector."""
+        self.imagen_captura.setPixmap(_a_pixmap(cuadro.captura, QImage.Format_RGB32))
+        self.imagen_binaria.setPixmap(_a_pixmap(cuadro.binaria, QImage.Format_Grayscale8))
+
+        texto = cuadro.texto.replace('\n', ' ⏎ ') or '(vacío)'
+        self.campos['texto'].setText(f"'{texto}'")
+        if cuadro.coincidente:
+            self.campos['clasificacion'].setText(
+                f"{cuadro.tipo.upper()}: {cuadro.coincidente} ({cuadro.similitud * 100:.1f}%)"
+            )
+            self.campos['candidato'].setText("-")
+        else:
+            self.campos['clasificacion'].setText(cuadro.tipo.upper())
+            self.campos['candidato'].setText(self._mejor_candidato(cuadro.nombre))
+        self.campos['latencia'].setText(f"{cuadro.latencia * 1000:.1f} ms")
+
+    @staticmethod
+    def _mejor_candidato(nombre: str) -> str:
+        """
+        Nombre más parecido aunque no llegue al umbral (calculado aquí, en el
+        hilo de la GUI, para no agregar trabajo al detector).
+        """
+        if not nombre:
+            return "-"
+        from almacen_configuracion import almacen
+        compilada = almacen.actual.compilada
+        mejores = [compilada.mobs.buscar(nombre, 0.0), compilada.drops.buscar(nombre, 0.0)]
+        candidato, similitud = max(mejores, key=lambda m: m[1])
+        if not candidato:
+            return "-"
+        return f"{candidato} ({similitud * 100:.1f}%, umbral {compilada.umbral * 100:.0f}%)"
@@ -0,0 +1,210 @@
+"""
+Perfilador por muestreo de los hilos del bot.
+Responsabilidad: Medir dónde pasa el tiempo cada hilo en ejecución (Single Responsibility Principle)
+
+Se activa y desactiva en caliente (GUI o bot.py --perfilar) sin reiniciar el
+bot. Un hilo auxiliar toma muestras de las pilas de los hilos elegidos con
+sys._current_frames() cada pocos milisegundos durante el tiempo indicado, y
+al terminar escribe un archivo de pilas colapsadas (formato "a;b;c N") que
+leen flamegraph.pl, speedscope o inferno. Con varios clientes cada hilo
+elegido se muestrea en todos ellos, con el espacio del cliente en la raíz de
+la pila ('detector:global', 'detector:hwnd:0x...').
+
+Se usa muestreo y no cProfile porque cProfile solo puede activarse desde el
+propio hilo perfilado; el muestreo se engancha a hilos que ya están corriendo
+y su costo no depende de cuántas funciones llamen.
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+
+# Nombres de los hilos del bot: threading.Thread(name='hilo:espacio'), con el
+# espacio de estado del cliente ('detector:global', 'detector:hwnd:0x...')
+HILOS_PERFILABLES = ('detector', 'habilidades', 'vida', 'mana', 'observador', 'loot', 'escape')
+
+CARPETA_PERFILES = "perfiles"
+INTERVALO_MUESTREO = 0.005   # Segundos entre muestras
+PROFUNDIDAD_MAXIMA = 64
+
+
+def _etiqueta(frame) -> str:
+    """Etiqueta de un marco de pila: archivo.py:funcion."""
+    codigo = frame.f_code
+    return f"{os.path.basename(codigo.co_filename)}:{codigo.co_name}"
+
+
+def _hilo_base(nombre: str) -> str:
+    """Nombre del hilo sin el espacio del cliente: 'detector:global' -> 'detector'."""
+    return nombre.split(':', 1)[0]
+
+
+def _pila_colapsada(nombre_hilo: str, frame) -> str:
+    """Pila de un hilo como 'hilo;raiz;...;hoja'."""
+    marcos = []
+    while frame is not None and len(marcos) < PROFUNDIDAD_MAXIMA:
+        marcos.append(_etiqueta(frame))
+        frame = frame.f_back
+    marcos.append(nombre_hilo)
+    return ";".join(reversed(marcos))
+
+
+class Perfilador:
+    """
+    Perfilador por muestreo de hilos con nombre.
+    Una sola sesión a la vez; thread-safe para iniciar/detener desde la GUI.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._detener = threading.Event()
+        self._muestras: Counter = Counter()
+        self._hilos: List[str] = []
+        self._inicio = 0.0
+        self._duracion = 0.0
+        self.ultimo_archivo: Optional[str] = None
+        self.ultimo_resumen: Dict[str, int] = {}
+
+    @property
+    def activo(self) -> bool:
+        """True si hay una sesión de perfilado en curso."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def progreso(self) -> float:
+        """Segundos restantes de la sesión en curso (0 si no hay sesión)."""
+        if not self.activo:
+            return 0.0
+        return max(0.0, self._duracion - (time.perf_counter() - self._inicio))
+
+    def iniciar(self, hilos: Optional[Iterable[str]] = None, duracion: float = 30.0,
+                intervalo: float = INTERVALO_MUESTREO, carpeta: str = CARPETA_PERFILES) -> bool:
+        """
+        Inicia una sesión de perfilado.
+
+        Args:
+            hilos: Nombres de los hilos a perfilar (por defecto todos los del bot)
+            duracion: Segundos de muestreo
+            intervalo: Segundos entre muestras
+            carpeta: Carpeta donde se escribe el archivo .folded
+
+        Returns:
+            False si ya había una sesión en curso
+        """
+        with self._lock:
+            if self.activo:
+                return False
+            self._hilos = list(hilos or HILOS_PERFILABLES)
+            self._muestras = Counter()
+            self._duracion = duracion
+            self._detener.clear()
+            self._inicio = time.perf_counter()
+            self._thread = threading.Thread(
+                target=self._ciclo_muestreo, args=(intervalo, carpeta), name='perfilador', daemon=True
+            )
+            self._thread.start()
+        print(f"[PERFILADOR] Perfilando {', '.join(self._hilos)} durante {duracion:.0f}s")
+        return True
+
+    def detener(self) -> None:
+        """Termina la sesión en curso antes de tiempo (igual se escribe el archivo)."""
+        self._detener.set()
+        thread = self._thread
+        if thread:
+            thread.join(timeout=5)
+
+    def _ciclo_muestreo(self, intervalo: float, carpeta: str) -> None:
+        """Toma muestras hasta agotar la duración o hasta que se pida detener."""
+        objetivo = set(self._hilos)
+        propio = threading.get_ident()
+        fin = self._inicio + self._duracion
+
+        while not self._detener.is_set() and time.perf_counter() < fin:
+            # Todos los clientes de cada hilo elegido, cada uno con su raíz en la pila
+            nombres = {t.ident: t.name for t in threading.enumerate() if _hilo_base(t.name) in objetivo}
+            for ident, frame in sys._current_frames().items():
+                if ident != propio and ident in nombres:
+                    self._muestras[_pila_colapsada(nombres[ident], frame)] += 1
+            self._detener.wait(intervalo)
+
+        self._escribir(carpeta)
+
+    def _escribir(self, carpeta: str) -> None:
+        """Escribe las pilas colapsadas e imprime un resumen por hilo."""
+        muestras = self._muestras
+        if not muestras:
+            print("[PERFILADOR] No se tomaron muestras (¿los hilos están en ejecución?)")
+            self.ultimo_archivo = None
+            self.ultimo_resumen = {}
+            return
+
+        os.makedirs(carpeta, exist_ok=True)
+        ruta = os.path.join(carpeta, f"perfil_{datetime.now():%Y%m%d_%H%M%S}.folded")
+        with open(ruta, 'w', encoding='utf-8') as f:
+            for pila, cantidad in sorted(muestras.items()):
+                f.write(f"{pila} {cantidad}\n")
+
+        resumen = Counter()
+        hojas: Dict[str, Counter] = {}
+        for pila, cantidad in muestras.items():
+            marcos = pila.split(";")
+            resumen[marcos[0]] += cantidad
+            hojas.setdefault(marcos[0], Counter())[marcos[-1]] += cantidad
+
+        self.ultimo_archivo = ruta
+        self.ultimo_resumen = dict(resumen)
+        print(f"[PERFILADOR] Perfil guardado en {ruta}")
+        for hilo, total in resumen.most_common():
+            principales = ", ".join(
+                f"{hoja} {100 * n / total:.0f}%" for hoja, n in hojas[hilo].most_common(3)
+            )
+            print(f"[PERFILADOR]   {hilo:24s} {total:6d} muestras | {principales}")
+
+
+def parsear_hilos(texto: str) -> List[str]:
+    """
+    Convierte 'detector,vida' o 'todos' en una lista de hilos válidos.
+
+    Raises:
+        ValueError: Si algún nombre no es un hilo perfilable
+    """
+    if not texto or texto.strip().lower() == 'todos':
+        return list(HILOS_PERFILABLES)
+    hilos = [nombre.strip().lower() for nombre in texto.split(",") if nombre.strip()]
+    desconocidos = [nombre for nombre in hilos if nombre not in HILOS_PERFILABLES]
+    if desconocidos:
+        raise ValueError(f"Hilos desconocidos: {', '.join(desconocidos)}. "
+                         f"Válidos: {', '.join(HILOS_PERFILABLES)} o 'todos'")
+    return hilos
+
+
+# Instancia global del perfilador
+perfilador = Perfilador()
+
+
+# ============================================================
+# PRUEBA INDEPENDIENTE
+# ============================================================
+if __name__ == "__main__":
+    print("=" * 60)
+    print("PRUEBA DEL PERFILADOR")
+    print("=" * 60)
+
+    def _trabajo_pesado():
+        return sum(i * i for i in range(20000))
+
+    def _ciclo_prueba():
+        fin = time.perf_counter() + 2.5
+        while time.perf_counter() < fin:
+            _trabajo_pesado()
+            time.sleep(0.001)
+
+    hilo = threading.Thread(target=_ciclo_prueba, name='detector:global', daemon=True)
+    hilo.start()
+    perfilador.iniciar(['detector'], duracion=2.0, carpeta=os.path.join("build", "perfiles_prueba"))
+    hilo.join()
+    perfilador.detener()
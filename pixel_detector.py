@@ -2,9 +2,9 @@
 Módulo para detectar colores en píxeles de la pantalla.
 Responsabilidad: Captura y análisis de colores (Single Responsibility Principle)
 """
-import ctypes
-from typing import Tuple
+from typing import List, Optional, Tuple
 from game_window import GameWindow
+from captura_sondas import FuentePantalla
 
 
 class PixelDetector:
@@ -12,16 +12,16 @@ class PixelDetector:
     Clase para detectar colores de píxeles en la ventana del juego.
     """
     
-    def __init__(self, game_window: GameWindow):
+    def __init__(self, game_window: GameWindow, fuente: Optional[FuentePantalla] = None):
         """
         Inicializa el detector de píxeles.
         
         Args:
             game_window: Instancia de GameWindow
+            fuente: Fuente de píxeles de pantalla (por defecto el backend de la ventana)
         """
         self.game_window = game_window
-        self.user32 = ctypes.windll.user32
-        self.gdi32 = ctypes.windll.gdi32
+        self.fuente = fuente or game_window.backend
     
     def get_pixel_color(self, x_relative: int, y_relative: int) -> Tuple[int, int, int]:
         """
@@ -34,28 +34,33 @@ class PixelDetector:
         Returns:
             Tupla (R, G, B) con los valores de color
         """
-        # Obtener posición de la ventana
-        rect = self.game_window.get_window_rect()
-        
-        # Calcular coordenadas absolutas
-        x_absolute = rect.left + x_relative
-        y_absolute = rect.top + y_relative
-        
-        # Obtener contexto de dispositivo
-        hdc = self.user32.GetDC(0)
-        
-        # Obtener color del píxel (formato BGR en Windows)
-        color = self.gdi32.GetPixel(hdc, x_absolute, y_absolute)
+        return self.get_pixel_colors([(x_relative, y_relative)])[0]
+    
+    def get_pixel_colors(self, puntos: List[Tuple[int, int]]) -> List[Tuple[int, int, int]]:
+        """
+        Obtiene el color RGB de varios píxeles con una sola captura
+        (el rectángulo mínimo que contiene todos los puntos).
         
-        # Liberar contexto
-        self.user32.ReleaseDC(0, hdc)
+        Args:
+            puntos: Lista de coordenadas (x, y) relativas a la ventana
+            
+        Returns:
+            Lista de tuplas (R, G, B) en el mismo orden
+        """
+        rect = self.game_window.get_window_rect()
+        x0 = min(x for x, _ in puntos)
+        y0 = min(y for _, y in puntos)
+        ancho = max(x for x, _ in puntos) - x0 + 1
+        alto = max(y for _, y in puntos) - y0 + 1
         
-        # Convertir de BGR a RGB
-        r = color & 0xFF
-        g = (color >> 8) & 0xFF
-        b = (color >> 16) & 0xFF
+        imagen = self.fuente.capturar(rect.left + x0, rect.top + y0, ancho, alto)
         
-        return r, g, b
+        # La captura es BGRA
+        colores = []
+        for x, y in puntos:
+            b, g, r = imagen[y - y0, x - x0, :3]
+            colores.append((int(r), int(g), int(b)))
+        return colores
     
     @staticmethod
     def rgb_to_hex(r: int, g: int, b: int) -> str:
@@ -0,0 +1,208 @@
+"""
+Reconocedor de la fuente de mapa de bits de las placas de nombre.
+Responsabilidad: Leer el texto de la placa por glifos conocidos, sin OCR general (Single Responsibility Principle)
+
+Kathana dibuja los nombres con una fuente de píxeles de tamaño fijo: la misma
+letra produce siempre el mismo mapa de bits. En lugar de pasar cada cuadro
+por el motor LSTM de Tesseract, la placa (en escala de grises, sin escalar)
+se binariza con el umbral del detector y se segmenta:
+
+1. Filas con texto -> líneas (huecos de pocas filas, como el punto de la 'i',
+   no separan líneas).
+2. Columnas con texto dentro de la línea -> glifos (proyección por columnas);
+   un hueco de al menos `espacio` columnas es un espacio.
+3. Cada glifo, recortado a sus filas con texto, se busca en la tabla por su
+   mapa de bits exacto (un diccionario). Si no está, se compara con los
+   glifos del mismo tamaño y se acepta el más parecido si difiere en pocos
+   píxeles.
+
+reconocer() retorna (texto, confianza). Si algún glifo no se reconoce, el
+texto es None y el detector usa Tesseract para ese cuadro.
+
+La tabla (glifos_fuente.npz) se construye con construir_glifos.py a partir de
+cuadros etiquetados; sin tabla el detector usa solo Tesseract.
+"""
+import os
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+# Archivo con la tabla de glifos (generado por construir_glifos.py)
+RUTA_GLIFOS = "glifos_fuente.npz"
+
+# Filas vacías que todavía pertenecen a la misma línea (punto de la 'i', tildes)
+HUECO_MAXIMO_LINEA = 2
+
+# Fracción de píxeles distintos aceptada al comparar con un glifo del mismo tamaño
+TOLERANCIA_GLIFO = 0.1
+
+
+def tramos(ocupado: np.ndarray) -> List[Tuple[int, int]]:
+    """Tramos [inicio, fin) de valores True consecutivos en un vector booleano."""
+    bordes = np.flatnonzero(np.diff(np.concatenate(([False], ocupado, [False])).astype(np.int8)))
+    return list(zip(bordes[::2].tolist(), bordes[1::2].tolist()))
+
+
+def lineas(mascara: np.ndarray) -> List[Tuple[int, int]]:
+    """
+    Filas [inicio, fin) de cada línea de texto. Los tramos separados por
+    pocas filas vacías (punto de la 'i') son la misma línea.
+    """
+    unidos: List[List[int]] = []
+    for inicio, fin in tramos(mascara.any(axis=1)):
+        if unidos and inicio - unidos[-1][1] <= HUECO_MAXIMO_LINEA:
+            unidos[-1][1] = fin
+        else:
+            unidos.append([inicio, fin])
+    return [(inicio, fin) for inicio, fin in unidos]
+
+
+def segmentar(mascara: np.ndarray, espacio: int) -> List[List[object]]:
+    """
+    Segmenta una placa binarizada en líneas de glifos y espacios.
+
+    Args:
+        mascara: Placa binarizada (bool, True = texto)
+        espacio: Columnas vacías a partir de las cuales hay un espacio
+
+    Returns:
+        Una lista por línea con los glifos (arrays bool recortados a sus filas
+        con texto) y ' ' donde hay espacios
+    """
+    resultado = []
+    for inicio, fin in lineas(mascara):
+        linea = mascara[inicio:fin]
+        elementos: List[object] = []
+        anterior = None
+        for c0, c1 in tramos(linea.any(axis=0)):
+            if anterior is not None and c0 - anterior >= espacio:
+                elementos.append(' ')
+            anterior = c1
+            glifo = linea[:, c0:c1]
+            filas = np.flatnonzero(glifo.any(axis=1))
+            elementos.append(np.ascontiguousarray(glifo[filas[0]:filas[-1] + 1]))
+        resultado.append(elementos)
+    return resultado
+
+
+class ReconocedorGlifos:
+    """Tabla de glifos de la fuente del juego y reconocimiento de placas."""
+
+    def __init__(self, glifos: List[Tuple[str, np.ndarray]], espacio: int, umbral: int):
+        """
+        Args:
+            glifos: (texto, mapa de bits bool) por glifo; texto puede tener más
+                    de un carácter si la fuente los dibuja pegados
+            espacio: Columnas vacías que forman un espacio
+            umbral: Brillo a partir del cual un píxel es texto
+        """
+        self.espacio = int(espacio)
+        self.umbral = int(umbral)
+        self.glifos = list(glifos)
+        self._exactos: Dict[Tuple[Tuple[int, int], bytes], str] = {}
+        por_forma: Dict[Tuple[int, int], List[Tuple[str, np.ndarray]]] = {}
+        for texto, bits in self.glifos:
+            bits = np.ascontiguousarray(bits, dtype=bool)
+            self._exactos[(bits.shape, bits.tobytes())] = texto
+            por_forma.setdefault(bits.shape, []).append((texto, bits))
+        # Glifos del mismo tamaño apilados, para la comparación aproximada
+        self._por_forma = {
+            forma: ([texto for texto, _ in lista], np.stack([bits.ravel() for _, bits in lista]))
+            for forma, lista in por_forma.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self.glifos)
+
+    def _glifo_parecido(self, glifo: np.ndarray) -> Tuple[Optional[str], float]:
+        """Glifo del mismo tamaño con menos píxeles distintos, si está dentro de la tolerancia."""
+        candidatos = self._por_forma.get(glifo.shape)
+        if candidatos is None:
+            return None, 0.0
+        textos, pila = candidatos
+        distintos = np.count_nonzero(pila != glifo.ravel(), axis=1)
+        mejor = int(distintos.argmin())
+        similitud = 1.0 - distintos[mejor] / glifo.size
+        if similitud < 1.0 - TOLERANCIA_GLIFO:
+            return None, similitud
+        return textos[mejor], similitud
+
+    def reconocer(self, gris: np.ndarray) -> Tuple[Optional[str], float]:
+        """
+        Lee el texto de una placa en escala de grises (sin escalar).
+
+        Args:
+            gris: Región OCR en escala de grises (texto claro sobre fondo oscuro)
+
+        Returns:
+            Tupla (texto o None si hay glifos desconocidos, confianza 0-1)
+        """
+        leidas = []
+        suma = 0.0
+        cantidad = 0
+        for elementos in segmentar(gris > self.umbral, self.espacio):
+            partes = []
+            for elemento in elementos:
+                if isinstance(elemento, str):
+                    partes.append(elemento)
+                    continue
+                texto = self._exactos.get((elemento.shape, elemento.tobytes()))
+                similitud = 1.0
+                if texto is None:
+                    texto, similitud = self._glifo_parecido(elemento)
+                    if texto is None:
+                        return None, 0.0
+                partes.append(texto)
+                suma += similitud
+                cantidad += 1
+            leidas.append(''.join(partes))
+        if not cantidad:
+            return "", 1.0
+        return '\n'.join(leidas), suma / cantidad
+
+    def guardar(self, ruta: str = RUTA_GLIFOS) -> None:
+        """Guarda la tabla (formas y bits concatenados, sin objetos de Python)."""
+        formas = np.array([bits.shape for _, bits in self.glifos], dtype=np.int32).reshape(-1, 2)
+        bits = np.concatenate([bits.ravel() for _, bits in self.glifos]) if self.glifos else np.zeros(0, bool)
+        np.savez_compressed(
+            ruta,
+            textos=np.array([texto for texto, _ in self.glifos], dtype=str),
+            formas=formas,
+            bits=np.packbits(bits),
+            total_bits=np.int64(bits.size),
+            espacio=np.int32(self.espacio),
+            umbral=np.int32(self.umbral),
+        )
+
+    @classmethod
+    def cargar(cls, ruta: str = RUTA_GLIFOS) -> 'ReconocedorGlifos':
+        """Carga una tabla guardada con guardar()."""
+        with np.load(ruta) as datos:
+            textos = [str(t) for t in datos['textos']]
+            formas = datos['formas']
+            bits = np.unpackbits(datos['bits'], count=int(datos['total_bits'])).astype(bool)
+            espacio = int(datos['espacio'])
+            umbral = int(datos['umbral'])
+        glifos = []
+        inicio = 0
+        for texto, (alto, ancho) in zip(textos, formas):
+            fin = inicio + int(alto) * int(ancho)
+            glifos.append((texto, bits[inicio:fin].reshape(int(alto), int(ancho))))
+            inicio = fin
+        return cls(glifos, espacio, umbral)
+
+
+def cargar_reconocedor(ruta: str = RUTA_GLIFOS) -> Optional[ReconocedorGlifos]:
+    """
+    Retorna el reconocedor de la tabla de glifos, o None si no hay tabla.
+    """
+    if not os.path.exists(ruta):
+        return None
+    try:
+        reconocedor = ReconocedorGlifos.cargar(ruta)
+    except Exception as e:
+        print(f"[GLIFOS] No se pudo cargar la tabla {ruta}: {e}")
+        return None
+    print(f"[GLIFOS] Usando tabla de glifos ({ruta}, {len(reconocedor)} glifos)")
+    return reconocedor
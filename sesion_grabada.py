@@ -0,0 +1,659 @@
+"""
+Grabación y repetición de sesiones de farmeo.
+Responsabilidad: Reproducir offline la percepción del bot (Single Responsibility Principle)
+
+Grabación (python bot.py --grabar sesion.npz): en cada tick se guarda la región
+OCR, la región de las sondas de vida/maná y lo que el bot decidió en ese
+momento (tipo de objetivo, nombre, vida/maná suficientes), que sirve de
+referencia para comparar.
+
+Repetición (python sesion_grabada.py sesion.npz): cada cuadro pasa por el
+camino real de HiloDetectorOCR (captura -> preproceso -> OCR -> clasificación)
+y de HiloAutocuracion sobre un BackendHeadless, sin esperas y en orden, y la
+línea de tiempo resultante se compara con la grabada. Así los cambios de OCR y
+de coincidencias se ajustan sin entrar al juego.
+
+Con --comparar-recorte la sesión se repite dos veces, sin y con
+OCR_REGION.recortar_texto, y se comparan los píxeles y el tiempo de OCR.
+Con --comparar-diccionario se repite sin y con OCR_REGION.diccionario_nombres
+(todas las placas por Tesseract) y se comparan aciertos y latencia del OCR.
+Con --comparar-filtro se repite sin y con el filtro de clasificación y se
+cuentan las transiciones espurias (parpadeos) de la grabación y de ambas
+repeticiones.
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from estado_objetivo import estado, TipoObjetivo
+from game_window import GameWindow
+from backend_plataforma import BackendHeadless
+from almacen_configuracion import almacen
+
+
+RECURSOS = ('vida', 'mana')
+
+# Etapas medidas en la repetición (en orden)
+ETAPAS = ('captura', 'preproceso', 'ocr', 'clasificacion', 'estado', 'curacion')
+
+# Un objetivo que dura menos que esto entre dos tramos iguales (A -> B -> A) es un parpadeo
+PARPADEO_MAXIMO = 0.5
+
+# Claves de configuración que se guardan con la sesión
+CLAVES_CONFIG = ('OCR_REGION', 'AUTOCURACION', 'MOBS_OBJETIVO', 'DROP_ITEMS_OBJETIVO', 'UMBRAL_SIMILITUD')
+
+
+class SesionGrabada:
+    """
+    Sesión grabada en memoria. Un cuadro por tick:
+    región OCR y región de sondas (BGRA) más la decisión del bot en ese momento.
+    """
+
+    def __init__(self, timestamps: np.ndarray, ocr: np.ndarray, sondas: np.ndarray,
+                 tipo: np.ndarray, nombre: np.ndarray, vida: np.ndarray, mana: np.ndarray,
+                 meta: dict):
+        """
+        Inicializa la sesión.
+
+        Args:
+            timestamps: Instante de cada cuadro (segundos, perf_counter)
+            ocr: Regiones OCR (N, alto, ancho, 4)
+            sondas: Regiones de las sondas de vida/maná (N, alto, ancho, 4)
+            tipo, nombre: Clasificación del bot en cada cuadro (referencia)
+            vida, mana: True si el bot consideró el recurso suficiente (referencia)
+            meta: Configuración al grabar y posición de la región de sondas
+        """
+        self.timestamps = timestamps
+        self.ocr = ocr
+        self.sondas = sondas
+        self.tipo = tipo
+        self.nombre = nombre
+        self.vida = vida
+        self.mana = mana
+        self.meta = meta
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @property
+    def duracion(self) -> float:
+        """Duración de la sesión en segundos."""
+        if len(self) < 2:
+            return 0.0
+        return float(self.timestamps[-1] - self.timestamps[0])
+
+    def guardar(self, ruta: str) -> None:
+        """Guarda la sesión en un archivo .npz comprimido."""
+        np.savez_compressed(
+            ruta,
+            timestamps=self.timestamps, ocr=self.ocr, sondas=self.sondas,
+            tipo=self.tipo, nombre=self.nombre, vida=self.vida, mana=self.mana,
+            meta=np.array(json.dumps(self.meta))
+        )
+
+    @classmethod
+    def cargar(cls, ruta: str) -> 'SesionGrabada':
+        """Carga una sesión guardada con guardar()."""
+        with np.load(ruta) as datos:
+            return cls(
+                datos['timestamps'], datos['ocr'], datos['sondas'],
+                datos['tipo'], datos['nombre'], datos['vida'], datos['mana'],
+                json.loads(str(datos['meta']))
+            )
+
+
+# ============================================================
+# Grabación
+# ============================================================
+
+class GrabadorSesion:
+    """
+    Hilo que graba la sesión mientras el bot juega.
+    Se detiene como los demás hilos; al detenerse guarda el archivo.
+    """
+
+    def __init__(self, game_window: GameWindow, autocuracion, ruta: str, intervalo: float = 0.1,
+                 detector=None):
+        """
+        Inicializa el grabador.
+
+        Args:
+            game_window: Ventana del juego
+            autocuracion: HiloAutocuracion en uso (sus sondas y su decisión son la referencia)
+            ruta: Archivo .npz de salida
+            intervalo: Segundos entre cuadros
+            detector: HiloDetectorOCR en uso (se graba la región que ubicó su localizador)
+        """
+        self.game_window = game_window
+        self.backend = game_window.backend
+        self.autocuracion = autocuracion
+        self.detector = detector
+        self.ruta = ruta
+        self.intervalo = intervalo
+        self.ejecutando = False
+        self.thread = None
+        self._cuadros: List[tuple] = []
+        self._forma = None
+        self._meta: Optional[dict] = None
+        self._descartados = 0
+
+    def _capturar_ocr(self) -> np.ndarray:
+        """Captura la región OCR igual que HiloDetectorOCR."""
+        compilada = almacen.actual.compilada
+        if self.detector is not None:
+            # Última región ubicada por el detector (sin buscar desde este hilo)
+            izquierda, arriba, ancho, alto = self.detector.localizador.region_actual(compilada)
+        else:
+            izquierda, arriba, ancho, alto = compilada.region_ocr
+        rect = self.game_window.geometria
+        return self.backend.capturar(rect.left + izquierda, rect.top + arriba, ancho, alto)
+
+    @staticmethod
+    def _instantanea_config() -> dict:
+        """Copia de la configuración que afecta a la percepción."""
+        config = almacen.actual.como_dict()
+        return {clave: config[clave] for clave in CLAVES_CONFIG}
+
+    def _grabar_cuadro(self) -> None:
+        """Captura y guarda un cuadro con la decisión actual del bot."""
+        compilada = almacen.actual.compilada
+        recursos = {'vida': compilada.vida, 'mana': compilada.mana}
+        ocr = np.array(self._capturar_ocr())
+
+        # Definir ambas sondas antes de leer para que compartan la captura
+        for recurso in RECURSOS:
+            self.autocuracion._leer_sonda(recursos[recurso])
+        lectura = self.autocuracion.sondas.leer()
+        referencia = {
+            recurso: self.autocuracion._evaluar_recurso(recursos[recurso])[0]
+            for recurso in RECURSOS
+        }
+        info = estado.obtener_info()
+
+        # Todos los cuadros deben tener la misma geometría para poder apilarlos
+        forma = (ocr.shape, lectura.imagen.shape, lectura.origen)
+        if self._forma is None:
+            self._forma = forma
+            self._meta = self._instantanea_config()
+            self._meta['origen_sondas'] = list(lectura.origen)
+            self._meta['sondas'] = {nombre: list(sonda) for nombre, sonda in lectura.sondas.items()}
+        elif forma != self._forma:
+            self._descartados += 1
+            return
+
+        self._cuadros.append((
+            time.perf_counter(), ocr, np.array(lectura.imagen),
+            info['tipo'].value, info['nombre_coincidente'] or '',
+            referencia['vida'], referencia['mana']
+        ))
+
+    def _ciclo_grabacion(self) -> None:
+        """Ciclo principal del grabador."""
+        print(f"[GRABADOR] Grabando sesión en {self.ruta}")
+
+        while self.ejecutando:
+            try:
+                self._grabar_cuadro()
+            except Exception as e:
+                print(f"[GRABADOR] Error: {e}")
+            time.sleep(self.intervalo)
+
+        print(f"[GRABADOR] Hilo detenido ({len(self._cuadros)} cuadros, {self._descartados} descartados)")
+
+    def sesion(self) -> SesionGrabada:
+        """Retorna lo grabado hasta ahora como SesionGrabada."""
+        cuadros = list(self._cuadros)
+        timestamps, ocr, sondas, tipo, nombre, vida, mana = zip(*cuadros)
+        return SesionGrabada(
+            np.array(timestamps), np.stack(ocr), np.stack(sondas),
+            np.array(tipo), np.array(nombre), np.array(vida), np.array(mana),
+            self._meta
+        )
+
+    def iniciar(self) -> None:
+        """Inicia el hilo de grabación."""
+        if self.ejecutando:
+            return
+
+        self.ejecutando = True
+        self.thread = threading.Thread(target=self._ciclo_grabacion, name='grabador', daemon=True)
+        self.thread.start()
+
+    def detener(self) -> None:
+        """Detiene la grabación y guarda la sesión."""
+        self.ejecutando = False
+        if self.thread:
+            self.thread.join(timeout=2)
+
+        if not self._cuadros:
+            print("[GRABADOR] No hay cuadros que guardar")
+            return
+        sesion = self.sesion()
+        sesion.guardar(self.ruta)
+        print(f"[GRABADOR] Sesión guardada: {self.ruta} ({len(sesion)} cuadros, {sesion.duracion:.0f}s)")
+
+
+# ============================================================
+# Repetición
+# ============================================================
+
+@contextmanager
+def _configuracion_sesion(meta: dict, usar_listas_grabadas: bool, ajustes_region: Optional[Dict[str, Any]] = None):
+    """
+    Aplica temporalmente la configuración grabada (región OCR y sondas).
+    Las listas de mobs/drops y el umbral se toman de la configuración actual,
+    salvo que se pida usar las grabadas. ajustes_region reemplaza claves de
+    OCR_REGION (p. ej. recortar_texto) para comparar variantes.
+    """
+    claves = ['OCR_REGION', 'AUTOCURACION']
+    if usar_listas_grabadas:
+        claves += ['MOBS_OBJETIVO', 'DROP_ITEMS_OBJETIVO', 'UMBRAL_SIMILITUD']
+
+    config = {clave: meta[clave] for clave in claves}
+    # Los cuadros ya son la región ubicada al grabar: se repiten en la región fija
+    config['OCR_REGION'] = dict(config['OCR_REGION'], plantilla='')
+    config['OCR_REGION'].update(ajustes_region or {})
+
+    anterior = almacen.actual
+    exito, mensaje = almacen.publicar(config)
+    if not exito:
+        raise ValueError(f"La configuración grabada no es válida. {mensaje}")
+    try:
+        yield
+    finally:
+        almacen.restaurar(anterior)
+
+
+def _segmentos(timestamps: np.ndarray, valores: np.ndarray) -> List[Tuple[float, float, str]]:
+    """Agrupa valores consecutivos iguales en (t_inicio, t_fin, valor)."""
+    segmentos = []
+    inicio = 0
+    for i in range(1, len(valores) + 1):
+        if i == len(valores) or valores[i] != valores[inicio]:
+            segmentos.append((float(timestamps[inicio]), float(timestamps[i - 1]), str(valores[inicio])))
+            inicio = i
+    return segmentos
+
+
+class InformeRepeticion:
+    """Resultados de una repetición: tiempos por etapa y comparación con la referencia."""
+
+    def __init__(self, sesion: SesionGrabada, tiempos: Dict[str, np.ndarray], duracion: float,
+                 textos: List[str], tipo: np.ndarray, nombre: np.ndarray,
+                 vida: np.ndarray, mana: np.ndarray, pixeles: Optional[np.ndarray] = None,
+                 evitados: int = 0, similitudes: Optional[np.ndarray] = None):
+        self.sesion = sesion
+        self.tiempos = tiempos
+        self.duracion = duracion
+        self.textos = textos
+        self.tipo = tipo
+        self.nombre = nombre
+        self.vida = vida
+        self.mana = mana
+        # Píxeles de la imagen que recibió el OCR en cada cuadro (0 en placas vacías)
+        self.pixeles = pixeles if pixeles is not None else np.zeros(len(sesion))
+        # Cuadros con la placa vacía (NULO sin llamar al OCR)
+        self.evitados = evitados
+        # Texto y similitud son los de cada cuadro; tipo y nombre, los publicados tras el filtro
+        # Similitud del texto con el nombre elegido (0 si no hubo coincidencia)
+        self.similitudes = similitudes if similitudes is not None else np.zeros(len(sesion))
+
+    @property
+    def fps(self) -> float:
+        """Cuadros procesados por segundo."""
+        return len(self.sesion) / self.duracion if self.duracion > 0 else 0.0
+
+    def coincidencias(self) -> Dict[str, float]:
+        """Porcentaje de cuadros que coinciden con la referencia, por campo."""
+        sesion = self.sesion
+        return {
+            'tipo': 100.0 * np.mean(self.tipo == sesion.tipo),
+            'nombre': 100.0 * np.mean(self.nombre == sesion.nombre),
+            'vida': 100.0 * np.mean(self.vida == sesion.vida),
+            'mana': 100.0 * np.mean(self.mana == sesion.mana),
+        }
+
+    def divergencias(self) -> List[Tuple[float, float, str, str, str]]:
+        """
+        Tramos donde el tipo repetido difiere del grabado.
+
+        Returns:
+            Lista de (t_inicio, t_fin, tipo_grabado, tipo_repetido, primer texto OCR)
+        """
+        t = self.sesion.timestamps - self.sesion.timestamps[0]
+        distinto = self.tipo != self.sesion.tipo
+        tramos = []
+        i = 0
+        while i < len(distinto):
+            if not distinto[i]:
+                i += 1
+                continue
+            inicio = i
+            while i < len(distinto) and distinto[i] and \
+                    self.tipo[i] == self.tipo[inicio] and self.sesion.tipo[i] == self.sesion.tipo[inicio]:
+                i += 1
+            tramos.append((float(t[inicio]), float(t[i - 1]), str(self.sesion.tipo[inicio]),
+                           str(self.tipo[inicio]), self.textos[inicio]))
+        return tramos
+
+    def imprimir(self, max_divergencias: int = 20) -> None:
+        """Imprime el informe completo."""
+        sesion = self.sesion
+        print("\n[RENDIMIENTO]")
+        print("-" * 70)
+        print(f"  Cuadros: {len(sesion)} ({sesion.duracion:.1f}s grabados) | "
+              f"Repetición: {self.duracion:.2f}s | {self.fps:.1f} cuadros/s")
+        print(f"  OCR evitados por placa vacía: {self.evitados} de {len(sesion)} cuadros "
+              f"({100 * self.evitados / len(sesion):.1f}%)")
+        total = sum(float(np.sum(v)) for v in self.tiempos.values()) or 1.0
+        print(f"\n  {'Etapa':14s} {'media ms':>10s} {'p50 ms':>10s} {'p95 ms':>10s} {'% total':>9s}")
+        for etapa in ETAPAS:
+            valores = self.tiempos[etapa] * 1000
+            print(f"  {etapa:14s} {valores.mean():10.3f} {np.percentile(valores, 50):10.3f} "
+                  f"{np.percentile(valores, 95):10.3f} {100 * valores.sum() / 1000 / total:8.1f}%")
+
+        print("\n[COINCIDENCIA CON LA REFERENCIA]")
+        print("-" * 70)
+        for campo, porcentaje in self.coincidencias().items():
+            print(f"  {campo:8s}: {porcentaje:6.2f}%")
+
+        tipos = [t.value for t in TipoObjetivo]
+        encabezado = "grabado \\ repetido"
+        print(f"\n  {encabezado:20s}" + "".join(f"{t:>8s}" for t in tipos))
+        for grabado in tipos:
+            fila = [np.count_nonzero((sesion.tipo == grabado) & (self.tipo == repetido)) for repetido in tipos]
+            print(f"  {grabado:20s}" + "".join(f"{n:8d}" for n in fila))
+
+        print("\n[LÍNEA DE TIEMPO]")
+        print("-" * 70)
+        t = sesion.timestamps
+        grabados = _segmentos(t, sesion.tipo)
+        repetidos = _segmentos(t, self.tipo)
+        print(f"  Segmentos grabados: {len(grabados)} | repetidos: {len(repetidos)}")
+        tramos = self.divergencias()
+        print(f"  Tramos con tipo distinto: {len(tramos)}")
+        for inicio, fin, grabado, repetido, texto in tramos[:max_divergencias]:
+            print(f"    {inicio:8.2f}s - {fin:8.2f}s  grabado={grabado:5s} repetido={repetido:5s} texto='{texto}'")
+        if len(tramos) > max_divergencias:
+            print(f"    ... {len(tramos) - max_divergencias} tramos más")
+        print("-" * 70)
+
+
+class ReproductorSesion:
+    """
+    Reproduce una sesión grabada a través de HiloDetectorOCR y HiloAutocuracion
+    usando un BackendHeadless cuya pantalla se rellena con cada cuadro.
+    """
+
+    def __init__(self, sesion: SesionGrabada, usar_listas_grabadas: bool = False,
+                 recortar_texto: Optional[bool] = None, usar_glifos: bool = True,
+                 diccionario_nombres: Optional[bool] = None, usar_filtro: bool = True):
+        """
+        Inicializa el reproductor.
+
+        Args:
+            sesion: Sesión a reproducir
+            usar_listas_grabadas: True para usar las listas de mobs/drops y el
+                                  umbral grabados en lugar de los actuales
+            recortar_texto: Fuerza OCR_REGION.recortar_texto (None = el grabado)
+            usar_glifos: False para leer todas las placas con Tesseract aunque haya tabla de glifos
+            diccionario_nombres: Fuerza OCR_REGION.diccionario_nombres (None = el grabado)
+            usar_filtro: False para publicar la clasificación de cada cuadro sin votación ni histéresis
+        """
+        self.sesion = sesion
+        self.usar_listas_grabadas = usar_listas_grabadas
+        self.recortar_texto = recortar_texto
+        self.usar_glifos = usar_glifos
+        self.diccionario_nombres = diccionario_nombres
+        self.usar_filtro = usar_filtro
+
+    def reproducir(self) -> InformeRepeticion:
+        """Reproduce todos los cuadros lo más rápido posible y retorna el informe."""
+        # Importación diferida: el detector arrastra pytesseract y OpenCV
+        from hilo_detector_ocr import HiloDetectorOCR
+        from hilo_autocuracion import HiloAutocuracion
+
+        sesion = self.sesion
+        meta = sesion.meta
+        ajustes = {clave: valor for clave, valor in (('recortar_texto', self.recortar_texto),
+                                                     ('diccionario_nombres', self.diccionario_nombres))
+                   if valor is not None}
+        with _configuracion_sesion(meta, self.usar_listas_grabadas, ajustes):
+            cfg = almacen.actual
+            region = cfg.OCR_REGION
+            ox, oy = region["left_offset"], region["top_offset"]
+            sx, sy = meta['origen_sondas']
+            alto_ocr, ancho_ocr = sesion.ocr.shape[1:3]
+            alto_sondas, ancho_sondas = sesion.sondas.shape[1:3]
+
+            # Pantalla justa para contener ambas regiones, con la ventana en (0, 0)
+            ancho = max(ox + ancho_ocr, sx + ancho_sondas)
+            alto = max(oy + alto_ocr, sy + alto_sondas)
+            backend = BackendHeadless(ancho, alto)
+            backend.agregar_ventana("sesion", 0, 0, ancho, alto)
+            pantalla = backend.pantalla.pantalla
+            game_window = GameWindow("sesion", backend=backend)
+
+            detector = HiloDetectorOCR(game_window)
+            if not self.usar_glifos:
+                detector.glifos = None
+            if not self.usar_filtro:
+                detector.filtro = None
+            autocuracion = HiloAutocuracion(game_window)
+            autocuracion.sondas.max_edad = 0  # Cada cuadro es una captura nueva
+            config_vida = cfg.compilada.vida
+            config_mana = cfg.compilada.mana
+
+            n = len(sesion)
+            tiempos = {etapa: np.zeros(n) for etapa in ETAPAS}
+            textos = []
+            tipos = []
+            nombres = []
+            vida = np.zeros(n, dtype=bool)
+            mana = np.zeros(n, dtype=bool)
+            pixeles = np.zeros(n)
+            similitudes = np.zeros(n)
+            evitados = 0
+            reloj = time.perf_counter
+
+            inicio_total = reloj()
+            for i in range(n):
+                pantalla[sy:sy + alto_sondas, sx:sx + ancho_sondas] = sesion.sondas[i]
+                pantalla[oy:oy + alto_ocr, ox:ox + ancho_ocr] = sesion.ocr[i]
+
+                t0 = reloj()
+                captura = detector._capturar_region_objetivo()
+                t1 = reloj()
+                gris = detector._escala_grises(captura)
+                procesada = detector._binarizar(gris)
+                t2 = reloj()
+                if detector._placa_vacia(procesada):
+                    texto, confianza = "", 1.0
+                    evitados += 1
+                else:
+                    texto, confianza = detector._leer_texto(gris, procesada)
+                    texto = detector._primera_linea(texto)
+                    pixeles[i] = procesada.size
+                t3 = reloj()
+                tipo, nombre, similitud = detector._clasificar_texto(texto)
+                similitudes[i] = similitud if nombre else 0.0
+                t4 = reloj()
+                # Tiempo grabado: la histéresis en ms se evalúa como en la sesión original
+                confirmada = detector._confirmar_clasificacion(
+                    texto, tipo, nombre, similitud, confianza, float(sesion.timestamps[i]))
+                detector._aplicar_clasificacion(*confirmada)
+                _, tipo, nombre, _ = confirmada
+                t5 = reloj()
+                vida[i] = autocuracion._evaluar_recurso(config_vida)[0]
+                mana[i] = autocuracion._evaluar_recurso(config_mana)[0]
+                t6 = reloj()
+
+                for etapa, duracion in zip(ETAPAS, (t1 - t0, t2 - t1, t3 - t2, t4 - t3, t5 - t4, t6 - t5)):
+                    tiempos[etapa][i] = duracion
+                textos.append(texto)
+                tipos.append(tipo.value)
+                nombres.append(nombre or '')
+            duracion_total = reloj() - inicio_total
+
+        return InformeRepeticion(sesion, tiempos, duracion_total, textos,
+                                 np.array(tipos), np.array(nombres), vida, mana, pixeles, evitados,
+                                 similitudes)
+
+
+def _filas_aciertos(informe: InformeRepeticion) -> List[Tuple[str, float]]:
+    """Aciertos respecto de la referencia y calidad de las lecturas con coincidencia."""
+    coincidencias = informe.coincidencias()
+    con_nombre = informe.similitudes[informe.similitudes > 0]
+    return [
+        ('tipo = ref %', coincidencias['tipo']),
+        ('nombre = ref %', coincidencias['nombre']),
+        ('exactas %', 100.0 * np.count_nonzero(con_nombre >= 1.0) / max(1, len(informe.sesion) - informe.evitados)),
+        ('similitud', float(con_nombre.mean()) if con_nombre.size else 0.0),
+    ]
+
+
+def imprimir_comparacion(titulo: str, etiquetas: Tuple[str, str],
+                         antes: InformeRepeticion, despues: InformeRepeticion) -> None:
+    """
+    Compara dos repeticiones de la misma sesión con una opción distinta:
+    píxeles y latencia de preproceso y OCR, y aciertos respecto de la referencia.
+
+    Args:
+        titulo: Encabezado del informe
+        etiquetas: Nombres de las dos variantes (sin, con)
+        antes: Repetición sin la opción
+        despues: Repetición con la opción
+    """
+    print(f"\n[{titulo}]")
+    print("-" * 70)
+    print(f"  {'':16s} {etiquetas[0]:>16s} {etiquetas[1]:>16s} {'cambio':>9s}")
+    # Píxeles por lectura: sin las placas vacías, que no llegan al OCR
+    leidos = [informe.pixeles[informe.pixeles > 0] for informe in (antes, despues)]
+    filas = [('píxeles', *(float(v.mean()) if v.size else 0.0 for v in leidos))]
+    for etapa in ('preproceso', 'ocr'):
+        for nombre, estadistico in (('media', np.mean), ('p95', lambda v: np.percentile(v, 95))):
+            filas.append((f"{etapa} {nombre} ms", estadistico(antes.tiempos[etapa]) * 1000,
+                          estadistico(despues.tiempos[etapa]) * 1000))
+    for (nombre, valor_antes), (_, valor_despues) in zip(_filas_aciertos(antes), _filas_aciertos(despues)):
+        filas.append((nombre, valor_antes, valor_despues))
+    for nombre, valor_antes, valor_despues in filas:
+        cambio = f"{100 * (valor_despues - valor_antes) / valor_antes:+8.1f}%" if valor_antes > 0 else f"{'-':>9s}"
+        print(f"  {nombre:16s} {valor_antes:16.2f} {valor_despues:16.2f} {cambio}")
+    iguales = 100.0 * np.mean(antes.tipo == despues.tipo)
+    print(f"  Cuadros con la misma clasificación: {iguales:.2f}%")
+    print("-" * 70)
+
+
+def transiciones(timestamps: np.ndarray, tipo: np.ndarray, nombre: np.ndarray) -> Dict[str, int]:
+    """
+    Cambios de objetivo de una línea de tiempo.
+
+    Returns:
+        {'total': cambios de tipo o nombre, 'parpadeos': tramos de menos de
+        PARPADEO_MAXIMO segundos entre dos tramos iguales (A -> B -> A),
+        'mob_a_nulo': MOB -> NULO (secuencias de loot)}
+    """
+    claves = np.char.add(np.char.add(tipo.astype(str), '\t'), nombre.astype(str))
+    segmentos = _segmentos(timestamps, claves)
+    parpadeos = sum(
+        1 for k in range(1, len(segmentos) - 1)
+        if segmentos[k - 1][2] == segmentos[k + 1][2] and segmentos[k + 1][0] - segmentos[k][0] < PARPADEO_MAXIMO
+    )
+    tipos = [valor.split('\t')[0] for _, _, valor in segmentos]
+    mob_a_nulo = sum(1 for a, b in zip(tipos, tipos[1:])
+                     if a == TipoObjetivo.MOB.value and b == TipoObjetivo.NULO.value)
+    return {'total': len(segmentos) - 1, 'parpadeos': parpadeos, 'mob_a_nulo': mob_a_nulo}
+
+
+def imprimir_comparacion_filtro(sin_filtro: InformeRepeticion, con_filtro: InformeRepeticion) -> None:
+    """
+    Transiciones espurias de la grabación (el bot en vivo) y de las
+    repeticiones sin y con filtro de clasificación.
+    """
+    sesion = sin_filtro.sesion
+    t = sesion.timestamps
+    minutos = max(sesion.duracion / 60.0, 1e-9)
+    columnas = [
+        ('grabado', transiciones(t, sesion.tipo, sesion.nombre), 100.0),
+        ('sin filtro', transiciones(t, sin_filtro.tipo, sin_filtro.nombre), sin_filtro.coincidencias()['tipo']),
+        ('con filtro', transiciones(t, con_filtro.tipo, con_filtro.nombre), con_filtro.coincidencias()['tipo']),
+    ]
+    print("\n[FILTRO DE CLASIFICACIÓN]")
+    print("-" * 70)
+    print(f"  {'':22s}" + "".join(f"{titulo:>14s}" for titulo, _, _ in columnas))
+    filas = (
+        ('transiciones', lambda c: f"{c['total']:d}"),
+        ('transiciones/min', lambda c: f"{c['total'] / minutos:.1f}"),
+        (f'parpadeos (<{PARPADEO_MAXIMO}s)', lambda c: f"{c['parpadeos']:d}"),
+        ('% espurias', lambda c: f"{100.0 * 2 * c['parpadeos'] / max(1, c['total']):.1f}"),
+        ('MOB -> NULO (loot)', lambda c: f"{c['mob_a_nulo']:d}"),
+    )
+    for nombre, formato in filas:
+        print(f"  {nombre:22s}" + "".join(f"{formato(c):>14s}" for _, c, _ in columnas))
+    print(f"  {'tipo = grabado %':22s}" + "".join(f"{coincide:14.2f}" for _, _, coincide in columnas))
+    print("-" * 70)
+
+
+def main() -> int:
+    """Punto de entrada de la repetición de sesiones."""
+    parser = argparse.ArgumentParser(description="Reproduce offline una sesión grabada con bot.py --grabar.")
+    parser.add_argument('sesion', help="Archivo .npz de la sesión")
+    parser.add_argument('--listas-grabadas', action='store_true',
+                        help="Usar las listas de mobs/drops y el umbral de la grabación")
+    parser.add_argument('--divergencias', type=int, default=20, help="Máximo de tramos distintos a listar")
+    parser.add_argument('--comparar-recorte', action='store_true',
+                        help="Repetir sin y con recorte al texto y comparar píxeles y tiempo de OCR")
+    parser.add_argument('--comparar-diccionario', action='store_true',
+                        help="Repetir con Tesseract sin y con el diccionario de nombres y comparar aciertos y latencia")
+    parser.add_argument('--comparar-filtro', action='store_true',
+                        help="Repetir sin y con el filtro de clasificación y contar transiciones espurias")
+    parser.add_argument('--sin-glifos', action='store_true',
+                        help="Leer todas las placas con Tesseract aunque exista glifos_fuente.npz")
+    args = parser.parse_args()
+
+    sesion = SesionGrabada.cargar(args.sesion)
+    if not len(sesion):
+        print("[ERROR] La sesión no tiene cuadros")
+        return 1
+
+    print("=" * 70)
+    print(f"REPETICIÓN DE SESIÓN: {args.sesion}")
+    print("=" * 70)
+    if args.comparar_recorte:
+        sin_recorte = ReproductorSesion(sesion, args.listas_grabadas, recortar_texto=False,
+                                        usar_glifos=not args.sin_glifos).reproducir()
+        con_recorte = ReproductorSesion(sesion, args.listas_grabadas, recortar_texto=True,
+                                        usar_glifos=not args.sin_glifos).reproducir()
+        con_recorte.imprimir(args.divergencias)
+        imprimir_comparacion("RECORTE AL TEXTO", ("sin recorte", "con recorte"), sin_recorte, con_recorte)
+        return 0
+    if args.comparar_filtro:
+        sin_filtro = ReproductorSesion(sesion, args.listas_grabadas, usar_glifos=not args.sin_glifos,
+                                       usar_filtro=False).reproducir()
+        con_filtro = ReproductorSesion(sesion, args.listas_grabadas, usar_glifos=not args.sin_glifos).reproducir()
+        con_filtro.imprimir(args.divergencias)
+        imprimir_comparacion_filtro(sin_filtro, con_filtro)
+        return 0
+    if args.comparar_diccionario:
+        # Sin glifos: se compara lo que cambia en Tesseract
+        sin_diccionario = ReproductorSesion(sesion, args.listas_grabadas, usar_glifos=False,
+                                            diccionario_nombres=False).reproducir()
+        con_diccionario = ReproductorSesion(sesion, args.listas_grabadas, usar_glifos=False,
+                                            diccionario_nombres=True).reproducir()
+        con_diccionario.imprimir(args.divergencias)
+        imprimir_comparacion("DICCIONARIO DE NOMBRES", ("sin diccionario", "con diccionario"),
+                             sin_diccionario, con_diccionario)
+        return 0
+    informe = ReproductorSesion(sesion, args.listas_grabadas, usar_glifos=not args.sin_glifos).reproducir()
+    informe.imprimir(args.divergencias)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,606 @@
+"""
+Simulador local del juego para pruebas de extremo a extremo.
+Responsabilidad: Sustituir al cliente del juego (Single Responsibility Principle)
+
+El simulador dibuja la superficie de la ventana (placa de nombre del objetivo,
+barras de vida/maná y drops en el suelo) en un BackendHeadless y reacciona a
+las teclas y clics del bot:
+- E selecciona un mob (o un drop del suelo)
+- Las habilidades activas bajan la vida del mob y gastan maná
+- Las teclas de curación recuperan vida o maná
+- F recoge el loot
+- Un mob puede quedar trabado: no recibe daño hasta que los clics de escape
+  alejan al personaje
+
+Todos los hilos del bot corren sin cambios sobre el BackendSimulador. Al final
+se informan mobs/hora, tiempos de respuesta de curación y de recuperación de
+mobs trabados.
+
+Con --localizar la región OCR se ubica con una plantilla del emblema del
+marco del objetivo (localizador_region); el evento 'mover_interfaz' del
+escenario desplaza el marco para probar la relocalización.
+
+Con --clientes N se simulan N juegos en N ventanas con el mismo título, una
+al lado de la otra, y cada una la maneja su propio ClienteBot (multicliente).
+
+Uso:
+    python simulador_juego.py --duracion 600
+    python simulador_juego.py --escenario escenario.json
+    python simulador_juego.py --clientes 3 --duracion 120
+
+El escenario es un JSON con cualquiera de las claves de ESCENARIO_DEFECTO.
+"""
+import argparse
+import copy
+import json
+import random
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+
+import cv2
+import numpy as np
+
+from backend_plataforma import BackendHeadless
+from clasificador_color import COLORES_VIDA, COLORES_MANA
+from lector_vitales import LectorVitales
+
+
+# ============================================================
+# ESCENARIO POR DEFECTO
+# ============================================================
+ESCENARIO_DEFECTO = {
+    'duracion': 300,               # Segundos de simulación
+    'semilla': 1,
+    'mobs': None,                  # Lista de {'nombre', 'vida', 'danio', 'prob_trabado', 'drops'}
+                                   # None = los 3 primeros de MOBS_OBJETIVO con los valores de abajo
+    'vida_mob': 100.0,
+    'danio_mob': 3.0,              # Vida del personaje por segundo mientras pelea
+    'prob_trabado': 0.1,           # Probabilidad de que el mob seleccionado quede trabado
+    'drops': None,                 # None = los 2 primeros de DROP_ITEMS_OBJETIVO
+    'drops_por_mob': 1,
+    'prob_seleccionar_drop': 0.3,  # Probabilidad de que E seleccione un drop del suelo
+    'danio_habilidad': 20.0,
+    'costo_mana_habilidad': 2.0,
+    'curacion_vida': 35.0,
+    'curacion_mana': 40.0,
+    'regeneracion_mana': 0.3,      # Maná por segundo
+    'clics_para_destrabar': 3,
+    'eventos': [],                 # [{'t': 30, 'accion': 'danio', 'recurso': 'vida', 'cantidad': 50},
+                                   #  {'t': 60, 'accion': 'trabar'},
+                                   #  {'t': 90, 'accion': 'mover_interfaz', 'dx': 40, 'dy': 25}]
+}
+
+# Colores de dibujo (BGRA)
+COLOR_FONDO_BARRA = (30, 30, 30, 255)
+COLOR_TEXTO = (255, 255, 255, 255)
+COLOR_DROP_SUELO = (0, 200, 255, 255)
+COLOR_MARCO = (40, 170, 220, 255)
+ALTO_BARRA = 5
+
+# Emblema del marco del objetivo (a la derecha de la placa de nombre):
+# es lo que busca la plantilla de --localizar
+ANCHO_EMBLEMA = 20
+SEPARACION_EMBLEMA = 4
+
+# Extensión de las barras si la configuración no define 'barra' (config.json antiguos)
+BARRA_X_INICIO = 20
+BARRA_X_FIN = 150
+
+
+def _dibujar_emblema(destino: np.ndarray) -> None:
+    """Dibuja el emblema del marco del objetivo en un recorte BGRA (alto x ANCHO_EMBLEMA)."""
+    alto, ancho = destino.shape[:2]
+    destino[:] = COLOR_MARCO
+    cv2.line(destino, (2, 2), (ancho - 3, alto - 3), (0, 0, 0, 255), 2)
+    cv2.line(destino, (2, alto - 3), (ancho - 3, 2), (0, 0, 0, 255), 2)
+    cv2.circle(destino, (ancho // 2, alto // 2), 2, (255, 255, 255, 255), -1)
+
+
+def guardar_plantilla_marco(ruta: str) -> tuple:
+    """
+    Guarda el emblema del marco del objetivo como plantilla (PNG en grises).
+
+    Returns:
+        (plantilla_offset_x, plantilla_offset_y) de la región OCR respecto del emblema
+    """
+    import configuracion
+    region = configuracion.OCR_REGION
+    emblema = np.zeros((region['height'], ANCHO_EMBLEMA, 4), dtype=np.uint8)
+    _dibujar_emblema(emblema)
+    cv2.imwrite(ruta, cv2.cvtColor(emblema, cv2.COLOR_BGRA2GRAY))
+    return -(region['width'] + SEPARACION_EMBLEMA), 0
+
+
+def _bgra(color_rgb) -> tuple:
+    r, g, b = color_rgb
+    return (b, g, r, 255)
+
+
+class MobSimulado:
+    """Mob seleccionado en el simulador."""
+
+    def __init__(self, nombre: str, vida: float, danio: float, trabado: bool, drops: List[str]):
+        self.nombre = nombre
+        self.vida = vida
+        self.danio = danio
+        self.trabado = trabado
+        self.drops = drops
+        self.inicio = time.perf_counter()
+        self.clics = 0
+
+
+class JuegoSimulado:
+    """
+    Estado del juego simulado. Se avanza de forma perezosa: cada tecla, clic o
+    captura integra el tiempo transcurrido desde la última actualización.
+    """
+
+    def __init__(self, escenario: Optional[dict] = None, ancho: int = 800, alto: int = 600):
+        import configuracion
+        self.escenario = copy.deepcopy(ESCENARIO_DEFECTO)
+        self.escenario.update(escenario or {})
+        esc = self.escenario
+
+        self.ancho = ancho
+        self.alto = alto
+        self.azar = random.Random(esc['semilla'])
+
+        drops = esc['drops'] if esc['drops'] is not None else list(configuracion.DROP_ITEMS_OBJETIVO[:2])
+        if esc['mobs'] is None:
+            self.mobs = [
+                {'nombre': nombre, 'vida': esc['vida_mob'], 'danio': esc['danio_mob'],
+                 'prob_trabado': esc['prob_trabado'], 'drops': drops}
+                for nombre in configuracion.MOBS_OBJETIVO[:3]
+            ]
+        else:
+            self.mobs = esc['mobs']
+        if not self.mobs:
+            raise ValueError("El escenario no tiene mobs (ni MOBS_OBJETIVO en la configuración)")
+
+        # Personaje
+        self.vida = 100.0
+        self.mana = 100.0
+        self.objetivo: Optional[MobSimulado] = None
+        self.drop_objetivo: Optional[str] = None
+        self.suelo: List[str] = []
+
+        # Métricas
+        self.inicio = time.perf_counter()
+        self.muertes_mob = 0
+        self.tiempos_muerte: List[float] = []
+        self.muertes_personaje = 0
+        self.loot_recogido = 0
+        self.respuestas_curacion: Dict[str, List[float]] = {'vida': [], 'mana': []}
+        self._curacion_pendiente: Dict[str, Optional[float]] = {'vida': None, 'mana': None}
+        self.trabados = 0
+        self.tiempos_recuperacion: List[float] = []
+        self.teclas: Dict[str, int] = {}
+
+        # Desplazamiento del marco del objetivo (evento mover_interfaz)
+        self.desplazamiento = (0, 0)
+        self._limpiar_superficie = False
+
+        self._eventos = sorted(esc['eventos'], key=lambda e: e['t'])
+        self._ultimo = self.inicio
+        self._lock = threading.RLock()
+
+    # ------------------------------
+    # Configuración del bot (leída dinámicamente)
+    # ------------------------------
+    @staticmethod
+    def _tecla_de_vk(vk_code: int) -> Optional[str]:
+        import configuracion
+        for tecla, codigo in configuracion.VK_CODES.items():
+            if codigo == vk_code:
+                return tecla
+        return None
+
+    @staticmethod
+    def _umbral_curacion(recurso: str, en_combate: bool) -> float:
+        """Nivel (%) por debajo del cual el bot debería curar el recurso."""
+        import configuracion
+        config = configuracion.AUTOCURACION[recurso]
+        if LectorVitales.usa_barra(config):
+            return LectorVitales.umbral(config, en_combate)
+        x0, x1, _ = JuegoSimulado._barra(recurso)
+        return 100.0 * (config['x'] - x0) / (x1 - x0)
+
+    @staticmethod
+    def _barra(recurso: str) -> tuple:
+        """Extensión (x_inicio, x_fin, y) de la barra dibujada para el recurso."""
+        import configuracion
+        config = configuracion.AUTOCURACION[recurso]
+        barra = config.get('barra')
+        if barra:
+            return barra['x_inicio'], barra['x_fin'], barra['y']
+        return BARRA_X_INICIO, BARRA_X_FIN, config['y']
+
+    # ------------------------------
+    # Mundo
+    # ------------------------------
+    def _avanzar(self) -> None:
+        """Integra el tiempo transcurrido desde la última actualización."""
+        ahora = time.perf_counter()
+        dt = ahora - self._ultimo
+        self._ultimo = ahora
+        esc = self.escenario
+
+        while self._eventos and self._eventos[0]['t'] <= ahora - self.inicio:
+            self._aplicar_evento(self._eventos.pop(0))
+
+        if self.objetivo is not None:
+            self.vida -= self.objetivo.danio * dt
+        self.mana = min(100.0, self.mana + esc['regeneracion_mana'] * dt)
+
+        if self.vida <= 0:
+            self.muertes_personaje += 1
+            print("[SIMULADOR] El personaje murió")
+            self.vida = 100.0
+            self.objetivo = None
+
+        self._vigilar_curacion(ahora)
+
+    def _aplicar_evento(self, evento: dict) -> None:
+        """Aplica un evento programado del escenario."""
+        accion = evento['accion']
+        if accion == 'danio':
+            if evento.get('recurso', 'vida') == 'vida':
+                self.vida = max(1.0, self.vida - evento['cantidad'])
+            else:
+                self.mana = max(0.0, self.mana - evento['cantidad'])
+        elif accion == 'trabar' and self.objetivo is not None and not self.objetivo.trabado:
+            self.objetivo.trabado = True
+            self.objetivo.inicio = time.perf_counter()
+            self.trabados += 1
+        elif accion == 'mover_interfaz':
+            dx, dy = self.desplazamiento
+            self.desplazamiento = (dx + evento.get('dx', 0), dy + evento.get('dy', 0))
+            self._limpiar_superficie = True
+        print(f"[SIMULADOR] Evento: {evento}")
+
+    def _vigilar_curacion(self, ahora: float) -> None:
+        """Marca el inicio de una necesidad de curación (recurso bajo el umbral)."""
+        en_combate = self.objetivo is not None
+        for recurso, nivel in (('vida', self.vida), ('mana', self.mana)):
+            bajo = nivel < self._umbral_curacion(recurso, en_combate)
+            if bajo and self._curacion_pendiente[recurso] is None:
+                self._curacion_pendiente[recurso] = ahora
+            elif not bajo:
+                self._curacion_pendiente[recurso] = None
+
+    def _curar(self, recurso: str) -> None:
+        ahora = time.perf_counter()
+        pendiente = self._curacion_pendiente[recurso]
+        if pendiente is not None:
+            self.respuestas_curacion[recurso].append(ahora - pendiente)
+            self._curacion_pendiente[recurso] = None
+        if recurso == 'vida':
+            self.vida = min(100.0, self.vida + self.escenario['curacion_vida'])
+        else:
+            self.mana = min(100.0, self.mana + self.escenario['curacion_mana'])
+
+    def _seleccionar(self) -> None:
+        """Tecla de selección: un drop del suelo o un mob nuevo."""
+        esc = self.escenario
+        if self.objetivo is not None:
+            return
+        if self.suelo and self.drop_objetivo is None and self.azar.random() < esc['prob_seleccionar_drop']:
+            self.drop_objetivo = self.azar.choice(self.suelo)
+            return
+
+        self.drop_objetivo = None
+        datos = self.azar.choice(self.mobs)
+        trabado = self.azar.random() < datos.get('prob_trabado', esc['prob_trabado'])
+        self.objetivo = MobSimulado(
+            datos['nombre'], datos.get('vida', esc['vida_mob']), datos.get('danio', esc['danio_mob']),
+            trabado, datos.get('drops', [])
+        )
+        if trabado:
+            self.trabados += 1
+
+    def _usar_habilidad(self) -> None:
+        esc = self.escenario
+        mob = self.objetivo
+        if mob is None or self.mana < esc['costo_mana_habilidad']:
+            return
+        self.mana -= esc['costo_mana_habilidad']
+        if mob.trabado:
+            return
+
+        mob.vida -= esc['danio_habilidad']
+        if mob.vida <= 0:
+            self.muertes_mob += 1
+            self.tiempos_muerte.append(time.perf_counter() - mob.inicio)
+            if mob.drops:
+                self.suelo.extend(self.azar.choice(mob.drops) for _ in range(esc['drops_por_mob']))
+            self.objetivo = None
+
+    def _recoger(self) -> None:
+        self.loot_recogido += len(self.suelo)
+        self.suelo.clear()
+        self.drop_objetivo = None
+
+    # ------------------------------
+    # Entrada
+    # ------------------------------
+    def recibir_tecla(self, vk_code: int) -> None:
+        """Procesa una tecla enviada por el bot."""
+        import configuracion
+        tecla = self._tecla_de_vk(vk_code)
+        if tecla is None:
+            return
+
+        with self._lock:
+            self._avanzar()
+            self.teclas[tecla] = self.teclas.get(tecla, 0) + 1
+
+            if tecla == configuracion.OBSERVADOR_OBJETIVO.get('tecla_seleccionar', 'E'):
+                self._seleccionar()
+            if tecla == 'F':
+                self._recoger()
+            habilidad = configuracion.HABILIDADES.get(tecla)
+            if habilidad and habilidad['active']:
+                self._usar_habilidad()
+            for recurso in ('vida', 'mana'):
+                if tecla in configuracion.AUTOCURACION[recurso]['tecla']:
+                    self._curar(recurso)
+
+    def recibir_clic(self, x: int, y: int) -> None:
+        """Procesa un clic (coordenadas relativas a la ventana)."""
+        with self._lock:
+            self._avanzar()
+            mob = self.objetivo
+            if mob is None or not mob.trabado:
+                return
+            mob.clics += 1
+            if mob.clics >= self.escenario['clics_para_destrabar']:
+                # El personaje se alejó: se pierde el objetivo trabado
+                self.tiempos_recuperacion.append(time.perf_counter() - mob.inicio)
+                self.objetivo = None
+
+    # ------------------------------
+    # Dibujo
+    # ------------------------------
+    def _dibujar_barra(self, pantalla: np.ndarray, recurso: str, nivel: float, color: tuple) -> None:
+        x0, x1, y = self._barra(recurso)
+        filas = slice(max(0, y - ALTO_BARRA // 2), y + ALTO_BARRA // 2 + 1)
+        lleno = x0 + int(round((x1 - x0) * max(0.0, nivel) / 100.0))
+        pantalla[filas, x0:x1] = COLOR_FONDO_BARRA
+        pantalla[filas, x0:lleno] = color
+
+    def renderizar(self, pantalla: np.ndarray) -> None:
+        """Dibuja el estado actual en la superficie de la ventana (BGRA)."""
+        import configuracion
+        with self._lock:
+            self._avanzar()
+            if self._limpiar_superficie:
+                # La interfaz se movió: se borra el marco de la posición anterior
+                pantalla[:] = (0, 0, 0, 255)
+                self._limpiar_superficie = False
+            self._dibujar_barra(pantalla, 'vida', self.vida, _bgra(COLORES_VIDA[0]))
+            self._dibujar_barra(pantalla, 'mana', self.mana, _bgra(COLORES_MANA[0]))
+
+            # Placa de nombre del objetivo (texto claro sobre fondo oscuro, como el juego)
+            region = configuracion.OCR_REGION
+            x = region['left_offset'] + self.desplazamiento[0]
+            y = region['top_offset'] + self.desplazamiento[1]
+            placa = pantalla[y:y + region['height'], x:x + region['width']]
+            placa[:] = (0, 0, 0, 255)
+            x_emblema = x + region['width'] + SEPARACION_EMBLEMA
+            _dibujar_emblema(pantalla[y:y + region['height'], x_emblema:x_emblema + ANCHO_EMBLEMA])
+            nombre = self.objetivo.nombre if self.objetivo else (self.drop_objetivo or '')
+            if nombre:
+                cv2.putText(placa, nombre, (2, region['height'] - 3), cv2.FONT_HERSHEY_SIMPLEX,
+                            0.4, COLOR_TEXTO, 1, cv2.LINE_AA)
+
+            # Drops en el suelo alrededor del personaje
+            centro_x, centro_y = self.ancho // 2, self.alto // 2 + 60
+            pantalla[centro_y - 10:centro_y + 10, centro_x - 100:centro_x + 100] = (0, 0, 0, 255)
+            for i in range(min(len(self.suelo), 10)):
+                dx = centro_x - 95 + i * 20
+                pantalla[centro_y - 4:centro_y + 4, dx:dx + 8] = COLOR_DROP_SUELO
+
+    # ------------------------------
+    # Informe
+    # ------------------------------
+    def informe(self) -> dict:
+        """Métricas acumuladas de la simulación."""
+        with self._lock:
+            duracion = time.perf_counter() - self.inicio
+            return {
+                'duracion': duracion,
+                'mobs_muertos': self.muertes_mob,
+                'mobs_por_hora': self.muertes_mob * 3600.0 / duracion if duracion else 0.0,
+                'tiempos_muerte': list(self.tiempos_muerte),
+                'muertes_personaje': self.muertes_personaje,
+                'loot_recogido': self.loot_recogido,
+                'respuestas_curacion': {r: list(v) for r, v in self.respuestas_curacion.items()},
+                'curaciones_pendientes': [r for r, t in self._curacion_pendiente.items() if t is not None],
+                'mobs_trabados': self.trabados,
+                'tiempos_recuperacion': list(self.tiempos_recuperacion),
+                'teclas': dict(self.teclas),
+            }
+
+    def imprimir_informe(self, titulo: str = "INFORME DE SIMULACIÓN") -> None:
+        """Imprime el informe de la simulación."""
+        datos = self.informe()
+
+        def resumen(valores: List[float], escala: float, unidad: str) -> str:
+            if not valores:
+                return "sin datos"
+            v = np.array(valores) * escala
+            return (f"n={len(v)} media={v.mean():.1f}{unidad} p50={np.percentile(v, 50):.1f}{unidad} "
+                    f"p95={np.percentile(v, 95):.1f}{unidad} máx={v.max():.1f}{unidad}")
+
+        print("\n" + "=" * 70)
+        print(titulo)
+        print("=" * 70)
+        print(f"  Duración:              {datos['duracion']:.0f}s")
+        print(f"  Mobs muertos:          {datos['mobs_muertos']} ({datos['mobs_por_hora']:.0f}/hora)")
+        print(f"  Tiempo por mob:        {resumen(datos['tiempos_muerte'], 1, 's')}")
+        print(f"  Muertes del personaje: {datos['muertes_personaje']}")
+        print(f"  Loot recogido:         {datos['loot_recogido']}")
+        print(f"  Respuesta curación vida: {resumen(datos['respuestas_curacion']['vida'], 1000, 'ms')}")
+        print(f"  Respuesta curación maná: {resumen(datos['respuestas_curacion']['mana'], 1000, 'ms')}")
+        if datos['curaciones_pendientes']:
+            print(f"  Curaciones pendientes al terminar: {', '.join(datos['curaciones_pendientes'])}")
+        print(f"  Mobs trabados:         {datos['mobs_trabados']} "
+              f"(recuperados {len(datos['tiempos_recuperacion'])})")
+        print(f"  Recuperación:          {resumen(datos['tiempos_recuperacion'], 1, 's')}")
+        print(f"  Teclas recibidas:      {datos['teclas']}")
+        print("=" * 70)
+
+
+class BackendSimulador(BackendHeadless):
+    """
+    BackendHeadless conectado a uno o varios JuegoSimulado, cada uno en su
+    ventana (todas con el mismo título, una al lado de la otra): cada captura
+    dibuja el juego de la ventana capturada y cada tecla o clic se entrega al
+    juego de su ventana (además de registrarse).
+    """
+
+    def __init__(self, juego, titulo: str):
+        juegos = list(juego) if isinstance(juego, (list, tuple)) else [juego]
+        super().__init__(sum(j.ancho for j in juegos), max(j.alto for j in juegos))
+        self.juegos = juegos
+        self.juego = juegos[0]
+        self._juegos: Dict[int, JuegoSimulado] = {}
+        left = 0
+        for j in juegos:
+            hwnd = self.agregar_ventana(titulo, left, 0, j.ancho, j.alto)
+            self._juegos[hwnd] = j
+            left += j.ancho
+        self.hwnd_juego = self.buscar_ventana(titulo)
+
+    def _ventana_en(self, x: int, y: int) -> Optional[int]:
+        """Handle de la ventana que contiene el punto de pantalla (x, y)."""
+        for hwnd in self._juegos:
+            g = self.geometria(hwnd)
+            if g.left <= x < g.right and g.top <= y < g.bottom:
+                return hwnd
+        return None
+
+    def capturar(self, left: int, top: int, width: int, height: int) -> np.ndarray:
+        hwnd = self._ventana_en(left, top)
+        if hwnd is not None:
+            g = self.geometria(hwnd)
+            self._juegos[hwnd].renderizar(self.pantalla.pantalla[g.top:g.bottom, g.left:g.right])
+        # Copia: la superficie se vuelve a dibujar desde otros hilos
+        return super().capturar(left, top, width, height).copy()
+
+    def enviar_tecla(self, hwnd: int, vk_code: int, duracion: float = 0.05) -> None:
+        super().enviar_tecla(hwnd, vk_code, duracion)
+        juego = self._juegos.get(hwnd)
+        if juego is not None:
+            juego.recibir_tecla(vk_code)
+
+    def clic(self, x: int, y: int) -> None:
+        super().clic(x, y)
+        hwnd = self._ventana_en(x, y)
+        if hwnd is not None:
+            geometria = self.geometria(hwnd)
+            self._juegos[hwnd].recibir_clic(x - geometria.left, y - geometria.top)
+
+
+def main() -> int:
+    """Ejecuta el bot completo contra el juego simulado."""
+    parser = argparse.ArgumentParser(description="Ejecuta el bot contra un juego simulado.")
+    parser.add_argument('--escenario', help="Archivo JSON con el escenario")
+    parser.add_argument('--duracion', type=float, help="Segundos de simulación (sobrescribe el escenario)")
+    parser.add_argument('--clientes', type=int, default=1,
+                        help="Juegos simulados en paralelo, uno por ventana (por defecto 1)")
+    parser.add_argument('--localizar', action='store_true',
+                        help="Ubicar la región OCR con la plantilla del emblema del marco (ver mover_interfaz)")
+    parser.add_argument('--combates', help="Base de estadísticas de combate (por defecto una temporal, "
+                                            "para no mezclar la simulación con combates.sqlite)")
+    args = parser.parse_args()
+    if args.clientes < 1:
+        parser.error("--clientes debe ser al menos 1")
+
+    escenario = {}
+    if args.escenario:
+        with open(args.escenario, 'r', encoding='utf-8') as f:
+            escenario = json.load(f)
+    if args.duracion:
+        escenario['duracion'] = args.duracion
+
+    from backend_plataforma import establecer_backend
+    from configuracion import GAME_WINDOW_TITLE
+    from game_window import GameWindow
+    from estado_objetivo import estado, EstadoObjetivo, espacio_de_ventana
+    from almacen_configuracion import almacen
+    from bot_controller import ClienteBot
+    from estadisticas_combate import base_combates
+    from ajuste_escape import ajuste_escape
+
+    juegos = []
+    for i in range(args.clientes):
+        # Cada cliente con su propia semilla para que no jueguen la misma partida
+        escenario_cliente = dict(escenario)
+        escenario_cliente['semilla'] = escenario.get('semilla', ESCENARIO_DEFECTO['semilla']) + i
+        juegos.append(JuegoSimulado(escenario_cliente))
+    establecer_backend(BackendSimulador(juegos, GAME_WINDOW_TITLE))
+
+    if args.localizar:
+        import os
+        import tempfile
+        ruta = os.path.join(tempfile.gettempdir(), 'plantilla_marco_simulador.png')
+        offset_x, offset_y = guardar_plantilla_marco(ruta)
+        region = dict(almacen.actual.como_dict()['OCR_REGION'], plantilla=ruta,
+                      plantilla_offset_x=offset_x, plantilla_offset_y=offset_y)
+        exito, mensaje = almacen.publicar({'OCR_REGION': region}, origen="simulador")
+        print(f"[SIMULADOR] Plantilla del marco: {ruta} ({mensaje})")
+
+    clientes = []
+    for i, game_window in enumerate(GameWindow.todas(GAME_WINDOW_TITLE)):
+        estado_cliente = estado if i == 0 else EstadoObjetivo(espacio_de_ventana(game_window.hwnd))
+        clientes.append(ClienteBot(game_window, estado_cliente, almacen, f"cliente {i + 1}"))
+    juego = juegos[0]
+    duracion = juego.escenario['duracion']
+    print(f"[SIMULADOR] Ejecutando el bot {duracion:.0f}s contra {len(juegos)} juego(s) simulado(s) "
+          f"({len(juego.mobs)} mobs, semilla {juego.escenario['semilla']})")
+
+    if args.combates:
+        base_combates.ruta = args.combates
+    else:
+        import os
+        import tempfile
+        base_combates.ruta = os.path.join(tempfile.gettempdir(), f'combates_simulador_{os.getpid()}.sqlite')
+    base_combates.iniciar()
+    ajuste_escape.iniciar(base_combates, almacen.actual.compilada.escape)
+    for cliente in clientes:
+        cliente.iniciar()
+    try:
+        fin = time.perf_counter() + duracion
+        while time.perf_counter() < fin:
+            time.sleep(1.0)
+            for cliente, j in zip(clientes, juegos):
+                info = cliente.estado.obtener_info()
+                print(f"[SIMULADOR] {cliente.nombre}: Vida {j.vida:5.1f}% | Maná {j.mana:5.1f}% | "
+                      f"Objetivo {info['tipo'].value} | Mobs muertos {j.muertes_mob}")
+    except KeyboardInterrupt:
+        print("\n[SIMULADOR] Detenido por el usuario")
+    finally:
+        for cliente in clientes:
+            cliente.detener()
+        base_combates.detener()
+        ajuste_escape.detener()
+
+    for mob, datos in sorted(base_combates.percentiles_ttk().items()):
+        print(f"[SIMULADOR] Combates {mob}: {datos['muertes']} muertes | "
+              f"TTK p50 {datos['p50']:.1f}s p90 {datos['p90']:.1f}s ({base_combates.ruta})")
+    if len(juegos) == 1:
+        juego.imprimir_informe()
+        return 0
+    for cliente, j in zip(clientes, juegos):
+        j.imprimir_informe(f"INFORME DE SIMULACIÓN - {cliente.nombre.upper()}")
+    por_hora = [j.informe()['mobs_por_hora'] for j in juegos]
+    print(f"\n[SIMULADOR] Mobs/hora por cliente: {', '.join(f'{v:.0f}' for v in por_hora)} "
+          f"| total {sum(por_hora):.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
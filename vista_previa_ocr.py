@@ -0,0 +1,82 @@
+"""
+Vista previa del detector OCR para depuración.
+Responsabilidad: Entregar a la GUI el último cuadro del detector sin frenar la detección (Single Responsibility Principle)
+
+El detector publica en un buffer de una sola posición: cada cuadro reemplaza
+al anterior (sin cola que crezca) y se guarda por referencia, sin copiar las
+imágenes (el detector crea arrays nuevos en cada ciclo y no los modifica
+después). Con la vista previa cerrada el costo en el detector es leer un
+atributo; abierta, crear una tupla por cuadro. La GUI lee el buffer a su
+propio ritmo (máximo de cuadros/s configurable) y es la que copia y escala
+las imágenes para mostrarlas.
+
+Hay un buffer por espacio de estado (uno por cliente del juego).
+"""
+import threading
+from typing import Dict, NamedTuple, Optional, Tuple
+
+# Espacio de estado por defecto: estado_objetivo.ESPACIO_GLOBAL (no se importa
+# para que la GUI no arranque el Manager del estado al cargar el panel)
+ESPACIO_GLOBAL = 'global'
+
+
+class CuadroOCR(NamedTuple):
+    """Un cuadro del detector: imágenes y resultado de la clasificación."""
+    captura: object            # Región capturada (BGRA, numpy)
+    binaria: object            # Imagen preprocesada que recibe el OCR (gris, numpy)
+    texto: str                 # Texto completo del OCR
+    nombre: str                # Primera línea (la que se clasifica)
+    tipo: str                  # 'nulo', 'mob' o 'drop'
+    coincidente: Optional[str] # Nombre de la lista que coincidió
+    similitud: float           # 0-1
+    latencia: float            # Segundos desde la captura hasta la clasificación
+
+
+class BufferUltimoCuadro:
+    """
+    Buffer de una posición con el último cuadro publicado.
+    publicar() y tomar() no toman locks: asignar una tupla es atómico.
+    """
+
+    def __init__(self):
+        # Lo activa la GUI mientras la vista previa está visible
+        self.activo = False
+        self._ultimo: Tuple[int, Optional[CuadroOCR]] = (0, None)
+        self.publicados = 0
+
+    def publicar(self, cuadro: CuadroOCR) -> None:
+        """Reemplaza el último cuadro (hilo del detector; solo si activo)."""
+        self.publicados += 1
+        self._ultimo = (self.publicados, cuadro)
+
+    def tomar(self, visto: int = 0) -> Tuple[int, Optional[CuadroOCR]]:
+        """
+        Retorna el último cuadro si es más nuevo que 'visto'.
+
+        Args:
+            visto: Número del último cuadro que ya se mostró
+
+        Returns:
+            Tupla (número, cuadro o None si no hay uno nuevo)
+        """
+        numero, cuadro = self._ultimo
+        if numero <= visto:
+            return visto, None
+        return numero, cuadro
+
+    def limpiar(self) -> None:
+        """Descarta el cuadro guardado (libera las imágenes)."""
+        self._ultimo = (self.publicados, None)
+
+
+_buffers: Dict[str, BufferUltimoCuadro] = {}
+_lock = threading.Lock()
+
+
+def obtener_buffer(espacio: str = ESPACIO_GLOBAL) -> BufferUltimoCuadro:
+    """Buffer de vista previa de un espacio de estado (se crea la primera vez)."""
+    buffer = _buffers.get(espacio)
+    if buffer is None:
+        with _lock:
+            buffer = _buffers.setdefault(espacio, BufferUltimoCuadro())
+    return buffer